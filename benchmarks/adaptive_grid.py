@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de la grille adaptative (src/noise/adaptive.py)
+Évaluations, temps et écart des isophones par rapport à la grille uniforme au pas fin ;
+échec si l'écart maximal dépasse la tolérance de raffinement
+Projet: Airport Air Quality Modeling
+
+Usage:
+    python benchmarks/adaptive_grid.py                          # ±8 km, pas fin 25 m, 3 niveaux
+    python benchmarks/adaptive_grid.py --step 12.5 --levels 4 --no-uniform
+"""
+
+import argparse
+import sys
+import time
+from datetime import time as clock
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from noise_engine import AIRPORT_X, AIRPORT_Y, SYNTHETIC_PROFILES, synthetic_tracks  # noqa: E402
+from src.grids.spec import GridSpec  # noqa: E402
+from src.noise.adaptive import (  # noqa: E402
+    DEFAULT_GRADIENT_TOLERANCE, level_evaluator, refine_grid, track_segments,
+)
+from src.noise.contours import DEFAULT_THRESHOLDS, extract_contours  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de la grille adaptative')
+    parser.add_argument('--flights', type=int, default=40)
+    parser.add_argument('--half-width', type=float, default=8000.0, help='Demi-emprise (m)')
+    parser.add_argument('--step', type=float, default=25.0, help='Pas fin (m)')
+    parser.add_argument('--levels', type=int, default=3, help='Niveaux de raffinement')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_GRADIENT_TOLERANCE)
+    parser.add_argument('--no-uniform', action='store_true', help='Ne pas calculer la grille uniforme')
+    args = parser.parse_args()
+
+    tracks = synthetic_tracks(args.flights)
+    # Répartition des mouvements sur la journée (jour, soirée, nuit)
+    times = {track.flight_id: clock((6 + 7 * i) % 24) for i, track in enumerate(tracks)}
+    evaluate = level_evaluator(tracks, times, SYNTHETIC_PROFILES)
+    spec = GridSpec.centered(AIRPORT_X, AIRPORT_Y, args.half_width, args.step)
+
+    start = time.perf_counter()
+    spec, adaptive, stats = refine_grid(evaluate, spec, args.levels, DEFAULT_THRESHOLDS, args.tolerance,
+                                        track_segments(tracks))
+    adaptive_time = time.perf_counter() - start
+    print(f"\n🔍 Grille adaptative {spec.nx}×{spec.ny} (pas fin {spec.step:g} m), {args.flights} vols")
+    print(stats.report())
+    print(f"   {adaptive_time:.2f}s")
+
+    if args.no_uniform:
+        return 0
+
+    start = time.perf_counter()
+    uniform = evaluate(spec.points()).reshape(spec.shape)
+    uniform_time = time.perf_counter() - start
+    error = np.abs(adaptive - uniform)
+    max_error = float(np.nanmax(error))
+    print(f"\n📏 Grille uniforme : {uniform_time:.2f}s (×{uniform_time / adaptive_time:.1f})"
+          f" | écart max {max_error:.2f} dB | nœuds à plus de 0,5 dB {np.mean(error > 0.5):.2%}")
+
+    print(f"\n{'seuil':>6} {'adaptative ha':>14} {'uniforme ha':>12} {'diff. sym. ha':>14}")
+    uniform_contours = {c.threshold: c for c in extract_contours(uniform, spec)}
+    for contour in extract_contours(adaptive, spec):
+        reference = uniform_contours.get(contour.threshold)
+        if reference is None:
+            continue
+        difference = contour.geometry.symmetric_difference(reference.geometry).area / 10_000
+        print(f"{contour.threshold:>6.0f} {contour.area_ha:>14,.1f} {reference.area_ha:>12,.1f} {difference:>14,.2f}")
+
+    if max_error > args.tolerance:
+        print(f"\n❌ Écart max {max_error:.2f} dB au-delà de la tolérance ({args.tolerance:g} dB)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
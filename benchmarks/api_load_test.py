@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de charge de l'API : latences p50 / p95 / p99 sous N clients concurrents
+Projet: Airport Air Quality Modeling
+
+Usage:
+    uvicorn src.api.main:app --port 8000 --workers 4
+    python benchmarks/api_load_test.py --url http://localhost:8000 --clients 200 --requests 20
+    python benchmarks/api_load_test.py --revalidate      # clients avec If-None-Match (304)
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+
+DEFAULT_ENDPOINTS = [
+    "/kpis",
+    "/emissions/temporal?bucket=day",
+    "/emissions/aircraft",
+    "/emissions/phases",
+    "/emissions/pollutants",
+]
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return float('nan')
+    index = min(int(round(q / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+async def client_loop(client, endpoints: List[str], n_requests: int, revalidate: bool,
+                      offset: int) -> List[Tuple[str, int, float, int]]:
+    """Un client : n_requests requêtes séquentielles en parcourant les endpoints"""
+    etags: Dict[str, str] = {}
+    results = []
+    for i in range(n_requests):
+        endpoint = endpoints[(offset + i) % len(endpoints)]
+        headers = {'Accept-Encoding': 'br, gzip'}
+        if revalidate and endpoint in etags:
+            headers['If-None-Match'] = etags[endpoint]
+        start = time.perf_counter()
+        try:
+            response = await client.get(endpoint, headers=headers)
+            status = response.status_code
+            size = len(response.content)
+            if 'etag' in response.headers:
+                etags[endpoint] = response.headers['etag']
+        except Exception:
+            status, size = 0, 0
+        results.append((endpoint, status, time.perf_counter() - start, size))
+    return results
+
+
+async def run(url: str, endpoints: List[str], clients: int, n_requests: int, revalidate: bool):
+    import httpx
+
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        start = time.perf_counter()
+        batches = await asyncio.gather(*[
+            client_loop(client, endpoints, n_requests, revalidate, offset)
+            for offset in range(clients)
+        ])
+        duration = time.perf_counter() - start
+    return [result for batch in batches for result in batch], duration
+
+
+def report(results, duration: float, clients: int):
+    latencies = [latency * 1000 for _, status, latency, _ in results if status in (200, 304)]
+    statuses = Counter(status for _, status, _, _ in results)
+
+    print(f"\n📊 {len(results):,} requêtes, {clients} clients, {duration:.1f}s "
+          f"({len(results) / duration:,.0f} req/s)")
+    print(f"   statuts: {dict(sorted(statuses.items()))}")
+    if latencies:
+        print(f"   latence p50 {percentile(latencies, 50):.1f} ms | p95 {percentile(latencies, 95):.1f} ms"
+              f" | p99 {percentile(latencies, 99):.1f} ms | moyenne {statistics.mean(latencies):.1f} ms")
+
+    print(f"\n{'endpoint':<40} {'n':>6} {'p50 ms':>8} {'p95 ms':>8} {'Ko moy.':>8}")
+    for endpoint in sorted({r[0] for r in results}):
+        rows = [r for r in results if r[0] == endpoint and r[1] in (200, 304)]
+        values = [r[2] * 1000 for r in rows]
+        sizes = [r[3] for r in rows]
+        if values:
+            print(f"{endpoint:<40} {len(values):>6} {percentile(values, 50):>8.1f} "
+                  f"{percentile(values, 95):>8.1f} {statistics.mean(sizes) / 1024:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge de l'API")
+    parser.add_argument('--url', default='http://localhost:8000')
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=20, help='Requêtes par client')
+    parser.add_argument('--endpoint', action='append', help='Endpoint à tester (répétable)')
+    parser.add_argument('--revalidate', action='store_true', help='Renvoyer les ETag reçus (If-None-Match)')
+    args = parser.parse_args()
+
+    endpoints = args.endpoint or DEFAULT_ENDPOINTS
+    results, duration = asyncio.run(run(args.url, endpoints, args.clients, args.requests, args.revalidate))
+    report(results, duration, args.clients)
+
+    errors = sum(1 for _, status, _, _ in results if status not in (200, 304))
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
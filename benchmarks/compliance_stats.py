@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark des statistiques de conformité incrémentales (src/dispersion/compliance.py)
+Grille horaire synthétique de NO2 / PM10 : coût de mise à jour par journée,
+taille du point de reprise, lecture des indicateurs, et comparaison avec le
+calcul exact (tri des valeurs) sur un échantillon de cellules
+Projet: Airport Air Quality Modeling
+
+Usage:
+    python benchmarks/compliance_stats.py                  # 500 × 500 cellules, 31 jours
+    python benchmarks/compliance_stats.py --size 200 --days 365
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.dispersion.compliance import ComplianceAccumulator  # noqa: E402
+from src.grids.spec import GridSpec  # noqa: E402
+
+AIRPORT_X = 684305.0
+AIRPORT_Y = 6864575.0
+
+SAMPLE_CELLS = 2000
+
+
+def synthetic_day(spec: GridSpec, hours: pd.DatetimeIndex, rng) -> np.ndarray:
+    """Concentrations horaires (24, ny, nx) en µg/m³ : fond log-normal + panache décroissant autour de la piste"""
+    x, y = spec.meshgrid()
+    distance_km = np.hypot(x - AIRPORT_X, y - AIRPORT_Y) / 1000.0
+    traffic = np.where((hours.hour >= 6) & (hours.hour < 23), 1.0, 0.2)
+    plume = 120.0 / (1.0 + distance_km) ** 1.5
+    background = rng.lognormal(np.log(25.0), 0.5, (len(hours), 1, 1))
+    noise = rng.lognormal(0.0, 0.35, (len(hours),) + spec.shape).astype(np.float32)
+    return (background + traffic[:, None, None] * plume * noise).astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Statistiques de conformité incrémentales')
+    parser.add_argument('--size', type=int, default=500, help='Cellules par côté')
+    parser.add_argument('--days', type=int, default=31, help='Journées cumulées (au moins 1)')
+    args = parser.parse_args()
+    rng = np.random.default_rng(3)
+
+    spec = GridSpec.centered(AIRPORT_X, AIRPORT_Y, args.size * 50.0, 100.0)
+    spec = spec.subgrid(slice(0, args.size), slice(0, args.size))
+    sample = rng.choice(spec.size, min(SAMPLE_CELLS, spec.size), replace=False)
+    accumulator = ComplianceAccumulator(spec, ['NO2', 'PM10'])
+    history = []
+    print(f"\n📏 Grille {spec.ny} × {spec.nx} ({spec.size:,} cellules), {args.days} jours, NO2 + PM10")
+
+    update = 0.0
+    for day in pd.date_range('2025-01-01', periods=args.days, freq='D'):
+        hours = pd.date_range(day, periods=24, freq='h')
+        values = synthetic_day(spec, hours, rng)
+        start = time.perf_counter()
+        accumulator.add('NO2', hours, values)
+        accumulator.add('PM10', hours, values * 0.8)
+        update += time.perf_counter() - start
+        history.append(values.reshape(24, -1)[:, sample])
+    per_day = update / args.days
+    print(f"{'mise à jour':<26} {per_day:>8.2f}s / jour ({per_day / 48 * 1000:.0f} ms par grille horaire), "
+          f"≈ {per_day * 365 / 60:.0f} min pour une année")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'checkpoint.npz'
+        start = time.perf_counter()
+        accumulator.save(path)
+        save = time.perf_counter() - start
+        size_mb = path.stat().st_size / 1e6
+        start = time.perf_counter()
+        reloaded = ComplianceAccumulator.load(path)
+        load = time.perf_counter() - start
+    print(f"{'point de reprise':<26} {size_mb:>8.0f} Mo, écriture {save:.1f}s, relecture {load:.1f}s")
+
+    start = time.perf_counter()
+    no2 = reloaded.indicators('NO2')
+    pm10 = reloaded.indicators('PM10')
+    indicators = time.perf_counter() - start
+    start = time.perf_counter()
+    median = reloaded.stats['NO2'].quantile(0.5)
+    p998 = reloaded.stats['NO2'].quantile(0.998)
+    quantiles = time.perf_counter() - start
+    print(f"{'indicateurs (2 polluants)':<26} {indicators:>8.2f}s  "
+          f"cellules non conformes NO2 horaire : {(~no2['conforme_h_200']).sum():,}, "
+          f"PM10 journalier : {(~pm10['conforme_j_50']).sum():,}")
+    print(f"{'médiane + P99,8 NO2':<26} {quantiles:>8.2f}s")
+
+    # Référence exacte sur l'échantillon : tri de toutes les valeurs horaires
+    exact = np.concatenate(history).astype(np.float64)
+    top = -np.sort(-exact, axis=0)
+    same_rank = np.allclose(no2['rang_h_19'].ravel()[sample], top[18])
+    same_count = np.array_equal(no2['depassements_h_200'].ravel()[sample], (exact > 200).sum(axis=0))
+    daily = (np.concatenate(history) * np.float32(0.8)).astype(np.float64).reshape(args.days, 24, -1).mean(axis=1)
+    same_daily = np.array_equal(pm10['depassements_j_50'].ravel()[sample], (daily > 50).sum(axis=0))
+    errors = {}
+    for q, approx in ((0.5, median), (0.998, p998)):
+        reference = np.quantile(exact.astype(np.float32), q, axis=0, method='inverted_cdf')
+        errors[q] = np.abs(approx[sample] / reference - 1)
+    print(f"   échantillon de {len(sample):,} cellules : rang 19 {'exact' if same_rank else 'FAUX'}, "
+          f"dépassements horaires {'exacts' if same_count else 'FAUX'}, journaliers "
+          f"{'exacts' if same_daily else 'FAUX'}")
+    print(f"   erreur relative max : médiane {errors[0.5].max():.2%} (histogramme), "
+          f"P99,8 {errors[0.998].max():.1e} (valeurs gardées)")
+    return 0 if same_rank and same_count and same_daily else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
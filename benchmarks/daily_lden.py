@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de la mise à jour journalière du Lden annuel (src/noise/daily_lden.py)
+Ajout d'une journée et remplacement d'une journée corrigée, comparés au
+recalcul de toutes les journées ; identité avec le cumul recalculé
+Projet: Airport Air Quality Modeling
+
+Usage:
+    python benchmarks/daily_lden.py                     # 7 journées de 200 mouvements, ±10 km au pas de 100 m
+    python benchmarks/daily_lden.py --days 30 --flights 100 --step 200
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from datetime import date, time as clock, timedelta
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from noise_engine import AIRPORT_X, AIRPORT_Y, SYNTHETIC_PROFILES, synthetic_tracks  # noqa: E402
+from src.grids.spec import GridSpec  # noqa: E402
+from src.noise.accumulator import PERIODS, LdenAccumulator  # noqa: E402
+from src.noise.daily_lden import DailyLden  # noqa: E402
+
+
+def day_accumulator(spec: GridSpec, day: date, n_flights: int, offset: int) -> LdenAccumulator:
+    """Journée synthétique : mouvements décalés d'un jour à l'autre"""
+    tracks = synthetic_tracks(n_flights + offset)[offset:]
+    times = {track.flight_id: clock((6 + 7 * i + offset) % 24) for i, track in enumerate(tracks)}
+    accumulator = LdenAccumulator(spec)
+    accumulator.add_flights(tracks, times, SYNTHETIC_PROFILES, day=day)
+    return accumulator
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mise à jour journalière du Lden annuel')
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--flights', type=int, default=200, help='Mouvements par journée')
+    parser.add_argument('--half-width', type=float, default=10000.0, help='Demi-emprise (m)')
+    parser.add_argument('--step', type=float, default=100.0, help='Pas de grille (m)')
+    args = parser.parse_args()
+
+    spec = GridSpec.centered(AIRPORT_X, AIRPORT_Y, args.half_width, args.step)
+    days = [date(2025, 8, 1) + timedelta(days=i) for i in range(args.days)]
+    print(f"\n📅 {args.days} journées × {args.flights} mouvements, {spec.size:,} récepteurs")
+
+    with tempfile.TemporaryDirectory() as root:
+        daily = DailyLden.open(Path(root) / "scenario", spec)
+        start = time.perf_counter()
+        for i, day in enumerate(days):
+            daily.update_day(day, day_accumulator(spec, day, args.flights, i))
+        full = time.perf_counter() - start
+        print(f"{'recalcul de toutes les journées':<40} {full:>8.2f}s")
+
+        # Correction d'une journée : nouveaux mouvements, seule cette journée est recalculée
+        corrected = days[len(days) // 2]
+        start = time.perf_counter()
+        daily.update_day(corrected, day_accumulator(spec, corrected, args.flights, 1000))
+        lden = daily.levels()['Lden']
+        update = time.perf_counter() - start
+        label = "remplacement d'une journée corrigée"
+        print(f"{label:<40} {update:>8.2f}s ({full / update:.0f}× plus rapide)")
+
+        # Référence : cumul exact reconstruit depuis les trames, et calcul float64 direct
+        reopened = DailyLden.open(Path(root) / "scenario", spec)
+        reopened.rebuild()
+        identical = all(np.array_equal(reopened.annual[p], daily.annual[p]) for p in PERIODS)
+        reference = LdenAccumulator(spec)
+        for i, day in enumerate(days):
+            reference.merge(day_accumulator(spec, day, args.flights, 1000 if day == corrected else i))
+        gap = np.nanmax(np.abs(np.where(np.isfinite(lden), lden - reference.lden(), 0)))
+        print(f"\n📏 Cumul incrémental identique au cumul reconstruit : {identical} | "
+              f"écart au calcul float64 direct : {gap:.2e} dB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
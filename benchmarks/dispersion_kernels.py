@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark du cache de noyaux unitaires par classe météo (src/dispersion/kernel_cache.py)
+Moyenne annuelle par histogramme des classes (cache vide, relu du disque,
+en mémoire) comparée au calcul heure par heure du panache sur un mois
+Projet: Airport Air Quality Modeling
+
+Usage:
+    python benchmarks/dispersion_kernels.py                # 8 760 h, 201 × 201 récepteurs, référence 720 h
+    python benchmarks/dispersion_kernels.py --direction-step 10 --reference-hours 240
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from dispersion_plume import AIRPORT_X, AIRPORT_Y, synthetic_meteo  # noqa: E402
+from src.dispersion.kernel_cache import KernelCache, MetBinning, SourceGroup, long_term_means  # noqa: E402
+from src.dispersion.plume import PlumeSources, concentrations, line_sources  # noqa: E402
+from src.grids.spec import GridSpec  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cache de noyaux de dispersion unitaires')
+    parser.add_argument('--hours', type=int, default=8760)
+    parser.add_argument('--reference-hours', type=int, default=720, help='Heures du calcul direct de référence')
+    parser.add_argument('--direction-step', type=float, default=MetBinning.direction_step_deg,
+                        help='Secteur de vent (degrés)')
+    parser.add_argument('--half-width', type=float, default=10000.0, help='Demi-largeur du domaine (m)')
+    parser.add_argument('--step', type=float, default=100.0, help='Pas de grille (m)')
+    args = parser.parse_args()
+    rng = np.random.default_rng(11)
+
+    meteo = synthetic_meteo(args.hours, rng)
+    groups = [
+        SourceGroup.from_frame('piste_nord', line_sources(AIRPORT_X - 1800, AIRPORT_Y + 600, AIRPORT_X + 1800,
+                                                          AIRPORT_Y + 600, 10, 10.0, 20.0, 5.0)),
+        SourceGroup.from_frame('piste_sud', line_sources(AIRPORT_X - 1500, AIRPORT_Y - 700, AIRPORT_X + 1500,
+                                                         AIRPORT_Y - 700, 10, 10.0, 20.0, 5.0)),
+    ]
+    # Trafic diurne : débits horaires (g/s) par groupe
+    activity = np.where((meteo.index.hour >= 6) & (meteo.index.hour < 23), 1.0, 0.2)
+    rates = {'NOx': activity[:, None] * rng.uniform(0.5, 1.5, (args.hours, len(groups)))}
+    spec = GridSpec.centered(AIRPORT_X, AIRPORT_Y, args.half_width, args.step)
+    binning = MetBinning(direction_step_deg=args.direction_step)
+
+    print(f"\n🌫️ {args.hours} h, {spec.shape[0]} × {spec.shape[1]} récepteurs, {len(groups)} groupes de sources, "
+          f"secteurs de {args.direction_step:g}° ({binning.n_classes} classes possibles)")
+
+    with tempfile.TemporaryDirectory() as root:
+        cache = KernelCache(spec, binning, root=root)
+        start = time.perf_counter()
+        long_term_means(cache, groups, rates, meteo)
+        cold = time.perf_counter() - start
+        print(f"🧮 Cache vide : {cache.computed} noyaux calculés en {cold:.2f}s")
+
+        reloaded = KernelCache(spec, binning, root=root)
+        start = time.perf_counter()
+        long_term_means(reloaded, groups, rates, meteo)
+        print(f"💾 Relecture disque (nouveau processus) : {time.perf_counter() - start:.2f}s "
+              f"| taux de succès {reloaded.hit_rate:.0%}")
+
+        start = time.perf_counter()
+        long_term_means(cache, groups, rates, meteo)
+        print(f"⚡ Noyaux en mémoire : {(time.perf_counter() - start) * 1000:.0f} ms | cache {cache.stats()}")
+
+        # Référence : panache heure par heure sur les premières heures
+        hours = min(args.reference_hours, args.hours)
+        subset = meteo.iloc[:hours]
+        sub_rates = {'NOx': rates['NOx'][:hours]}
+        approx = long_term_means(cache, groups, sub_rates, subset)['NOx']
+
+    sources = pd.concat([pd.DataFrame({'x': g.sources.x, 'y': g.sources.y, 'hauteur_m': g.sources.height,
+                                       'sigma_y0_m': g.sources.sigma_y0, 'sigma_z0_m': g.sources.sigma_z0})
+                         for g in groups], ignore_index=True)
+    per_source = np.concatenate([sub_rates['NOx'][:, [g]] * group.weights[None, :]
+                                 for g, group in enumerate(groups)], axis=1)
+    start = time.perf_counter()
+    exact = np.zeros(spec.size)
+    for block in range(0, hours, 48):
+        window = slice(block, block + 48)
+        exact += concentrations(PlumeSources.from_frame(sources), per_source[window],
+                                spec.points(), subset.iloc[window]).sum(axis=0)
+    exact = (exact / hours).reshape(spec.shape)
+    direct = time.perf_counter() - start
+    significant = exact > 0.01 * exact.max()
+    relative = np.abs(approx - exact)[significant] / exact[significant]
+    print(f"🐢 Calcul heure par heure : {hours} h en {direct:.1f}s (≈ {direct * args.hours / hours:.0f}s "
+          f"pour {args.hours} h)")
+    print(f"   Écart sur la moyenne (> 1 % du max) : médian {np.median(relative):.1%}, "
+          f"P95 {np.percentile(relative, 95):.1%}, max du domaine {approx.max():.2f} / {exact.max():.2f} µg/m³")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
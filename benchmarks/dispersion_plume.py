@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark du modèle de panache gaussien (src/dispersion/plume.py)
+Mois synthétique de météo horaire (classes de Turner), sources le long de
+deux pistes, grille de récepteurs autour de l'aéroport : temps par heure
+simulée et extrapolation à un mois, contrôle au point d'axe d'un panache
+Projet: Airport Air Quality Modeling
+
+Usage:
+    python benchmarks/dispersion_plume.py                  # 72 h, 201 × 201 récepteurs, 20 sources
+    python benchmarks/dispersion_plume.py --hours 720 --step 50
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.dispersion.meteo import solar_elevation, stability_class  # noqa: E402
+from src.dispersion.plume import (  # noqa: E402
+    PlumeSources, class_summary, concentrations, hourly_runs, line_sources,
+)
+from src.grids.spec import GridSpec  # noqa: E402
+
+AIRPORT_X = 684305.0
+AIRPORT_Y = 6864575.0
+
+POLLUTANTS = ('NOx', 'PM10', 'PM25')
+
+
+def synthetic_meteo(hours: int, rng) -> pd.DataFrame:
+    """Météo horaire plausible (cycle diurne, vents d'ouest dominants)"""
+    index = pd.date_range('2025-07-01', periods=hours, freq='h', name='heure')
+    diurnal = np.sin(2 * np.pi * (index.hour.to_numpy() - 9) / 24)
+    meteo = pd.DataFrame({
+        'temperature_c': 18 + 6 * diurnal + rng.normal(0, 1, hours),
+        'humidity_percent': np.clip(70 - 15 * diurnal + rng.normal(0, 10, hours), 20, 100),
+        'wind_speed_ms': np.clip(rng.gamma(2.5, 1.6, hours), 0.2, None),
+        'pressure_hpa': 1013 + rng.normal(0, 5, hours),
+        'wind_direction_deg': (250 + rng.normal(0, 60, hours)) % 360,
+    }, index=index)
+    meteo['solar_elevation_deg'] = solar_elevation(index)
+    meteo['stability'] = stability_class(meteo['wind_speed_ms'].to_numpy(), meteo['solar_elevation_deg'].to_numpy(),
+                                         meteo['humidity_percent'].to_numpy())
+    return meteo
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Modèle de panache gaussien')
+    parser.add_argument('--hours', type=int, default=72)
+    parser.add_argument('--half-width', type=float, default=10000.0, help='Demi-largeur du domaine (m)')
+    parser.add_argument('--step', type=float, default=100.0, help='Pas de grille (m)')
+    parser.add_argument('--sources', type=int, default=20)
+    args = parser.parse_args()
+    rng = np.random.default_rng(7)
+
+    meteo = synthetic_meteo(args.hours, rng)
+    half = args.sources // 2
+    frame = pd.concat([
+        line_sources(AIRPORT_X - 1800, AIRPORT_Y + 600, AIRPORT_X + 1800, AIRPORT_Y + 600, half, 10.0, 20.0, 5.0),
+        line_sources(AIRPORT_X - 1500, AIRPORT_Y - 700, AIRPORT_X + 1500, AIRPORT_Y - 700,
+                     args.sources - half, 10.0, 20.0, 5.0),
+    ], ignore_index=True)
+    sources = PlumeSources.from_frame(frame)
+    rates = {p: rng.uniform(0.5, 2.0, (args.hours, len(sources))) * scale
+             for p, scale in zip(POLLUTANTS, (1.0, 0.02, 0.02))}
+    spec = GridSpec.centered(AIRPORT_X, AIRPORT_Y, args.half_width, args.step)
+    stations = pd.DataFrame({'id_station': ['ST1', 'ST2'],
+                             'x': [AIRPORT_X + 3000, AIRPORT_X - 2000], 'y': [AIRPORT_Y, AIRPORT_Y + 2500]})
+
+    print(f"\n🌫️ {args.hours} h, {spec.shape[0]} × {spec.shape[1]} récepteurs, {len(sources)} sources, "
+          f"{len(POLLUTANTS)} polluants")
+    print(f"   Heures par classe : {class_summary(meteo)}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        store, series = hourly_runs(sources, rates, meteo, spec, stations, Path(tmp) / 'dispersion')
+        elapsed = time.perf_counter() - start
+        mean_nox = store.array('NOx').mean(axis=0)
+
+    per_hour = elapsed / args.hours
+    print(f"{'grilles + stations + magasin':<32} {elapsed:>8.2f}s  {per_hour * 1000:>7.1f} ms/h  "
+          f"≈ {per_hour * 720:.0f}s par mois")
+    print(f"   NOx moyen max {mean_nox.max():.1f} µg/m³, {len(series):,} valeurs aux stations")
+
+    # Contrôle : 1 g/s, vent de 5 m/s à 10 m, classe D, source au sol, axe à 1 km → ~22 µg/m³
+    check = pd.DataFrame({'temperature_c': [15.0], 'pressure_hpa': [1013.0], 'wind_speed_ms': [5.0],
+                          'wind_direction_deg': [270.0], 'stability': [3]})
+    axis = concentrations(PlumeSources.from_frame(line_sources(0, 0, 0, 0, 1)), np.ones((1, 1)),
+                          np.array([[1000.0, 0.0]]), check, receptor_height=0.0)
+    print(f"\n🎯 Axe à 1 km (D, 5 m/s, 1 g/s) : {axis[0, 0]:.1f} µg/m³")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
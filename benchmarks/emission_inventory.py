@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de l'inventaire d'émissions maillé (src/dispersion/inventory.py)
+Mois synthétique de vols (émissions par vol × phase comme etl_pipeline) :
+construction, conservation de la masse, taille sur disque, requêtes par
+fenêtre de temps et sources pour la dispersion
+Projet: Airport Air Quality Modeling
+
+Usage:
+    python benchmarks/emission_inventory.py                # 30 jours × 900 mouvements, ±20 km, pas 200 m
+    python benchmarks/emission_inventory.py --days 365 --movements 1200 --step 100
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.dispersion.inventory import (  # noqa: E402
+    LTO_PHASES, EmissionInventory, build_inventory, default_apron, default_runways,
+)
+from src.grids.spec import GridSpec  # noqa: E402
+
+AIRPORT_X = 684305.0
+AIRPORT_Y = 6864575.0
+
+# Débit carburant moyen (kg/h), régimes et facteurs d'émission (kg/kg) d'etl_pipeline
+FUEL_FLOW_KGH = 2500.0
+POWER_SETTING = {'taxi_out': 0.07, 'takeoff': 1.0, 'climb': 0.85, 'approach': 0.30, 'taxi_in': 0.07}
+EMISSION_FACTORS = {'NOx': 0.013, 'PM10': 0.0002, 'PM25': 0.0001}
+
+
+def synthetic_emissions(days: int, movements: int, rng) -> pd.DataFrame:
+    """Émissions par vol × phase (format de lto_frame), mouvements de 6 h à 23 h"""
+    total = days * movements
+    reference = (pd.Timestamp('2025-07-01') + pd.to_timedelta(rng.integers(0, days, total), unit='D')
+                 + pd.to_timedelta(rng.uniform(6, 23, total), unit='h')).floor('s')
+    departure = rng.random(total) < 0.5
+    rows = []
+    for phase, (movement, _, duration_s) in LTO_PHASES.items():
+        selected = departure if movement == 'depart' else ~departure
+        fuel = FUEL_FLOW_KGH * POWER_SETTING[phase] * duration_s / 3600 * rng.uniform(0.6, 1.6, selected.sum())
+        frame = pd.DataFrame({'flight_id': np.flatnonzero(selected).astype(str), 'flight_phase': phase,
+                              'heure_reference': reference[selected]})
+        for pollutant, factor in EMISSION_FACTORS.items():
+            frame[pollutant] = fuel * factor
+        rows.append(frame)
+    return pd.concat(rows, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inventaire d\'émissions maillé')
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--movements', type=int, default=900, help='Mouvements par jour')
+    parser.add_argument('--half-width', type=float, default=20000.0, help='Demi-emprise (m)')
+    parser.add_argument('--step', type=float, default=200.0, help='Pas de grille (m)')
+    args = parser.parse_args()
+    rng = np.random.default_rng(5)
+
+    emissions = synthetic_emissions(args.days, args.movements, rng)
+    runways = default_runways(AIRPORT_X, AIRPORT_Y)
+    spec = GridSpec.centered(AIRPORT_X, AIRPORT_Y, args.half_width, args.step)
+    hours = pd.date_range('2025-07-01', periods=args.days * 24, freq='h')
+    wind = pd.Series((250 + rng.normal(0, 70, len(hours))) % 360, index=hours)
+    print(f"\n🗺️ {len(emissions):,} lignes vol × phase ({args.days} j × {args.movements} mouvements), "
+          f"grille {spec.nx} × {spec.ny} × 5 tranches")
+
+    start = time.perf_counter()
+    inventory = build_inventory(emissions, runways, default_apron(runways), spec, wind_direction=wind)
+    build = time.perf_counter() - start
+    pollutants = list(EMISSION_FACTORS)
+    expected = emissions[pollutants].sum()
+    kept = inventory.totals()
+    dropped = pd.Series(inventory.attrs['ecarte_kg'])
+    balance = float(((kept + dropped - expected).abs() / expected).max())
+    print(f"{'construction':<28} {build:>8.2f}s  {len(emissions) / build:>10,.0f} lignes/s")
+    print(f"   {len(inventory.cells):,} cellules-heures non nulles sur {len(inventory.hours):,} h, "
+          f"{(kept / expected).min():.1%} de la masse dans la grille, bilan {balance:.1e}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'inventaire.npz'
+        start = time.perf_counter()
+        inventory.save(path)
+        save = time.perf_counter() - start
+        start = time.perf_counter()
+        reloaded = EmissionInventory.load(path)
+        load = time.perf_counter() - start
+        size_mb = path.stat().st_size / 1e6
+    print(f"{'sauvegarde / relecture':<28} {save:>8.2f}s / {load:.2f}s  ({size_mb:.1f} Mo)")
+
+    day = pd.Timestamp('2025-07-15')
+    start = time.perf_counter()
+    grids = reloaded.window(day, day + pd.Timedelta(days=1))
+    query = time.perf_counter() - start
+    same = np.isclose(grids['NOx'].sum(), reloaded.totals(day, day + pd.Timedelta(days=1))['NOx'])
+    print(f"{'fenêtre d’un jour (dense)':<28} {query * 1000:>8.1f} ms  {grids['NOx'].sum():,.1f} kg NOx "
+          f"({'cohérent' if same else 'INCOHÉRENT'})")
+
+    start = time.perf_counter()
+    sources, rates = reloaded.plume_sources(pd.date_range(day, periods=24, freq='h'), coarsen=5)
+    print(f"{'sources dispersion (24 h)':<28} {(time.perf_counter() - start) * 1000:>8.1f} ms  "
+          f"{len(sources):,} sources (blocs de 5 × 5), débit NOx moyen {rates['NOx'].sum(axis=1).mean():.2f} g/s")
+    return 0 if balance < 1e-6 and same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
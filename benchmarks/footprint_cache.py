@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark du cache d'empreintes unitaires (src/noise/footprint_cache.py)
+Scénario par superposition comparé au calcul vol par vol (LdenAccumulator)
+Projet: Airport Air Quality Modeling
+
+Usage:
+    python benchmarks/footprint_cache.py                   # ±10 km, pas 100 m, 400 mouvements
+    python benchmarks/footprint_cache.py --movements 2000 --step 50
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from noise_engine import AIRPORT_X, AIRPORT_Y, SYNTHETIC_PROFILES  # noqa: E402
+from src.grids.spec import GridSpec  # noqa: E402
+from src.noise.accumulator import PERIODS, LdenAccumulator  # noqa: E402
+from src.noise.engine import compute_receptor_noise  # noqa: E402
+from src.noise.footprint_cache import (  # noqa: E402
+    FootprintCache, FootprintKey, Movement, Runway, scenario_levels,
+)
+
+# Deux pistes parallèles est-ouest distantes de 1 500 m, deux sens chacune
+SYNTHETIC_RUNWAYS = {
+    '09L': Runway('09L', AIRPORT_X - 1500, AIRPORT_Y + 750, 90.0),
+    '27R': Runway('27R', AIRPORT_X + 1500, AIRPORT_Y + 750, 270.0),
+    '09R': Runway('09R', AIRPORT_X - 1500, AIRPORT_Y - 750, 90.0),
+    '27L': Runway('27L', AIRPORT_X + 1500, AIRPORT_Y - 750, 270.0),
+}
+
+
+def synthetic_movements(total: int, runway_share: dict, seed: int = 7):
+    """Mouvements répartis par type, sens, piste et période (60 % jour, 25 % soirée, 15 % nuit)"""
+    rng = np.random.default_rng(seed)
+    keys = [FootprintKey(aircraft, procedure, runway)
+            for aircraft in SYNTHETIC_PROFILES for procedure in ('DEP_STD', 'ARR_STD') for runway in runway_share]
+    weights = np.array([runway_share[key.runway] for key in keys])
+    counts = rng.multinomial(total, weights / weights.sum())
+    movements = []
+    for key, count in zip(keys, counts):
+        for period, split in zip(PERIODS, rng.multinomial(count, [0.6, 0.25, 0.15])):
+            if split:
+                movements.append(Movement(key, period, int(split)))
+    return movements
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark du cache d\'empreintes unitaires')
+    parser.add_argument('--movements', type=int, default=400)
+    parser.add_argument('--half-width', type=float, default=10000.0, help='Demi-emprise (m)')
+    parser.add_argument('--step', type=float, default=100.0, help='Pas de grille (m)')
+    args = parser.parse_args()
+
+    spec = GridSpec.centered(AIRPORT_X, AIRPORT_Y, args.half_width, args.step)
+    reference = synthetic_movements(args.movements, {'09L': 0.4, '27R': 0.1, '09R': 0.4, '27L': 0.1})
+    what_if = synthetic_movements(args.movements, {'09L': 0.1, '27R': 0.1, '09R': 0.7, '27L': 0.1})
+
+    with tempfile.TemporaryDirectory() as root:
+        cache = FootprintCache(spec, SYNTHETIC_PROFILES, SYNTHETIC_RUNWAYS, root=root)
+        start = time.perf_counter()
+        scenario_levels(cache, reference)
+        cold = time.perf_counter() - start
+        print(f"\n🧮 Cache vide : {cache.computed} empreintes unitaires calculées en {cold:.2f}s "
+              f"({spec.nx}×{spec.ny} récepteurs)")
+
+        start = time.perf_counter()
+        reloaded = FootprintCache(spec, SYNTHETIC_PROFILES, SYNTHETIC_RUNWAYS, root=root)
+        scenario_levels(reloaded, reference)
+        print(f"💾 Relecture disque (nouveau processus) : {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        timings = []
+        for _ in range(5):
+            start = time.perf_counter()
+            levels = scenario_levels(cache, what_if)
+            timings.append(time.perf_counter() - start)
+        print(f"⚡ Scénario modifié (piste 09R à 70 %) : {min(timings) * 1000:.1f} ms | cache {cache.stats()}")
+
+        # Référence : chaque mouvement calculé par le moteur puis cumulé
+        tracks, periods = [], []
+        for movement in what_if:
+            for i in range(movement.count):
+                tracks.append(cache.track(movement.key, f"{movement.key}/{movement.period}/{i}"))
+                periods.append(movement.period)
+        start = time.perf_counter()
+        accumulator = LdenAccumulator(spec)
+        for i in range(0, len(tracks), 50):
+            _, _, sel = compute_receptor_noise(tracks[i:i + 50], SYNTHETIC_PROFILES, spec.points())
+            accumulator.add_sel(sel.reshape((-1,) + spec.shape), periods[i:i + 50])
+        direct = time.perf_counter() - start
+        error = np.abs(accumulator.lden(1) - levels['lden'])
+        print(f"🐢 Calcul vol par vol : {len(tracks)} mouvements en {direct:.2f}s "
+              f"(×{direct / min(timings):,.0f}) | écart Lden max {np.nanmax(error):.4f} dB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark mémoire du magasin de grilles mappé (src/grids/memmap_store.py)
+Pic d'allocation (tracemalloc) : calcul tuile par tuile, lecture d'emprise, ajout
+d'un pas de temps, comparés à la grille en RAM et au GeoDataFrame de points
+des notebooks
+Projet: Airport Air Quality Modeling
+
+Usage:
+    python benchmarks/grid_store.py                      # ±20 km au pas de 10 m (16 M nœuds)
+    python benchmarks/grid_store.py --half-width 5000 --step 10 --days 3
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from noise_engine import AIRPORT_X, AIRPORT_Y  # noqa: E402
+from src.grids.memmap_store import GridStore  # noqa: E402
+from src.grids.spec import GridSpec  # noqa: E402
+
+# Échantillon pour estimer le coût par nœud du GeoDataFrame de points
+POINTS_SAMPLE = 200
+
+
+def synthetic_level(points: np.ndarray) -> np.ndarray:
+    """Champ analytique type isophone (décroissance depuis l'axe de piste est-ouest)"""
+    along = np.abs(points[:, 0] - AIRPORT_X)
+    across = np.abs(points[:, 1] - AIRPORT_Y)
+    return (75 - 20 * np.log10(1 + across / 300) - along / 1000).astype(np.float32)
+
+
+def measure(label: str, action):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = action()
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<44} {peak / 2**20:>10.1f} Mo {duration:>8.2f}s")
+    return result, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mémoire du magasin de grilles mappé')
+    parser.add_argument('--half-width', type=float, default=20000.0, help='Demi-emprise (m)')
+    parser.add_argument('--step', type=float, default=10.0, help='Pas de grille (m)')
+    parser.add_argument('--days', type=int, default=2, help='Pas de temps ajoutés')
+    parser.add_argument('--tile', type=int, default=512, help='Nœuds par côté de tuile')
+    args = parser.parse_args()
+
+    spec = GridSpec.centered(AIRPORT_X, AIRPORT_Y, args.half_width, args.step)
+    raw = spec.size * 4
+    print(f"\n🧱 Grille {spec.nx:,}×{spec.ny:,} = {spec.size:,} nœuds ({raw / 2**20:,.0f} Mo par champ float32)")
+    print(f"{'opération':<44} {'pic alloc.':>13} {'temps':>9}")
+
+    with tempfile.TemporaryDirectory() as root:
+        store = GridStore.create(Path(root) / "store", spec, ['lden'])
+        for day in range(args.days):
+            label = f"2025-08-{15 + day:02d}"
+            measure(f"ajout du pas de temps {label}", lambda: store.append(label))
+            measure(f"calcul tuile par tuile ({args.tile}²)",
+                    lambda: store.fill('lden', synthetic_level, tile_size=args.tile))
+
+        reopened = GridStore.open(Path(root) / "store")
+        half = 1000.0
+        (sub, values), _ = measure(
+            "lecture d'une emprise 2 km × 2 km",
+            lambda: reopened.read_bbox('lden', AIRPORT_X - half, AIRPORT_Y - half, AIRPORT_X + half, AIRPORT_Y + half),
+        )
+        measure("série temporelle d'un nœud", lambda: reopened.series('lden', AIRPORT_X, AIRPORT_Y))
+        expected = synthetic_level(sub.points()).reshape(sub.shape)
+        print(f"   emprise {sub.nx}×{sub.ny}, identique au calcul direct : {np.array_equal(values, expected)}")
+
+    # Approche des notebooks : X, Y, L en RAM (float64) puis un Point shapely par nœud
+    in_ram = spec.size * 8 * 3
+    import geopandas as gpd
+    from shapely.geometry import Point
+
+    sample = GridSpec.centered(AIRPORT_X, AIRPORT_Y, (POINTS_SAMPLE - 1) * args.step / 2, args.step)
+
+    def explode():
+        X, Y = sample.meshgrid()
+        L = synthetic_level(sample.points()).reshape(sample.shape)
+        return gpd.GeoDataFrame({'Lden': L.ravel()}, geometry=[Point(x, y) for x, y in zip(X.ravel(), Y.ravel())])
+
+    _, peak = measure(f"GeoDataFrame de points ({sample.size:,} nœuds)", explode)
+    per_node = peak / sample.size
+    print(f"\n📏 Grille complète en RAM (X, Y, L float64) : {in_ram / 2**20:,.0f} Mo"
+          f" | GeoDataFrame de points extrapolé : ≥ {per_node * spec.size / 2**30:,.1f} Go"
+          f" (≥ {per_node / 4:,.0f}× la valeur float32, géométries GEOS non comptées)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark du temps d'import à froid des dashboards Streamlit
+Profil `python -X importtime` comparé à une référence versionnée
+Projet: Airport Air Quality Modeling
+
+Usage:
+    python benchmarks/import_time.py              # contrôle vs référence
+    python benchmarks/import_time.py --update     # régénérer référence et rapport
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DASHBOARD_DIR = PROJECT_ROOT / "dashboards" / "streamlit"
+BASELINE_FILE = Path(__file__).resolve().parent / "import_time_baseline.json"
+REPORT_FILE = Path(__file__).resolve().parent / "reports" / "import_time.txt"
+
+DASHBOARDS = ["dashboard_environmental", "dashboard_executive", "dashboard_operational"]
+
+# Modules qui ne doivent jamais être chargés au démarrage d'un dashboard
+FORBIDDEN_AT_STARTUP = [
+    "geopandas", "shapely", "folium", "streamlit_folium",
+    "plotly.express", "plotly.subplots", "sqlalchemy", "psycopg2",
+]
+
+# Tolérance avant de considérer une régression (relative à la référence)
+DEFAULT_TOLERANCE = 0.30
+
+
+def profile_import(module: str) -> List[Tuple[int, int, int, str]]:
+    """Importer un dashboard dans un processus neuf et parser le profil importtime"""
+    code = f"import sys; sys.path.insert(0, {str(DASHBOARD_DIR)!r}); import {module}"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=PROJECT_ROOT
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Import de {module} en échec:\n{result.stderr[-2000:]}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        entries.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return entries
+
+
+def summarize(entries: List[Tuple[int, int, int, str]], top: int = 10) -> Dict:
+    """Résumer un profil : total et imports directs les plus coûteux"""
+    top_level = [cumul for _, cumul, depth, _ in entries if depth == 0]
+    direct = [(cumul, name) for _, cumul, depth, name in entries if depth == 1]
+    loaded = {name for _, _, _, name in entries}
+    return {
+        "total_ms": round(sum(top_level) / 1000, 1),
+        "heaviest": [
+            {"module": name, "cumulative_ms": round(cumul / 1000, 1)}
+            for cumul, name in sorted(direct, reverse=True)[:top]
+        ],
+        "forbidden_loaded": sorted(m for m in FORBIDDEN_AT_STARTUP if m in loaded),
+    }
+
+
+def measure(module: str, repeat: int) -> Dict:
+    """Mesurer un dashboard plusieurs fois et garder la médiane"""
+    runs = [summarize(profile_import(module)) for _ in range(repeat)]
+    median_total = statistics.median(run["total_ms"] for run in runs)
+    best = min(runs, key=lambda run: abs(run["total_ms"] - median_total))
+    best["total_ms"] = median_total
+    return best
+
+
+def write_report(results: Dict[str, Dict]):
+    """Écrire le rapport texte versionné"""
+    lines = [
+        "Profil d'import à froid des dashboards (python -X importtime, médiane)",
+        f"Python {sys.version.split()[0]}",
+        "",
+    ]
+    for module, summary in results.items():
+        lines.append(f"{module}: {summary['total_ms']:.1f} ms")
+        for item in summary["heaviest"]:
+            lines.append(f"    {item['cumulative_ms']:>9.1f} ms  {item['module']}")
+        forbidden = ", ".join(summary["forbidden_loaded"]) or "aucun"
+        lines.append(f"    modules lourds chargés au démarrage: {forbidden}")
+        lines.append("")
+    REPORT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    REPORT_FILE.write_text("\n".join(lines), encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark temps d'import des dashboards")
+    parser.add_argument("--update", action="store_true", help="Régénérer la référence et le rapport")
+    parser.add_argument("--repeat", type=int, default=5, help="Nombre de mesures par dashboard")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Régression relative tolérée (0.30 = +30%%)")
+    args = parser.parse_args()
+
+    results = {module: measure(module, args.repeat) for module in DASHBOARDS}
+    for module, summary in results.items():
+        print(f"⏱️ {module:<28} {summary['total_ms']:>8.1f} ms")
+
+    if args.update:
+        baseline = {module: {"total_ms": summary["total_ms"]} for module, summary in results.items()}
+        BASELINE_FILE.write_text(json.dumps(baseline, indent=2) + "\n", encoding="utf-8")
+        write_report(results)
+        print(f"✅ Référence mise à jour: {BASELINE_FILE.name}, rapport: {REPORT_FILE.relative_to(PROJECT_ROOT)}")
+        return 0
+
+    if not BASELINE_FILE.exists():
+        print("❌ Référence absente - lancer avec --update")
+        return 1
+
+    baseline = json.loads(BASELINE_FILE.read_text(encoding="utf-8"))
+    failures = []
+    for module, summary in results.items():
+        if summary["forbidden_loaded"]:
+            failures.append(f"{module}: modules lourds importés au démarrage ({', '.join(summary['forbidden_loaded'])})")
+        reference = baseline.get(module, {}).get("total_ms")
+        if reference and summary["total_ms"] > reference * (1 + args.tolerance):
+            failures.append(f"{module}: {summary['total_ms']:.1f} ms > référence {reference:.1f} ms (+{args.tolerance:.0%})")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        return 1
+
+    print("✅ Aucune régression du temps de démarrage")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de la carte environnementale : taille HTML et temps de rendu
+en fonction du nombre de points d'émission et de stations
+Projet: Airport Air Quality Modeling
+
+Usage:
+    python benchmarks/map_payload.py --points 1000 10000 100000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "dashboards" / "streamlit"))
+
+from map_layers import emissions_layer, stations_layer  # noqa: E402
+
+AIRPORT_LAT = 48.8738
+AIRPORT_LON = 2.6794
+
+
+def synthetic_points(n_points, seed=42):
+    """Points d'émission et stations aléatoires autour de l'aéroport"""
+    rng = np.random.default_rng(seed)
+    emissions = pd.DataFrame({
+        'latitude': AIRPORT_LAT + rng.normal(0, 0.05, n_points),
+        'longitude': AIRPORT_LON + rng.normal(0, 0.05, n_points),
+        'type_polluant': rng.choice(['CO2', 'NOx', 'PM10', 'PM2.5'], n_points),
+        'total_emission_kg': rng.exponential(2000, n_points),
+    })
+    stations = pd.DataFrame({
+        'nom_station': [f'Station {i}' for i in range(n_points)],
+        'zone_surveillance': 'Zone test',
+        'latitude': AIRPORT_LAT + rng.normal(0, 0.05, n_points),
+        'longitude': AIRPORT_LON + rng.normal(0, 0.05, n_points),
+        'niveau_qualite': rng.choice(['Bon', 'Modéré', 'Élevé'], n_points),
+        'polluant': 'NOx',
+        'valeur_mesure': rng.normal(30, 10, n_points),
+        'unite_mesure': 'µg/m³',
+    })
+    return emissions, stations
+
+
+def render_map(emissions, stations, cluster):
+    """Construire la carte et retourner le HTML complet"""
+    import folium
+
+    m = folium.Map(location=[AIRPORT_LAT, AIRPORT_LON], zoom_start=13)
+    emissions_layer(emissions).add_to(m)
+    stations_layer(stations, cluster=cluster).add_to(m)
+    return m.get_root().render()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark taille/rendu de la carte folium")
+    parser.add_argument("--points", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--cluster", action="store_true", help="Stations regroupées (FastMarkerCluster)")
+    args = parser.parse_args()
+
+    print(f"{'points':>8} | {'HTML (Ko)':>10} | {'rendu (s)':>9}")
+    for n_points in args.points:
+        emissions, stations = synthetic_points(n_points)
+        start = time.perf_counter()
+        html = render_map(emissions, stations, args.cluster)
+        duration = time.perf_counter() - start
+        print(f"{n_points:>8} | {len(html.encode('utf-8')) / 1024:>10.0f} | {duration:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
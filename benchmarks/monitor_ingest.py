@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de l'ingestion des stations de mesure du bruit (src/noise/monitor_ingest.py)
+Fichier CSV synthétique de LAeq 1 s (bruit de fond + survols) : débit de
+lecture, de détection des événements et de préparation des séries horaires
+pour COPY, identité des événements entre lecture en un bloc et en flux
+Projet: Airport Air Quality Modeling
+
+Usage:
+    python benchmarks/monitor_ingest.py                    # 20 stations × 1 jour (1,7 M échantillons)
+    python benchmarks/monitor_ingest.py --stations 50 --hours 12 --ndjson
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.noise.monitor_ingest import (  # noqa: E402
+    CHUNK_ROWS, DEFAULT_THRESHOLD_DBA, MonitorIngester, read_monitor_file,
+)
+
+# Survols par station et par heure, niveau de crête et pente autour de la crête
+FLYOVERS_PER_HOUR = 20
+PEAK_DBA = (62.0, 85.0)
+SLOPE_DB_PER_S = 0.6
+
+
+def synthetic_samples(n_stations: int, hours: int, rng) -> pd.DataFrame:
+    """Échantillons 1 s de toutes les stations, entrelacés par horodatage"""
+    seconds = hours * 3600
+    start = pd.Timestamp('2025-08-01').value // 10**9
+    levels = 45.0 + rng.normal(0, 2.5, (n_stations, seconds))
+    offset = np.arange(-60, 61)
+    for station in range(n_stations):
+        centers = rng.integers(0, seconds, FLYOVERS_PER_HOUR * hours)
+        peaks = rng.uniform(*PEAK_DBA, len(centers))
+        index = np.clip(centers[:, None] + offset, 0, seconds - 1)
+        np.maximum.at(levels[station], index, peaks[:, None] - SLOPE_DB_PER_S * np.abs(offset))
+    t = np.broadcast_to(start + np.arange(seconds), (n_stations, seconds))
+    codes = np.array([f"BR{i:03d}" for i in range(n_stations)])
+    return pd.DataFrame({
+        'code_station': np.repeat(codes[None, :], seconds, axis=0).ravel(),
+        'timestamp': pd.to_datetime(t.T.ravel(), unit='s').strftime('%Y-%m-%dT%H:%M:%S'),
+        'laeq_dba': levels.T.ravel().round(1),
+    })
+
+
+def run(path: Path, stations: pd.DataFrame, chunk_rows: int):
+    """Ingestion sans écriture ; temps de lecture et de traitement séparés"""
+    ingester = MonitorIngester(stations)
+    events, read_s, process_s = [], 0.0, 0.0
+    t0 = time.perf_counter()
+    for chunk in read_monitor_file(path, chunk_rows):
+        t1 = time.perf_counter()
+        read_s += t1 - t0
+        events.append(ingester.feed(chunk).events)
+        t0 = time.perf_counter()
+        process_s += t0 - t1
+    events.append(ingester.flush().events)
+    process_s += time.perf_counter() - t0
+    events = pd.concat([frame for frame in events if len(frame)], ignore_index=True)
+    return events.sort_values(['id_station_bruit', 'timestamp_mesure'], ignore_index=True), ingester.stats, \
+        read_s, process_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ingestion des stations de mesure du bruit')
+    parser.add_argument('--stations', type=int, default=20)
+    parser.add_argument('--hours', type=int, default=24)
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--ndjson', action='store_true', help='Fichier NDJSON au lieu de CSV')
+    args = parser.parse_args()
+    rng = np.random.default_rng(3)
+
+    samples = synthetic_samples(args.stations, args.hours, rng)
+    stations = pd.DataFrame({
+        'id_station_bruit': [f"00000000-0000-0000-0000-{i:012d}" for i in range(args.stations)],
+        'code_station': [f"BR{i:03d}" for i in range(args.stations)],
+        'seuil_dba': DEFAULT_THRESHOLD_DBA,
+    })
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / ("monitors.ndjson" if args.ndjson else "monitors.csv")
+        if args.ndjson:
+            samples.to_json(path, orient='records', lines=True)
+        else:
+            samples.to_csv(path, index=False)
+        size_mb = path.stat().st_size / 1e6
+        print(f"\n🎙️ {len(samples):,} échantillons, {args.stations} stations × {args.hours} h "
+              f"({path.suffix[1:]}, {size_mb:.0f} Mo), blocs de {args.chunk_rows:,} lignes")
+
+        events, stats, read_s, process_s = run(path, stations, args.chunk_rows)
+        streamed, _, _, _ = run(path, stations, args.chunk_rows // 7)
+
+    total = read_s + process_s
+    print(f"{'lecture + horodatages':<36} {read_s:>8.2f}s  {len(samples) / read_s / 1e6:>6.2f} M éch./s")
+    print(f"{'événements + séries horaires':<36} {process_s:>8.2f}s  {len(samples) / process_s / 1e6:>6.2f} M éch./s")
+    print(f"{'total (hors COPY)':<36} {total:>8.2f}s  {len(samples) / total / 1e6:>6.2f} M éch./s")
+    print(f"   {stats.events:,} événements, {stats.hours:,} heures brutes, "
+          f"durée médiane {events['duree_s'].median():.0f} s, LAmax médian {events['lamax_dba'].median():.1f} dB(A)")
+    same = len(events) == len(streamed) and np.allclose(
+        events[['duree_s', 'lamax_dba', 'sel_dba']].to_numpy(), streamed[['duree_s', 'lamax_dba', 'sel_dba']].to_numpy())
+    print(f"\n🔁 Blocs de {args.chunk_rows // 7:,} lignes : {len(streamed):,} événements, "
+          f"{'identiques' if same else 'DIFFÉRENTS'}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de la corrélation événements sonores / vols (src/noise/correlation.py)
+Un mois de trafic synthétique, 20 stations, événements bruités (décalage
+horaire, événements parasites) : temps par étape, taux de corrélation exacte,
+et parcours événements × passages extrapolé depuis un échantillon
+Projet: Airport Air Quality Modeling
+
+Usage:
+    python benchmarks/noise_correlation.py                       # 30 jours × 1000 mouvements
+    python benchmarks/noise_correlation.py --days 7 --flights 500 --stations 10
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from noise_engine import AIRPORT_X, AIRPORT_Y, synthetic_tracks  # noqa: E402
+from src.noise.correlation import (  # noqa: E402
+    DEFAULT_TOLERANCE_S, correlate, overflights, segment_start_times,
+)
+
+# Distance au-delà de laquelle une station ne détecte pas le passage (m)
+DETECTION_DISTANCE_M = 2500.0
+
+# Écart type entre heure de l'événement et heure de passage (s)
+EVENT_JITTER_S = 15.0
+
+# Événements parasites (route, chantier...) par événement aéronef
+SPURIOUS_RATIO = 0.2
+
+SAMPLE_EVENTS = 500
+
+
+def synthetic_network(n_stations: int, rng) -> pd.DataFrame:
+    """Stations réparties sous les axes d'approche et de départ"""
+    return pd.DataFrame({
+        'id_station_bruit': [f"S{i:02d}" for i in range(n_stations)],
+        'x': AIRPORT_X + rng.uniform(-12000, 12000, n_stations),
+        'y': AIRPORT_Y + rng.normal(0, 800, n_stations),
+        'hauteur_m': 4.0,
+    })
+
+
+def synthetic_events(passages: pd.DataFrame, rng):
+    """Événements détectés (vérité terrain) et parasites"""
+    detected = passages[passages['distance_m'] < DETECTION_DISTANCE_M]
+    duration = rng.uniform(10, 60, len(detected))
+    center = detected['passage'].to_numpy() + rng.normal(0, EVENT_JITTER_S, len(detected))
+    n_spurious = int(len(detected) * SPURIOUS_RATIO)
+    stations = np.concatenate([detected['id_station_bruit'].to_numpy(),
+                               rng.choice(passages['id_station_bruit'].unique(), n_spurious)])
+    center = np.concatenate([center, rng.uniform(passages['passage'].min(), passages['passage'].max(), n_spurious)])
+    duration = np.concatenate([duration, rng.uniform(10, 60, n_spurious)])
+    events = pd.DataFrame({
+        'id_mesure_bruit': [f"E{i:07d}" for i in range(len(stations))],
+        'id_station_bruit': stations,
+        'timestamp_mesure': pd.to_datetime(center - duration / 2, unit='s'),
+        'duree_s': duration,
+    })
+    truth = dict(zip(events['id_mesure_bruit'][:len(detected)], detected['id_vol']))
+    return events.sample(frac=1, random_state=0).reset_index(drop=True), truth
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Corrélation événements sonores / vols')
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--flights', type=int, default=1000, help='Mouvements par jour')
+    parser.add_argument('--stations', type=int, default=20)
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE_S, help='Fenêtre (s)')
+    args = parser.parse_args()
+    rng = np.random.default_rng(7)
+
+    base = synthetic_tracks(args.flights * 2)
+    tracks, departures = [], {}
+    start = pd.Timestamp('2025-08-01')
+    for day in range(args.days):
+        for i, track in enumerate(rng.choice(len(base), args.flights, replace=False)):
+            source = base[track]
+            flight_id = f"D{day:02d}-{i:04d}"
+            tracks.append(type(source)(flight_id, source.aircraft, source.start, source.end,
+                                       source.duration, source.phases))
+            departures[flight_id] = start + pd.Timedelta(days=day, seconds=float(rng.uniform(0, 86400)))
+    stations = synthetic_network(args.stations, rng)
+    print(f"\n🔗 {len(tracks):,} vols sur {args.days} jours, {args.stations} stations")
+
+    t0 = time.perf_counter()
+    segment_start = segment_start_times(tracks, departures)
+    passages = overflights(tracks, segment_start, stations)
+    t1 = time.perf_counter()
+    events, truth = synthetic_events(passages, rng)
+    t2 = time.perf_counter()
+    matches = correlate(events, passages, args.tolerance)
+    t3 = time.perf_counter()
+
+    expected = matches['id_mesure_bruit'].map(truth)
+    correct = int((expected == matches['id_vol']).sum())
+    false_positive = int(expected.isna().sum())
+    print(f"{'passages (index spatial)':<36} {t1 - t0:>8.2f}s  {len(passages):,} passages")
+    print(f"{'jointure + score + affectation':<36} {t3 - t2:>8.2f}s  {len(events):,} événements")
+    print(f"   corrélés {len(matches):,} | exacts {correct:,}/{len(truth):,} ({correct / max(len(truth), 1):.1%})"
+          f" | parasites corrélés {false_positive:,}")
+
+    # Parcours naïf : chaque événement comparé à tous les passages
+    sample = events.head(SAMPLE_EVENTS)
+    passage_station = passages['id_station_bruit'].to_numpy()
+    passage_time = passages['passage'].to_numpy()
+    t4 = time.perf_counter()
+    for row in sample.itertuples():
+        moment = row.timestamp_mesure.value / 1e9 + row.duree_s / 2
+        candidates = (passage_station == row.id_station_bruit) & (np.abs(passage_time - moment) <= args.tolerance)
+        candidates.nonzero()
+    naive = (time.perf_counter() - t4) / len(sample) * len(events)
+    print(f"\n📏 Parcours événements × passages extrapolé : {naive:.1f}s "
+          f"({naive / (t3 - t2):.0f}× la jointure), total corrélation {t1 - t0 + t3 - t2:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark du moteur de bruit vectorisé (src/noise/engine.py)
+Comparaison avec acoustique.calculer_empreinte_vol (un appel par couple vol × point)
+Projet: Airport Air Quality Modeling
+
+Usage:
+    python benchmarks/noise_engine.py                         # 200×200 récepteurs, 600 vols synthétiques
+    python benchmarks/noise_engine.py --flights 100 --grid 100
+    python benchmarks/noise_engine.py --step 250 --floor 60      # + calcul limité par index spatial
+    python benchmarks/noise_engine.py --sql --date 2025-08-15 --sql-sample 200
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.grids.spec import GridSpec  # noqa: E402
+from src.noise.engine import (  # noqa: E402
+    PHASE_SOURCE_COLUMN, PHASES_QUERY, AcousticProfile, FlightTrack, audibility_cutoff, compute_flight_noise,
+    received_level, tracks_from_phases,
+)
+
+# Point de référence PVE (POINT(2.786 48.881)) en Lambert-93
+AIRPORT_X = 684305.0
+AIRPORT_Y = 6864575.0
+
+SYNTHETIC_PROFILES = {
+    'A320': AcousticProfile(65, 95, 88, 82, 78, 1000),
+    'B738': AcousticProfile(66, 96, 89, 83, 79, 1000),
+    'A333': AcousticProfile(68, 99, 92, 85, 81, 500),
+}
+
+
+def synthetic_tracks(n_flights: int, seed: int = 42):
+    """Départs et arrivées rectilignes sur une piste est-ouest, 25 segments par vol"""
+    rng = np.random.default_rng(seed)
+    aircraft = list(SYNTHETIC_PROFILES)
+    tracks = []
+    for i in range(n_flights):
+        heading = rng.choice([-1.0, 1.0])
+        offset = rng.normal(0, 150)
+        if i % 2 == 0:  # départ : roulage, décollage puis montée à 8 %
+            x = AIRPORT_X + heading * np.concatenate([np.linspace(-2500, -1500, 5), np.linspace(-1500, 15000, 21)])
+            z = np.concatenate([np.zeros(5), np.maximum(0, (x[5:] - x[5]) * heading - 1800) * 0.08])
+            phases = ['Taxi-out'] * 4 + ['Take-off'] * 5 + ['Climb-out'] * 16
+            speed = np.concatenate([np.full(4, 8.0), np.full(21, 80.0)])
+        else:  # arrivée : approche à 3°, atterrissage puis roulage
+            x = AIRPORT_X + heading * np.concatenate([np.linspace(-15000, 1500, 21), np.linspace(1500, 2500, 5)])
+            z = np.concatenate([np.maximum(0, (-1000 - (x[:21] - AIRPORT_X) * heading) * 0.0524), np.zeros(5)])
+            phases = ['Approach'] * 16 + ['Landing'] * 5 + ['Taxi-in'] * 4
+            speed = np.concatenate([np.full(20, 70.0), np.full(5, 8.0)])
+        y = np.full_like(x, AIRPORT_Y + offset)
+        t = np.concatenate([[0.0], np.cumsum(np.abs(np.diff(x)) / speed)])
+        tracks.append(FlightTrack.from_points(f"F{i:04d}", aircraft[i % len(aircraft)], x, y, z, t, phases))
+    return tracks
+
+
+def run_engine(tracks, profiles, spec: GridSpec, repeat: int, cutoff_m=None):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = compute_flight_noise(tracks, profiles, spec, cutoff_m=cutoff_m)
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+def run_sql(date: str, sample: int, spec: GridSpec):
+    """Chronométrer calculer_empreinte_vol sur un échantillon et extrapoler à la grille
+
+    Contrôle aussi la parité des formules : niveaux du moteur comparés à
+    calculer_attenuation_distance - calculer_absorption_atmospherique.
+    """
+    import pandas as pd
+    import psycopg2
+
+    conn = psycopg2.connect(
+        host=os.getenv('DB_HOST', 'localhost'),
+        port=os.getenv('DB_PORT', '5433'),
+        database=os.getenv('DB_NAME', 'airport_air_quality'),
+        user=os.getenv('DB_USER', 'airport_user'),
+        password=os.getenv('DB_PASSWORD', 'airport_password'),
+    )
+    try:
+        phases = pd.read_sql_query(PHASES_QUERY, conn, params={'date': date})
+        tracks = tracks_from_phases(phases)
+        if not tracks:
+            print(f"⚠️ Aucun vol géolocalisé le {date}")
+            return None
+
+        rng = np.random.default_rng(0)
+        flights = [tracks[i].flight_id for i in rng.integers(0, len(tracks), sample)]
+        points = spec.points()[rng.integers(0, spec.size, sample)]
+
+        with conn.cursor() as cur:
+            start = time.perf_counter()
+            for flight_id, (x, y) in zip(flights, points):
+                cur.execute(
+                    "SELECT count(*) FROM acoustique.calculer_empreinte_vol("
+                    "%s::uuid, ST_Transform(ST_SetSRID(ST_MakePoint(%s, %s), 2154), 4326))",
+                    (flight_id, float(x), float(y)),
+                )
+                cur.fetchone()
+            per_call = (time.perf_counter() - start) / sample
+
+            distances = np.geomspace(50, 20000, 50)
+            cur.execute(
+                "SELECT acoustique.calculer_attenuation_distance(90, d, 1000)"
+                " - acoustique.calculer_absorption_atmospherique(d, 1000, 15, 70)"
+                " FROM unnest(%s::numeric[]) AS d",
+                (distances.tolist(),),
+            )
+            sql_levels = np.array([float(row[0]) for row in cur.fetchall()])
+        parity = float(np.max(np.abs(sql_levels - received_level(90, distances))))
+        return {'per_call': per_call, 'n_tracks': len(tracks), 'parity_db': parity}
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark du moteur de bruit vectorisé')
+    parser.add_argument('--flights', type=int, default=600)
+    parser.add_argument('--grid', type=int, default=200, help='Nœuds par côté')
+    parser.add_argument('--step', type=float, default=100.0, help='Pas de grille (m)')
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--floor', type=float,
+                        help='Plancher (dB) : comparer avec le calcul limité par index spatial')
+    parser.add_argument('--sql', action='store_true', help='Comparer avec calculer_empreinte_vol')
+    parser.add_argument('--date', help='Date des vols pour --sql (AAAA-MM-JJ)')
+    parser.add_argument('--sql-sample', type=int, default=200, help='Appels SQL chronométrés')
+    args = parser.parse_args()
+
+    half_width = (args.grid - 1) * args.step / 2
+    spec = GridSpec.centered(AIRPORT_X, AIRPORT_Y, half_width, args.step)
+    tracks = synthetic_tracks(args.flights)
+    n_segments = sum(track.n_segments for track in tracks)
+
+    result, duration = run_engine(tracks, SYNTHETIC_PROFILES, spec, args.repeat)
+    pairs = spec.size * args.flights
+    print(f"\n🔊 Moteur NumPy : {args.flights} vols ({n_segments:,} segments) × {spec.size:,} récepteurs")
+    print(f"   {duration:.2f}s | {pairs / duration:,.0f} couples vol×point/s"
+          f" | LAmax max {np.nanmax(result.lamax):.1f} dBA | SEL max {np.nanmax(result.sel):.1f} dBA")
+
+    if args.floor is not None:
+        # Coupure du profil le plus audible à distance (niveau et fréquence dominante)
+        cutoff = max(
+            audibility_cutoff(max(profile.source_level(phase) for phase in PHASE_SOURCE_COLUMN),
+                              args.floor, profile.frequence_dominante_hz)
+            for profile in SYNTHETIC_PROFILES.values()
+        )
+        indexed, indexed_duration = run_engine(tracks, SYNTHETIC_PROFILES, spec, args.repeat, cutoff)
+        # Événements audibles (LAmax >= plancher) : identiques ; le SEL perd l'énergie
+        # des segments sous le plancher, comptée à part
+        audible = result.lamax >= args.floor
+        lamax_error = np.nanmax(np.abs(indexed.lamax - result.lamax)[audible]) if audible.any() else 0.0
+        sel_error = np.abs(np.nan_to_num(indexed.sel, nan=-np.inf) - result.sel)[audible]
+        print(f"\n📍 Index spatial (coupure {cutoff / 1000:.1f} km, plancher {args.floor:g} dB) :"
+              f" {indexed_duration:.2f}s (×{duration / indexed_duration:.1f})")
+        print(f"   événements audibles {audible.mean():.1%} | écart LAmax max {lamax_error:.2f} dB"
+              f" | écart SEL médian {np.median(sel_error):.2f} dB, p95 {np.percentile(sel_error, 95):.2f} dB")
+
+    if args.sql:
+        if not args.date:
+            parser.error('--sql requiert --date')
+        sql = run_sql(args.date, args.sql_sample, spec)
+        if sql:
+            estimate = sql['per_call'] * pairs
+            print(f"\n🐘 calculer_empreinte_vol : {sql['per_call'] * 1000:.2f} ms/appel"
+                  f" ({sql['n_tracks']} vols le {args.date})")
+            print(f"   extrapolation {pairs:,} appels : {estimate / 3600:.1f} h"
+                  f" | accélération ×{estimate / duration:,.0f}")
+            print(f"   écart max des formules (atténuation - absorption) : {sql['parity_db']:.4f} dB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de passage à l'échelle du calcul Lden parallèle (src/noise/parallel.py)
+Temps, accélération et efficacité de 1 à N processus, identité avec le calcul séquentiel
+Projet: Airport Air Quality Modeling
+
+Usage:
+    python benchmarks/parallel_noise.py                        # 1500 mouvements, ±10 km au pas de 100 m
+    python benchmarks/parallel_noise.py --flights 300 --workers 1 2 4 8 --serial
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import time as clock
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from noise_engine import AIRPORT_X, AIRPORT_Y, SYNTHETIC_PROFILES, synthetic_tracks  # noqa: E402
+from src.grids.spec import GridSpec  # noqa: E402
+from src.noise.accumulator import PERIODS, LdenAccumulator  # noqa: E402
+from src.noise.parallel import parallel_add_flights  # noqa: E402
+
+
+def default_workers():
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Passage à l\'échelle du calcul Lden parallèle')
+    parser.add_argument('--flights', type=int, default=1500)
+    parser.add_argument('--half-width', type=float, default=10000.0, help='Demi-emprise (m)')
+    parser.add_argument('--step', type=float, default=100.0, help='Pas de grille (m)')
+    parser.add_argument('--workers', type=int, nargs='+', default=default_workers())
+    parser.add_argument('--serial', action='store_true', help='Comparer aussi à LdenAccumulator.add_flights')
+    args = parser.parse_args()
+
+    spec = GridSpec.centered(AIRPORT_X, AIRPORT_Y, args.half_width, args.step)
+    tracks = synthetic_tracks(args.flights)
+    times = {track.flight_id: clock((6 + 7 * i) % 24) for i, track in enumerate(tracks)}
+    print(f"\n🧵 {args.flights} mouvements × {spec.size:,} récepteurs, {os.cpu_count()} cœurs disponibles")
+
+    def report(done, total):
+        print(f"\r   tuiles {done}/{total}", end='', flush=True)
+
+    reference, baseline = None, None
+    print(f"{'processus':>10} {'temps (s)':>10} {'accélération':>13} {'efficacité':>11} {'identique':>10}")
+    for workers in args.workers:
+        accumulator = LdenAccumulator(spec)
+        start = time.perf_counter()
+        parallel_add_flights(accumulator, tracks, times, SYNTHETIC_PROFILES, day='2025-08-15',
+                             workers=workers, progress=report)
+        duration = time.perf_counter() - start
+        print('\r' + ' ' * 24, end='')
+        energy = np.stack([accumulator.energy[period] for period in PERIODS])
+        if reference is None:
+            reference, baseline = energy, duration
+        speedup = baseline / duration
+        print(f"\r{workers:>10} {duration:>10.2f} {speedup:>12.2f}× {speedup / workers:>10.0%} "
+              f"{str(np.array_equal(energy, reference)):>10}")
+
+    if args.serial:
+        accumulator = LdenAccumulator(spec)
+        start = time.perf_counter()
+        accumulator.add_flights(tracks, times, SYNTHETIC_PROFILES, day='2025-08-15')
+        duration = time.perf_counter() - start
+        energy = np.stack([accumulator.energy[period] for period in PERIODS])
+        print(f"\n📏 LdenAccumulator.add_flights : {duration:.2f}s | identique au bit près : "
+              f"{np.array_equal(energy, reference)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
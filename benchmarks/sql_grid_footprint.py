@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de acoustique.calculer_empreinte_grille (V005) face à calculer_empreinte_vol (V003)
+Projet: Airport Air Quality Modeling
+
+Usage:
+    python benchmarks/sql_grid_footprint.py --date 2025-08-15
+    python benchmarks/sql_grid_footprint.py --date 2025-08-15 --flights 50 --grid 100 --step 200 --insert
+
+Le temps de la fonction par point est mesuré sur un échantillon puis
+extrapolé à la grille ; la fonction ensembliste est comparée au moteur NumPy
+(mêmes formules) sur les mêmes vols et récepteurs.
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from noise_engine import AIRPORT_X, AIRPORT_Y  # noqa: E402
+from src.grids.spec import GridSpec  # noqa: E402
+from src.noise.engine import (  # noqa: E402
+    PHASES_QUERY, PROFILES_QUERY, compute_receptor_noise, profiles_from_frame, tracks_from_phases,
+)
+
+GRID_FUNCTION_SQL = """
+    SELECT id_vol::text, id_point, niveau_bruit_dba, sel_db
+    FROM acoustique.calculer_empreinte_grille(
+        %(ids)s::uuid[], ST_MakeEnvelope(%(xmin)s, %(ymin)s, %(xmax)s, %(ymax)s, 2154), %(step)s
+    )
+"""
+
+INSERT_FUNCTION_SQL = """
+    SELECT acoustique.inserer_empreinte_grille(
+        %(ids)s::uuid[], ST_MakeEnvelope(%(xmin)s, %(ymin)s, %(xmax)s, %(ymax)s, 2154), %(step)s
+    )
+"""
+
+
+def main():
+    import pandas as pd
+    import psycopg2
+
+    parser = argparse.ArgumentParser(description='Empreinte SQL ensembliste vs appels par point')
+    parser.add_argument('--date', required=True, help='Date des vols (AAAA-MM-JJ)')
+    parser.add_argument('--flights', type=int, default=20)
+    parser.add_argument('--grid', type=int, default=50, help='Nœuds par côté')
+    parser.add_argument('--step', type=float, default=200.0, help='Pas de grille (m)')
+    parser.add_argument('--sample', type=int, default=200, help='Appels par point chronométrés')
+    parser.add_argument('--insert', action='store_true',
+                        help='Chronométrer aussi inserer_empreinte_grille (transaction annulée)')
+    args = parser.parse_args()
+
+    half_width = (args.grid - 1) * args.step / 2
+    spec = GridSpec.centered(AIRPORT_X, AIRPORT_Y, half_width, args.step)
+    xmin, ymin = spec.x0, spec.y0
+    xmax, ymax = spec.x0 + (spec.nx - 1) * spec.step, spec.y0 + (spec.ny - 1) * spec.step
+
+    conn = psycopg2.connect(
+        host=os.getenv('DB_HOST', 'localhost'),
+        port=os.getenv('DB_PORT', '5433'),
+        database=os.getenv('DB_NAME', 'airport_air_quality'),
+        user=os.getenv('DB_USER', 'airport_user'),
+        password=os.getenv('DB_PASSWORD', 'airport_password'),
+    )
+    try:
+        profiles = profiles_from_frame(pd.read_sql_query(PROFILES_QUERY, conn))
+        phases = pd.read_sql_query(PHASES_QUERY, conn, params={'date': args.date})
+        tracks = [track for track in tracks_from_phases(phases) if track.aircraft in profiles][:args.flights]
+        if not tracks:
+            print(f"⚠️ Aucun vol géolocalisé avec profil acoustique le {args.date}")
+            return 1
+        ids = [track.flight_id for track in tracks]
+        params = {'ids': ids, 'xmin': xmin, 'ymin': ymin, 'xmax': xmax, 'ymax': ymax, 'step': spec.step}
+        pairs = len(ids) * spec.size
+
+        with conn.cursor() as cur:
+            rng = np.random.default_rng(0)
+            points = spec.points()[rng.integers(0, spec.size, args.sample)]
+            flights = [ids[i] for i in rng.integers(0, len(ids), args.sample)]
+            start = time.perf_counter()
+            for flight_id, (x, y) in zip(flights, points):
+                cur.execute(
+                    "SELECT count(*) FROM acoustique.calculer_empreinte_vol("
+                    "%s::uuid, ST_Transform(ST_SetSRID(ST_MakePoint(%s, %s), 2154), 4326))",
+                    (flight_id, float(x), float(y)),
+                )
+                cur.fetchone()
+            per_call = (time.perf_counter() - start) / args.sample
+
+            start = time.perf_counter()
+            cur.execute(GRID_FUNCTION_SQL, params)
+            rows = cur.fetchall()
+            grid_time = time.perf_counter() - start
+
+            insert_time = inserted = None
+            if args.insert:
+                start = time.perf_counter()
+                cur.execute(INSERT_FUNCTION_SQL, params)
+                inserted = cur.fetchone()[0]
+                insert_time = time.perf_counter() - start
+        conn.rollback()
+    finally:
+        conn.close()
+
+    print(f"\n🐘 calculer_empreinte_vol : {per_call * 1000:.2f} ms/appel → {pairs:,} couples vol×point "
+          f"≈ {per_call * pairs:,.0f}s (extrapolation)")
+    print(f"⚡ calculer_empreinte_grille : {len(ids)} vols × {spec.size:,} récepteurs en {grid_time:.2f}s "
+          f"(×{per_call * pairs / grid_time:,.0f}) | {len(rows):,} lignes")
+    if insert_time is not None:
+        print(f"💾 inserer_empreinte_grille : {inserted:,} lignes en {insert_time:.2f}s (annulé)")
+
+    # Parité avec le moteur NumPy (sources fixes par phase, mêmes formules)
+    flight_ids, lamax, sel = compute_receptor_noise(tracks, profiles, spec.points())
+    order = {flight_id: i for i, flight_id in enumerate(flight_ids)}
+    sql_lamax = np.full_like(lamax, np.nan)
+    sql_sel = np.full_like(sel, np.nan)
+    for flight_id, point, level, exposure in rows:
+        sql_lamax[order[flight_id], point] = level
+        sql_sel[order[flight_id], point] = np.nan if exposure is None else exposure
+    print(f"📏 écart avec le moteur NumPy : LAmax {np.nanmax(np.abs(sql_lamax - lamax)):.4f} dB"
+          f" | SEL {np.nanmax(np.abs(sql_sel - sel)):.4f} dB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
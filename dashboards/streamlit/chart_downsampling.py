@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Réduction des séries temporelles avant envoi à Plotly
+LTTB (Largest-Triangle-Three-Buckets) pour l'allure des courbes, min-max pour
+conserver les pics (seuils d'alerte), et choix du pas d'agrégation SQL
+(heure, jour, semaine) selon la fenêtre affichée
+"""
+
+import numpy as np
+import pandas as pd
+
+# Nombre de points par trace : ordre de grandeur de la largeur du graphique en pixels
+DEFAULT_MAX_POINTS = 1200
+
+# Pas d'agrégation disponibles côté SQL (DATE_TRUNC), du plus fin au plus grossier
+ROLLUP_SECONDS = {'hour': 3600, 'day': 86400, 'week': 7 * 86400}
+ROLLUP_LABELS = {'hour': 'heure', 'day': 'jour', 'week': 'semaine'}
+
+
+def choose_rollup(start, end, max_points=DEFAULT_MAX_POINTS, oversampling=4):
+    """Pas d'agrégation le plus fin dont le nombre de périodes reste raisonnable
+
+    On tolère jusqu'à oversampling × max_points périodes : la réduction LTTB
+    ramène ensuite la série à la largeur du graphique.
+    """
+    span = (pd.Timestamp(end) - pd.Timestamp(start)).total_seconds()
+    for bucket, seconds in ROLLUP_SECONDS.items():
+        if span / seconds <= max_points * oversampling:
+            return bucket
+    return 'week'
+
+
+def _as_float(values):
+    """Abscisses numériques (les dates deviennent des nanosecondes)"""
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.astype('int64').to_numpy(dtype=float)
+    return pd.to_numeric(values, errors='coerce').to_numpy(dtype=float)
+
+
+def lttb_indices(x, y, n_out):
+    """Indices des points retenus par LTTB (premier et dernier toujours conservés)"""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # n_out - 2 seaux entre le premier et le dernier point
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        # Aire du triangle (point retenu précédent, candidat, moyenne du seau suivant)
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+
+    return indices
+
+
+def minmax_indices(y, n_out):
+    """Indices du minimum et du maximum de chaque seau (pics préservés)"""
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+
+    n_buckets = (n_out - 2) // 2  # + premier et dernier points
+    bucket = np.arange(n) * n_buckets // n
+    order = np.lexsort((np.nan_to_num(y, nan=-np.inf), bucket))
+    sorted_buckets = bucket[order]
+    first = np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]]
+    last = np.r_[sorted_buckets[1:] != sorted_buckets[:-1], True]
+
+    return np.unique(np.concatenate([order[first], order[last], [0, n - 1]]))
+
+
+def downsample(df, x_col, y_col, max_points=DEFAULT_MAX_POINTS, method='lttb'):
+    """Réduire un DataFrame trié par x_col à max_points lignes au plus pour y_col"""
+    if df is None or len(df) <= max_points:
+        return df
+
+    if method == 'minmax':
+        indices = minmax_indices(df[y_col], max_points)
+    else:
+        indices = lttb_indices(_as_float(df[x_col]), _as_float(df[y_col]), max_points)
+    return df.iloc[indices]
@@ -7,17 +7,26 @@ Analyse géospatiale et impact environnemental
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import folium
-from streamlit_folium import st_folium
-import psycopg2
-from sqlalchemy import create_engine
 import datetime as dt
-import geopandas as gpd
-from shapely.geometry import Point, Polygon
-import math
+
+from lazy_modules import lazy_import, lazy_callable
+from db_access import get_engine, metrics, read_sql
+from map_layers import (
+    available_tile_layers, emissions_layer, raster_legend_html, raster_tile_layer,
+    stations_layer, tile_layer_label,
+)
+
+# Bibliothèques lourdes chargées au premier rendu du composant qui les utilise
+px = lazy_import("plotly.express")
+go = lazy_import("plotly.graph_objects")
+folium = lazy_import("folium")
+st_folium = lazy_callable("streamlit_folium", "st_folium")
+dispersion_meteo = lazy_import("src.dispersion.meteo")
+dispersion_plume = lazy_import("src.dispersion.plume")
+dispersion_emissions = lazy_import("src.dispersion.emissions")
+grid_spec = lazy_import("src.grids.spec")
+dispersion_inventory = lazy_import("src.dispersion.inventory")
+pyproj = lazy_import("pyproj")
 
 # Configuration page Streamlit
 st.set_page_config(
@@ -38,15 +47,29 @@ DB_CONFIG = {
 
 DATABASE_URL = f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}"
 
+# Métriques Prometheus du dashboard (http://localhost:9101/metrics, ou METRICS_PORT)
+METRICS_COMPONENT = 'environmental'
+metrics.start_metrics_server(default_port=9101)
+
 # Coordonnées de l'aéroport Paris-Val d'Europe (fictif - proche de Marne-la-Vallée)
 AIRPORT_LAT = 48.8738  # Plus au nord-est de Paris
 AIRPORT_LON = 2.6794   # Proche de Disneyland Paris / Val d'Europe
 AIRPORT_NAME = "Paris-Val d'Europe Airport"
 
+# Point de référence en Lambert-93 et maillage de l'inventaire des zones d'émission (m)
+AIRPORT_X = 684305.0
+AIRPORT_Y = 6864575.0
+INVENTORY_HALF_WIDTH_M = 10000.0
+INVENTORY_STEP_M = 500.0
+
+# Aéroport des vols et de la météo (etl.*_staging) pour les zones d'émission et la dispersion, polluants
+LTO_AIRPORT = 'CDG'
+LTO_POLLUTANTS = ('CO2', 'NOx', 'PM10', 'PM25')
+
 def discover_database_structure():
     """Découvrir automatiquement la structure de la base de données"""
     try:
-        engine = create_engine(DATABASE_URL)
+        engine = get_engine(DATABASE_URL)
         
         # Lister toutes les tables disponibles
         query_tables = """
@@ -58,7 +81,7 @@ def discover_database_structure():
         AND table_type = 'BASE TABLE'
         ORDER BY table_schema, table_name;
         """
-        tables = pd.read_sql_query(query_tables, engine)
+        tables = read_sql('tables', query_tables, engine, METRICS_COMPONENT)
         
         # Identifier les tables de données
         flight_tables = tables[tables['table_name'].str.contains('flight|vol', case=False)]
@@ -78,12 +101,12 @@ def discover_database_structure():
         st.error(f"Erreur lors de la découverte de la structure : {e}")
         return None
 
-@st.cache_data(ttl=600)  # Cache 10 minutes
+@metrics.instrument_cache('load_environmental_data', METRICS_COMPONENT, st.cache_data(ttl=600))  # Cache 10 minutes
 def load_environmental_data():
     """Charger les données environnementales avec adaptation automatique aux vraies tables"""
     
     try:
-        engine = create_engine(DATABASE_URL)
+        engine = get_engine(DATABASE_URL)
         
         # 1. Données d'émissions réelles depuis etl.emissions_staging
         query_emissions = """
@@ -115,8 +138,8 @@ def load_environmental_data():
         LIMIT 20
         """
         
-        # 3. Données météo réelles depuis etl.weather_staging
-        query_meteo = """
+        # 3. Données météo réelles depuis etl.weather_staging (stations de LTO_AIRPORT uniquement)
+        query_meteo = f"""
         SELECT 
             observation_time as timestamp_observation,
             temperature_c as temperature_celsius,
@@ -125,9 +148,9 @@ def load_environmental_data():
             humidity_percent as humidite_relative_pourcent,
             pressure_hpa as pression_atmospherique_hpa
         FROM etl.weather_staging
-        WHERE observation_time >= CURRENT_DATE - INTERVAL '7 days'
+        WHERE airport_code = '{LTO_AIRPORT}'
+          AND observation_time >= CURRENT_DATE - INTERVAL '7 days'
         ORDER BY observation_time DESC
-        LIMIT 168  -- 7 jours * 24 heures
         """
         
         # 4. Vue d'ensemble des vols pour le dashboard
@@ -143,34 +166,13 @@ def load_environmental_data():
         
         # Exécution des requêtes avec gestion d'erreurs
         try:
-            emissions_data = pd.read_sql_query(query_emissions, engine)
-            aircraft_emissions = pd.read_sql_query(query_flights, engine)
-            meteo = pd.read_sql_query(query_meteo, engine)
-            vol_overview = pd.read_sql_query(query_vol_overview, engine)
+            emissions_data = read_sql('emissions', query_emissions, engine, METRICS_COMPONENT)
+            aircraft_emissions = read_sql('flights', query_flights, engine, METRICS_COMPONENT)
+            meteo = read_sql('meteo', query_meteo, engine, METRICS_COMPONENT)
+            vol_overview = read_sql('vol_overview', query_vol_overview, engine, METRICS_COMPONENT)
             
-            # Créer des points d'émissions géographiques simulés basés sur les vraies données
-            if not emissions_data.empty:
-                np.random.seed(42)
-                n_points = len(emissions_data)
-                
-                # Générer des coordonnées autour de l'aéroport proportionnelles aux émissions
-                total_emissions = emissions_data['total_emission_kg'].values
-                max_emission = total_emissions.max()
-                
-                # Plus l'émission est importante, plus elle peut être éloignée (dispersion)
-                distances = (total_emissions / max_emission) * 0.03  # Maximum 3km du centre
-                angles = np.random.uniform(0, 2*np.pi, n_points)
-                
-                emissions_zone = pd.DataFrame({
-                    'latitude': AIRPORT_LAT + distances * np.sin(angles),
-                    'longitude': AIRPORT_LON + distances * np.cos(angles),
-                    'type_polluant': emissions_data['type_polluant'],
-                    'total_emission_kg': emissions_data['total_emission_kg'],
-                    'nb_calculs': emissions_data['nb_calculs'],
-                    'emission_moyenne_kg': emissions_data['emission_moyenne_kg']
-                })
-            else:
-                emissions_zone = pd.DataFrame()
+            # Zones d'émission : émissions par vol × phase réparties le long des trajectoires LTO
+            emissions_zone = emission_zones(load_lto_emissions(engine))
             
             # Générer des stations de mesure simulées basées sur les types de polluants réels
             stations = generate_stations_data_from_real_pollutants(emissions_data)
@@ -186,6 +188,56 @@ def load_environmental_data():
         st.warning(f"Erreur de connexion, utilisation de données simulées : {e}")
         return generate_sample_data()
 
+def load_lto_emissions(engine):
+    """Émissions par vol et phase LTO des EMISSIONS_PERIOD_DAYS derniers jours (format large)
+
+    Requête partagée avec l'inventaire (src/dispersion/inventory.py) : seuls les
+    mouvements de LTO_AIRPORT sont retenus, datés par l'heure de départ ou
+    d'arrivée selon la phase.
+    """
+    today = dt.date.today()
+    conn = engine.raw_connection()
+    try:
+        with metrics.timed_query('lto_emissions', METRICS_COMPONENT):
+            lto_emissions = dispersion_inventory.load_lto_emissions(
+                conn, today - dt.timedelta(days=EMISSIONS_PERIOD_DAYS), today + dt.timedelta(days=1),
+                LTO_AIRPORT, LTO_POLLUTANTS,
+            )
+    finally:
+        conn.close()
+    metrics.observe_pool(engine.pool, METRICS_COMPONENT)
+    return lto_emissions
+
+def emission_zones(lto_emissions, pollutants=LTO_POLLUTANTS):
+    """Cellules de l'inventaire maillé (src/dispersion/inventory.py) en WGS84, une ligne par polluant
+
+    Piste et aire de stationnement par défaut autour du point de référence ;
+    nb_calculs compte les heures émettrices de la cellule.
+    """
+    if lto_emissions.empty:
+        return pd.DataFrame()
+    pollutants = list(pollutants)
+    runways = dispersion_inventory.default_runways(AIRPORT_X, AIRPORT_Y)
+    spec = grid_spec.GridSpec.centered(AIRPORT_X, AIRPORT_Y, INVENTORY_HALF_WIDTH_M, INVENTORY_STEP_M)
+    inventory = dispersion_inventory.build_inventory(
+        lto_emissions, runways,
+        dispersion_inventory.default_apron(runways), spec,
+    )
+    hourly = inventory.to_frame(hourly=True)
+    cells = (hourly.melt(id_vars=['heure', 'x', 'y'], value_vars=pollutants,
+                         var_name='type_polluant', value_name='emission_kg')
+             .groupby(['x', 'y', 'heure', 'type_polluant'], as_index=False)['emission_kg'].sum())
+    cells = cells[cells['emission_kg'] > 0]
+    zones = cells.groupby(['x', 'y', 'type_polluant'], as_index=False).agg(
+        total_emission_kg=('emission_kg', 'sum'),
+        nb_calculs=('emission_kg', 'size'),
+        emission_moyenne_kg=('emission_kg', 'mean'),
+    )
+    transformer = pyproj.Transformer.from_crs(spec.crs, "EPSG:4326", always_xy=True)
+    zones['longitude'], zones['latitude'] = transformer.transform(zones['x'].to_numpy(), zones['y'].to_numpy())
+    return zones[['latitude', 'longitude', 'type_polluant', 'total_emission_kg', 'nb_calculs',
+                  'emission_moyenne_kg']].sort_values('total_emission_kg', ascending=False, ignore_index=True)
+
 def generate_stations_data_from_real_pollutants(emissions_data):
     """Générer des stations de mesure basées sur les vrais polluants détectés"""
     
@@ -296,7 +348,8 @@ def generate_weather_data():
     
     return meteo
 
-def create_airport_map(emissions_zone, stations):
+def create_airport_map(emissions_zone, stations, show_emissions=True, show_buffers=True,
+                       show_stations=True, cluster_stations=False, raster_layer=None):
     """Créer la carte principale de l'aéroport avec zones d'émissions"""
     
     # Initialiser la carte centrée sur l'aéroport
@@ -323,61 +376,29 @@ def create_airport_map(emissions_zone, stations):
     ).add_to(m)
     
     # Zones concentriques d'impact (5km, 10km, 15km)
-    for radius, color, label in [(5000, 'blue', '5km'), (10000, 'orange', '10km'), (15000, 'red', '15km')]:
-        folium.Circle(
-            location=[AIRPORT_LAT, AIRPORT_LON],
-            radius=radius,
-            popup=f"Zone d'impact {label}",
-            color=color,
-            weight=2,
-            fill=False,
-            opacity=0.6
-        ).add_to(m)
-    
-    # Ajouter les points d'émissions si disponibles
-    if emissions_zone is not None and not emissions_zone.empty:
-        # Grouper par localisation pour éviter la surcharge
-        emissions_grouped = emissions_zone.groupby(['latitude', 'longitude']).agg({
-            'total_emission_kg': 'sum',
-            'type_polluant': lambda x: ', '.join(x.unique())
-        }).reset_index()
-        
-        for _, row in emissions_grouped.iterrows():
-            # Taille du marqueur proportionnelle aux émissions
-            size = min(max(row['total_emission_kg'] / 100, 5), 20)
-            
-            folium.CircleMarker(
-                location=[row['latitude'], row['longitude']],
-                radius=size,
-                popup=f"""
-                <b>Zone d'Émission</b><br>
-                Polluants: {row['type_polluant']}<br>
-                Total: {row['total_emission_kg']:.2f} kg
-                """,
-                color='darkred',
-                fillColor='red',
-                fillOpacity=0.6
+    if show_buffers:
+        for radius, color, label in [(5000, 'blue', '5km'), (10000, 'orange', '10km'), (15000, 'red', '15km')]:
+            folium.Circle(
+                location=[AIRPORT_LAT, AIRPORT_LON],
+                radius=radius,
+                popup=f"Zone d'impact {label}",
+                color=color,
+                weight=2,
+                fill=False,
+                opacity=0.6
             ).add_to(m)
     
-    # Ajouter les stations de mesure
-    if stations is not None and not stations.empty:
-        # Couleurs selon le niveau de qualité
-        color_map = {'Bon': 'green', 'Modéré': 'orange', 'Élevé': 'red'}
-        
-        for _, station in stations.iterrows():
-            color = color_map.get(station.get('niveau_qualite', 'Bon'), 'gray')
-            
-            folium.Marker(
-                [station['latitude'], station['longitude']],
-                popup=f"""
-                <b>{station['nom_station']}</b><br>
-                Zone: {station['zone_surveillance']}<br>
-                Qualité: {station.get('niveau_qualite', 'N/A')}<br>
-                {station.get('polluant', 'N/A')}: {station.get('valeur_mesure', 'N/A')} {station.get('unite_mesure', '')}
-                """,
-                tooltip=f"Station {station['nom_station']}",
-                icon=folium.Icon(color=color, icon='tachometer-alt', prefix='fa')
-            ).add_to(m)
+    # Champ sur grille pré-rendu (bruit, concentrations) : tuiles PNG
+    if raster_layer is not None:
+        raster_tile_layer(raster_layer).add_to(m)
+    
+    # Zones d'émissions : une seule couche GeoJSON, agrégée au-delà de MAX_FEATURES
+    if show_emissions and emissions_zone is not None and not emissions_zone.empty:
+        emissions_layer(emissions_zone).add_to(m)
+    
+    # Stations de mesure (regroupement optionnel pour les grands réseaux)
+    if show_stations and stations is not None and not stations.empty:
+        stations_layer(stations, cluster=cluster_stations).add_to(m)
     
     # Ajouter le contrôle des couches
     folium.LayerControl().add_to(m)
@@ -629,54 +650,94 @@ def create_environmental_metrics(emissions_zone, stations, meteo_data):
         else:
             st.metric("🎯 Types Polluants", "4", delta="CO2, NOx, PM10, PM2.5")
 
+# Domaine de la modélisation de dispersion du dashboard (m, coordonnées locales centrées sur la piste)
+DISPERSION_HALF_WIDTH_M = 6000.0
+DISPERSION_STEP_M = 150.0
+EMISSIONS_PERIOD_DAYS = 30
+
+
+@metrics.instrument_cache('dispersion_run', METRICS_COMPONENT, st.cache_data(ttl=600))
+def compute_dispersion(meteo_data, rate_gs):
+    """Panache gaussien heure par heure sur la météo chargée (src/dispersion)
+
+    Débit moyen (g/s) réparti sur la piste par défaut ; retourne la
+    concentration moyenne (µg/m³), le maximum du domaine par heure et le
+    nombre d'heures par classe de stabilité.
+    """
+    observations = meteo_data.rename(columns={
+        'timestamp_observation': 'observation_time',
+        'temperature_celsius': 'temperature_c',
+        'vitesse_vent_ms': 'wind_speed_ms',
+        'direction_vent_degres': 'wind_direction_deg',
+        'humidite_relative_pourcent': 'humidity_percent',
+        'pression_atmospherique_hpa': 'pressure_hpa',
+    })
+    observations['observation_time'] = pd.to_datetime(observations['observation_time'])
+    meteo = dispersion_meteo.hourly_weather(observations)
+    sources = dispersion_plume.PlumeSources.from_frame(dispersion_emissions.runway_sources(0.0, 0.0))
+    spec = grid_spec.GridSpec.centered(0.0, 0.0, DISPERSION_HALF_WIDTH_M, DISPERSION_STEP_M)
+    rates = np.full((len(meteo), len(sources)), rate_gs / len(sources))
+    values = dispersion_plume.concentrations(sources, rates, spec.points(), meteo)
+    return (values.mean(axis=0).reshape(spec.shape), spec.xs / 1000.0, spec.ys / 1000.0,
+            pd.Series(values.max(axis=1), index=meteo.index, name='max_ugm3'),
+            dispersion_plume.class_summary(meteo))
+
 def create_dispersion_analysis(meteo_data, emissions_zone):
-    """Analyser la dispersion des polluants selon les conditions météo"""
+    """Dispersion des émissions de la zone selon la météo horaire (panache gaussien)"""
     
     if meteo_data is None or meteo_data.empty or emissions_zone is None or emissions_zone.empty:
         return st.warning("Données insuffisantes pour l'analyse de dispersion")
     
     st.subheader("🌪️ Modélisation de Dispersion Atmosphérique")
     
+    totals = emissions_zone.groupby('type_polluant')['total_emission_kg'].sum()
+    polluants = [p for p in totals.index if p != 'CO2'] or list(totals.index)
+    polluant = st.selectbox("Polluant dispersé", polluants,
+                            index=polluants.index('NOx') if 'NOx' in polluants else 0)
+    rate_gs = totals[polluant] * 1000.0 / (EMISSIONS_PERIOD_DAYS * 86400)
+    
+    try:
+        mean_grid, x_km, y_km, hourly_max, classes = compute_dispersion(meteo_data, rate_gs)
+    except Exception as e:
+        return st.warning(f"Modélisation de dispersion indisponible : {e}")
+    
+    st.caption(f"{polluant} : {rate_gs:.3f} g/s en moyenne sur {EMISSIONS_PERIOD_DAYS} jours, "
+               f"répartis le long de la piste ; {len(hourly_max)} heures de météo")
+    
     col1, col2 = st.columns(2)
     
     with col1:
-        # Analyse de l'impact du vent sur la dispersion
-        st.markdown("**Impact du Vent sur les Émissions**")
+        st.markdown("**Concentration Moyenne Modélisée**")
         
-        # Simuler l'impact en fonction de la vitesse du vent
-        if not meteo_data.empty:
-            vent_impact = meteo_data.copy()
-            vent_impact['impact_dispersion'] = 1 / (1 + vent_impact['vitesse_vent_ms'])  # Plus de vent = meilleure dispersion
-            
-            fig_impact = px.scatter(
-                vent_impact, 
-                x='vitesse_vent_ms', 
-                y='impact_dispersion',
-                color='direction_vent_degres',
-                title="Facteur d'Impact vs Vitesse du Vent",
-                labels={
-                    'vitesse_vent_ms': 'Vitesse du Vent (m/s)',
-                    'impact_dispersion': 'Facteur d\'Impact',
-                    'direction_vent_degres': 'Direction (°)'
-                }
-            )
-            fig_impact.update_layout(height=300)
-            st.plotly_chart(fig_impact, use_container_width=True)
+        fig_map = go.Figure(go.Heatmap(
+            x=x_km, y=y_km, z=mean_grid, colorscale='YlOrRd',
+            colorbar=dict(title='µg/m³')
+        ))
+        fig_map.update_layout(
+            height=400,
+            xaxis_title='Est (km)', yaxis_title='Nord (km)',
+            yaxis=dict(scaleanchor='x')
+        )
+        st.plotly_chart(fig_map, use_container_width=True)
     
     with col2:
-        # Zone de dispersion prédominante
-        st.markdown("**Direction de Dispersion Prédominante**")
+        st.markdown("**Heures par Classe de Stabilité (Pasquill-Gifford)**")
         
-        if not meteo_data.empty:
-            direction_freq = meteo_data['direction_vent_degres'].value_counts().head(8)
-            
-            fig_direction = px.pie(
-                values=direction_freq.values,
-                names=[f"{angle}°" for angle in direction_freq.index],
-                title="Directions de Vent Dominantes"
-            )
-            fig_direction.update_layout(height=300)
-            st.plotly_chart(fig_direction, use_container_width=True)
+        fig_classes = px.bar(
+            x=list(classes), y=list(classes.values()),
+            labels={'x': 'Classe', 'y': 'Heures'},
+            title="A très instable → F très stable"
+        )
+        fig_classes.update_layout(height=400)
+        st.plotly_chart(fig_classes, use_container_width=True)
+    
+    fig_max = px.line(
+        hourly_max.reset_index(), x='heure', y='max_ugm3',
+        title=f"Maximum Horaire du Domaine - {polluant}",
+        labels={'heure': 'Heure', 'max_ugm3': 'µg/m³'}
+    )
+    fig_max.update_layout(height=300)
+    st.plotly_chart(fig_max, use_container_width=True)
 
 def main():
     """Interface principale du dashboard environnemental"""
@@ -712,6 +773,18 @@ def main():
         show_emission_zones = st.checkbox("Zones d'émission", value=True)
         show_buffer_zones = st.checkbox("Zones d'impact", value=True)
         show_stations = st.checkbox("Stations de mesure", value=True)
+        cluster_stations = st.checkbox("Regrouper les stations", value=False)
+        
+        # Champs sur grille pré-rendus (scripts/build_tiles.py)
+        tile_layers = available_tile_layers()
+        raster_choice = st.selectbox(
+            "Champ sur grille",
+            ["Aucun"] + [tile_layer_label(meta) for meta in tile_layers],
+            help="Pyramides générées par scripts/build_tiles.py"
+        )
+        raster_layer = next(
+            (meta for meta in tile_layers if tile_layer_label(meta) == raster_choice), None
+        )
         
         # Informations contextuelles
         st.markdown("### ℹ️ Informations Sources")
@@ -780,9 +853,19 @@ def main():
     
     with col1:
         # Carte principale
-        airport_map = create_airport_map(emissions_zone, stations)
+        airport_map = create_airport_map(
+            emissions_zone, stations,
+            show_emissions=show_emission_zones,
+            show_buffers=show_buffer_zones,
+            show_stations=show_stations,
+            cluster_stations=cluster_stations,
+            raster_layer=raster_layer
+        )
         map_data = st_folium(airport_map, width=700, height=500)
         
+        if raster_layer is not None:
+            st.markdown(raster_legend_html(raster_layer), unsafe_allow_html=True)
+        
         # Informations sur la sélection de carte
         if map_data['last_object_clicked']:
             st.info(f"📍 Dernière sélection: {map_data['last_object_clicked']}")
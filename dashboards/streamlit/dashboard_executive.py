@@ -6,14 +6,18 @@ Tableau de bord dirigeant pour suivi performance environnementale
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import psycopg2
-from sqlalchemy import create_engine
 import datetime as dt
 import numpy as np
 
+from lazy_modules import lazy_import, lazy_callable
+from db_access import get_engine, metrics, read_sql
+from chart_downsampling import ROLLUP_LABELS, choose_rollup, downsample
+
+# Bibliothèques lourdes chargées au premier rendu du composant qui les utilise
+px = lazy_import("plotly.express")
+go = lazy_import("plotly.graph_objects")
+make_subplots = lazy_callable("plotly.subplots", "make_subplots")
+
 # Configuration page Streamlit
 st.set_page_config(
     page_title="Dashboard Exécutif - Paris-Val d'Europe",
@@ -33,11 +37,15 @@ DB_CONFIG = {
 
 DATABASE_URL = f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}"
 
-@st.cache_data(ttl=300)  # Cache 5 minutes
+# Métriques Prometheus du dashboard (http://localhost:9102/metrics, ou METRICS_PORT)
+METRICS_COMPONENT = 'executive'
+metrics.start_metrics_server(default_port=9102)
+
+@metrics.instrument_cache('load_data', METRICS_COMPONENT, st.cache_data(ttl=300))  # Cache 5 minutes
 def load_data():
     """Charger les données depuis PostgreSQL avec cache"""
     try:
-        engine = create_engine(DATABASE_URL)
+        engine = get_engine(DATABASE_URL)
         
         # Requête principale pour KPIs
         query_kpis = """
@@ -50,21 +58,7 @@ def load_data():
         JOIN etl.emissions_staging e ON f.flight_id = e.flight_id
         """
         
-        kpis = pd.read_sql_query(query_kpis, engine)
-        
-        # Données temporelles
-        query_temporal = """
-        SELECT 
-            DATE(f.departure_time) as flight_date,
-            COUNT(DISTINCT f.flight_id) as daily_flights,
-            ROUND(SUM(CASE WHEN e.pollutant_type = 'CO2' THEN e.emission_quantity_kg ELSE 0 END)::numeric, 2) as daily_co2_kg
-        FROM etl.flights_staging f
-        JOIN etl.emissions_staging e ON f.flight_id = e.flight_id
-        GROUP BY DATE(f.departure_time)
-        ORDER BY flight_date
-        """
-        
-        temporal_data = pd.read_sql_query(query_temporal, engine)
+        kpis = read_sql('kpis', query_kpis, engine, METRICS_COMPONENT)
         
         # Données par type d'avion
         query_aircraft = """
@@ -79,7 +73,7 @@ def load_data():
         ORDER BY total_co2_kg DESC
         """
         
-        aircraft_data = pd.read_sql_query(query_aircraft, engine)
+        aircraft_data = read_sql('aircraft', query_aircraft, engine, METRICS_COMPONENT)
         
         # Répartition des polluants
         query_pollutants = """
@@ -92,13 +86,57 @@ def load_data():
         ORDER BY total_emission_kg DESC
         """
         
-        pollutants_data = pd.read_sql_query(query_pollutants, engine)
+        pollutants_data = read_sql('pollutants', query_pollutants, engine, METRICS_COMPONENT)
         
-        return kpis, temporal_data, aircraft_data, pollutants_data
+        return kpis, aircraft_data, pollutants_data
         
     except Exception as e:
         st.error(f"Erreur chargement données: {e}")
-        return None, None, None, None
+        return None, None, None
+
+@metrics.instrument_cache('load_time_bounds', METRICS_COMPONENT, st.cache_data(ttl=300))
+def load_time_bounds():
+    """Première et dernière date de vol disponibles"""
+    try:
+        engine = get_engine(DATABASE_URL)
+        bounds = read_sql(
+            'time_bounds',
+            "SELECT MIN(departure_time)::date AS first_day, MAX(departure_time)::date AS last_day FROM etl.flights_staging",
+            engine, METRICS_COMPONENT
+        )
+        if bounds.empty or pd.isna(bounds.iloc[0]['first_day']):
+            return None
+        return bounds.iloc[0]['first_day'], bounds.iloc[0]['last_day']
+    except Exception as e:
+        st.error(f"Erreur chargement période: {e}")
+        return None
+
+@metrics.instrument_cache('load_temporal_data', METRICS_COMPONENT, st.cache_data(ttl=300))
+def load_temporal_data(start_date, end_date, bucket):
+    """Série vols / CO2 agrégée par heure, jour ou semaine sur une fenêtre"""
+    if bucket not in ROLLUP_LABELS:
+        raise ValueError(f"Pas d'agrégation inconnu: {bucket}")
+    try:
+        engine = get_engine(DATABASE_URL)
+        
+        query_temporal = f"""
+        SELECT 
+            DATE_TRUNC('{bucket}', f.departure_time) as period,
+            COUNT(DISTINCT f.flight_id) as flights,
+            ROUND(SUM(CASE WHEN e.pollutant_type = 'CO2' THEN e.emission_quantity_kg ELSE 0 END)::numeric, 2)::float8 as co2_kg
+        FROM etl.flights_staging f
+        JOIN etl.emissions_staging e ON f.flight_id = e.flight_id
+        WHERE f.departure_time >= '{start_date.isoformat()}'
+          AND f.departure_time < '{end_date.isoformat()}'::date + INTERVAL '1 day'
+        GROUP BY DATE_TRUNC('{bucket}', f.departure_time)
+        ORDER BY period
+        """
+        
+        return read_sql('temporal', query_temporal, engine, METRICS_COMPONENT)
+        
+    except Exception as e:
+        st.error(f"Erreur chargement série temporelle: {e}")
+        return None
 
 def create_kpi_cards(kpis):
     """Créer les cartes KPI"""
@@ -140,12 +178,17 @@ def create_kpi_cards(kpis):
             delta=f"{row['avg_co2_per_flight']:,.0f} kg"
         )
 
-def create_temporal_chart(temporal_data):
-    """Graphique d'évolution temporelle"""
+def create_temporal_chart(temporal_data, bucket='day'):
+    """Graphique d'évolution temporelle (séries réduites à la largeur du graphique)"""
     if temporal_data is None or temporal_data.empty:
         st.error("Pas de données temporelles")
         return
     
+    unit = ROLLUP_LABELS[bucket]
+    flights_series = downsample(temporal_data, 'period', 'flights')
+    co2_series = downsample(temporal_data, 'period', 'co2_kg')
+    markers = len(temporal_data) <= 100
+    
     fig = make_subplots(
         rows=2, cols=1,
         subplot_titles=('Évolution des Vols', 'Évolution des Émissions CO2'),
@@ -156,10 +199,10 @@ def create_temporal_chart(temporal_data):
     # Graphique des vols
     fig.add_trace(
         go.Scatter(
-            x=temporal_data['flight_date'],
-            y=temporal_data['daily_flights'],
-            mode='lines+markers',
-            name='Vols/jour',
+            x=flights_series['period'],
+            y=flights_series['flights'],
+            mode='lines+markers' if markers else 'lines',
+            name=f'Vols/{unit}',
             line=dict(color='#1f77b4', width=3),
             marker=dict(size=8)
         ),
@@ -169,10 +212,10 @@ def create_temporal_chart(temporal_data):
     # Graphique des émissions
     fig.add_trace(
         go.Scatter(
-            x=temporal_data['flight_date'],
-            y=temporal_data['daily_co2_kg'],
-            mode='lines+markers',
-            name='CO2 kg/jour',
+            x=co2_series['period'],
+            y=co2_series['co2_kg'],
+            mode='lines+markers' if markers else 'lines',
+            name=f'CO2 kg/{unit}',
             line=dict(color='#ff7f0e', width=3),
             marker=dict(size=8),
             fill='tonexty',
@@ -182,7 +225,7 @@ def create_temporal_chart(temporal_data):
     )
     
     fig.update_layout(
-        title="📈 Évolution Temporelle - Paris-Val d'Europe",
+        title=f"📈 Évolution Temporelle par {unit} - Paris-Val d'Europe",
         height=500,
         showlegend=True,
         hovermode='x unified'
@@ -193,6 +236,9 @@ def create_temporal_chart(temporal_data):
     fig.update_yaxes(title_text="CO2 (kg)", row=2, col=1)
     
     st.plotly_chart(fig, use_container_width=True)
+    
+    if len(flights_series) < len(temporal_data):
+        st.caption(f"📉 {len(temporal_data):,} périodes réduites à {len(flights_series):,} points (LTTB)")
 
 def create_aircraft_ranking(aircraft_data):
     """Classement des types d'avions"""
@@ -308,7 +354,7 @@ def main():
     
     # Chargement des données
     with st.spinner("📊 Chargement des données..."):
-        kpis, temporal_data, aircraft_data, pollutants_data = load_data()
+        kpis, aircraft_data, pollutants_data = load_data()
     
     if kpis is None:
         st.error("❌ Impossible de charger les données. Vérifiez la connexion à la base.")
@@ -322,7 +368,24 @@ def main():
     
     # Section évolution temporelle
     st.markdown("## 📈 Tendances Temporelles")
-    create_temporal_chart(temporal_data)
+    bounds = load_time_bounds()
+    if bounds is None:
+        create_temporal_chart(None)
+    else:
+        first_day, last_day = bounds
+        if first_day < last_day:
+            # Resserrer la fenêtre relance la requête à un pas d'agrégation plus fin
+            start_date, end_date = st.slider(
+                "Fenêtre d'analyse",
+                min_value=first_day,
+                max_value=last_day,
+                value=(first_day, last_day),
+                format="DD/MM/YYYY"
+            )
+        else:
+            start_date, end_date = first_day, last_day
+        bucket = choose_rollup(start_date, end_date + dt.timedelta(days=1))
+        create_temporal_chart(load_temporal_data(start_date, end_date, bucket), bucket)
     
     st.markdown("---")
     
@@ -6,13 +6,19 @@ Interface terrain avancée pour managers d'exploitation et équipes techniques
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import psycopg2
-from sqlalchemy import create_engine
 import datetime as dt
+import time
 import numpy as np
+
+from lazy_modules import lazy_import, lazy_callable
+from db_access import get_engine, metrics, read_sql
+from chart_downsampling import ROLLUP_LABELS, choose_rollup, downsample
+from live_feed import LiveFeed
+
+# Bibliothèques lourdes chargées au premier rendu du composant qui les utilise
+px = lazy_import("plotly.express")
+go = lazy_import("plotly.graph_objects")
+make_subplots = lazy_callable("plotly.subplots", "make_subplots")
 from datetime import timedelta
 import io
 
@@ -35,17 +41,45 @@ DB_CONFIG = {
 
 DATABASE_URL = f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}"
 
+# Métriques Prometheus du dashboard (http://localhost:9103/metrics, ou METRICS_PORT)
+METRICS_COMPONENT = 'operational'
+metrics.start_metrics_server(default_port=9103)
+
+# Fenêtres d'historique du monitoring (jours, None = tout l'historique)
+HISTORY_WINDOWS = {
+    "Dernières 24h": 1,
+    "7 derniers jours": 7,
+    "30 derniers jours": 30,
+    "12 derniers mois": 365,
+    "Tout l'historique": None,
+}
+
+# Attente maximale d'une notification ETL en mode live avant rafraîchissement
+LIVE_WAIT_SECONDS = 60
+# Pas de l'attente : entre deux pas, Streamlit traite les widgets modifiés
+LIVE_POLL_SECONDS = 1.0
+
 # Initialisation du state
 if 'auto_refresh' not in st.session_state:
     st.session_state.auto_refresh = False
 if 'last_refresh' not in st.session_state:
     st.session_state.last_refresh = dt.datetime.now()
+if 'live_version' not in st.session_state:
+    st.session_state.live_version = -1
+
+@st.cache_resource
+def get_live_feed():
+    """Flux temps réel unique, partagé par toutes les sessions"""
+    return LiveFeed(DB_CONFIG).start()
 
-@st.cache_data(ttl=60)  # Cache plus court pour données opérationnelles
-def load_operational_data(date_filter, aircraft_filter, phase_filter):
-    """Charger données opérationnelles avec filtres"""
+@metrics.instrument_cache('load_operational_data', METRICS_COMPONENT, st.cache_data(ttl=60))  # Cache plus court pour données opérationnelles
+def load_operational_data(date_filter, aircraft_filter, phase_filter, include_realtime=True):
+    """Charger données opérationnelles avec filtres
+
+    include_realtime=False : métriques 24 h fournies par le flux live, requête omise.
+    """
     try:
-        engine = create_engine(DATABASE_URL)
+        engine = get_engine(DATABASE_URL)
         
         # Construction des filtres dynamiques
         where_conditions = ["1=1"]  # Condition toujours vraie pour commencer
@@ -84,9 +118,10 @@ def load_operational_data(date_filter, aircraft_filter, phase_filter):
         ORDER BY f.departure_time DESC, e.flight_phase, e.pollutant_type
         """
         
-        details = pd.read_sql_query(query_details, engine)
+        details = read_sql('details', query_details, engine, METRICS_COMPONENT)
         
         # Métriques temps réel (dernières 24h)
+        realtime = None
         query_realtime = """
         SELECT 
             DATE_TRUNC('hour', f.departure_time) as hour_period,
@@ -100,7 +135,8 @@ def load_operational_data(date_filter, aircraft_filter, phase_filter):
         ORDER BY hour_period DESC
         """
         
-        realtime = pd.read_sql_query(query_realtime, engine)
+        if include_realtime:
+            realtime = read_sql('realtime', query_realtime, engine, METRICS_COMPONENT)
         
         # Top vols émetteurs actuels
         query_top_flights = f"""
@@ -119,7 +155,7 @@ def load_operational_data(date_filter, aircraft_filter, phase_filter):
         LIMIT 20
         """
         
-        top_flights = pd.read_sql_query(query_top_flights, engine)
+        top_flights = read_sql('top_flights', query_top_flights, engine, METRICS_COMPONENT)
         
         # Analyse par phase de vol
         query_phases = f"""
@@ -136,7 +172,7 @@ def load_operational_data(date_filter, aircraft_filter, phase_filter):
         ORDER BY phase_co2_kg DESC
         """
         
-        phases = pd.read_sql_query(query_phases, engine)
+        phases = read_sql('phases', query_phases, engine, METRICS_COMPONENT)
         
         return details, realtime, top_flights, phases
         
@@ -144,6 +180,33 @@ def load_operational_data(date_filter, aircraft_filter, phase_filter):
         st.error(f"Erreur chargement données: {e}")
         return None, None, None, None
 
+@metrics.instrument_cache('load_emission_history', METRICS_COMPONENT, st.cache_data(ttl=60))
+def load_emission_history(start_time, end_time, bucket):
+    """Historique vols / CO2 agrégé par heure, jour ou semaine"""
+    if bucket not in ROLLUP_LABELS:
+        raise ValueError(f"Pas d'agrégation inconnu: {bucket}")
+    try:
+        engine = get_engine(DATABASE_URL)
+        
+        start_filter = f"AND f.departure_time >= '{start_time.isoformat()}'" if start_time else ""
+        query_history = f"""
+        SELECT 
+            DATE_TRUNC('{bucket}', f.departure_time) as hour_period,
+            COUNT(DISTINCT f.flight_id) as hourly_flights,
+            ROUND(SUM(CASE WHEN e.pollutant_type = 'CO2' THEN e.emission_quantity_kg ELSE 0 END)::numeric, 2)::float8 as hourly_co2_kg
+        FROM etl.flights_staging f
+        JOIN etl.emissions_staging e ON f.flight_id = e.flight_id
+        WHERE f.departure_time <= '{end_time.isoformat()}' {start_filter}
+        GROUP BY DATE_TRUNC('{bucket}', f.departure_time)
+        ORDER BY hour_period
+        """
+        
+        return read_sql('history', query_history, engine, METRICS_COMPONENT)
+        
+    except Exception as e:
+        st.error(f"Erreur chargement historique: {e}")
+        return None
+
 def create_control_panel():
     """Panel de contrôle avancé dans la sidebar"""
     
@@ -151,7 +214,11 @@ def create_control_panel():
     
     # Auto-refresh
     st.sidebar.markdown("### ⚡ Actualisation")
-    auto_refresh = st.sidebar.checkbox("Auto-refresh (60s)", value=st.session_state.auto_refresh)
+    auto_refresh = st.sidebar.checkbox(
+        "Mode live (notifications ETL)",
+        value=st.session_state.auto_refresh,
+        help="Les nouveaux vols sont poussés par le pipeline ETL, sans recharger la fenêtre complète"
+    )
     st.session_state.auto_refresh = auto_refresh
     
     if st.sidebar.button("🔄 Actualiser maintenant"):
@@ -161,6 +228,13 @@ def create_control_panel():
     
     st.sidebar.caption(f"Dernière MàJ: {st.session_state.last_refresh.strftime('%H:%M:%S')}")
     
+    # Fenêtre du graphique de monitoring (pas d'agrégation adapté à la fenêtre)
+    history_window = st.sidebar.selectbox(
+        "Historique monitoring",
+        list(HISTORY_WINDOWS.keys()),
+        index=0
+    )
+    
     # Filtres temporels
     st.sidebar.markdown("### 📅 Période d'Analyse")
     
@@ -227,10 +301,15 @@ def create_control_panel():
     else:
         co2_threshold = None
     
-    return date_filter, aircraft_filter, phase_filter, show_details, show_alerts, co2_threshold
+    return date_filter, aircraft_filter, phase_filter, show_details, show_alerts, co2_threshold, history_window
 
-def create_realtime_metrics(realtime_data, co2_threshold=None):
-    """Métriques temps réel avec alertes"""
+def create_realtime_metrics(realtime_data, co2_threshold=None, history=None,
+                            bucket='hour', window_label="Dernières 24h"):
+    """Métriques temps réel avec alertes
+    
+    Les cartes portent sur les dernières 24h ; le graphique affiche l'historique
+    de la fenêtre choisie, réduit à la largeur du graphique.
+    """
     
     st.markdown("## ⚡ Monitoring Temps Réel (24h)")
     
@@ -286,20 +365,28 @@ def create_realtime_metrics(realtime_data, co2_threshold=None):
             )
     
     # Graphique temps réel
-    if not realtime_data.empty:
+    chart_data = realtime_data if history is None or history.empty else history
+    if not chart_data.empty:
+        unit = ROLLUP_LABELS[bucket]
+        chart_data = chart_data.sort_values('hour_period')
+        flights_series = downsample(chart_data, 'hour_period', 'hourly_flights')
+        # Min-max sur le CO2 : les pics restent visibles face au seuil d'alerte
+        co2_series = downsample(chart_data, 'hour_period', 'hourly_co2_kg', method='minmax')
+        markers = len(chart_data) <= 100
+        
         fig_realtime = make_subplots(
             rows=2, cols=1,
-            subplot_titles=('Vols par Heure', 'Émissions CO2 par Heure'),
+            subplot_titles=(f'Vols par {unit.capitalize()}', f'Émissions CO2 par {unit.capitalize()}'),
             vertical_spacing=0.1
         )
         
         # Graphique vols
         fig_realtime.add_trace(
             go.Scatter(
-                x=realtime_data['hour_period'],
-                y=realtime_data['hourly_flights'],
-                mode='lines+markers',
-                name='Vols/h',
+                x=flights_series['hour_period'],
+                y=flights_series['hourly_flights'],
+                mode='lines+markers' if markers else 'lines',
+                name=f'Vols/{unit}',
                 line=dict(color='#2E86AB', width=3),
                 marker=dict(size=8)
             ),
@@ -309,10 +396,10 @@ def create_realtime_metrics(realtime_data, co2_threshold=None):
         # Graphique CO2 avec zone d'alerte
         fig_realtime.add_trace(
             go.Scatter(
-                x=realtime_data['hour_period'],
-                y=realtime_data['hourly_co2_kg'],
-                mode='lines+markers',
-                name='CO2 kg/h',
+                x=co2_series['hour_period'],
+                y=co2_series['hourly_co2_kg'],
+                mode='lines+markers' if markers else 'lines',
+                name=f'CO2 kg/{unit}',
                 line=dict(color='#A23B72', width=3),
                 marker=dict(size=8),
                 fill='tonexty'
@@ -331,16 +418,19 @@ def create_realtime_metrics(realtime_data, co2_threshold=None):
             )
         
         fig_realtime.update_layout(
-            title="📊 Évolution Temps Réel - Dernières 24h",
+            title=f"📊 Évolution Temps Réel - {window_label}",
             height=400,
             showlegend=False
         )
         
-        fig_realtime.update_xaxes(title_text="Heure", row=2, col=1)
+        fig_realtime.update_xaxes(title_text=unit.capitalize(), row=2, col=1)
         fig_realtime.update_yaxes(title_text="Vols", row=1, col=1)
         fig_realtime.update_yaxes(title_text="CO2 (kg)", row=2, col=1)
         
         st.plotly_chart(fig_realtime, use_container_width=True)
+        
+        if len(co2_series) < len(chart_data):
+            st.caption(f"📉 {len(chart_data):,} périodes réduites à {len(co2_series):,} points (LTTB / min-max)")
 
 def create_flight_analysis(top_flights, phases_data):
     """Analyse détaillée des vols et phases"""
@@ -497,11 +587,7 @@ def main():
     st.markdown("### 🔧 Aéroport Paris-Val d'Europe - Interface Terrain")
     
     # Panel de contrôle
-    date_filter, aircraft_filter, phase_filter, show_details, show_alerts, co2_threshold = create_control_panel()
-    
-    # Auto-refresh
-    if st.session_state.auto_refresh:
-        st.rerun()
+    date_filter, aircraft_filter, phase_filter, show_details, show_alerts, co2_threshold, history_window = create_control_panel()
     
     # Indicateur de filtres actifs
     active_filters = []
@@ -515,16 +601,41 @@ def main():
     if active_filters:
         st.info("🎯 Filtres actifs: " + " | ".join(active_filters))
     
+    # Mode live : métriques 24h issues du tampon alimenté par les notifications ETL
+    live_feed = get_live_feed() if st.session_state.auto_refresh else None
+    live = live_feed is not None and live_feed.connected
+    
     # Chargement des données
     with st.spinner("⚡ Chargement données opérationnelles..."):
-        details, realtime, top_flights, phases = load_operational_data(date_filter, aircraft_filter, phase_filter)
+        details, realtime, top_flights, phases = load_operational_data(
+            date_filter, aircraft_filter, phase_filter, include_realtime=not live)
     
     if details is None:
         st.error("❌ Impossible de charger les données opérationnelles")
         st.stop()
     
-    # Métriques temps réel
-    create_realtime_metrics(realtime, co2_threshold)
+    if live_feed is not None:
+        # Version lue avant les métriques : une mise à jour intermédiaire relancera le script
+        st.session_state.live_version = live_feed.version
+        if live:
+            realtime = live_feed.hourly_metrics()
+            st.caption(
+                f"📡 Live : {live_feed.notifications} notifications reçues"
+                + (f", dernière à {live_feed.last_event.strftime('%H:%M:%S')}" if live_feed.last_event else "")
+            )
+        else:
+            st.warning("📡 Flux live indisponible - données du dernier chargement")
+    
+    # Métriques temps réel et historique à la résolution adaptée à la fenêtre
+    # Bornes arrondies à l'heure : la clé de cache reste stable d'un rafraîchissement à l'autre
+    history_end = dt.datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    history_days = HISTORY_WINDOWS[history_window]
+    history_start = history_end - timedelta(days=history_days) if history_days else None
+    bucket = choose_rollup(history_start or dt.datetime(2000, 1, 1), history_end)
+    history = None
+    if history_days != 1:
+        history = load_emission_history(history_start, history_end, bucket)
+    create_realtime_metrics(realtime, co2_threshold, history, bucket, history_window)
     
     st.markdown("---")
     
@@ -562,6 +673,19 @@ def main():
     </small>
     </div>
     """, unsafe_allow_html=True)
+    
+    # Mode live : attendre une nouvelle version du tampon par pas courts plutôt que relancer à
+    # intervalle fixe ; chaque mise à jour de l'indicateur rend la main à Streamlit, qui
+    # interrompt l'attente dès qu'un widget change (filtres, arrêt du mode live)
+    if live_feed is not None:
+        status = st.empty()
+        version = st.session_state.live_version
+        deadline = time.monotonic() + LIVE_WAIT_SECONDS
+        while live_feed.version == version and time.monotonic() < deadline:
+            live_feed.wait_for_update(version, timeout=LIVE_POLL_SECONDS)
+            status.caption(f"📡 En attente de nouveaux vols ({dt.datetime.now():%H:%M:%S})")
+        st.session_state.last_refresh = dt.datetime.now()
+        st.rerun()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Accès base de données commun aux dashboards
+Moteur SQLAlchemy unique par processus (pool partagé entre sessions) et
+lectures instrumentées : latence par requête et occupation du pool
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+from lazy_modules import lazy_callable
+
+# Racine du projet pour les modules partagés (src/)
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.monitoring import metrics  # noqa: E402
+
+create_engine = lazy_callable("sqlalchemy", "create_engine")
+
+
+@st.cache_resource
+def get_engine(database_url):
+    """Moteur partagé : évite d'ouvrir un nouveau pool à chaque chargement"""
+    return create_engine(database_url, pool_size=5, max_overflow=5, pool_pre_ping=True)
+
+
+def read_sql(name, query, engine, component):
+    """pd.read_sql_query mesurée (histogramme par nom de requête)"""
+    with metrics.timed_query(name, component):
+        result = pd.read_sql_query(query, engine)
+    metrics.observe_pool(engine.pool, component)
+    return result
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Chargement paresseux des bibliothèques lourdes des dashboards
+Streamlit ré-exécute le script à chaque interaction : les modules géo et
+graphiques ne sont importés qu'au premier usage par le composant qui les affiche
+"""
+
+import importlib
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Module importé au premier accès à l'un de ses attributs"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_module'] = None
+
+    def _load(self) -> types.ModuleType:
+        """Importer réellement le module (une seule fois par processus)"""
+        module = self.__dict__['_module']
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attribute: str):
+        return getattr(self._load(), attribute)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "chargé" if self.__dict__['_module'] is not None else "non chargé"
+        return f"<module paresseux '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Retourner un module paresseux (import différé jusqu'au premier usage)"""
+    return LazyModule(name)
+
+
+def lazy_callable(module_name: str, attribute: str):
+    """Retourner une fonction dont le module n'est importé qu'au premier appel"""
+    module = LazyModule(module_name)
+
+    def wrapper(*args, **kwargs):
+        return getattr(module, attribute)(*args, **kwargs)
+
+    wrapper.__name__ = attribute
+    wrapper.__qualname__ = attribute
+    wrapper.__doc__ = f"Appel différé de {module_name}.{attribute}"
+    return wrapper
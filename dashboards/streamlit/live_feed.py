@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Flux temps réel du dashboard opérationnel
+Un thread d'écoute (LISTEN sur le canal notifié par le pipeline ETL) ajoute
+ou met à jour uniquement les vols dont des émissions ont été insérées, dans un
+tampon borné partagé par toutes les sessions ; les métriques sont recalculées
+depuis ce tampon
+"""
+
+import json
+import logging
+import select
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Canal PostgreSQL utilisé par scripts/etl_pipeline.py (pg_notify)
+NOTIFY_CHANNEL = 'etl_changes'
+
+# Capacité du tampon (vols) et fenêtre chargée au démarrage
+DEFAULT_CAPACITY = 50000
+DEFAULT_WINDOW = timedelta(hours=24)
+
+# Vols dont des émissions ont été insérées depuis le filigrane (inclus), totaux
+# recalculés sur toutes leurs émissions : une ligne tardive remplace le vol du tampon
+QUERY_NEW_FLIGHTS = """
+WITH modifies AS (
+    SELECT DISTINCT flight_id FROM etl.emissions_staging WHERE created_at >= %(watermark)s
+)
+SELECT
+    f.flight_id,
+    f.aircraft_type,
+    f.departure_time,
+    MAX(e.created_at) AS loaded_at,
+    SUM(CASE WHEN e.pollutant_type = 'CO2' THEN e.emission_quantity_kg ELSE 0 END)::float8 AS co2_kg,
+    SUM(CASE WHEN e.pollutant_type = 'NOx' THEN e.emission_quantity_kg ELSE 0 END)::float8 AS nox_kg,
+    COUNT(*) FILTER (WHERE e.pollutant_type = 'CO2') AS co2_rows
+FROM modifies m
+JOIN etl.flights_staging f ON f.flight_id = m.flight_id
+JOIN etl.emissions_staging e ON e.flight_id = f.flight_id
+GROUP BY f.flight_id, f.aircraft_type, f.departure_time
+ORDER BY loaded_at
+"""
+
+# Chargement initial : vols de la fenêtre récente
+QUERY_WINDOW = """
+SELECT
+    f.flight_id,
+    f.aircraft_type,
+    f.departure_time,
+    MAX(e.created_at) AS loaded_at,
+    SUM(CASE WHEN e.pollutant_type = 'CO2' THEN e.emission_quantity_kg ELSE 0 END)::float8 AS co2_kg,
+    SUM(CASE WHEN e.pollutant_type = 'NOx' THEN e.emission_quantity_kg ELSE 0 END)::float8 AS nox_kg,
+    COUNT(*) FILTER (WHERE e.pollutant_type = 'CO2') AS co2_rows
+FROM etl.flights_staging f
+JOIN etl.emissions_staging e ON f.flight_id = e.flight_id
+WHERE f.departure_time >= %(since)s
+GROUP BY f.flight_id, f.aircraft_type, f.departure_time
+ORDER BY loaded_at
+"""
+
+COLUMNS = ['flight_id', 'aircraft_type', 'departure_time', 'loaded_at', 'co2_kg', 'nox_kg', 'co2_rows']
+
+
+class LiveFeed:
+    """Tampon borné de vols (les plus anciennement modifiés évincés) alimenté par les notifications de l'ETL"""
+
+    def __init__(self, db_config, capacity=DEFAULT_CAPACITY, window=DEFAULT_WINDOW,
+                 channel=NOTIFY_CHANNEL, poll_timeout=5.0):
+        self.db_config = db_config
+        self.window = window
+        self.channel = channel
+        self.poll_timeout = poll_timeout
+
+        self.capacity = capacity
+        self._buffer = OrderedDict()
+        self._watermark = None
+        self._version = 0
+        self._changed = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.connected = False
+        self.last_event = None
+        self.notifications = 0
+
+    # ------------------------------------------------------------------
+    # Cycle de vie
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Démarrer le thread d'écoute (idempotent)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='live-feed', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._changed:
+            self._changed.notify_all()
+
+    def _run(self):
+        """Boucle d'écoute avec reconnexion progressive"""
+        import psycopg2
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+        backoff = 1.0
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(**self.db_config)
+                conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {self.channel};")
+                self.connected = True
+                backoff = 1.0
+                logger.info(f"📡 Écoute du canal {self.channel}")
+
+                # Rattrapage : fenêtre initiale, puis tout ce qui a été inséré pendant une coupure
+                if self._watermark is None:
+                    self._load_window(conn)
+                else:
+                    self._fetch_new(conn)
+
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], self.poll_timeout) == ([], [], []):
+                        continue
+                    conn.poll()
+                    events = []
+                    while conn.notifies:
+                        events.append(conn.notifies.pop(0))
+                    if events:
+                        self._handle(conn, events)
+
+            except Exception as e:
+                self.connected = False
+                logger.warning(f"⚠️ Flux temps réel interrompu ({e}), reconnexion dans {backoff:.0f}s")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 60.0)
+            finally:
+                if conn is not None:
+                    conn.close()
+        self.connected = False
+
+    # ------------------------------------------------------------------
+    # Alimentation du tampon
+    # ------------------------------------------------------------------
+
+    def _handle(self, conn, events):
+        """Traiter un lot de notifications (une seule requête incrémentale)"""
+        self.notifications += len(events)
+        payloads = []
+        for event in events:
+            try:
+                payloads.append(json.loads(event.payload or '{}'))
+            except ValueError:
+                payloads.append({})
+        self.last_event = datetime.now()
+
+        if any(p.get('action') == 'reset' for p in payloads):
+            self._reset()
+            self._load_window(conn)
+        elif any(p.get('table') == 'emissions_staging' for p in payloads):
+            # Un vol n'entre dans le tampon qu'avec ses émissions
+            self._fetch_new(conn)
+
+    def _reset(self):
+        with self._changed:
+            self._buffer.clear()
+            self._watermark = None
+
+    def _load_window(self, conn):
+        since = datetime.now() - self.window
+        self._append(self._query(conn, QUERY_WINDOW, {'since': since}))
+        if self._watermark is None:
+            # Tampon vide : on rattrapera ce qui arrive à partir de l'heure du serveur
+            self._watermark = self._query(conn, "SELECT LOCALTIMESTAMP", {})[0][0]
+
+    def _fetch_new(self, conn):
+        self._append(self._query(conn, QUERY_NEW_FLIGHTS, {'watermark': self._watermark}))
+
+    @staticmethod
+    def _query(conn, sql, params):
+        with conn.cursor() as cur:
+            cur.execute(sql, params)
+            return cur.fetchall()
+
+    def _append(self, rows):
+        """Ajouter les nouveaux vols, remplacer ceux déjà présents et avancer le filigrane"""
+        with self._changed:
+            added = updated = 0
+            for row in rows:
+                flight_id = row[0]
+                previous = self._buffer.pop(flight_id, None)
+                # Filigrane inclus : un vol relu sans nouvelle émission ne compte pas comme modifié
+                if previous is None:
+                    added += 1
+                elif tuple(previous) != tuple(row):
+                    updated += 1
+                self._buffer[flight_id] = row
+                while len(self._buffer) > self.capacity:
+                    self._buffer.popitem(last=False)
+                if self._watermark is None or row[3] > self._watermark:
+                    self._watermark = row[3]
+            if added or updated:
+                self._version += 1
+                self._changed.notify_all()
+        if added or updated:
+            logger.info(f"📥 Flux temps réel : {added} nouveaux vols, {updated} vols complétés")
+
+    # ------------------------------------------------------------------
+    # Lecture (sessions Streamlit)
+    # ------------------------------------------------------------------
+
+    @property
+    def version(self):
+        return self._version
+
+    def wait_for_update(self, version, timeout):
+        """Bloquer jusqu'à une nouvelle version du tampon (ou expiration)"""
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while self._version == version and not self._stop.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+            return self._version
+
+    def snapshot(self):
+        """Copie du tampon sous forme de DataFrame"""
+        with self._changed:
+            rows = list(self._buffer.values())
+        return pd.DataFrame(rows, columns=COLUMNS)
+
+    def hourly_metrics(self, window=None):
+        """Agrégats horaires au format de la requête temps réel du dashboard
+
+        avg_co2_per_flight suit la définition SQL (src/api/queries.py) :
+        moyenne des lignes d'émission CO2 (une par phase), pas CO2 par vol.
+        """
+        flights = self.snapshot()
+        since = datetime.now() - (window or self.window)
+        flights = flights[pd.to_datetime(flights['departure_time']) >= since]
+        if flights.empty:
+            return pd.DataFrame(columns=['hour_period', 'hourly_flights', 'hourly_co2_kg', 'avg_co2_per_flight'])
+
+        hourly = (
+            flights.assign(hour_period=pd.to_datetime(flights['departure_time']).dt.floor('h'))
+            .groupby('hour_period')
+            .agg(hourly_flights=('flight_id', 'nunique'), hourly_co2_kg=('co2_kg', 'sum'),
+                 co2_rows=('co2_rows', 'sum'))
+        )
+        hourly['avg_co2_per_flight'] = hourly['hourly_co2_kg'] / hourly['co2_rows'].where(hourly['co2_rows'] > 0)
+        hourly = hourly.drop(columns='co2_rows')
+        return hourly.round(2).reset_index().sort_values('hour_period', ascending=False)
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Couches cartographiques vectorisées pour folium
+Une seule couche GeoJSON par jeu de données au lieu d'un objet JS par ligne,
+style piloté par les données et agrégation spatiale au-delà d'un volume cible.
+Les champs sur grille (bruit, concentrations) sont affichés via les tuiles
+pré-rendues par scripts/build_tiles.py
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from lazy_modules import lazy_import
+
+folium = lazy_import("folium")
+folium_plugins = lazy_import("folium.plugins")
+
+# Pyramides de tuiles générées par scripts/build_tiles.py et serveur qui les expose
+TILES_DIR = Path(os.getenv('TILES_DIR', Path(__file__).resolve().parents[2] / 'data' / 'tiles'))
+TILES_BASE_URL = os.getenv('TILES_BASE_URL', 'http://localhost:8600')
+
+# Nombre maximal d'entités envoyées au navigateur par couche
+MAX_FEATURES = 5000
+
+# Palette séquentielle (faible → fort) pour les classes d'émission
+EMISSION_COLORS = ['#fee391', '#fec44f', '#fe9929', '#d95f0e', '#993404']
+
+# Couleurs des stations selon le niveau de qualité
+QUALITY_COLORS = {'Bon': 'green', 'Modéré': 'orange', 'Élevé': 'red'}
+
+# Rendu client des points regroupés (FastMarkerCluster) : [lat, lon, couleur, popup]
+CLUSTER_CALLBACK = """
+function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+        radius: 7, color: row[2], fillColor: row[2], fillOpacity: 0.8, weight: 1
+    });
+    marker.bindPopup(row[3]);
+    return marker;
+};
+"""
+
+
+def aggregate_points(df, value_col, lat_col='latitude', lon_col='longitude',
+                     max_features=MAX_FEATURES, text_cols=(), value_agg='sum', extra_cols=None):
+    """Agréger les points sur une grille régulière lorsqu'ils dépassent max_features
+
+    Les valeurs sont sommées (ou réduites par value_agg) par cellule, les positions
+    moyennées, les colonnes texte résumées par leurs valeurs uniques et les
+    colonnes de extra_cols réduites par l'agrégation indiquée. La colonne
+    nb_points conserve le nombre de points d'origine représentés par chaque entité.
+    """
+    if len(df) <= max_features:
+        return df.assign(nb_points=1)
+
+    lat = df[lat_col].to_numpy(dtype=float)
+    lon = df[lon_col].to_numpy(dtype=float)
+
+    # (n + 1)² cellules au plus : la grille tient toujours dans max_features
+    n_cells = max(int(np.sqrt(max_features)) - 1, 1)
+    span = max(np.ptp(lat), np.ptp(lon)) or 1e-9
+    cell = span / n_cells
+
+    keys = (
+        np.floor((lat - lat.min()) / cell).astype(np.int64) * (n_cells + 1)
+        + np.floor((lon - lon.min()) / cell).astype(np.int64)
+    )
+
+    aggregations = {
+        lat_col: (lat_col, 'mean'),
+        lon_col: (lon_col, 'mean'),
+        value_col: (value_col, value_agg),
+        'nb_points': (value_col, 'size'),
+    }
+    for col, how in (extra_cols or {}).items():
+        aggregations[col] = (col, how)
+    for col in text_cols:
+        aggregations[col] = (col, lambda values: ', '.join(sorted(set(map(str, values)))))
+
+    return df.groupby(keys).agg(**aggregations).reset_index(drop=True)
+
+
+def classify(values, n_classes=len(EMISSION_COLORS)):
+    """Répartir des valeurs en classes de quantiles (0 = faible)"""
+    values = np.asarray(values, dtype=float)
+    if values.size == 0:
+        return np.zeros(0, dtype=int)
+    edges = np.unique(np.quantile(values, np.linspace(0, 1, n_classes + 1)[1:-1]))
+    return np.digitize(values, edges)
+
+
+def points_to_geojson(df, properties, lat_col='latitude', lon_col='longitude', decimals=2):
+    """Construire une FeatureCollection de points à partir de colonnes d'un DataFrame"""
+    coordinates = np.column_stack([
+        df[lon_col].to_numpy(dtype=float), df[lat_col].to_numpy(dtype=float)
+    ]).round(6).tolist()
+
+    props = df[list(properties)]
+    numeric = props.select_dtypes('number').columns
+    props = props.assign(**{col: props[col].round(decimals) for col in numeric})
+    records = props.astype(object).where(props.notna(), None).to_dict('records')
+
+    return {
+        'type': 'FeatureCollection',
+        'features': [
+            {
+                'type': 'Feature',
+                'id': i,
+                'geometry': {'type': 'Point', 'coordinates': coords},
+                'properties': record,
+            }
+            for i, (coords, record) in enumerate(zip(coordinates, records))
+        ],
+    }
+
+
+def _feature_style(feature):
+    """Style d'une entité : lu depuis ses propriétés précalculées"""
+    props = feature['properties']
+    return {
+        'radius': props['rayon'],
+        'color': props['couleur'],
+        'fillColor': props['couleur'],
+        'fillOpacity': 0.6,
+        'weight': 1,
+    }
+
+
+def emissions_layer(emissions_zone, max_features=MAX_FEATURES):
+    """Couche GeoJSON unique des zones d'émission, rayon et couleur par classe"""
+    points = aggregate_points(
+        emissions_zone, 'total_emission_kg',
+        max_features=max_features, text_cols=('type_polluant',)
+    )
+    classes = classify(points['total_emission_kg'])
+    points = points.assign(
+        couleur=np.take(EMISSION_COLORS, classes),
+        rayon=5 + 3 * classes,
+    )
+
+    data = points_to_geojson(
+        points, ['type_polluant', 'total_emission_kg', 'nb_points', 'couleur', 'rayon']
+    )
+
+    return folium.GeoJson(
+        data,
+        name="Zones d'émission",
+        marker=folium.CircleMarker(),
+        style_function=_feature_style,
+        popup=folium.GeoJsonPopup(
+            fields=['type_polluant', 'total_emission_kg', 'nb_points'],
+            aliases=['Polluants', 'Total (kg)', 'Points agrégés'],
+        ),
+    )
+
+
+def stations_layer(stations, cluster=False, max_features=MAX_FEATURES):
+    """Couche des stations de mesure, couleur selon le niveau de qualité
+
+    En mode regroupé, toutes les stations sont transmises comme un simple
+    tableau et dessinées côté navigateur par FastMarkerCluster. Sinon, au-delà
+    de max_features, les stations proches sont agrégées : mesure moyenne et
+    niveau de qualité le plus défavorable de la cellule.
+    """
+    quality = stations.get('niveau_qualite', pd.Series('Bon', index=stations.index))
+    colors = quality.map(QUALITY_COLORS).fillna('gray')
+
+    if cluster:
+        popups = (
+            '<b>' + stations['nom_station'].astype(str) + '</b><br>'
+            + 'Zone: ' + stations['zone_surveillance'].astype(str) + '<br>'
+            + 'Qualité: ' + quality.astype(str)
+        )
+        rows = pd.DataFrame({
+            'lat': stations['latitude'].round(6),
+            'lon': stations['longitude'].round(6),
+            'couleur': colors,
+            'popup': popups,
+        }).values.tolist()
+        return folium_plugins.FastMarkerCluster(
+            rows, callback=CLUSTER_CALLBACK, name='Stations de mesure'
+        )
+
+    levels = list(QUALITY_COLORS)
+    stations = stations.assign(
+        rang_qualite=quality.map({level: rank for rank, level in enumerate(levels)}).fillna(-1),
+        polluant=stations.get('polluant', 'N/A'),
+        valeur_mesure=stations.get('valeur_mesure', np.nan),
+        unite_mesure=stations.get('unite_mesure', ''),
+    )
+    stations = aggregate_points(
+        stations, 'valeur_mesure', max_features=max_features, value_agg='mean',
+        text_cols=('zone_surveillance', 'polluant', 'unite_mesure'),
+        extra_cols={'nom_station': 'first', 'rang_qualite': 'max'},
+    )
+    grouped = stations['nb_points'] > 1
+    stations.loc[grouped, 'nom_station'] = (
+        stations.loc[grouped, 'nom_station'].astype(str)
+        + ' (+' + (stations.loc[grouped, 'nb_points'] - 1).astype(str) + ')'
+    )
+    quality = stations['rang_qualite'].astype(int).map(dict(enumerate(levels))).fillna('N/A')
+    colors = quality.map(QUALITY_COLORS).fillna('gray')
+
+    points = stations.assign(couleur=colors, rayon=8, niveau_qualite=quality)
+    fields = ['nom_station', 'zone_surveillance', 'niveau_qualite',
+              'polluant', 'valeur_mesure', 'unite_mesure', 'nb_points']
+    data = points_to_geojson(points, fields + ['couleur', 'rayon'])
+
+    return folium.GeoJson(
+        data,
+        name='Stations de mesure',
+        marker=folium.CircleMarker(),
+        style_function=_feature_style,
+        tooltip=folium.GeoJsonTooltip(fields=['nom_station'], aliases=['Station']),
+        popup=folium.GeoJsonPopup(
+            fields=fields,
+            aliases=['Station', 'Zone', 'Qualité', 'Polluant', 'Valeur', 'Unité', 'Stations agrégées'],
+        ),
+    )
+
+
+def available_tile_layers(tiles_dir=TILES_DIR):
+    """Lister les pyramides de tuiles disponibles (métadonnées, plus récentes d'abord)"""
+    layers = []
+    for metadata_file in Path(tiles_dir).glob('*/*/*/metadata.json'):
+        try:
+            layers.append(json.loads(metadata_file.read_text(encoding='utf-8')))
+        except (OSError, ValueError):
+            continue
+    return sorted(layers, key=lambda meta: (meta['date'], meta['scenario'], meta['field']), reverse=True)
+
+
+def tile_layer_label(metadata):
+    """Libellé court d'une pyramide pour les sélecteurs"""
+    return f"{metadata['field'].upper()} · {metadata['scenario']} · {metadata['date']}"
+
+
+def raster_tile_layer(metadata, base_url=TILES_BASE_URL, opacity=0.8):
+    """Couche de tuiles raster pré-rendues pour un champ (scénario, date)"""
+    url = f"{base_url.rstrip('/')}/{metadata['scenario']}/{metadata['date']}/{metadata['field']}/{{z}}/{{x}}/{{y}}.png"
+    west, south, east, north = metadata['bounds_wgs84']
+    return folium.TileLayer(
+        tiles=url,
+        attr='Modélisation Airport Air Quality',
+        name=tile_layer_label(metadata),
+        overlay=True,
+        control=True,
+        opacity=opacity,
+        min_zoom=0,
+        max_native_zoom=metadata['max_zoom'],
+        max_zoom=metadata['max_zoom'] + 3,
+        bounds=[[south, west], [north, east]],
+    )
+
+
+def raster_legend_html(metadata):
+    """Légende HTML des classes de couleur d'une pyramide"""
+    unit = 'dB(A)' if metadata.get('decibel') else 'µg/m³'
+    colormap = metadata['colormap']
+    rows = []
+    for i, (level, color) in enumerate(colormap):
+        upper = f"{colormap[i + 1][0]}" if i + 1 < len(colormap) else ''
+        label = f"{level}–{upper} {unit}" if upper else f"≥ {level} {unit}"
+        rows.append(f'<span style="background:{color};padding:0 10px;margin-right:6px"></span>{label}')
+    return '<br>'.join(rows)
@@ -0,0 +1,79 @@
+-- =====================================================
+-- Migration V004: Zones d'exposition calculées (isophones)
+-- Description: zone_exposition_bruit accueille les courbes Lden / Lnight
+--              extraites des grilles de bruit (src/noise/contours.py)
+-- Auteur: Portfolio Project - Module Acoustique
+-- Date: 2025-08-15
+-- =====================================================
+
+-- =====================================================
+-- 1. ORIGINE ET INDICATEUR DES ZONES
+-- =====================================================
+
+ALTER TABLE acoustique.zone_exposition_bruit
+    ADD COLUMN source_zone VARCHAR(20) NOT NULL DEFAULT 'arrete', -- arrete (PEB) ou calcul (grille)
+    ADD COLUMN scenario VARCHAR(50),
+    ADD COLUMN date_calcul DATE,
+    ADD COLUMN indicateur VARCHAR(10) NOT NULL DEFAULT 'Lden',
+    ADD COLUMN seuil_db NUMERIC(4,1),
+    ADD COLUMN seuil_max_db NUMERIC(4,1); -- Borne haute en mode bandes, NULL sinon
+
+-- Les zones calculées n'ont pas de lettre PEB ; une zone Lnight n'a pas de seuil Lden
+ALTER TABLE acoustique.zone_exposition_bruit
+    ALTER COLUMN zone_peb DROP NOT NULL,
+    ALTER COLUMN niveau_exposition_lden_db DROP NOT NULL;
+
+UPDATE acoustique.zone_exposition_bruit
+SET seuil_db = niveau_exposition_lden_db
+WHERE seuil_db IS NULL;
+
+ALTER TABLE acoustique.zone_exposition_bruit
+    ADD CONSTRAINT chk_source_zone CHECK (source_zone IN ('arrete', 'calcul')),
+    ADD CONSTRAINT chk_indicateur_zone CHECK (indicateur IN ('Lden', 'Lnight')),
+    ADD CONSTRAINT chk_seuil_realiste CHECK (seuil_db BETWEEN 40 AND 80),
+    ADD CONSTRAINT chk_zone_arretee_complete CHECK (
+        source_zone = 'calcul' OR (zone_peb IS NOT NULL AND niveau_exposition_lden_db IS NOT NULL)
+    ),
+    ADD CONSTRAINT chk_zone_calculee_complete CHECK (
+        source_zone = 'arrete' OR (scenario IS NOT NULL AND seuil_db IS NOT NULL)
+    );
+
+-- =====================================================
+-- 2. GÉOMÉTRIES MULTIPARTIES (isophones fragmentées, trous)
+-- =====================================================
+
+ALTER TABLE acoustique.zone_exposition_bruit
+    ALTER COLUMN geometrie_zone TYPE GEOMETRY(MULTIPOLYGON, 4326)
+    USING ST_Multi(geometrie_zone);
+
+-- =====================================================
+-- 3. UNICITÉ : une zone PEB par lettre, une isophone par scénario / seuil
+-- =====================================================
+
+ALTER TABLE acoustique.zone_exposition_bruit
+    DROP CONSTRAINT IF EXISTS zone_exposition_bruit_id_aeroport_zone_peb_key;
+
+CREATE UNIQUE INDEX uq_zone_peb_arretee
+    ON acoustique.zone_exposition_bruit(id_aeroport, zone_peb)
+    WHERE source_zone = 'arrete';
+
+CREATE UNIQUE INDEX uq_zone_calculee
+    ON acoustique.zone_exposition_bruit(id_aeroport, scenario, date_calcul, indicateur, seuil_db)
+    NULLS NOT DISTINCT
+    WHERE source_zone = 'calcul';
+
+CREATE INDEX idx_zone_source_scenario
+    ON acoustique.zone_exposition_bruit(source_zone, scenario, indicateur);
+
+COMMENT ON COLUMN acoustique.zone_exposition_bruit.source_zone IS 'arrete : PEB réglementaire ; calcul : isophone extraite d''une grille';
+COMMENT ON COLUMN acoustique.zone_exposition_bruit.seuil_db IS 'Seuil de l''isophone (dB) pour l''indicateur de la zone';
+COMMENT ON COLUMN acoustique.zone_exposition_bruit.seuil_max_db IS 'Borne haute de la bande (dB), NULL pour une zone cumulée >= seuil';
+
+-- =====================================================
+-- FIN MIGRATION V004
+-- =====================================================
+
+DO $$
+BEGIN
+    RAISE NOTICE 'Migration V004 appliquée avec succès - Zones d''exposition calculées';
+END $$;
@@ -0,0 +1,249 @@
+-- =====================================================
+-- Migration V005: Empreinte acoustique ensembliste sur grille
+-- Description: calcul de tous les couples vol × phase × récepteur en une
+--              requête (float8, géométries transformées une seule fois) au
+--              lieu d'un appel de calculer_empreinte_vol par point
+-- Auteur: Portfolio Project - Module Acoustique
+-- Date: 2025-08-15
+-- =====================================================
+
+-- Formules identiques au moteur Python (src/noise/engine.py) :
+--   niveau = Lsource - 20·log10(d / 1000) - coef(f)·(1 + (T-15)·0,01)·(1 + |HR-70|·0,002)·d / 1000
+--   d      = distance oblique en Lambert-93 (altitude de phase - hauteur du récepteur), >= 10 m
+--   SEL    = 10·log10(Σ 10^(niveau/10)·durée) sur les phases du vol
+-- calculer_empreinte_vol (V003) mesure en Web Mercator sans altitude et
+-- soustrait le niveau atténué du niveau source : ses résultats diffèrent.
+
+-- =====================================================
+-- 1. GRILLE DE RÉCEPTEURS
+-- =====================================================
+
+-- Nœuds d'une emprise au pas donné, dans le même ordre que GridSpec.points()
+-- (ligne par ligne depuis le coin sud-ouest, id_point à partir de 0)
+CREATE OR REPLACE FUNCTION acoustique.grille_recepteurs(
+    p_emprise GEOMETRY,
+    p_pas_m DOUBLE PRECISION,
+    p_srid INTEGER DEFAULT 2154
+) RETURNS TABLE (
+    id_point INTEGER,
+    point_calcul GEOMETRY
+) AS $$
+    WITH bornes AS (
+        SELECT ST_XMin(e) AS xmin, ST_YMin(e) AS ymin,
+               floor((ST_XMax(e) - ST_XMin(e)) / p_pas_m + 1e-9)::INTEGER + 1 AS nx,
+               floor((ST_YMax(e) - ST_YMin(e)) / p_pas_m + 1e-9)::INTEGER + 1 AS ny
+        FROM ST_Transform(p_emprise, p_srid) AS e
+    )
+    SELECT iy * b.nx + ix,
+           ST_SetSRID(ST_MakePoint(b.xmin + ix * p_pas_m, b.ymin + iy * p_pas_m), p_srid)
+    FROM bornes b,
+         generate_series(0, b.ny - 1) AS iy,
+         generate_series(0, b.nx - 1) AS ix
+    ORDER BY iy, ix;
+$$ LANGUAGE sql STABLE;
+
+-- =====================================================
+-- 2. CALCUL ENSEMBLISTE
+-- =====================================================
+
+-- LAmax, SEL et distance minimale de chaque vol en chaque récepteur.
+-- Les vols sans profil acoustique actif ou sans position sont ignorés.
+-- p_distance_max_m : couples phase × récepteur au-delà ignorés (NULL = tous)
+CREATE OR REPLACE FUNCTION acoustique.calculer_empreinte_grille(
+    p_ids_vol UUID[],
+    p_recepteurs GEOMETRY[],
+    p_conditions_meteo JSONB DEFAULT '{"temperature": 15, "humidite": 70, "vent": 0}'::JSONB,
+    p_hauteur_recepteur_m DOUBLE PRECISION DEFAULT 4.0,
+    p_distance_max_m DOUBLE PRECISION DEFAULT NULL
+) RETURNS TABLE (
+    id_vol UUID,
+    id_point INTEGER,
+    id_phase_vol UUID,
+    point_calcul GEOMETRY,
+    distance_source_m DOUBLE PRECISION,
+    niveau_bruit_dba DOUBLE PRECISION,
+    sel_db DOUBLE PRECISION
+) AS $$
+    WITH meteo AS (
+        SELECT COALESCE((p_conditions_meteo->>'temperature')::DOUBLE PRECISION, 15.0) AS temperature,
+               COALESCE((p_conditions_meteo->>'humidite')::DOUBLE PRECISION, 70.0) AS humidite
+    ),
+    -- Récepteurs transformés une seule fois, coordonnées en float8
+    recepteurs AS (
+        SELECT (r.rang - 1)::INTEGER AS id_point, r.geom AS point_calcul,
+               ST_X(l93) AS rx, ST_Y(l93) AS ry
+        FROM unnest(p_recepteurs) WITH ORDINALITY AS r(geom, rang),
+             ST_Transform(r.geom, 2154) AS l93
+    ),
+    -- Profil actif le plus récent par type, absorption en dB/m
+    profils AS (
+        SELECT DISTINCT ON (p.id_type_aeronef)
+               p.id_type_aeronef,
+               p.bruit_taxi_dba::DOUBLE PRECISION AS taxi,
+               p.bruit_decollage_dba::DOUBLE PRECISION AS decollage,
+               p.bruit_montee_dba::DOUBLE PRECISION AS montee,
+               p.bruit_approche_dba::DOUBLE PRECISION AS approche,
+               p.bruit_atterrissage_dba::DOUBLE PRECISION AS atterrissage,
+               CASE
+                   WHEN p.frequence_dominante_hz <= 250 THEN 0.1
+                   WHEN p.frequence_dominante_hz <= 500 THEN 0.2
+                   WHEN p.frequence_dominante_hz <= 1000 THEN 0.5
+                   WHEN p.frequence_dominante_hz <= 2000 THEN 1.0
+                   WHEN p.frequence_dominante_hz <= 4000 THEN 2.0
+                   ELSE 4.0
+               END::DOUBLE PRECISION
+                   * (1 + (m.temperature - 15) * 0.01) * (1 + abs(m.humidite - 70) * 0.002) / 1000
+                   AS absorption_db_m
+        FROM acoustique.profil_acoustique_aeronef p, meteo m
+        WHERE p.statut_actif
+        ORDER BY p.id_type_aeronef, p.date_modification DESC
+    ),
+    -- Une source fixe par phase : position transformée, niveau source résolu
+    sources AS (
+        SELECT v.id_vol, pv.id_phase, ST_X(s) AS sx, ST_Y(s) AS sy,
+               COALESCE(pv.altitude_m, 0) - p_hauteur_recepteur_m AS dz,
+               COALESCE(pv.duree_minutes, 0) * 60.0::DOUBLE PRECISION AS duree_s,
+               CASE
+                   WHEN pv.type_phase IN ('Take-off', 'Décollage') THEN pr.decollage
+                   WHEN pv.type_phase IN ('Climb-out', 'Montée') THEN pr.montee
+                   WHEN pv.type_phase IN ('Approach', 'Approche') THEN pr.approche
+                   WHEN pv.type_phase IN ('Landing', 'Atterrissage') THEN pr.atterrissage
+                   ELSE pr.taxi
+               END AS niveau_source,
+               pr.absorption_db_m
+        FROM airport.vol v
+        JOIN profils pr ON pr.id_type_aeronef = v.id_type_aeronef
+        JOIN airport.phase_vol pv ON pv.id_vol = v.id_vol
+        LEFT JOIN airport.aeroport a
+               ON a.id_aeroport = COALESCE(v.id_aeroport_origine, v.id_aeroport_destination),
+             ST_Transform(COALESCE(pv.position_gps, a.coordonnees_gps), 2154) AS s
+        WHERE v.id_vol = ANY(p_ids_vol)
+          AND COALESCE(pv.position_gps, a.coordonnees_gps) IS NOT NULL
+    ),
+    couples AS (
+        SELECT s.id_vol, s.id_phase, r.id_point, s.duree_s, d.distance,
+               s.niveau_source - 20 * log(d.distance / 1000.0) - s.absorption_db_m * d.distance AS niveau
+        FROM sources s
+        CROSS JOIN recepteurs r
+        CROSS JOIN LATERAL (
+            SELECT GREATEST(sqrt((s.sx - r.rx) * (s.sx - r.rx) + (s.sy - r.ry) * (s.sy - r.ry)
+                                 + s.dz * s.dz), 10.0) AS distance
+        ) d
+        WHERE p_distance_max_m IS NULL OR d.distance <= p_distance_max_m
+    ),
+    agregats AS (
+        SELECT c.id_vol, c.id_point,
+               (array_agg(c.id_phase ORDER BY c.niveau DESC))[1] AS id_phase_vol,
+               min(c.distance) AS distance_source_m,
+               max(c.niveau) AS niveau_bruit_dba,
+               10 * log(NULLIF(sum(power(10.0, c.niveau / 10) * c.duree_s), 0)) AS sel_db
+        FROM couples c
+        GROUP BY c.id_vol, c.id_point
+    )
+    SELECT a.id_vol, a.id_point, a.id_phase_vol, r.point_calcul,
+           a.distance_source_m, a.niveau_bruit_dba, a.sel_db
+    FROM agregats a
+    JOIN recepteurs r USING (id_point);
+$$ LANGUAGE sql STABLE;
+
+-- Variante emprise + pas (récepteurs générés par grille_recepteurs, en Lambert-93)
+CREATE OR REPLACE FUNCTION acoustique.calculer_empreinte_grille(
+    p_ids_vol UUID[],
+    p_emprise GEOMETRY,
+    p_pas_m DOUBLE PRECISION,
+    p_conditions_meteo JSONB DEFAULT '{"temperature": 15, "humidite": 70, "vent": 0}'::JSONB,
+    p_hauteur_recepteur_m DOUBLE PRECISION DEFAULT 4.0,
+    p_distance_max_m DOUBLE PRECISION DEFAULT NULL
+) RETURNS TABLE (
+    id_vol UUID,
+    id_point INTEGER,
+    id_phase_vol UUID,
+    point_calcul GEOMETRY,
+    distance_source_m DOUBLE PRECISION,
+    niveau_bruit_dba DOUBLE PRECISION,
+    sel_db DOUBLE PRECISION
+) AS $$
+    SELECT *
+    FROM acoustique.calculer_empreinte_grille(
+        p_ids_vol,
+        ARRAY(SELECT g.point_calcul FROM acoustique.grille_recepteurs(p_emprise, p_pas_m) g ORDER BY g.id_point),
+        p_conditions_meteo, p_hauteur_recepteur_m, p_distance_max_m
+    );
+$$ LANGUAGE sql STABLE;
+
+-- =====================================================
+-- 3. CHARGEMENT EN MASSE
+-- =====================================================
+
+-- Remplace les empreintes 'GRILLE_SQL' des vols par un INSERT ... SELECT unique.
+-- Seuls les récepteurs où LAmax >= p_niveau_min sont conservés
+-- (chk_niveau_realiste : 20 à 140 dBA). Retourne le nombre de lignes insérées.
+CREATE OR REPLACE FUNCTION acoustique.inserer_empreinte_grille(
+    p_ids_vol UUID[],
+    p_recepteurs GEOMETRY[],
+    p_conditions_meteo JSONB DEFAULT '{"temperature": 15, "humidite": 70, "vent": 0}'::JSONB,
+    p_niveau_min DOUBLE PRECISION DEFAULT 40.0,
+    p_hauteur_recepteur_m DOUBLE PRECISION DEFAULT 4.0,
+    p_distance_max_m DOUBLE PRECISION DEFAULT NULL
+) RETURNS BIGINT AS $$
+DECLARE
+    nb_lignes BIGINT;
+BEGIN
+    DELETE FROM acoustique.empreinte_acoustique_calculee e
+    WHERE e.id_vol = ANY(p_ids_vol) AND e.methode_calcul = 'GRILLE_SQL';
+
+    INSERT INTO acoustique.empreinte_acoustique_calculee (
+        id_vol, id_phase_vol, point_calcul, distance_source_m, niveau_bruit_dba, sel_db,
+        temperature_calcul_c, humidite_calcul_percent, methode_calcul
+    )
+    SELECT g.id_vol, g.id_phase_vol, ST_Transform(g.point_calcul, 4326),
+           round(g.distance_source_m::NUMERIC, 2),
+           round(LEAST(g.niveau_bruit_dba, 140)::NUMERIC, 2),
+           round(g.sel_db::NUMERIC, 2),
+           COALESCE((p_conditions_meteo->>'temperature')::NUMERIC, 15.0),
+           round(COALESCE((p_conditions_meteo->>'humidite')::NUMERIC, 70)),
+           'GRILLE_SQL'
+    FROM acoustique.calculer_empreinte_grille(
+        p_ids_vol, p_recepteurs, p_conditions_meteo, p_hauteur_recepteur_m, p_distance_max_m
+    ) g
+    WHERE g.niveau_bruit_dba >= GREATEST(p_niveau_min, 20);
+
+    GET DIAGNOSTICS nb_lignes = ROW_COUNT;
+    RETURN nb_lignes;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION acoustique.inserer_empreinte_grille(
+    p_ids_vol UUID[],
+    p_emprise GEOMETRY,
+    p_pas_m DOUBLE PRECISION,
+    p_conditions_meteo JSONB DEFAULT '{"temperature": 15, "humidite": 70, "vent": 0}'::JSONB,
+    p_niveau_min DOUBLE PRECISION DEFAULT 40.0,
+    p_hauteur_recepteur_m DOUBLE PRECISION DEFAULT 4.0,
+    p_distance_max_m DOUBLE PRECISION DEFAULT NULL
+) RETURNS BIGINT AS $$
+    SELECT acoustique.inserer_empreinte_grille(
+        p_ids_vol,
+        ARRAY(SELECT g.point_calcul FROM acoustique.grille_recepteurs(p_emprise, p_pas_m) g ORDER BY g.id_point),
+        p_conditions_meteo, p_niveau_min, p_hauteur_recepteur_m, p_distance_max_m
+    );
+$$ LANGUAGE sql;
+
+-- Purge des empreintes d'un vol par méthode de calcul
+CREATE INDEX idx_empreinte_vol_methode
+    ON acoustique.empreinte_acoustique_calculee(id_vol, methode_calcul);
+
+COMMENT ON FUNCTION acoustique.grille_recepteurs IS 'Nœuds d''une emprise au pas donné (ordre de GridSpec.points())';
+COMMENT ON FUNCTION acoustique.calculer_empreinte_grille(UUID[], GEOMETRY[], JSONB, DOUBLE PRECISION, DOUBLE PRECISION) IS 'LAmax / SEL de vols sur un ensemble de récepteurs en une requête ensembliste (float8, Lambert-93)';
+COMMENT ON FUNCTION acoustique.calculer_empreinte_grille(UUID[], GEOMETRY, DOUBLE PRECISION, JSONB, DOUBLE PRECISION, DOUBLE PRECISION) IS 'LAmax / SEL de vols sur la grille d''une emprise';
+COMMENT ON FUNCTION acoustique.inserer_empreinte_grille(UUID[], GEOMETRY[], JSONB, DOUBLE PRECISION, DOUBLE PRECISION, DOUBLE PRECISION) IS 'Chargement en masse des empreintes sur grille (methode_calcul = GRILLE_SQL)';
+COMMENT ON FUNCTION acoustique.inserer_empreinte_grille(UUID[], GEOMETRY, DOUBLE PRECISION, JSONB, DOUBLE PRECISION, DOUBLE PRECISION, DOUBLE PRECISION) IS 'Chargement en masse des empreintes sur la grille d''une emprise';
+
+-- =====================================================
+-- FIN MIGRATION V005
+-- =====================================================
+
+DO $$
+BEGIN
+    RAISE NOTICE 'Migration V005 appliquée avec succès - Empreinte acoustique ensembliste';
+END $$;
@@ -0,0 +1,356 @@
+-- =====================================================
+-- Migration V006: Indicateurs journaliers matérialisés par station
+-- Description: table des énergies Lden / Lnight par station et par jour,
+--              maintenue de façon incrémentale par triggers d'instruction
+--              (tables de transition) ; vues réglementaires recâblées dessus
+-- Auteur: Portfolio Project - Module Acoustique
+-- Date: 2025-08-15
+-- =====================================================
+
+-- Énergie d'une mesure : 10^(LAeq/10) · durée (s), sommée par période.
+--   Lday   = 10·log10(E_jour / (12·3600))      jour    06h-18h
+--   Leve   = 10·log10(E_soirée / (4·3600))     soirée  18h-22h (+5 dB)
+--   Lnight = 10·log10(E_nuit / (8·3600))       nuit    22h-06h (+10 dB)
+--   Lden   = 10·log10((E_jour + 10^0,5·E_soirée + 10·E_nuit) / 86400)
+-- Les vues V003 moyennaient des dB (AVG(laeq_dba)) et leurs tranches horaires
+-- se chevauchaient (BETWEEN 6 AND 18 puis BETWEEN 18 AND 22 : 18h compté deux fois).
+-- Journée calendaire, comme src/noise/accumulator.py.
+
+-- =====================================================
+-- 1. FONCTIONS PAR MESURE
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION acoustique.periode_reglementaire(p_instant TIMESTAMP)
+RETURNS VARCHAR(10) AS $$
+    SELECT CASE
+        WHEN EXTRACT(hour FROM p_instant) >= 6 AND EXTRACT(hour FROM p_instant) < 18 THEN 'Jour'
+        WHEN EXTRACT(hour FROM p_instant) >= 18 AND EXTRACT(hour FROM p_instant) < 22 THEN 'Soirée'
+        ELSE 'Nuit'
+    END;
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+-- Durée absente : une seconde (durée d'intégration par défaut des stations)
+CREATE OR REPLACE FUNCTION acoustique.energie_mesure(p_laeq_dba NUMERIC, p_duree_s NUMERIC)
+RETURNS DOUBLE PRECISION AS $$
+    SELECT POWER(10::float8, p_laeq_dba::float8 / 10) * COALESCE(p_duree_s::float8, 1);
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+-- =====================================================
+-- 2. TABLE DES INDICATEURS JOURNALIERS
+-- =====================================================
+
+CREATE TABLE acoustique.indicateur_station_jour (
+    id_station_bruit UUID NOT NULL REFERENCES acoustique.station_mesure_bruit(id_station_bruit) ON DELETE CASCADE,
+    date_mesure DATE NOT NULL,
+
+    -- Énergies cumulées (s, relatives à 20 µPa) des mesures valides
+    energie_jour DOUBLE PRECISION NOT NULL DEFAULT 0,
+    energie_soiree DOUBLE PRECISION NOT NULL DEFAULT 0,
+    energie_nuit DOUBLE PRECISION NOT NULL DEFAULT 0,
+
+    -- Durées mesurées par période (s) : couverture de la journée
+    duree_jour_s DOUBLE PRECISION NOT NULL DEFAULT 0,
+    duree_soiree_s DOUBLE PRECISION NOT NULL DEFAULT 0,
+    duree_nuit_s DOUBLE PRECISION NOT NULL DEFAULT 0,
+
+    nb_evenements INTEGER NOT NULL DEFAULT 0,
+    nb_evenements_aeriens INTEGER NOT NULL DEFAULT 0,
+    lamax_max_dba NUMERIC(5,2),
+
+    date_maj TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (id_station_bruit, date_mesure)
+);
+
+CREATE INDEX idx_indicateur_station_date ON acoustique.indicateur_station_jour(date_mesure);
+
+-- =====================================================
+-- 3. RECALCUL PAR CLÉ (station, jour)
+-- =====================================================
+
+-- Remplace les lignes des couples (station, jour) donnés par l'agrégat des
+-- mesures valides ; un couple sans mesure valide disparaît
+CREATE OR REPLACE FUNCTION acoustique.recalculer_indicateurs_station(
+    p_stations UUID[],
+    p_dates DATE[]
+) RETURNS INTEGER AS $$
+DECLARE
+    v_lignes INTEGER;
+BEGIN
+    DELETE FROM acoustique.indicateur_station_jour i
+    USING unnest(p_stations, p_dates) AS k(id_station_bruit, date_mesure)
+    WHERE i.id_station_bruit = k.id_station_bruit AND i.date_mesure = k.date_mesure;
+
+    -- Bornes sur timestamp_mesure : idx_mesure_bruit_station_time
+    INSERT INTO acoustique.indicateur_station_jour (
+        id_station_bruit, date_mesure, energie_jour, energie_soiree, energie_nuit,
+        duree_jour_s, duree_soiree_s, duree_nuit_s, nb_evenements, nb_evenements_aeriens, lamax_max_dba
+    )
+    SELECT
+        k.id_station_bruit,
+        k.date_mesure,
+        COALESCE(SUM(acoustique.energie_mesure(mb.laeq_dba, mb.duree_evenement_s))
+                 FILTER (WHERE acoustique.periode_reglementaire(mb.timestamp_mesure) = 'Jour'), 0),
+        COALESCE(SUM(acoustique.energie_mesure(mb.laeq_dba, mb.duree_evenement_s))
+                 FILTER (WHERE acoustique.periode_reglementaire(mb.timestamp_mesure) = 'Soirée'), 0),
+        COALESCE(SUM(acoustique.energie_mesure(mb.laeq_dba, mb.duree_evenement_s))
+                 FILTER (WHERE acoustique.periode_reglementaire(mb.timestamp_mesure) = 'Nuit'), 0),
+        COALESCE(SUM(COALESCE(mb.duree_evenement_s::float8, 1))
+                 FILTER (WHERE acoustique.periode_reglementaire(mb.timestamp_mesure) = 'Jour'), 0),
+        COALESCE(SUM(COALESCE(mb.duree_evenement_s::float8, 1))
+                 FILTER (WHERE acoustique.periode_reglementaire(mb.timestamp_mesure) = 'Soirée'), 0),
+        COALESCE(SUM(COALESCE(mb.duree_evenement_s::float8, 1))
+                 FILTER (WHERE acoustique.periode_reglementaire(mb.timestamp_mesure) = 'Nuit'), 0),
+        COUNT(*),
+        COUNT(*) FILTER (WHERE mb.type_evenement = 'Aéronef'),
+        MAX(mb.lamax_dba)
+    FROM (SELECT DISTINCT * FROM unnest(p_stations, p_dates) AS u(id_station_bruit, date_mesure)) k
+    JOIN acoustique.mesure_bruit mb
+      ON mb.id_station_bruit = k.id_station_bruit
+     AND mb.timestamp_mesure >= k.date_mesure
+     AND mb.timestamp_mesure < k.date_mesure + 1
+    WHERE mb.validite_mesure = 'Valide'
+    GROUP BY k.id_station_bruit, k.date_mesure;
+    GET DIAGNOSTICS v_lignes = ROW_COUNT;
+
+    RETURN v_lignes;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Initialisation / reconstruction sur une période (bornes incluses, toutes stations)
+CREATE OR REPLACE FUNCTION acoustique.recalculer_indicateurs_station(
+    p_date_debut DATE,
+    p_date_fin DATE
+) RETURNS INTEGER AS $$
+    WITH cles AS (
+        SELECT DISTINCT mb.id_station_bruit, mb.timestamp_mesure::date AS date_mesure
+        FROM acoustique.mesure_bruit mb
+        WHERE mb.timestamp_mesure >= p_date_debut AND mb.timestamp_mesure < p_date_fin + 1
+        UNION
+        SELECT i.id_station_bruit, i.date_mesure
+        FROM acoustique.indicateur_station_jour i
+        WHERE i.date_mesure BETWEEN p_date_debut AND p_date_fin
+    )
+    -- Les deux array_agg parcourent les mêmes lignes dans le même ordre
+    SELECT acoustique.recalculer_indicateurs_station(array_agg(id_station_bruit), array_agg(date_mesure))
+    FROM cles;
+$$ LANGUAGE sql;
+
+-- =====================================================
+-- 4. MAINTENANCE INCRÉMENTALE (triggers d'instruction)
+-- =====================================================
+
+-- INSERT : cumul des nouvelles mesures par (station, jour), upsert additif.
+-- Une instruction COPY / INSERT de N lignes = une seule requête d'agrégation.
+CREATE OR REPLACE FUNCTION acoustique.cumuler_indicateurs_insertion()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO acoustique.indicateur_station_jour AS i (
+        id_station_bruit, date_mesure, energie_jour, energie_soiree, energie_nuit,
+        duree_jour_s, duree_soiree_s, duree_nuit_s, nb_evenements, nb_evenements_aeriens, lamax_max_dba
+    )
+    SELECT
+        n.id_station_bruit,
+        n.timestamp_mesure::date,
+        COALESCE(SUM(acoustique.energie_mesure(n.laeq_dba, n.duree_evenement_s))
+                 FILTER (WHERE acoustique.periode_reglementaire(n.timestamp_mesure) = 'Jour'), 0),
+        COALESCE(SUM(acoustique.energie_mesure(n.laeq_dba, n.duree_evenement_s))
+                 FILTER (WHERE acoustique.periode_reglementaire(n.timestamp_mesure) = 'Soirée'), 0),
+        COALESCE(SUM(acoustique.energie_mesure(n.laeq_dba, n.duree_evenement_s))
+                 FILTER (WHERE acoustique.periode_reglementaire(n.timestamp_mesure) = 'Nuit'), 0),
+        COALESCE(SUM(COALESCE(n.duree_evenement_s::float8, 1))
+                 FILTER (WHERE acoustique.periode_reglementaire(n.timestamp_mesure) = 'Jour'), 0),
+        COALESCE(SUM(COALESCE(n.duree_evenement_s::float8, 1))
+                 FILTER (WHERE acoustique.periode_reglementaire(n.timestamp_mesure) = 'Soirée'), 0),
+        COALESCE(SUM(COALESCE(n.duree_evenement_s::float8, 1))
+                 FILTER (WHERE acoustique.periode_reglementaire(n.timestamp_mesure) = 'Nuit'), 0),
+        COUNT(*),
+        COUNT(*) FILTER (WHERE n.type_evenement = 'Aéronef'),
+        MAX(n.lamax_dba)
+    FROM nouvelles n
+    WHERE n.validite_mesure = 'Valide'
+    GROUP BY n.id_station_bruit, n.timestamp_mesure::date
+    ON CONFLICT (id_station_bruit, date_mesure) DO UPDATE SET
+        energie_jour = i.energie_jour + EXCLUDED.energie_jour,
+        energie_soiree = i.energie_soiree + EXCLUDED.energie_soiree,
+        energie_nuit = i.energie_nuit + EXCLUDED.energie_nuit,
+        duree_jour_s = i.duree_jour_s + EXCLUDED.duree_jour_s,
+        duree_soiree_s = i.duree_soiree_s + EXCLUDED.duree_soiree_s,
+        duree_nuit_s = i.duree_nuit_s + EXCLUDED.duree_nuit_s,
+        nb_evenements = i.nb_evenements + EXCLUDED.nb_evenements,
+        nb_evenements_aeriens = i.nb_evenements_aeriens + EXCLUDED.nb_evenements_aeriens,
+        lamax_max_dba = GREATEST(i.lamax_max_dba, EXCLUDED.lamax_max_dba),
+        date_maj = CURRENT_TIMESTAMP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- UPDATE : recalcul des seuls couples dont une colonne utile a changé
+-- (la corrélation vol / événement, src/noise/correlation.py, ne déclenche rien)
+CREATE OR REPLACE FUNCTION acoustique.recalculer_indicateurs_modification()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM acoustique.recalculer_indicateurs_station(array_agg(c.id_station_bruit), array_agg(c.date_mesure))
+    FROM (
+        SELECT a.id_station_bruit, a.timestamp_mesure::date AS date_mesure
+        FROM anciennes a JOIN nouvelles n ON n.id_mesure_bruit = a.id_mesure_bruit
+        WHERE (a.id_station_bruit, a.timestamp_mesure, a.laeq_dba, a.lamax_dba, a.duree_evenement_s,
+               a.validite_mesure, a.type_evenement)
+              IS DISTINCT FROM
+              (n.id_station_bruit, n.timestamp_mesure, n.laeq_dba, n.lamax_dba, n.duree_evenement_s,
+               n.validite_mesure, n.type_evenement)
+        UNION
+        SELECT n.id_station_bruit, n.timestamp_mesure::date
+        FROM anciennes a JOIN nouvelles n ON n.id_mesure_bruit = a.id_mesure_bruit
+        WHERE (a.id_station_bruit, a.timestamp_mesure) IS DISTINCT FROM (n.id_station_bruit, n.timestamp_mesure)
+    ) c
+    HAVING count(*) > 0;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- DELETE : recalcul des couples touchés (MAX et comptages non soustractibles)
+CREATE OR REPLACE FUNCTION acoustique.recalculer_indicateurs_suppression()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM acoustique.recalculer_indicateurs_station(array_agg(c.id_station_bruit), array_agg(c.date_mesure))
+    FROM (SELECT DISTINCT a.id_station_bruit, a.timestamp_mesure::date AS date_mesure FROM anciennes a) c
+    HAVING count(*) > 0;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Une table de transition n'est permise que pour un seul événement par trigger
+CREATE TRIGGER trg_indicateurs_station_insert
+    AFTER INSERT ON acoustique.mesure_bruit
+    REFERENCING NEW TABLE AS nouvelles
+    FOR EACH STATEMENT EXECUTE FUNCTION acoustique.cumuler_indicateurs_insertion();
+
+CREATE TRIGGER trg_indicateurs_station_update
+    AFTER UPDATE ON acoustique.mesure_bruit
+    REFERENCING OLD TABLE AS anciennes NEW TABLE AS nouvelles
+    FOR EACH STATEMENT EXECUTE FUNCTION acoustique.recalculer_indicateurs_modification();
+
+CREATE TRIGGER trg_indicateurs_station_delete
+    AFTER DELETE ON acoustique.mesure_bruit
+    REFERENCING OLD TABLE AS anciennes
+    FOR EACH STATEMENT EXECUTE FUNCTION acoustique.recalculer_indicateurs_suppression();
+
+-- Mesures déjà présentes
+SELECT acoustique.recalculer_indicateurs_station(
+    COALESCE((SELECT MIN(timestamp_mesure)::date FROM acoustique.mesure_bruit), CURRENT_DATE),
+    COALESCE((SELECT MAX(timestamp_mesure)::date FROM acoustique.mesure_bruit), CURRENT_DATE)
+);
+
+-- =====================================================
+-- 5. VUES RÉGLEMENTAIRES RECÂBLÉES
+-- =====================================================
+
+-- Lecture de la table journalière : plus d'agrégation des mesures brutes
+DROP VIEW IF EXISTS acoustique.v_indicateurs_reglementaires_station;
+CREATE VIEW acoustique.v_indicateurs_reglementaires_station AS
+SELECT
+    smb.code_station,
+    smb.nom_station,
+    smb.zone_reglementaire,
+    smb.environnement_sonore,
+    i.date_mesure,
+
+    -- Lden (indicateur jour-soirée-nuit), somme énergétique pondérée
+    ROUND((10 * LOG10(NULLIF(
+        i.energie_jour + POWER(10, 0.5) * i.energie_soiree + 10 * i.energie_nuit, 0
+    ) / 86400))::numeric, 1) AS lden_dba,
+
+    -- Lnight (22h-6h)
+    ROUND((10 * LOG10(NULLIF(i.energie_nuit, 0) / (8 * 3600)))::numeric, 1) AS lnight_dba,
+
+    i.nb_evenements,
+    i.nb_evenements_aeriens,
+    i.lamax_max_dba,
+
+    CASE
+        WHEN smb.zone_reglementaire = 'A' THEN 'Zone forte exposition (>65 dB Lden)'
+        WHEN smb.zone_reglementaire = 'B' THEN 'Zone exposition modérée (60-65 dB Lden)'
+        WHEN smb.zone_reglementaire = 'C' THEN 'Zone exposition faible (55-60 dB Lden)'
+        ELSE 'Hors zone réglementaire'
+    END AS classification_exposition,
+
+    -- Détail par période et couverture de mesure
+    ROUND((10 * LOG10(NULLIF(i.energie_jour, 0) / (12 * 3600)))::numeric, 1) AS lday_dba,
+    ROUND((10 * LOG10(NULLIF(i.energie_soiree, 0) / (4 * 3600)))::numeric, 1) AS levening_dba,
+    ROUND(((i.duree_jour_s + i.duree_soiree_s + i.duree_nuit_s) / 86400 * 100)::numeric, 1) AS couverture_pourcent,
+    i.id_station_bruit,
+    i.date_maj
+FROM acoustique.indicateur_station_jour i
+JOIN acoustique.station_mesure_bruit smb ON smb.id_station_bruit = i.id_station_bruit;
+
+-- Événements aéronautiques : périodes corrigées, une ligne par mesure (la
+-- jointure directe sur phase_vol dupliquait chaque mesure par phase du vol ;
+-- seule la phase en cours à l'instant de la mesure est retenue)
+DROP VIEW IF EXISTS acoustique.v_evenements_aeronautiques;
+CREATE VIEW acoustique.v_evenements_aeronautiques AS
+SELECT
+    mb.timestamp_mesure,
+    mb.lamax_dba,
+    mb.laeq_dba,
+    mb.duree_evenement_s,
+    smb.nom_station,
+    smb.zone_reglementaire,
+    smb.environnement_sonore,
+    v.numero_vol,
+    c.nom_compagnie,
+    at.designation_icao,
+    pv.type_phase,
+    mb.correlation_certitude,
+    mb.distance_estimee_m,
+    mb.laeq_dba + CASE acoustique.periode_reglementaire(mb.timestamp_mesure)
+        WHEN 'Jour' THEN 0
+        WHEN 'Soirée' THEN 5
+        ELSE 10
+    END AS contribution_lden_dba,
+    acoustique.periode_reglementaire(mb.timestamp_mesure) AS periode_reglementaire,
+    mb.id_mesure_bruit,
+    mb.id_vol_correlé
+FROM acoustique.mesure_bruit mb
+JOIN acoustique.station_mesure_bruit smb ON mb.id_station_bruit = smb.id_station_bruit
+LEFT JOIN airport.vol v ON mb.id_vol_correlé = v.id_vol
+LEFT JOIN airport.compagnie c ON v.id_compagnie = c.id_compagnie
+LEFT JOIN airport.aeronef_type at ON v.id_type_aeronef = at.id_type_aeronef
+LEFT JOIN LATERAL (
+    SELECT p.type_phase
+    FROM airport.phase_vol p
+    WHERE p.id_vol = v.id_vol AND p.heure_debut <= mb.timestamp_mesure::time
+    ORDER BY p.heure_debut DESC
+    LIMIT 1
+) pv ON TRUE
+WHERE mb.type_evenement = 'Aéronef'
+  AND mb.validite_mesure = 'Valide';
+
+-- Recherche de la phase en cours (LATERAL ... ORDER BY heure_debut DESC LIMIT 1)
+CREATE INDEX IF NOT EXISTS idx_phase_vol_vol_heure ON airport.phase_vol(id_vol, heure_debut);
+
+-- =====================================================
+-- 6. COMMENTAIRES
+-- =====================================================
+
+COMMENT ON TABLE acoustique.indicateur_station_jour IS 'Énergies journalières par période et par station (mesures valides), maintenues par triggers sur mesure_bruit';
+COMMENT ON COLUMN acoustique.indicateur_station_jour.energie_jour IS 'Somme de 10^(LAeq/10)·durée (s) des mesures de 06h à 18h';
+COMMENT ON COLUMN acoustique.indicateur_station_jour.energie_soiree IS 'Somme de 10^(LAeq/10)·durée (s) des mesures de 18h à 22h';
+COMMENT ON COLUMN acoustique.indicateur_station_jour.energie_nuit IS 'Somme de 10^(LAeq/10)·durée (s) des mesures de 22h à 06h (journée calendaire)';
+COMMENT ON FUNCTION acoustique.periode_reglementaire(TIMESTAMP) IS 'Période Lden d''un instant : Jour [6h, 18h[, Soirée [18h, 22h[, Nuit sinon';
+COMMENT ON FUNCTION acoustique.energie_mesure(NUMERIC, NUMERIC) IS 'Énergie acoustique d''une mesure : 10^(LAeq/10)·durée (1 s par défaut)';
+COMMENT ON FUNCTION acoustique.recalculer_indicateurs_station(UUID[], DATE[]) IS 'Recalcul exact des indicateurs de couples (station, jour)';
+COMMENT ON FUNCTION acoustique.recalculer_indicateurs_station(DATE, DATE) IS 'Reconstruction des indicateurs journaliers sur une période';
+COMMENT ON VIEW acoustique.v_indicateurs_reglementaires_station IS 'Indicateurs Lden et Lnight par station et par jour (somme énergétique, table indicateur_station_jour)';
+COMMENT ON VIEW acoustique.v_evenements_aeronautiques IS 'Événements acoustiques corrélés au trafic aérien, une ligne par mesure, phase en cours au moment de la mesure';
+
+-- =====================================================
+-- FIN MIGRATION V006
+-- =====================================================
+
+DO $$
+BEGIN
+    RAISE NOTICE 'Migration V006 appliquée avec succès - Indicateurs journaliers par station';
+    RAISE NOTICE 'Table créée: indicateur_station_jour (triggers INSERT / UPDATE / DELETE sur mesure_bruit)';
+    RAISE NOTICE 'Vues recâblées: v_indicateurs_reglementaires_station, v_evenements_aeronautiques';
+END $$;
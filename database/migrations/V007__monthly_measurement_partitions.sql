@@ -0,0 +1,284 @@
+-- =====================================================
+-- Migration V007: Partitionnement mensuel des mesures
+-- Description: acoustique.mesure_bruit et air_quality.mesure_qualite_air
+--              deviennent des tables partitionnées par mois (RANGE sur
+--              timestamp_mesure), index BRIN sur l'horodatage, création
+--              anticipée des partitions et rétention par suppression de
+--              partition (scripts/maintain_partitions.py)
+-- Auteur: Portfolio Project - Module Acoustique
+-- Date: 2025-08-15
+-- =====================================================
+
+-- Une partition par mois : <table>_yAAAAmMM, bornes [1er du mois, 1er du mois suivant[.
+-- Les requêtes bornées sur timestamp_mesure (>= / <, BETWEEN, paramètres)
+-- ne lisent que les partitions concernées ; DATE(timestamp_mesure) = ... ne
+-- permet pas l'élagage. Les mesures arrivent dans l'ordre du temps : un BRIN
+-- sur timestamp_mesure remplace le B-tree (polluant, horodatage) pour une
+-- fraction de sa taille. Les B-tree (station, horodatage) restent : le
+-- recalcul des indicateurs d'une station sur une journée (V006) et les
+-- suppressions par station et plage horaire ne lisent que cette station.
+-- Les indicateurs journaliers (V006) survivent à la suppression des
+-- partitions brutes : DROP TABLE ne déclenche pas les triggers DELETE.
+
+-- =====================================================
+-- 1. GESTION DES PARTITIONS MENSUELLES
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS public.partition_mensuelle_config (
+    table_parent REGCLASS PRIMARY KEY,
+    mois_anticipation INTEGER NOT NULL DEFAULT 3, -- Partitions futures toujours présentes
+    retention INTERVAL, -- NULL = conservation illimitée
+    CONSTRAINT chk_mois_anticipation CHECK (mois_anticipation BETWEEN 1 AND 24)
+);
+
+-- Partition du mois contenant p_mois (NULL si elle existe déjà)
+CREATE OR REPLACE FUNCTION public.creer_partition_mensuelle(
+    p_table REGCLASS,
+    p_mois DATE
+) RETURNS TEXT AS $$
+DECLARE
+    v_schema TEXT;
+    v_nom TEXT;
+    v_debut DATE := date_trunc('month', p_mois)::date;
+    v_partition TEXT;
+BEGIN
+    SELECT n.nspname, c.relname INTO v_schema, v_nom
+    FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE c.oid = p_table;
+
+    v_partition := format('%s_y%sm%s', v_nom, to_char(v_debut, 'YYYY'), to_char(v_debut, 'MM'));
+    IF to_regclass(format('%I.%I', v_schema, v_partition)) IS NOT NULL THEN
+        RETURN NULL;
+    END IF;
+
+    EXECUTE format('CREATE TABLE %I.%I PARTITION OF %s FOR VALUES FROM (%L) TO (%L)',
+                   v_schema, v_partition, p_table, v_debut, (v_debut + INTERVAL '1 month')::date);
+    RETURN v_partition;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Partitions de tous les mois de [p_debut, p_fin] (reprises d'historique comprises)
+CREATE OR REPLACE FUNCTION public.creer_partitions_mensuelles(
+    p_table REGCLASS,
+    p_debut DATE,
+    p_fin DATE
+) RETURNS INTEGER AS $$
+    SELECT COUNT(public.creer_partition_mensuelle(p_table, mois::date))::integer
+    FROM generate_series(date_trunc('month', p_debut), date_trunc('month', p_fin), INTERVAL '1 month') AS mois;
+$$ LANGUAGE sql;
+
+-- Partitions d'une table et leurs bornes
+CREATE OR REPLACE FUNCTION public.partitions_mensuelles(p_table REGCLASS)
+RETURNS TABLE (
+    partition REGCLASS,
+    debut TIMESTAMP,
+    fin TIMESTAMP
+) AS $$
+    SELECT c.oid::regclass,
+           substring(pg_get_expr(c.relpartbound, c.oid) FROM 'FROM \(''([^'']+)''\)')::timestamp,
+           substring(pg_get_expr(c.relpartbound, c.oid) FROM 'TO \(''([^'']+)''\)')::timestamp
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = p_table
+    ORDER BY 2;
+$$ LANGUAGE sql STABLE;
+
+-- Création anticipée et rétention pour toutes les tables configurées
+-- (p_simulation : actions listées sans être exécutées)
+CREATE OR REPLACE FUNCTION public.maintenir_partitions_mensuelles(
+    p_simulation BOOLEAN DEFAULT FALSE
+) RETURNS TABLE (
+    table_parent REGCLASS,
+    action TEXT,
+    partition TEXT
+) AS $$
+DECLARE
+    v_config RECORD;
+    v_mois DATE;
+    v_partition RECORD;
+    v_nom TEXT;
+BEGIN
+    FOR v_config IN SELECT * FROM public.partition_mensuelle_config c ORDER BY c.table_parent::text LOOP
+        table_parent := v_config.table_parent;
+
+        FOR v_mois IN
+            SELECT generate_series(date_trunc('month', CURRENT_DATE),
+                                   date_trunc('month', CURRENT_DATE) + v_config.mois_anticipation * INTERVAL '1 month',
+                                   INTERVAL '1 month')::date
+        LOOP
+            IF NOT EXISTS (SELECT 1 FROM public.partitions_mensuelles(v_config.table_parent) p
+                           WHERE p.debut = v_mois) THEN
+                action := 'creation';
+                partition := CASE WHEN p_simulation THEN to_char(v_mois, 'YYYY-MM')
+                                  ELSE public.creer_partition_mensuelle(v_config.table_parent, v_mois) END;
+                RETURN NEXT;
+            END IF;
+        END LOOP;
+
+        -- Partition entièrement antérieure à la limite de rétention
+        IF v_config.retention IS NOT NULL THEN
+            FOR v_partition IN
+                SELECT p.partition FROM public.partitions_mensuelles(v_config.table_parent) p
+                WHERE p.fin <= CURRENT_DATE - v_config.retention
+            LOOP
+                v_nom := v_partition.partition::text;
+                IF NOT p_simulation THEN
+                    EXECUTE format('DROP TABLE %s', v_nom);
+                END IF;
+                action := 'suppression';
+                partition := v_nom;
+                RETURN NEXT;
+            END LOOP;
+        END IF;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- =====================================================
+-- 2. VUES DÉPENDANTES (recréées à l'identique après conversion)
+-- =====================================================
+
+CREATE TEMP TABLE vues_partitionnement ON COMMIT DROP AS
+SELECT v.oid::regclass::text AS vue,
+       pg_get_viewdef(v.oid) AS definition,
+       obj_description(v.oid, 'pg_class') AS commentaire
+FROM pg_class v
+WHERE v.oid = 'acoustique.v_evenements_aeronautiques'::regclass;
+
+DROP VIEW acoustique.v_evenements_aeronautiques;
+
+-- =====================================================
+-- 3. CONVERSION DE acoustique.mesure_bruit
+-- =====================================================
+
+ALTER TABLE acoustique.mesure_bruit RENAME TO mesure_bruit_heap;
+
+CREATE TABLE acoustique.mesure_bruit (
+    LIKE acoustique.mesure_bruit_heap INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING COMMENTS
+) PARTITION BY RANGE (timestamp_mesure);
+
+SELECT public.creer_partitions_mensuelles(
+    'acoustique.mesure_bruit',
+    COALESCE((SELECT MIN(timestamp_mesure)::date FROM acoustique.mesure_bruit_heap), CURRENT_DATE),
+    (GREATEST(COALESCE((SELECT MAX(timestamp_mesure)::date FROM acoustique.mesure_bruit_heap), CURRENT_DATE),
+              CURRENT_DATE) + INTERVAL '3 months')::date
+);
+
+-- Chargement avant index et triggers : indicateurs V006 déjà à jour
+INSERT INTO acoustique.mesure_bruit SELECT * FROM acoustique.mesure_bruit_heap;
+DROP TABLE acoustique.mesure_bruit_heap;
+
+-- La clé de partitionnement fait partie de toute contrainte d'unicité
+ALTER TABLE acoustique.mesure_bruit
+    ADD PRIMARY KEY (id_mesure_bruit, timestamp_mesure),
+    ADD FOREIGN KEY (id_station_bruit)
+        REFERENCES acoustique.station_mesure_bruit(id_station_bruit) ON DELETE CASCADE,
+    ADD FOREIGN KEY (id_vol_correlé) REFERENCES airport.vol(id_vol);
+
+CREATE INDEX idx_mesure_bruit_time_brin
+    ON acoustique.mesure_bruit USING BRIN (timestamp_mesure) WITH (pages_per_range = 32);
+-- Recalcul station × journée (V006) et remplacement des événements par station et plage horaire
+CREATE INDEX idx_mesure_bruit_station_time
+    ON acoustique.mesure_bruit(id_station_bruit, timestamp_mesure);
+CREATE INDEX idx_mesure_bruit_vol
+    ON acoustique.mesure_bruit(id_vol_correlé) WHERE id_vol_correlé IS NOT NULL;
+
+-- Triggers d'instruction V006 (tables de transition sur la table parente)
+CREATE TRIGGER trg_indicateurs_station_insert
+    AFTER INSERT ON acoustique.mesure_bruit
+    REFERENCING NEW TABLE AS nouvelles
+    FOR EACH STATEMENT EXECUTE FUNCTION acoustique.cumuler_indicateurs_insertion();
+
+CREATE TRIGGER trg_indicateurs_station_update
+    AFTER UPDATE ON acoustique.mesure_bruit
+    REFERENCING OLD TABLE AS anciennes NEW TABLE AS nouvelles
+    FOR EACH STATEMENT EXECUTE FUNCTION acoustique.recalculer_indicateurs_modification();
+
+CREATE TRIGGER trg_indicateurs_station_delete
+    AFTER DELETE ON acoustique.mesure_bruit
+    REFERENCING OLD TABLE AS anciennes
+    FOR EACH STATEMENT EXECUTE FUNCTION acoustique.recalculer_indicateurs_suppression();
+
+-- =====================================================
+-- 4. CONVERSION DE air_quality.mesure_qualite_air
+-- =====================================================
+
+ALTER TABLE air_quality.mesure_qualite_air RENAME TO mesure_qualite_air_heap;
+
+CREATE TABLE air_quality.mesure_qualite_air (
+    LIKE air_quality.mesure_qualite_air_heap INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING COMMENTS
+) PARTITION BY RANGE (timestamp_mesure);
+
+SELECT public.creer_partitions_mensuelles(
+    'air_quality.mesure_qualite_air',
+    COALESCE((SELECT MIN(timestamp_mesure)::date FROM air_quality.mesure_qualite_air_heap), CURRENT_DATE),
+    (GREATEST(COALESCE((SELECT MAX(timestamp_mesure)::date FROM air_quality.mesure_qualite_air_heap), CURRENT_DATE),
+              CURRENT_DATE) + INTERVAL '3 months')::date
+);
+
+INSERT INTO air_quality.mesure_qualite_air SELECT * FROM air_quality.mesure_qualite_air_heap;
+DROP TABLE air_quality.mesure_qualite_air_heap;
+
+-- UNIQUE (station, horodatage, polluant) couvre aussi les recherches par station
+ALTER TABLE air_quality.mesure_qualite_air
+    ADD PRIMARY KEY (id_mesure, timestamp_mesure),
+    ADD UNIQUE (id_station, timestamp_mesure, polluant),
+    ADD FOREIGN KEY (id_station) REFERENCES air_quality.station_mesure(id_station);
+
+CREATE INDEX idx_mesure_qualite_air_time_brin
+    ON air_quality.mesure_qualite_air USING BRIN (timestamp_mesure) WITH (pages_per_range = 32);
+
+-- =====================================================
+-- 5. VUES ET CONFIGURATION DE MAINTENANCE
+-- =====================================================
+
+DO $$
+DECLARE
+    v_vue RECORD;
+BEGIN
+    FOR v_vue IN SELECT * FROM vues_partitionnement LOOP
+        EXECUTE format('CREATE VIEW %s AS %s', v_vue.vue, v_vue.definition);
+        IF v_vue.commentaire IS NOT NULL THEN
+            EXECUTE format('COMMENT ON VIEW %s IS %L', v_vue.vue, v_vue.commentaire);
+        END IF;
+    END LOOP;
+END $$;
+
+-- Mesures acoustiques brutes : 2 ans (indicateurs journaliers conservés) ;
+-- qualité de l'air : 5 ans
+INSERT INTO public.partition_mensuelle_config (table_parent, mois_anticipation, retention) VALUES
+    ('acoustique.mesure_bruit', 3, INTERVAL '2 years'),
+    ('air_quality.mesure_qualite_air', 3, INTERVAL '5 years')
+ON CONFLICT (table_parent) DO NOTHING;
+
+-- Exécution quotidienne si pg_cron est disponible (sinon scripts/maintain_partitions.py)
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule('maintenir_partitions_mensuelles', '15 3 * * *',
+                              'SELECT * FROM public.maintenir_partitions_mensuelles()');
+    END IF;
+END $$;
+
+-- =====================================================
+-- 6. COMMENTAIRES
+-- =====================================================
+
+COMMENT ON TABLE public.partition_mensuelle_config IS 'Tables partitionnées par mois : partitions anticipées et rétention';
+COMMENT ON TABLE acoustique.mesure_bruit IS 'Mesures acoustiques en continu avec corrélation trafic aérien (partitions mensuelles)';
+COMMENT ON TABLE air_quality.mesure_qualite_air IS 'Mesures de qualité de l''air (partitions mensuelles)';
+COMMENT ON FUNCTION public.creer_partition_mensuelle(REGCLASS, DATE) IS 'Crée la partition mensuelle contenant une date (NULL si existante)';
+COMMENT ON FUNCTION public.creer_partitions_mensuelles(REGCLASS, DATE, DATE) IS 'Crée les partitions mensuelles d''une période (reprise d''historique)';
+COMMENT ON FUNCTION public.partitions_mensuelles(REGCLASS) IS 'Partitions d''une table et leurs bornes';
+COMMENT ON FUNCTION public.maintenir_partitions_mensuelles(BOOLEAN) IS 'Création anticipée et suppression des partitions expirées des tables configurées';
+
+-- =====================================================
+-- FIN MIGRATION V007
+-- =====================================================
+
+DO $$
+BEGIN
+    RAISE NOTICE 'Migration V007 appliquée avec succès - Partitionnement mensuel des mesures';
+    RAISE NOTICE 'Tables partitionnées: acoustique.mesure_bruit, air_quality.mesure_qualite_air (BRIN sur timestamp_mesure)';
+    RAISE NOTICE 'Maintenance: SELECT * FROM public.maintenir_partitions_mensuelles() ou scripts/maintain_partitions.py';
+END $$;
@@ -0,0 +1,89 @@
+-- =====================================================
+-- Migration V008: Séries brutes des stations de mesure du bruit
+-- Description: LAeq 1 s des stations stockés par heure (une ligne par
+--              station et par heure, tableau SMALLINT de 3600 niveaux en
+--              centièmes de dB) ; alimenté par COPY depuis
+--              src/noise/monitor_ingest.py, partitionné par mois (V007)
+-- Auteur: Portfolio Project - Module Acoustique
+-- Date: 2025-08-15
+-- =====================================================
+
+-- Une ligne par seconde coûterait ~50 octets d'en-tête et d'index par
+-- échantillon (86 400 lignes par station et par jour) ; le tableau horaire
+-- tient en ~7 Ko compressés par TOAST et se relit d'un seul accès.
+
+-- =====================================================
+-- 1. FONCTIONS SUR LES TABLEAUX DE NIVEAUX
+-- =====================================================
+
+-- LAeq d'un tableau de niveaux en centièmes de dB (échantillons absents ignorés)
+CREATE OR REPLACE FUNCTION acoustique.laeq_niveaux(p_niveaux SMALLINT[])
+RETURNS NUMERIC(5,2) AS $$
+    SELECT round((10 * log(avg(power(10::float8, v / 1000.0::float8))))::numeric, 2)
+    FROM unnest(p_niveaux) AS v
+    WHERE v IS NOT NULL;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Fusion d'une heure déjà stockée avec une heure partielle reçue ensuite
+-- (les valeurs reçues remplacent les anciennes, les absences les conservent)
+CREATE OR REPLACE FUNCTION acoustique.fusionner_niveaux(p_anciens SMALLINT[], p_nouveaux SMALLINT[])
+RETURNS SMALLINT[] AS $$
+    SELECT array_agg(COALESCE(n, a) ORDER BY i)
+    FROM unnest(p_nouveaux, p_anciens) WITH ORDINALITY AS u(n, a, i);
+$$ LANGUAGE sql IMMUTABLE;
+
+-- =====================================================
+-- 2. SÉRIES HORAIRES
+-- =====================================================
+
+CREATE TABLE acoustique.serie_bruit_horaire (
+    id_station_bruit UUID NOT NULL REFERENCES acoustique.station_mesure_bruit(id_station_bruit) ON DELETE CASCADE,
+    heure TIMESTAMP NOT NULL, -- Début de l'heure, heure locale
+
+    -- Niveau de la seconde i de l'heure à l'indice i + 1 (centièmes de dB(A), NULL si absent)
+    niveaux_cdb SMALLINT[] NOT NULL,
+    nb_echantillons SMALLINT GENERATED ALWAYS AS (cardinality(array_remove(niveaux_cdb, NULL))) STORED,
+    laeq_dba NUMERIC(5,2) GENERATED ALWAYS AS (acoustique.laeq_niveaux(niveaux_cdb)) STORED,
+
+    date_maj TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (id_station_bruit, heure),
+    CONSTRAINT chk_serie_heure CHECK (heure = date_trunc('hour', heure)),
+    CONSTRAINT chk_serie_longueur CHECK (cardinality(niveaux_cdb) = 3600)
+) PARTITION BY RANGE (heure);
+
+CREATE INDEX idx_serie_bruit_heure_brin
+    ON acoustique.serie_bruit_horaire USING BRIN (heure) WITH (pages_per_range = 32);
+
+-- Événements détectés à l'ingestion : remplacement par station et par plage horaire
+CREATE INDEX idx_mesure_bruit_source ON acoustique.mesure_bruit(source_donnees, id_station_bruit);
+
+SELECT public.creer_partitions_mensuelles(
+    'acoustique.serie_bruit_horaire', (CURRENT_DATE - INTERVAL '1 month')::date,
+    (CURRENT_DATE + INTERVAL '3 months')::date
+);
+
+INSERT INTO public.partition_mensuelle_config (table_parent, mois_anticipation, retention) VALUES
+    ('acoustique.serie_bruit_horaire', 3, INTERVAL '2 years')
+ON CONFLICT (table_parent) DO NOTHING;
+
+-- =====================================================
+-- 3. COMMENTAIRES
+-- =====================================================
+
+COMMENT ON TABLE acoustique.serie_bruit_horaire IS 'LAeq 1 s des stations de mesure du bruit, un tableau par station et par heure (partitions mensuelles)';
+COMMENT ON COLUMN acoustique.serie_bruit_horaire.niveaux_cdb IS 'Niveaux de chaque seconde en centièmes de dB(A), NULL si échantillon absent';
+COMMENT ON COLUMN acoustique.serie_bruit_horaire.laeq_dba IS 'LAeq horaire des échantillons présents';
+COMMENT ON FUNCTION acoustique.laeq_niveaux(SMALLINT[]) IS 'LAeq d''un tableau de niveaux en centièmes de dB';
+COMMENT ON FUNCTION acoustique.fusionner_niveaux(SMALLINT[], SMALLINT[]) IS 'Fusion de deux tableaux horaires, valeurs présentes du second prioritaires';
+
+-- =====================================================
+-- FIN MIGRATION V008
+-- =====================================================
+
+DO $$
+BEGIN
+    RAISE NOTICE 'Migration V008 appliquée avec succès - Séries brutes des stations de bruit';
+    RAISE NOTICE 'Table créée: acoustique.serie_bruit_horaire (partitions mensuelles)';
+    RAISE NOTICE 'Ingestion: python scripts/ingest_noise_monitors.py <fichiers>';
+END $$;
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cumul incrémental Lden / Lnight des mouvements journaliers
+Projet: Airport Air Quality Modeling
+
+Usage:
+    python scripts/accumulate_noise.py --start 2025-01-01 --end 2025-12-31 --scenario annuel_2025
+    python scripts/accumulate_noise.py --start 2025-08-15 --end 2025-08-15 --step 50 --workers 8
+
+Chaque journée est calculée par src/noise/engine.py puis ajoutée au point de
+reprise (data/noise/<scénario>/checkpoint.npz) : une exécution interrompue
+reprend à la première journée non cumulée. Les grilles Lden / Lnight sont
+écrites dans data/grids/<scénario>/<libellé>.npz (tuiles, API).
+"""
+
+import argparse
+import logging
+import os
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+import psycopg2
+from dotenv import load_dotenv
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.grids.spec import DEFAULT_GRIDS_ROOT, GridSpec, grid_path, save_grid  # noqa: E402
+from src.noise.accumulator import DEFAULT_CHUNK_FLIGHTS, LdenAccumulator, flight_times  # noqa: E402
+from src.noise.engine import PHASES_QUERY, PROFILES_QUERY, profiles_from_frame, tracks_from_phases  # noqa: E402
+from src.noise.parallel import parallel_add_flights  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+DB_CONFIG = {
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'port': os.getenv('DB_PORT', '5433'),
+    'database': os.getenv('DB_NAME', 'airport_air_quality'),
+    'user': os.getenv('DB_USER', 'airport_user'),
+    'password': os.getenv('DB_PASSWORD', 'airport_password'),
+}
+
+# Point de référence PVE (POINT(2.786 48.881)) en Lambert-93
+AIRPORT_X = 684305.0
+AIRPORT_Y = 6864575.0
+
+DEFAULT_CHECKPOINT_ROOT = PROJECT_ROOT / "data" / "noise"
+
+
+def daterange(start: date, end: date):
+    day = start
+    while day <= end:
+        yield day
+        day += timedelta(days=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cumul Lden / Lnight des mouvements')
+    parser.add_argument('--start', type=date.fromisoformat, required=True)
+    parser.add_argument('--end', type=date.fromisoformat, required=True)
+    parser.add_argument('--scenario', default='baseline')
+    parser.add_argument('--label', help='Nom de la grille produite (défaut: <start>_<end>)')
+    parser.add_argument('--half-width', type=float, default=10000.0, help='Demi-emprise (m)')
+    parser.add_argument('--step', type=float, default=100.0, help='Pas de grille (m)')
+    parser.add_argument('--chunk-flights', type=int, default=DEFAULT_CHUNK_FLIGHTS)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Processus de calcul (tuiles de grille, résultat identique)')
+    parser.add_argument('--checkpoint', type=Path, help='Point de reprise (.npz)')
+    parser.add_argument('--restart', action='store_true', help='Ignorer le point de reprise existant')
+    parser.add_argument('--temperature', type=float, default=15.0)
+    parser.add_argument('--humidity', type=float, default=70.0)
+    args = parser.parse_args()
+
+    spec = GridSpec.centered(AIRPORT_X, AIRPORT_Y, args.half_width, args.step)
+    checkpoint = args.checkpoint or DEFAULT_CHECKPOINT_ROOT / args.scenario / "checkpoint.npz"
+    checkpoint.parent.mkdir(parents=True, exist_ok=True)
+    if args.restart and checkpoint.exists():
+        checkpoint.unlink()
+    accumulator = LdenAccumulator.resume(checkpoint, spec)
+    weather = {'temperature': args.temperature, 'humidite': args.humidity}
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        profiles = profiles_from_frame(pd.read_sql_query(PROFILES_QUERY, conn))
+        logger.info(f"✅ {len(profiles)} profils acoustiques chargés")
+
+        for day in daterange(args.start, args.end):
+            if str(day) in accumulator.days:
+                continue
+            phases = pd.read_sql_query(PHASES_QUERY, conn, params={'date': day})
+            tracks = tracks_from_phases(phases)
+            if args.workers > 1:
+                parallel_add_flights(accumulator, tracks, flight_times(phases), profiles, day=day,
+                                     weather=weather, workers=args.workers, chunk_flights=args.chunk_flights)
+            else:
+                accumulator.add_flights(tracks, flight_times(phases), profiles, day=day,
+                                        weather=weather, chunk_flights=args.chunk_flights)
+            accumulator.save(checkpoint)
+            logger.info(f"📅 {day} : {len(tracks)} mouvements cumulés")
+    finally:
+        conn.close()
+
+    label = args.label or f"{args.start}_{args.end}"
+    output = grid_path(args.scenario, label, DEFAULT_GRIDS_ROOT)
+    save_grid(output, spec, lden=accumulator.lden().astype('float32'),
+              lnight=accumulator.lnight().astype('float32'))
+    summary = accumulator.summary()
+    logger.info(f"💾 Lden / Lnight écrits dans {output} ({summary['days']} jours, "
+                f"mouvements {summary['movements']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
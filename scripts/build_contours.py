@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Extraction des isophones Lden / Lnight depuis les grilles de bruit
+Projet: Airport Air Quality Modeling
+
+Usage:
+    python scripts/build_contours.py --scenario baseline --date 2025-08-15
+    python scripts/build_contours.py --grid data/grids/baseline/2025-08-15.npz --field lnight \\
+        --thresholds 50 55 60 --bands --load
+
+Sorties : data/contours/<scénario>/<date>_<champ>.geojson (+ .parquet) et,
+avec --load, acoustique.zone_exposition_bruit (source_zone = 'calcul').
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.grids.spec import DEFAULT_GRIDS_ROOT, grid_path, load_grid  # noqa: E402
+from src.noise.contours import (  # noqa: E402
+    DEFAULT_THRESHOLDS, export_geojson, export_geoparquet, extract_contours, load_zones, summarize,
+)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+DB_CONFIG = {
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'port': os.getenv('DB_PORT', '5433'),
+    'database': os.getenv('DB_NAME', 'airport_air_quality'),
+    'user': os.getenv('DB_USER', 'airport_user'),
+    'password': os.getenv('DB_PASSWORD', 'airport_password'),
+}
+
+DEFAULT_CONTOURS_ROOT = PROJECT_ROOT / "data" / "contours"
+
+# Champ de grille -> indicateur de zone_exposition_bruit
+FIELD_INDICATORS = {'lden': 'Lden', 'lnight': 'Lnight'}
+
+
+def load_to_database(contours, spec, airport: str, scenario: str, indicator: str, date_calcul):
+    import psycopg2
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT id_aeroport FROM airport.aeroport WHERE code_iata = %s", (airport,))
+            row = cur.fetchone()
+        if row is None:
+            raise ValueError(f"Aéroport {airport} introuvable")
+        return load_zones(conn, contours, spec, row[0], scenario, [indicator], date_calcul)
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Isophones depuis les grilles de bruit')
+    parser.add_argument('--grid', type=Path, help='Fichier .npz (défaut: data/grids/<scénario>/<date>.npz)')
+    parser.add_argument('--scenario', default='baseline')
+    parser.add_argument('--date', help='Date (ou libellé) de la grille')
+    parser.add_argument('--field', default='lden', choices=sorted(FIELD_INDICATORS))
+    parser.add_argument('--thresholds', type=float, nargs='+', default=list(DEFAULT_THRESHOLDS))
+    parser.add_argument('--bands', action='store_true', help='Bandes [seuil, seuil suivant[ au lieu de zones >= seuil')
+    parser.add_argument('--simplify', type=float, help='Tolérance de simplification (m, défaut: demi-pas)')
+    parser.add_argument('--output', type=Path, default=DEFAULT_CONTOURS_ROOT)
+    parser.add_argument('--no-parquet', action='store_true', help='Ne pas écrire le GeoParquet')
+    parser.add_argument('--load', action='store_true', help='Charger dans acoustique.zone_exposition_bruit')
+    parser.add_argument('--airport', default='PVE', help='Code IATA de l\'aéroport (--load)')
+    args = parser.parse_args()
+
+    if args.grid is None and args.date is None:
+        parser.error('--grid ou --date requis')
+    path = args.grid or grid_path(args.scenario, args.date, DEFAULT_GRIDS_ROOT)
+    label = args.date or path.stem
+
+    spec, arrays = load_grid(path)
+    if args.field not in arrays:
+        parser.error(f"Champ {args.field} absent de {path} ({', '.join(arrays)})")
+
+    start = time.perf_counter()
+    contours = extract_contours(arrays[args.field], spec, args.thresholds,
+                                indicator=FIELD_INDICATORS[args.field], bands=args.bands,
+                                simplify_tolerance=args.simplify)
+    logger.info(f"🗺️ {len(contours)} isophones en {time.perf_counter() - start:.2f}s "
+                f"({spec.nx}×{spec.ny}) : {summarize(contours)}")
+
+    stem = args.output / args.scenario / f"{label}_{args.field}"
+    logger.info(f"💾 {export_geojson(contours, spec, stem.with_suffix('.geojson'))}")
+    if not args.no_parquet:
+        written = export_geoparquet(contours, spec, stem.with_suffix('.parquet'))
+        if written:
+            logger.info(f"💾 {written}")
+
+    if args.load:
+        try:
+            date_calcul = date.fromisoformat(label)
+        except ValueError:  # libellé de période (ex: 2025-01-01_2025-12-31)
+            date_calcul = None
+        load_to_database(contours, spec, args.airport, args.scenario, FIELD_INDICATORS[args.field], date_calcul)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
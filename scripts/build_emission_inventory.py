@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Construction de l'inventaire d'émissions maillé (x, y, tranche de hauteur, heure)
+Projet: Airport Air Quality Modeling
+
+Usage:
+    python scripts/build_emission_inventory.py --start 2025-08-01 --end 2025-09-01
+    python scripts/build_emission_inventory.py --start 2025-01-01 --end 2026-01-01 --label 2025 --into-wind
+    python scripts/build_emission_inventory.py --start 2025-08-14 --end 2025-08-16 --step 100 --half-width 10000
+
+Émissions par vol et phase LTO d'etl.emissions_staging (vols de
+--flights-airport), réparties le long des trajectoires types des pistes de
+--airport (airport.piste, aire de stationnement d'après airport.phase_vol ;
+piste par défaut centrée sur le point de référence si absentes). Avec
+--into-wind, chaque mouvement utilise le QFU face au vent de l'heure
+(etl.weather_staging). Résultat : data/inventory/<libellé>.npz
+(src/dispersion/inventory.py), relu par scripts/run_dispersion.py --inventory.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+import psycopg2
+from dotenv import load_dotenv
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.dispersion.emissions import DEFAULT_POLLUTANTS  # noqa: E402
+from src.dispersion.inventory import (  # noqa: E402
+    DEFAULT_INVENTORY_ROOT, build_inventory, default_apron, default_runways, load_apron, load_lto_emissions,
+    load_runways,
+)
+from src.dispersion.meteo import hourly_weather, load_weather  # noqa: E402
+from src.grids.spec import GridSpec  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+DB_CONFIG = {
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'port': os.getenv('DB_PORT', '5433'),
+    'database': os.getenv('DB_NAME', 'airport_air_quality'),
+    'user': os.getenv('DB_USER', 'airport_user'),
+    'password': os.getenv('DB_PASSWORD', 'airport_password'),
+}
+
+# Point de référence PVE (POINT(2.786 48.881)) en Lambert-93
+AIRPORT_X = 684305.0
+AIRPORT_Y = 6864575.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inventaire d\'émissions maillé')
+    parser.add_argument('--start', type=date.fromisoformat, required=True)
+    parser.add_argument('--end', type=date.fromisoformat, required=True, help='Borne exclue')
+    parser.add_argument('--airport', default='PVE', help='Code IATA des pistes (airport.piste)')
+    parser.add_argument('--flights-airport', default='CDG', help='Code des vols et de la météo (etl.*_staging)')
+    parser.add_argument('--pollutants', nargs='+', default=list(DEFAULT_POLLUTANTS))
+    parser.add_argument('--label', help='Nom de l\'inventaire (défaut: <début>_<fin>)')
+    parser.add_argument('--half-width', type=float, default=20000.0, help='Demi-emprise (m)')
+    parser.add_argument('--step', type=float, default=200.0, help='Pas de grille (m)')
+    parser.add_argument('--into-wind', action='store_true', help='QFU face au vent de l\'heure')
+    args = parser.parse_args()
+
+    label = args.label or f"{args.start}_{args.end}"
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        emissions = load_lto_emissions(conn, args.start, args.end, args.flights_airport, args.pollutants)
+        runways = load_runways(conn, args.airport)
+        apron = load_apron(conn, args.airport)
+        wind = None
+        if args.into_wind:
+            weather = load_weather(conn, args.start, args.end, args.flights_airport)
+            wind = hourly_weather(weather)['wind_direction_deg'] if len(weather) else None
+    finally:
+        conn.close()
+
+    if not runways:
+        logger.warning(f"⚠️ Aucune piste géolocalisée pour {args.airport}, piste par défaut")
+        runways = default_runways(AIRPORT_X, AIRPORT_Y)
+    if apron is None:
+        logger.warning("⚠️ Aucune position de roulage dans phase_vol, aire de stationnement par défaut")
+        apron = default_apron(runways)
+    logger.info(f"🛬 {len(emissions):,} lignes vol × phase, QFU {', '.join(runways)}")
+
+    spec = GridSpec.centered(AIRPORT_X, AIRPORT_Y, args.half_width, args.step)
+    start = time.perf_counter()
+    inventory = build_inventory(emissions, runways, apron, spec, wind_direction=wind, attrs={
+        'debut': str(args.start), 'fin': str(args.end), 'aeroport': args.airport,
+        'aeroport_vols': args.flights_airport, 'face_au_vent': bool(args.into_wind),
+    })
+    output = DEFAULT_INVENTORY_ROOT / f"{label}.npz"
+    inventory.save(output)
+    logger.info(f"✅ Inventaire en {time.perf_counter() - start:.1f}s → {output}")
+
+    kept = inventory.totals()
+    for pollutant, dropped in inventory.attrs['ecarte_kg'].items():
+        total = kept[pollutant] + dropped
+        share = kept[pollutant] / total if total else 0.0
+        logger.info(f"   {pollutant}: {kept[pollutant]:,.1f} kg dans la grille ({share:.0%}), "
+                    f"{dropped:,.1f} kg hors grille ou au-dessus de {inventory.height_edges[-1]:.0f} m")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Génération de la pyramide de tuiles raster des champs sur grille
+Projet: Airport Air Quality Modeling
+
+Usage:
+    python scripts/build_tiles.py --grid data/grids/lden_2025-08-15.npz --field lden \\
+        --scenario baseline --date 2025-08-15
+    python scripts/build_tiles.py --geojson notebooks/outputs/noise/grid_points.geojson \\
+        --property Lden --field lden --scenario notebook --date 2025-08-15
+    python scripts/build_tiles.py --store notebooks/outputs/noise/grid_store --field lden \\
+        --scenario notebook --date scenario_fictif
+    python scripts/build_tiles.py --serve          # servir data/tiles sur http://localhost:8600
+"""
+
+import argparse
+import functools
+import http.server
+import json
+import logging
+import sys
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.grids.memmap_store import GridStore  # noqa: E402
+from src.grids.spec import GridSpec, load_grid  # noqa: E402
+from src.grids.tiles import DEFAULT_TILES_ROOT, build_tile_pyramid  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Point de référence de l'aéroport (airport.aeroport, PVE) pour les grilles locales en km
+AIRPORT_LON = 2.786
+AIRPORT_LAT = 48.881
+
+
+def grid_from_geojson(path: Path, prop: str, origin=(AIRPORT_LON, AIRPORT_LAT)):
+    """Reconstruire une grille régulière depuis les points GeoJSON des notebooks
+
+    Les coordonnées sont des distances en km au point de référence de l'aéroport.
+    """
+    from pyproj import Transformer
+
+    features = json.loads(path.read_text(encoding='utf-8'))['features']
+    coords = np.array([f['geometry']['coordinates'] for f in features], dtype=float)
+    values = np.array([f['properties'][prop] for f in features], dtype=float)
+
+    xs = np.unique(coords[:, 0])
+    ys = np.unique(coords[:, 1])
+    step_km = float(np.min(np.diff(xs)))
+
+    ox, oy = Transformer.from_crs("EPSG:4326", "EPSG:2154", always_xy=True).transform(*origin)
+    spec = GridSpec.from_bbox(ox + xs[0] * 1000, oy + ys[0] * 1000,
+                              ox + xs[-1] * 1000, oy + ys[-1] * 1000, step_km * 1000)
+
+    grid = np.full(spec.shape, np.nan)
+    ix = np.rint((coords[:, 0] - xs[0]) / step_km).astype(int)
+    iy = np.rint((coords[:, 1] - ys[0]) / step_km).astype(int)
+    grid[iy, ix] = values
+    return spec, grid
+
+
+def serve(root: Path, port: int):
+    """Servir le répertoire de tuiles en HTTP (développement local)"""
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(root))
+    with http.server.ThreadingHTTPServer(("", port), handler) as httpd:
+        logger.info(f"🌐 Tuiles servies sur http://localhost:{port}/ depuis {root}")
+        httpd.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pyramide de tuiles des champs sur grille')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--grid', type=Path, help='Fichier .npz écrit par src.grids.spec.save_grid')
+    source.add_argument('--geojson', type=Path, help='Points de grille GeoJSON (sorties des notebooks)')
+    source.add_argument('--store', type=Path, help='Magasin de grilles mappé (src.grids.memmap_store)')
+    parser.add_argument('--property', default='Lden', help='Propriété GeoJSON à tuiler')
+    parser.add_argument('--field', default='lden', help='Champ à tuiler (lden, lnight, nox)')
+    parser.add_argument('--array', help='Nom du tableau dans le .npz ou le magasin (défaut: --field)')
+    parser.add_argument('--scenario', default='baseline')
+    parser.add_argument('--date', default='latest')
+    parser.add_argument('--zoom', type=int, nargs=2, default=[10, 15], metavar=('MIN', 'MAX'))
+    parser.add_argument('--root', type=Path, default=DEFAULT_TILES_ROOT)
+    parser.add_argument('--force', action='store_true', help='Ignorer le cache')
+    parser.add_argument('--serve', action='store_true', help='Servir les tuiles en HTTP')
+    parser.add_argument('--port', type=int, default=8600)
+    args = parser.parse_args()
+
+    if args.grid:
+        spec, arrays = load_grid(args.grid)
+        name = args.array or args.field
+        if name not in arrays:
+            logger.error(f"❌ Tableau '{name}' absent de {args.grid} (disponibles: {', '.join(arrays)})")
+            return 1
+        values = arrays[name]
+    elif args.geojson:
+        spec, values = grid_from_geojson(args.geojson, args.property)
+    elif args.store:
+        store = GridStore.open(args.store)
+        name = args.array or args.field
+        if name not in store.fields:
+            logger.error(f"❌ Champ '{name}' absent de {args.store} (disponibles: {', '.join(store.fields)})")
+            return 1
+        # Pas de temps --date s'il existe, sinon le dernier ajouté
+        time_step = args.date if args.date in store.times else -1
+        spec, values = store.spec, store.array(name)[store.time_index(time_step)]
+    elif not args.serve:
+        parser.print_help()
+        return 1
+
+    if args.grid or args.geojson or args.store:
+        metadata = build_tile_pyramid(values, spec, args.scenario, args.date, args.field,
+                                      root=args.root, zooms=tuple(args.zoom), force=args.force)
+        logger.info(f"📊 {metadata['n_tiles']} tuiles, zooms {metadata['min_zoom']}-{metadata['max_zoom']}")
+
+    if args.serve:
+        serve(args.root, args.port)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
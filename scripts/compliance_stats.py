@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Statistiques de conformité annuelles aux stations ou sur les grilles de dispersion
+Projet: Airport Air Quality Modeling
+
+Usage:
+    python scripts/compliance_stats.py --stations --start 2025-01-01 --end 2026-01-01 --label 2025
+    python scripts/compliance_stats.py --store data/grids/dispersion/2025 --label modele_2025
+    python scripts/compliance_stats.py --stations --start 2025-01-01 --end 2026-01-01 --label 2025 --restart
+
+Les valeurs horaires (moyennes horaires de air_quality.mesure_qualite_air
+avec --stations, grilles du magasin de scripts/run_dispersion.py avec
+--store) mettent à jour les statistiques de src/dispersion/compliance.py
+mois par mois (stations) ou jour par jour (grilles). L'état est sauvegardé
+après chaque tranche dans data/compliance/<libellé>/checkpoint.npz : une
+exécution interrompue ou relancée sur une période prolongée reprend après
+la dernière heure cumulée. Indicateurs : data/compliance/<libellé>/stations.csv
+ou data/grids/compliance/<libellé>.npz (une grille par polluant et indicateur).
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import psycopg2
+from dotenv import load_dotenv
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.dispersion.compliance import ComplianceAccumulator, limits_for  # noqa: E402
+from src.grids.memmap_store import GridStore  # noqa: E402
+from src.grids.spec import DEFAULT_GRIDS_ROOT, save_grid  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+DB_CONFIG = {
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'port': os.getenv('DB_PORT', '5433'),
+    'database': os.getenv('DB_NAME', 'airport_air_quality'),
+    'user': os.getenv('DB_USER', 'airport_user'),
+    'password': os.getenv('DB_PASSWORD', 'airport_password'),
+}
+
+DEFAULT_COMPLIANCE_ROOT = PROJECT_ROOT / "data" / "compliance"
+
+STATION_POLLUTANTS = ('NO2', 'PM10', 'PM2.5')
+
+STATIONS_QUERY = """
+    SELECT id_station::text AS id_station, nom_station
+    FROM air_quality.station_mesure
+    ORDER BY id_station
+"""
+
+# Moyennes horaires des mesures valides (élagage des partitions mensuelles sur timestamp_mesure)
+HOURLY_MEASURES_QUERY = """
+    SELECT date_trunc('hour', timestamp_mesure) AS heure, id_station::text AS id_station, polluant,
+           AVG(valeur_mesure)::float8 AS valeur
+    FROM air_quality.mesure_qualite_air
+    WHERE timestamp_mesure >= %(start)s AND timestamp_mesure < %(end)s
+      AND polluant = ANY(%(pollutants)s) AND unite_mesure = 'µg/m³'
+      AND qualite_donnee <> 'Invalide'
+    GROUP BY 1, 2, 3
+"""
+
+
+def resume_start(accumulator: ComplianceAccumulator, start: pd.Timestamp) -> pd.Timestamp:
+    last = accumulator.last_hour
+    return start if last is None else max(start, last + pd.Timedelta(hours=1))
+
+
+def accumulate_stations(args, checkpoint: Path) -> ComplianceAccumulator:
+    pollutants = args.pollutants or list(STATION_POLLUTANTS)
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        stations = pd.read_sql_query(STATIONS_QUERY, conn)
+        accumulator = ComplianceAccumulator.resume(checkpoint, stations['id_station'].tolist(), pollutants)
+        end = pd.Timestamp(args.end)
+        month = resume_start(accumulator, pd.Timestamp(args.start))
+        while month < end:
+            month_end = min(month.to_period('M').end_time.floor('D') + pd.Timedelta(days=1), end)
+            frame = pd.read_sql_query(HOURLY_MEASURES_QUERY, conn, params={
+                'start': month.to_pydatetime(), 'end': month_end.to_pydatetime(), 'pollutants': pollutants,
+            }, parse_dates=['heure'])
+            accumulator.add_frame(frame)
+            accumulator.save(checkpoint)
+            logger.info(f"📅 {month:%Y-%m} : {len(frame):,} moyennes horaires cumulées")
+            month = month_end
+    finally:
+        conn.close()
+    return accumulator
+
+
+def accumulate_store(args, checkpoint: Path) -> ComplianceAccumulator:
+    store = GridStore.open(args.store)
+    pollutants = [p for p in (args.pollutants or list(store.fields)) if p in store.fields and limits_for(p)]
+    if not pollutants:
+        raise ValueError(f"Aucun champ de {store.path} soumis à une valeur limite")
+    accumulator = ComplianceAccumulator.resume(checkpoint, store.spec, pollutants)
+    hours = pd.DatetimeIndex(pd.to_datetime(store.times))
+    start = resume_start(accumulator, pd.Timestamp(args.start) if args.start else hours[0])
+    end = pd.Timestamp(args.end) if args.end else hours[-1] + pd.Timedelta(hours=1)
+    indices = np.flatnonzero((hours >= start) & (hours < end))
+    arrays = {p: store.array(p) for p in pollutants}
+    days = hours[indices].floor('D')
+    for day in days.unique():
+        block = indices[days == day]
+        for pollutant in pollutants:
+            accumulator.add(pollutant, hours[block], np.asarray(arrays[pollutant][block], dtype=np.float32))
+        if day.day == 1 or day == days[-1]:
+            accumulator.save(checkpoint)
+            logger.info(f"📅 Grilles cumulées jusqu'au {day:%Y-%m-%d}")
+    return accumulator
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Statistiques de conformité (valeurs limites)')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--stations', action='store_true', help='Mesures de air_quality.mesure_qualite_air')
+    source.add_argument('--store', type=Path, help='Magasin de grilles horaires (scripts/run_dispersion.py)')
+    parser.add_argument('--start', type=date.fromisoformat, help='Début (requis avec --stations)')
+    parser.add_argument('--end', type=date.fromisoformat, help='Borne exclue (requis avec --stations)')
+    parser.add_argument('--pollutants', nargs='+', help='Défaut : NO2, PM10, PM2.5 ou champs du magasin')
+    parser.add_argument('--label', required=True, help='Nom du cumul (point de reprise et résultats)')
+    parser.add_argument('--restart', action='store_true', help='Ignorer le point de reprise existant')
+    args = parser.parse_args()
+    if args.stations and not (args.start and args.end):
+        parser.error("--stations requiert --start et --end")
+
+    checkpoint = DEFAULT_COMPLIANCE_ROOT / args.label / "checkpoint.npz"
+    if args.restart and checkpoint.exists():
+        checkpoint.unlink()
+    start = time.perf_counter()
+    accumulator = accumulate_stations(args, checkpoint) if args.stations else accumulate_store(args, checkpoint)
+    logger.info(f"✅ Cumul jusqu'à {accumulator.last_hour} en {time.perf_counter() - start:.1f}s "
+                f"({accumulator.summary()})")
+
+    if accumulator.spec is None:
+        output = DEFAULT_COMPLIANCE_ROOT / args.label / "stations.csv"
+        frame = accumulator.to_frame()
+        output.parent.mkdir(parents=True, exist_ok=True)
+        frame.to_csv(output, index=False)
+        columns = [c for c in frame.columns if c.startswith('conforme_')]
+        failing = frame[~frame[columns].fillna(True).astype(bool).all(axis=1)]
+        logger.info(f"💾 Indicateurs de {len(frame)} stations × polluants → {output}, "
+                    f"{len(failing)} non conformes ou sans données")
+    else:
+        output = DEFAULT_GRIDS_ROOT / 'compliance' / f"{args.label}.npz"
+        grids = {}
+        for pollutant in accumulator.stats:
+            for name, values in accumulator.indicators(pollutant).items():
+                grids[f"{pollutant}_{name}"] = values.astype(np.float32)
+        save_grid(output, accumulator.spec, **grids)
+        for pollutant in accumulator.stats:
+            flags = [name for name in grids if name.startswith(f"{pollutant}_conforme_")]
+            failing = sum(int((grids[name] == 0).sum()) for name in flags)
+            logger.info(f"   {pollutant} : {failing:,} cellules × valeurs limites non conformes")
+        logger.info(f"💾 {len(grids)} grilles d'indicateurs → {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Corrélation des événements sonores mesurés avec les vols
+Projet: Airport Air Quality Modeling
+
+Usage:
+    python scripts/correlate_noise_events.py --start 2025-08-01 --end 2025-09-01
+    python scripts/correlate_noise_events.py --start 2025-08-15 --end 2025-08-16 --tolerance 90 --dry-run
+
+Renseigne id_vol_correlé, correlation_certitude, distance_estimee_m et
+azimut_source_deg de acoustique.mesure_bruit pour les événements de la
+période [start, end[ (cf. src/noise/correlation.py).
+"""
+
+import argparse
+import logging
+import os
+import sys
+from datetime import date
+from pathlib import Path
+
+import psycopg2
+from dotenv import load_dotenv
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.noise.correlation import (  # noqa: E402
+    DEFAULT_CUTOFF_M, DEFAULT_TOLERANCE_S, MIN_CERTITUDE, correlate_period,
+)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+DB_CONFIG = {
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'port': os.getenv('DB_PORT', '5433'),
+    'database': os.getenv('DB_NAME', 'airport_air_quality'),
+    'user': os.getenv('DB_USER', 'airport_user'),
+    'password': os.getenv('DB_PASSWORD', 'airport_password'),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Corrélation événements sonores / vols')
+    parser.add_argument('--start', type=date.fromisoformat, required=True)
+    parser.add_argument('--end', type=date.fromisoformat, required=True, help='Borne exclue')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE_S, help='Fenêtre horaire (s)')
+    parser.add_argument('--cutoff', type=float, default=DEFAULT_CUTOFF_M, help='Distance maximale au vol (m)')
+    parser.add_argument('--min-certitude', type=float, default=MIN_CERTITUDE)
+    parser.add_argument('--dry-run', action='store_true', help='Calculer sans écrire en base')
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        matches = correlate_period(conn, args.start, args.end, tolerance_s=args.tolerance,
+                                   cutoff_m=args.cutoff, min_certitude=args.min_certitude,
+                                   write=not args.dry_run)
+    finally:
+        conn.close()
+    if not matches.empty:
+        logger.info(f"📊 Certitude médiane {matches['certitude'].median():.2f}, "
+                    f"distance médiane {matches['distance_m'].median():.0f} m")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,10 +8,18 @@ import pandas as pd
 import numpy as np
 import psycopg2
 from sqlalchemy import create_engine, text
+import json
 import logging
 from datetime import datetime, timedelta
+import os
 import random
+import sys
 import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.monitoring import metrics  # noqa: E402
 
 # Configuration logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -28,6 +36,9 @@ DB_CONFIG = {
 
 DATABASE_URL = f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}"
 
+# Canal écouté par le mode live du dashboard opérationnel (dashboards/streamlit/live_feed.py)
+NOTIFY_CHANNEL = 'etl_changes'
+
 class SimpleETLPipeline:
     """Pipeline ETL simplifié sans suppressions problématiques"""
     
@@ -155,6 +166,23 @@ class SimpleETLPipeline:
             logger.error(f"❌ Erreur création tables: {e}")
             return False
     
+    def notify_change(self, table, records=0, action='insert'):
+        """Notifier les écouteurs (LISTEN) qu'une table de staging a changé"""
+        payload = json.dumps({
+            'table': table,
+            'action': action,
+            'records': int(records),
+            'at': datetime.now().isoformat(timespec='seconds')
+        })
+        try:
+            with self.engine.connect() as conn:
+                conn.execute(text("SELECT pg_notify(:channel, :payload)"),
+                             {'channel': NOTIFY_CHANNEL, 'payload': payload})
+                conn.commit()
+        except Exception as e:
+            # Une notification perdue ne doit pas faire échouer le pipeline
+            logger.warning(f"⚠️ Notification {table} non envoyée: {e}")
+    
     def clear_staging_data(self):
         """Vider les données de staging pour nouvelle exécution"""
         logger.info("🧹 NETTOYAGE - Données staging")
@@ -167,6 +195,8 @@ class SimpleETLPipeline:
                 conn.execute(text("TRUNCATE TABLE etl.weather_staging"))
                 conn.commit()
                 
+                self.notify_change('emissions_staging', action='reset')
+                
                 logger.info("✅ Données staging nettoyées")
                 return True
                 
@@ -222,6 +252,7 @@ class SimpleETLPipeline:
             df_flights.to_sql('flights_staging', self.engine, schema='etl', 
                             if_exists='append', index=False, method='multi', chunksize=100)
             
+            self.notify_change('flights_staging', len(df_flights))
             logger.info(f"✅ {len(flights_data)} vols insérés")
             return df_flights
             
@@ -273,6 +304,7 @@ class SimpleETLPipeline:
             df_emissions.to_sql('emissions_staging', self.engine, schema='etl', 
                               if_exists='append', index=False, method='multi', chunksize=500)
             
+            self.notify_change('emissions_staging', len(df_emissions))
             logger.info(f"✅ {len(emissions_data)} calculs d'émissions effectués")
             return df_emissions
             
@@ -307,6 +339,7 @@ class SimpleETLPipeline:
             df_weather.to_sql('weather_staging', self.engine, schema='etl', 
                             if_exists='append', index=False, method='multi', chunksize=200)
             
+            self.notify_change('weather_staging', len(df_weather))
             logger.info(f"✅ {len(weather_data)} observations météo générées")
             return df_weather
             
@@ -366,31 +399,41 @@ Pipeline robuste évitant les conflits de contraintes
                 return False
             
             # 3. Nettoyage données
-            if not self.clear_staging_data():
+            with metrics.etl_stage('clear_staging'):
+                cleared = self.clear_staging_data()
+            if not cleared:
                 return False
             
             # 4. Génération vols
-            flights_df = self.generate_flights(1000)
+            with metrics.etl_stage('flights') as stage:
+                flights_df = self.generate_flights(1000)
+                stage.rows = 0 if flights_df is None else len(flights_df)
             if flights_df is None:
                 return False
             
             # 5. Calcul émissions
-            emissions_df = self.calculate_emissions(flights_df)
+            with metrics.etl_stage('emissions') as stage:
+                emissions_df = self.calculate_emissions(flights_df)
+                stage.rows = 0 if emissions_df is None else len(emissions_df)
             if emissions_df is None:
                 return False
             
             # 6. Génération météo
-            weather_df = self.generate_weather(720)
+            with metrics.etl_stage('weather') as stage:
+                weather_df = self.generate_weather(720)
+                stage.rows = 0 if weather_df is None else len(weather_df)
             if weather_df is None:
                 return False
             
             # 7. Validation
-            results = self.validate_results()
+            with metrics.etl_stage('validation'):
+                results = self.validate_results()
             if results is None:
                 return False
             
             # 8. Rapport final
             duration = time.time() - start_time
+            metrics.observe_pool(self.engine.pool, 'etl')
             
             print(f"""
 🎉 PIPELINE ETL TERMINÉ AVEC SUCCÈS!
@@ -431,8 +474,14 @@ Votre base de données contient maintenant:
 def main():
     print("🚀 Démarrage pipeline ETL simplifié...")
     
+    # Traitement batch : /metrics seulement si METRICS_PORT est défini,
+    # envoi vers la Pushgateway en fin d'exécution si PROMETHEUS_PUSHGATEWAY l'est
+    if os.getenv('METRICS_PORT'):
+        metrics.start_metrics_server()
+    
     pipeline = SimpleETLPipeline()
     success = pipeline.run_pipeline()
+    metrics.push_metrics('etl_pipeline')
     
     if success:
         print("\n🎉 PIPELINE RÉUSSI - Projet prêt pour démonstration!")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ingestion des fichiers des stations de mesure du bruit (LAeq 1 s)
+Projet: Airport Air Quality Modeling
+
+Usage:
+    python scripts/ingest_noise_monitors.py data/monitors/2025-08-15/*.csv
+    python scripts/ingest_noise_monitors.py flux.ndjson --airport PVE --min-duration 8
+    python scripts/ingest_noise_monitors.py data/monitors/*.csv --dry-run
+
+Colonnes attendues : code_station, timestamp, laeq_dba (cf.
+src/noise/monitor_ingest.py). Événements chargés dans acoustique.mesure_bruit
+(source MONITEUR_1S, remplacés en cas de relance), séries brutes dans
+acoustique.serie_bruit_horaire (migration V008). Les fichiers d'une même
+station sont traités dans l'ordre des noms (chronologique) comme un seul flux.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+import psycopg2
+from dotenv import load_dotenv
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.noise.monitor_ingest import (  # noqa: E402
+    CHUNK_ROWS, MAX_GAP_S, MIN_EVENT_DURATION_S, MonitorIngester, ingest_file, load_stations, write_batch,
+)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+DB_CONFIG = {
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'port': os.getenv('DB_PORT', '5433'),
+    'database': os.getenv('DB_NAME', 'airport_air_quality'),
+    'user': os.getenv('DB_USER', 'airport_user'),
+    'password': os.getenv('DB_PASSWORD', 'airport_password'),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ingestion des stations de mesure du bruit')
+    parser.add_argument('files', nargs='+', type=Path, help='Fichiers CSV ou NDJSON')
+    parser.add_argument('--airport', help='Code IATA (codes de station propres à un aéroport)')
+    parser.add_argument('--min-duration', type=int, default=MIN_EVENT_DURATION_S, help='Durée minimale (s)')
+    parser.add_argument('--max-gap', type=int, default=MAX_GAP_S, help='Creux toléré dans un événement (s)')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--dry-run', action='store_true', help='Détecter sans écrire en base')
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        stations = load_stations(conn, args.airport)
+        logger.info(f"🎙️ {len(stations)} stations en service")
+        ingester = MonitorIngester(stations, args.min_duration, args.max_gap)
+        start = time.perf_counter()
+        for path in sorted(args.files):
+            ingest_file(conn, path, ingester, args.chunk_rows, write=not args.dry_run, flush=False)
+            logger.info(f"📄 {path.name} : {ingester.stats.samples:,} échantillons cumulés")
+        batch = ingester.flush()
+        if not args.dry_run:
+            write_batch(conn, batch)
+    finally:
+        conn.close()
+
+    stats = ingester.stats
+    elapsed = time.perf_counter() - start
+    logger.info(f"✅ {stats.samples:,} échantillons en {elapsed:.1f}s ({stats.samples / max(elapsed, 1e-9):,.0f}/s), "
+                f"{stats.events:,} événements, {stats.hours:,} heures brutes")
+    if stats.duplicates or stats.invalid or stats.background:
+        logger.warning(f"⚠️ {stats.duplicates:,} doublons, {stats.invalid:,} niveaux invalides, "
+                       f"{stats.background:,} dépassements continus ignorés")
+    for code, n in stats.unknown.items():
+        logger.warning(f"⚠️ Station inconnue {code} : {n:,} échantillons ignorés")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
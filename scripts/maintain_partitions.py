@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Maintenance des partitions mensuelles des mesures (migration V007)
+Projet: Airport Air Quality Modeling
+
+Usage:
+    python scripts/maintain_partitions.py                  # partitions anticipées + rétention
+    python scripts/maintain_partitions.py --dry-run        # actions listées sans être exécutées
+    python scripts/maintain_partitions.py --backfill 2023-01-01 2024-12-31
+    python scripts/maintain_partitions.py --explain        # élagage des partitions (EXPLAIN)
+
+À planifier chaque jour (cron) lorsque pg_cron n'est pas installé : les
+partitions des mois à venir existent toujours avant l'arrivée des mesures, les
+partitions entièrement antérieures à la rétention de
+public.partition_mensuelle_config sont supprimées (DROP TABLE, sans DELETE).
+"""
+
+import argparse
+import logging
+import os
+import sys
+from datetime import date, timedelta
+
+import psycopg2
+from dotenv import load_dotenv
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+DB_CONFIG = {
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'port': os.getenv('DB_PORT', '5433'),
+    'database': os.getenv('DB_NAME', 'airport_air_quality'),
+    'user': os.getenv('DB_USER', 'airport_user'),
+    'password': os.getenv('DB_PASSWORD', 'airport_password'),
+}
+
+# Requêtes bornées sur timestamp_mesure : seules les partitions du jour sont lues
+EXPLAIN_QUERIES = {
+    'acoustique.mesure_bruit': """
+        SELECT id_station_bruit, COUNT(*), MAX(lamax_dba)
+        FROM acoustique.mesure_bruit
+        WHERE timestamp_mesure >= %(start)s AND timestamp_mesure < %(end)s
+        GROUP BY id_station_bruit
+    """,
+    'air_quality.mesure_qualite_air': """
+        SELECT id_station, polluant, AVG(valeur_mesure)
+        FROM air_quality.mesure_qualite_air
+        WHERE timestamp_mesure >= %(start)s AND timestamp_mesure < %(end)s
+        GROUP BY id_station, polluant
+    """,
+}
+
+
+def maintain(conn, dry_run: bool = False) -> list:
+    """Création anticipée et rétention pour toutes les tables configurées"""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT table_parent::text, action, partition FROM public.maintenir_partitions_mensuelles(%s)",
+                       (dry_run,))
+        actions = cursor.fetchall()
+    conn.commit()
+    return actions
+
+
+def backfill(conn, start: date, end: date) -> dict:
+    """Partitions d'une période passée, avant une reprise d'historique"""
+    created = {}
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT table_parent::text FROM public.partition_mensuelle_config ORDER BY 1")
+        for (table,) in cursor.fetchall():
+            cursor.execute("SELECT public.creer_partitions_mensuelles(%s::regclass, %s, %s)", (table, start, end))
+            created[table] = cursor.fetchone()[0]
+    conn.commit()
+    return created
+
+
+def explain(conn, day: date) -> dict:
+    """Plans des requêtes d'exemple sur une journée (partitions lues)"""
+    plans = {}
+    with conn.cursor() as cursor:
+        for table, query in EXPLAIN_QUERIES.items():
+            cursor.execute("EXPLAIN " + query, {'start': day, 'end': day + timedelta(days=1)})
+            plans[table] = [row[0] for row in cursor.fetchall()]
+    conn.rollback()
+    return plans
+
+
+def partition_summary(conn) -> list:
+    """Nombre de partitions, bornes et taille par table"""
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT c.table_parent::text, c.retention::text, COUNT(p.partition),
+                   MIN(p.debut), MAX(p.fin),
+                   pg_size_pretty(COALESCE(SUM(pg_total_relation_size(p.partition)), 0))
+            FROM public.partition_mensuelle_config c
+            LEFT JOIN LATERAL public.partitions_mensuelles(c.table_parent) p ON TRUE
+            GROUP BY c.table_parent, c.retention
+            ORDER BY 1
+        """)
+        return cursor.fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Maintenance des partitions mensuelles')
+    parser.add_argument('--dry-run', action='store_true', help='Lister les actions sans les exécuter')
+    parser.add_argument('--backfill', nargs=2, type=date.fromisoformat, metavar=('START', 'END'),
+                        help="Créer les partitions d'une période passée")
+    parser.add_argument('--explain', action='store_true', help="Afficher l'élagage des partitions")
+    parser.add_argument('--date', type=date.fromisoformat, default=date.today(),
+                        help='Journée des requêtes --explain')
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        if args.backfill:
+            for table, n in backfill(conn, *args.backfill).items():
+                logger.info(f"📅 {table}: {n} partition(s) créée(s) sur {args.backfill[0]} → {args.backfill[1]}")
+
+        actions = maintain(conn, args.dry_run)
+        prefix = "🔎 (simulation) " if args.dry_run else ""
+        for table, action, partition in actions:
+            icon = "🆕" if action == 'creation' else "🗑️"
+            logger.info(f"{prefix}{icon} {table}: {action} {partition}")
+        if not actions:
+            logger.info("✅ Partitions à jour")
+
+        for table, retention, n, first, last, size in partition_summary(conn):
+            logger.info(f"📦 {table}: {n} partitions [{first} → {last}[, {size}, rétention {retention or 'illimitée'}")
+
+        if args.explain:
+            for table, plan in explain(conn, args.date).items():
+                print(f"\n🔍 {table} ({args.date})")
+                print("\n".join(plan))
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Scénarios de bruit par superposition d'empreintes unitaires (répartition des pistes, flotte)
+Projet: Airport Air Quality Modeling
+
+Usage:
+    # Trafic réel d'une journée -> mouvements du scénario de référence (CSV modifiable)
+    python scripts/noise_scenario.py --date 2025-08-15 --export-movements data/scenarios/reference.csv
+    # Scénario modifié : Lden / Lnight en quelques millisecondes une fois le cache rempli
+    python scripts/noise_scenario.py --movements data/scenarios/piste_sud.csv --scenario piste_sud
+    # Empreintes des vols réels dans acoustique.empreinte_acoustique_calculee
+    python scripts/noise_scenario.py --date 2025-08-15 --store-flights
+
+CSV des mouvements : aircraft, procedure, runway, period (day/evening/night), count.
+Empreintes en cache dans data/noise/footprints/<grille>/, grilles écrites dans
+data/grids/<scénario>/<libellé>.npz (tuiles, isophones).
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+import psycopg2
+from dotenv import load_dotenv
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.grids.spec import DEFAULT_GRIDS_ROOT, GridSpec, grid_path, save_grid  # noqa: E402
+from src.noise.engine import PROFILES_QUERY, profiles_from_frame  # noqa: E402
+from src.noise.footprint_cache import (  # noqa: E402
+    DEFAULT_CACHE_ROOT, FLIGHT_FOOTPRINTS_QUERY, RUNWAYS_QUERY, FootprintCache, FootprintKey, Movement,
+    flight_keys, movements_from_flights, runways_from_frame, scenario_levels, store_flight_footprints,
+)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+DB_CONFIG = {
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'port': os.getenv('DB_PORT', '5433'),
+    'database': os.getenv('DB_NAME', 'airport_air_quality'),
+    'user': os.getenv('DB_USER', 'airport_user'),
+    'password': os.getenv('DB_PASSWORD', 'airport_password'),
+}
+
+# Point de référence PVE (POINT(2.786 48.881)) en Lambert-93
+AIRPORT_X = 684305.0
+AIRPORT_Y = 6864575.0
+
+MOVEMENT_COLUMNS = ['aircraft', 'procedure', 'runway', 'period', 'count']
+
+
+def read_movements(path: Path):
+    frame = pd.read_csv(path)
+    missing = set(MOVEMENT_COLUMNS) - set(frame.columns)
+    if missing:
+        raise ValueError(f"Colonnes manquantes dans {path}: {sorted(missing)}")
+    return [Movement(FootprintKey(str(r['aircraft']), str(r['procedure']), str(r['runway'])),
+                     str(r['period']), float(r['count']))
+            for r in frame.to_dict('records')]
+
+
+def write_movements(movements, path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame([
+        {'aircraft': m.key.aircraft, 'procedure': m.key.procedure, 'runway': m.key.runway,
+         'period': m.period, 'count': m.count}
+        for m in movements
+    ], columns=MOVEMENT_COLUMNS).to_csv(path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scénarios de bruit par empreintes unitaires')
+    parser.add_argument('--movements', type=Path, help='CSV des mouvements du scénario')
+    parser.add_argument('--date', help='Journée de trafic réel (AAAA-MM-JJ)')
+    parser.add_argument('--export-movements', type=Path, help='Écrire les mouvements de --date en CSV')
+    parser.add_argument('--store-flights', action='store_true',
+                        help='Alimenter empreinte_acoustique_calculee pour les vols de --date')
+    parser.add_argument('--replace', action='store_true', help='Réécrire les empreintes déjà chargées')
+    parser.add_argument('--scenario', default='baseline')
+    parser.add_argument('--label', help='Nom de la grille produite (défaut: --date ou nom du CSV)')
+    parser.add_argument('--n-days', type=int, default=1, help='Jours couverts par les mouvements')
+    parser.add_argument('--airport', default='PVE', help='Code IATA de l\'aéroport')
+    parser.add_argument('--half-width', type=float, default=10000.0, help='Demi-emprise (m)')
+    parser.add_argument('--step', type=float, default=100.0, help='Pas de grille (m)')
+    parser.add_argument('--cache', type=Path, default=DEFAULT_CACHE_ROOT)
+    parser.add_argument('--temperature', type=float, default=15.0)
+    parser.add_argument('--humidity', type=float, default=70.0)
+    args = parser.parse_args()
+
+    if args.movements is None and args.date is None:
+        parser.error('--movements ou --date requis')
+    if (args.store_flights or args.export_movements) and args.date is None:
+        parser.error('--store-flights et --export-movements requièrent --date')
+
+    spec = GridSpec.centered(AIRPORT_X, AIRPORT_Y, args.half_width, args.step)
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        profiles = profiles_from_frame(pd.read_sql_query(PROFILES_QUERY, conn))
+        runways = runways_from_frame(pd.read_sql_query(RUNWAYS_QUERY, conn, params={'airport': args.airport}))
+        logger.info(f"✅ {len(profiles)} profils acoustiques, pistes {', '.join(sorted(runways))}")
+        cache = FootprintCache(spec, profiles, runways, root=args.cache,
+                               weather={'temperature': args.temperature, 'humidite': args.humidity})
+
+        flights = {}
+        if args.date:
+            frame = pd.read_sql_query(FLIGHT_FOOTPRINTS_QUERY, conn, params={'date': args.date})
+            flights = flight_keys(frame)
+            logger.info(f"📅 {args.date} : {len(flights)} mouvements avec piste renseignée")
+            if args.store_flights:
+                store_flight_footprints(conn, cache, {flight_id: key for flight_id, (key, _) in flights.items()},
+                                        replace=args.replace)
+    finally:
+        conn.close()
+
+    movements = read_movements(args.movements) if args.movements else movements_from_flights(flights)
+    if args.export_movements:
+        write_movements(movements_from_flights(flights), args.export_movements)
+        logger.info(f"💾 Mouvements de référence écrits dans {args.export_movements}")
+
+    cache.get_many(m.key for m in movements)  # remplissage du cache, hors chronométrage
+    start = time.perf_counter()
+    levels = scenario_levels(cache, movements, args.n_days)
+    logger.info(f"⚡ Scénario {args.scenario} : {len(movements)} groupes de mouvements superposés "
+                f"en {(time.perf_counter() - start) * 1000:.1f} ms | cache {cache.stats()}")
+
+    label = args.label or args.date or args.movements.stem
+    output = grid_path(args.scenario, label, DEFAULT_GRIDS_ROOT)
+    save_grid(output, spec, lden=levels['lden'].astype('float32'), lnight=levels['lnight'].astype('float32'))
+    logger.info(f"💾 Lden / Lnight écrits dans {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
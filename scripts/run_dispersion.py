@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dispersion horaire des émissions aéroportuaires (panache gaussien)
+Projet: Airport Air Quality Modeling
+
+Usage:
+    python scripts/run_dispersion.py --start 2025-08-01 --end 2025-09-01
+    python scripts/run_dispersion.py --start 2025-08-14 --end 2025-08-16 --step 50 --pollutants NOx
+    python scripts/run_dispersion.py --start 2025-08-01 --end 2025-09-01 --label aout --overwrite
+    python scripts/run_dispersion.py --start 2024-01-01 --end 2025-01-01 --long-term --label 2024
+    python scripts/run_dispersion.py --start 2025-08-01 --end 2025-09-01 --inventory data/inventory/2025-08.npz
+
+Météo horaire d'etl.weather_staging (src/dispersion/meteo.py), émissions LTO
+d'etl.emissions_staging rattachées à l'heure de départ / d'arrivée
+(src/dispersion/emissions.py), réparties sur la piste par défaut, ou
+sources de l'inventaire maillé (--inventory, scripts/build_emission_inventory.py,
+cellules regroupées par blocs de --coarsen mailles). Une grille
+par heure et par polluant est écrite dans le magasin
+data/grids/dispersion/<libellé>/ (src/grids/memmap_store.py), les séries aux
+stations de air_quality.station_mesure dans data/processed/.
+
+Avec --long-term, seules les moyennes de la période sont calculées, par
+somme des noyaux unitaires par classe météo (src/dispersion/kernel_cache.py,
+cache dans data/dispersion/kernels/) : data/grids/dispersion/<libellé>.npz.
+Les sources forment alors un seul groupe dont la répartition spatiale est
+celle du total de la période.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import psycopg2
+from dotenv import load_dotenv
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.dispersion.emissions import (  # noqa: E402
+    DEFAULT_POLLUTANTS, load_hourly_emissions, runway_sources, spread_rates,
+)
+from src.dispersion.inventory import EmissionInventory  # noqa: E402
+from src.dispersion.kernel_cache import KernelCache, MetBinning, SourceGroup, long_term_means  # noqa: E402
+from src.dispersion.meteo import hourly_weather, load_weather  # noqa: E402
+from src.dispersion.plume import PlumeSources, class_summary, hourly_runs  # noqa: E402
+from src.grids.spec import DEFAULT_GRIDS_ROOT, GridSpec, save_grid  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+DB_CONFIG = {
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'port': os.getenv('DB_PORT', '5433'),
+    'database': os.getenv('DB_NAME', 'airport_air_quality'),
+    'user': os.getenv('DB_USER', 'airport_user'),
+    'password': os.getenv('DB_PASSWORD', 'airport_password'),
+}
+
+# Point de référence PVE (POINT(2.786 48.881)) en Lambert-93
+AIRPORT_X = 684305.0
+AIRPORT_Y = 6864575.0
+
+STATIONS_QUERY = """
+    SELECT id_station::text AS id_station, nom_station,
+           ST_X(ST_Transform(coordonnees_gps, 2154)) AS x, ST_Y(ST_Transform(coordonnees_gps, 2154)) AS y
+    FROM air_quality.station_mesure
+    WHERE statut_operationnel
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Dispersion horaire des émissions (panache gaussien)')
+    parser.add_argument('--start', type=date.fromisoformat, required=True)
+    parser.add_argument('--end', type=date.fromisoformat, required=True, help='Borne exclue')
+    parser.add_argument('--weather-airport', default='CDG', help='Code de la météo et des vols (weather_staging)')
+    parser.add_argument('--pollutants', nargs='+', default=list(DEFAULT_POLLUTANTS))
+    parser.add_argument('--label', help='Nom du magasin (défaut: <début>_<fin>)')
+    parser.add_argument('--half-width', type=float, default=10000.0, help='Demi-emprise (m)')
+    parser.add_argument('--step', type=float, default=100.0, help='Pas de grille (m)')
+    parser.add_argument('--hours-per-chunk', type=int, default=24)
+    parser.add_argument('--overwrite', action='store_true', help='Remplacer un magasin existant')
+    parser.add_argument('--long-term', action='store_true',
+                        help='Moyennes de la période seulement (noyaux unitaires par classe météo)')
+    parser.add_argument('--direction-step', type=float, default=MetBinning.direction_step_deg,
+                        help='Secteur de vent des classes météo (degrés, --long-term)')
+    parser.add_argument('--inventory', type=Path, help='Inventaire maillé (.npz) au lieu de la piste par défaut')
+    parser.add_argument('--coarsen', type=int, default=5, help='Mailles d\'inventaire par source (--inventory)')
+    args = parser.parse_args()
+
+    label = args.label or f"{args.start}_{args.end}"
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        meteo = hourly_weather(load_weather(conn, args.start, args.end, args.weather_airport), args.start, args.end)
+        emissions = None if args.inventory else \
+            load_hourly_emissions(conn, args.start, args.end, args.weather_airport, args.pollutants)
+        stations = pd.read_sql_query(STATIONS_QUERY, conn)
+    finally:
+        conn.close()
+
+    if meteo.empty:
+        logger.error(f"❌ Aucune météo {args.weather_airport} entre {args.start} et {args.end}")
+        return 1
+    logger.info(f"🌤️ {len(meteo)} heures de météo, classes : {class_summary(meteo)}")
+
+    if args.inventory:
+        inventory = EmissionInventory.load(args.inventory)
+        frame, source_rates = inventory.plume_sources(meteo.index, args.coarsen)
+        source_rates = {p: source_rates[p] for p in args.pollutants if p in source_rates}
+        logger.info(f"🗺️ Inventaire {args.inventory.name} : {len(frame)} sources")
+    else:
+        frame = runway_sources(AIRPORT_X, AIRPORT_Y)
+        source_rates = spread_rates(emissions, meteo.index, len(frame))
+        logger.info("✈️ Émissions LTO (piste par défaut) : " + ", ".join(
+            f"{p} {emissions[p].sum():,.1f} kg" for p in emissions.columns))
+    if frame.empty or not source_rates:
+        logger.error("❌ Aucune émission sur la période")
+        return 1
+    spec = GridSpec.centered(AIRPORT_X, AIRPORT_Y, args.half_width, args.step)
+
+    if args.long_term:
+        start = time.perf_counter()
+        cache = KernelCache(spec, MetBinning(direction_step_deg=args.direction_step))
+        totals = sum(rates.sum(axis=0) for rates in source_rates.values())
+        group = SourceGroup.from_frame('aeroport', frame.assign(poids=totals + 1e-12), 'poids')
+        means = long_term_means(cache, [group], {p: r.sum(axis=1, keepdims=True) for p, r in source_rates.items()},
+                                meteo)
+        output = DEFAULT_GRIDS_ROOT / 'dispersion' / f"{label}.npz"
+        save_grid(output, spec, **means)
+        stats = cache.stats()
+        logger.info(f"✅ Moyennes {len(meteo)} h en {time.perf_counter() - start:.1f}s → {output} | "
+                    f"{stats['computed']} noyaux calculés, taux de succès du cache {stats['hit_rate']:.0%}")
+        return 0
+
+    sources = PlumeSources.from_frame(frame)
+    start = time.perf_counter()
+    store, series = hourly_runs(sources, source_rates, meteo, spec, stations[['id_station', 'x', 'y']],
+                                DEFAULT_GRIDS_ROOT / 'dispersion' / label, args.hours_per_chunk, args.overwrite)
+    store.update_attrs(debut=str(args.start), fin=str(args.end), aeroport_meteo=args.weather_airport)
+    elapsed = time.perf_counter() - start
+    logger.info(f"✅ {len(meteo)} h × {spec.size:,} récepteurs en {elapsed:.1f}s → {store.path}")
+
+    if len(series):
+        series = series.merge(stations[['id_station', 'nom_station']], on='id_station')
+        output = PROJECT_ROOT / 'data' / 'processed' / f"dispersion_stations_{label}.csv"
+        series.to_csv(output, index=False)
+        logger.info(f"📍 {stations.shape[0]} stations, {len(series):,} valeurs → {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -19,6 +19,10 @@ import argparse
 import hashlib
 import time
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.monitoring import metrics  # noqa: E402
+
 # Configuration spéciale pour Windows
 if sys.platform == "win32":
     os.system("chcp 65001")  # UTF-8
@@ -183,6 +187,7 @@ class MigrationManager:
                 self.cursor.execute(sql_content)
                 
                 execution_time = int((time.time() - start_time) * 1000)
+                metrics.record_migration(version, time.time() - start_time, True)
                 
                 # Enregistrement du succès
                 self.cursor.execute("""
@@ -200,6 +205,7 @@ class MigrationManager:
             except Exception as sql_error:
                 # Enregistrement de l'échec
                 execution_time = int((time.time() - start_time) * 1000)
+                metrics.record_migration(version, time.time() - start_time, False)
                 
                 self.cursor.execute("""
                     INSERT INTO _migrations.schema_version 
@@ -415,6 +421,7 @@ def main():
     
     finally:
         migration_manager.close_connection()
+        metrics.push_metrics('run_migrations')
 
 
 if __name__ == "__main__":
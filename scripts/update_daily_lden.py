@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mise à jour journalière du Lden / Lnight annuel glissant
+Projet: Airport Air Quality Modeling
+
+Usage:
+    python scripts/update_daily_lden.py --date 2025-08-15 --scenario annuel
+    python scripts/update_daily_lden.py --start 2025-08-10 --end 2025-08-15 --workers 8 --contours
+    python scripts/update_daily_lden.py --date 2025-08-12 --scenario annuel   # journée corrigée
+
+Seules les journées demandées sont calculées (src/noise/engine.py) ; leurs
+énergies sont persistées dans data/noise/<scénario>/days/ et le cumul annuel
+(data/noise/<scénario>/annual.npz) est mis à jour par retrait / ajout exact.
+Une journée déjà calculée est remplacée. La grille Lden / Lnight de la fenêtre
+glissante est écrite dans data/grids/<scénario>/annuel.npz ; avec --contours,
+zone_exposition_bruit n'est rechargée que si les isophones ont changé.
+"""
+
+import argparse
+import logging
+import os
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+import psycopg2
+from dotenv import load_dotenv
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.grids.spec import DEFAULT_GRIDS_ROOT, GridSpec, grid_path, save_grid  # noqa: E402
+from src.noise.accumulator import DEFAULT_CHUNK_FLIGHTS, LdenAccumulator, flight_times  # noqa: E402
+from src.noise.contours import DEFAULT_THRESHOLDS  # noqa: E402
+from src.noise.daily_lden import ANNUAL_DAYS, DailyLden  # noqa: E402
+from src.noise.engine import PHASES_QUERY, PROFILES_QUERY, profiles_from_frame, tracks_from_phases  # noqa: E402
+from src.noise.parallel import parallel_add_flights  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+DB_CONFIG = {
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'port': os.getenv('DB_PORT', '5433'),
+    'database': os.getenv('DB_NAME', 'airport_air_quality'),
+    'user': os.getenv('DB_USER', 'airport_user'),
+    'password': os.getenv('DB_PASSWORD', 'airport_password'),
+}
+
+# Point de référence PVE (POINT(2.786 48.881)) en Lambert-93
+AIRPORT_X = 684305.0
+AIRPORT_Y = 6864575.0
+
+DEFAULT_DAILY_ROOT = PROJECT_ROOT / "data" / "noise"
+
+
+def daterange(start: date, end: date):
+    day = start
+    while day <= end:
+        yield day
+        day += timedelta(days=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mise à jour journalière du Lden annuel')
+    parser.add_argument('--date', type=date.fromisoformat, help='Journée à (re)calculer')
+    parser.add_argument('--start', type=date.fromisoformat)
+    parser.add_argument('--end', type=date.fromisoformat)
+    parser.add_argument('--scenario', default='annuel')
+    parser.add_argument('--label', default='annuel', help='Nom de la grille produite')
+    parser.add_argument('--window', type=int, default=ANNUAL_DAYS, help='Fenêtre glissante (jours)')
+    parser.add_argument('--half-width', type=float, default=10000.0, help='Demi-emprise (m)')
+    parser.add_argument('--step', type=float, default=100.0, help='Pas de grille (m)')
+    parser.add_argument('--chunk-flights', type=int, default=DEFAULT_CHUNK_FLIGHTS)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Processus de calcul (tuiles de grille, résultat identique)')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='Recalculer le cumul depuis les journées persistées, sans calcul de bruit')
+    parser.add_argument('--contours', action='store_true',
+                        help='Recharger zone_exposition_bruit si les isophones ont changé')
+    parser.add_argument('--force-contours', action='store_true', help='Recharger les isophones dans tous les cas')
+    parser.add_argument('--thresholds', type=float, nargs='+', default=list(DEFAULT_THRESHOLDS))
+    parser.add_argument('--airport', default='PVE', help='Code IATA de l\'aéroport (--contours)')
+    parser.add_argument('--temperature', type=float, default=15.0)
+    parser.add_argument('--humidity', type=float, default=70.0)
+    args = parser.parse_args()
+
+    if args.date:
+        days = [args.date]
+    elif args.start and args.end:
+        days = list(daterange(args.start, args.end))
+    elif args.rebuild:
+        days = []
+    else:
+        parser.error('--date, --start/--end ou --rebuild requis')
+
+    spec = GridSpec.centered(AIRPORT_X, AIRPORT_Y, args.half_width, args.step)
+    daily = DailyLden.open(DEFAULT_DAILY_ROOT / args.scenario, spec)
+    if args.rebuild:
+        daily.rebuild()
+        logger.info(f"🔁 Cumul recalculé depuis {daily.n_days} journées persistées")
+    weather = {'temperature': args.temperature, 'humidite': args.humidity}
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        if days:
+            profiles = profiles_from_frame(pd.read_sql_query(PROFILES_QUERY, conn))
+            logger.info(f"✅ {len(profiles)} profils acoustiques chargés")
+        for day in days:
+            phases = pd.read_sql_query(PHASES_QUERY, conn, params={'date': day})
+            tracks = tracks_from_phases(phases)
+            accumulator = LdenAccumulator(spec)
+            if args.workers > 1:
+                parallel_add_flights(accumulator, tracks, flight_times(phases), profiles, day=day,
+                                     weather=weather, workers=args.workers, chunk_flights=args.chunk_flights)
+            else:
+                accumulator.add_flights(tracks, flight_times(phases), profiles, day=day,
+                                        weather=weather, chunk_flights=args.chunk_flights)
+            daily.update_day(day, accumulator)
+        daily.roll(n_days=args.window)
+
+        if not daily.n_days:
+            logger.warning("⚠️ Aucune journée cumulée")
+            return 1
+        levels = daily.levels()
+        output = grid_path(args.scenario, args.label, DEFAULT_GRIDS_ROOT)
+        save_grid(output, spec, lden=levels['Lden'].astype('float32'), lnight=levels['Lnight'].astype('float32'))
+        summary = daily.summary()
+        logger.info(f"💾 Lden / Lnight écrits dans {output} ({summary['days']} jours, "
+                    f"{summary['first']} → {summary['last']}, mouvements {summary['movements']})")
+
+        if args.contours or args.force_contours:
+            with conn.cursor() as cur:
+                cur.execute("SELECT id_aeroport FROM airport.aeroport WHERE code_iata = %s", (args.airport,))
+                row = cur.fetchone()
+            if row is None:
+                raise ValueError(f"Aéroport {args.airport} introuvable")
+            loaded = daily.refresh_contours(conn, row[0], args.scenario, args.thresholds,
+                                            force=args.force_contours)
+            logger.info(f"🗺️ Isophones : {loaded}")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache mémoire des résultats de l'API (durée de vie + calcul unique par clé)
+Sous forte concurrence, une seule requête SQL est émise par clé expirée :
+les autres clients attendent le même résultat
+Projet: Airport Air Quality Modeling
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from src.monitoring import metrics
+
+
+class ResultCache:
+    """Cache TTL asynchrone avec regroupement des calculs concurrents
+
+    Au plus max_entries résultats : au-delà, les entrées expirées puis les
+    moins récemment utilisées sont évincées (avec leurs verrous).
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 1024, name: str = 'api_results'):
+        self.ttl = ttl
+        self.name = name
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._locks: Dict[Hashable, asyncio.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _fresh(self, key: Hashable):
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            self._entries.move_to_end(key)
+            return entry
+        return None
+
+    async def get_or_compute(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._fresh(key)
+        if entry is not None:
+            self.hits += 1
+            metrics.record_cache_access(self.name, 'api', hit=True)
+            return entry[1]
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self._fresh(key)
+            if entry is not None:
+                self.hits += 1
+                metrics.record_cache_access(self.name, 'api', hit=True)
+                return entry[1]
+            self.misses += 1
+            metrics.record_cache_access(self.name, 'api', hit=False)
+            value = await factory()
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._purge()
+            return value
+
+    def _purge(self):
+        """Retirer les entrées expirées, puis les moins récemment utilisées au-delà de max_entries"""
+        now = time.monotonic()
+        for key in [k for k, (stored, _) in self._entries.items() if now - stored >= self.ttl]:
+            del self._entries[key]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        # Verrous des clés évincées (ou dont le calcul a échoué), sauf calcul en cours
+        for key in [k for k, lock in self._locks.items() if k not in self._entries and not lock.locked()]:
+            del self._locks[key]
+
+    def clear(self):
+        self._entries.clear()
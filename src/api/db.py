@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Accès asynchrone à PostgreSQL pour l'API (pool asyncpg)
+Projet: Airport Air Quality Modeling
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+
+def load_config() -> Dict[str, str]:
+    """Configuration base de données depuis l'environnement (.env)"""
+    load_dotenv()
+
+    return {
+        'DB_HOST': os.getenv('DB_HOST', 'localhost'),
+        'DB_PORT': os.getenv('DB_PORT', '5433'),
+        'DB_NAME': os.getenv('DB_NAME', 'airport_air_quality'),
+        'DB_USER': os.getenv('DB_USER', 'airport_user'),
+        'DB_PASSWORD': os.getenv('DB_PASSWORD', 'airport_password'),
+    }
+
+
+class Database:
+    """Pool de connexions asyncpg partagé par les requêtes de l'API
+
+    Si le pool n'a pas pu être ouvert (base indisponible au démarrage), il est
+    recréé à la requête suivante, au plus une tentative toutes les
+    retry_interval secondes.
+    """
+
+    def __init__(self, config: Dict[str, str], min_size: int = 2, max_size: int = 10,
+                 retry_interval: float = 5.0):
+        self.config = config
+        self.min_size = min_size
+        self.max_size = max_size
+        self.retry_interval = retry_interval
+        self.pool = None
+        self._lock = asyncio.Lock()
+        self._last_attempt: Optional[float] = None
+
+    async def connect(self):
+        import asyncpg
+
+        self._last_attempt = time.monotonic()
+        self.pool = await asyncpg.create_pool(
+            host=self.config['DB_HOST'],
+            port=int(self.config['DB_PORT']),
+            database=self.config['DB_NAME'],
+            user=self.config['DB_USER'],
+            password=self.config['DB_PASSWORD'],
+            min_size=self.min_size,
+            max_size=self.max_size,
+            command_timeout=30,
+        )
+        logger.info(f"✅ Pool PostgreSQL ouvert ({self.min_size}-{self.max_size} connexions)")
+
+    async def close(self):
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+    async def ensure_pool(self):
+        """Ouvrir le pool s'il manque (une seule tentative concurrente)"""
+        if self.pool is not None:
+            return
+        async with self._lock:
+            if self.pool is not None:
+                return
+            if self._last_attempt is not None and time.monotonic() - self._last_attempt < self.retry_interval:
+                raise RuntimeError("Pool PostgreSQL non initialisé")
+            await self.connect()
+
+    async def fetch(self, query: str, *args: Any) -> List[Dict[str, Any]]:
+        """Exécuter une requête et retourner les lignes sous forme de dictionnaires"""
+        await self.ensure_pool()
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, *args)
+        return [dict(row) for row in rows]
+
+    async def fetchrow(self, query: str, *args: Any) -> Optional[Dict[str, Any]]:
+        rows = await self.fetch(query, *args)
+        return rows[0] if rows else None
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+API de consultation (lecture seule) des agrégats d'émissions et des grilles de bruit
+Projet: Airport Air Quality Modeling
+
+Usage:
+    uvicorn src.api.main:app --host 0.0.0.0 --port 8000 --workers 4
+
+Réponses JSON par défaut, Arrow IPC avec ?format=arrow (ou
+Accept: application/vnd.apache.arrow.stream), ETag / If-None-Match,
+compression brotli (si installé) ou gzip.
+"""
+
+import logging
+import os
+import re
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Literal, Optional
+
+import numpy as np
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.staticfiles import StaticFiles
+
+from src.api import queries
+from src.api.cache import ResultCache
+from src.api.db import Database, load_config
+from src.api.responses import arrow_payload, build_response, json_payload, records_payload, wants_arrow
+from src.grids.spec import DEFAULT_GRIDS_ROOT, load_grid
+from src.grids.tiles import DEFAULT_TILES_ROOT
+from src.monitoring import metrics
+
+logger = logging.getLogger(__name__)
+
+# Durée de vie des agrégats en mémoire et côté client (secondes)
+AGGREGATE_TTL = int(os.getenv('API_AGGREGATE_TTL', '60'))
+GRID_MAX_AGE = 3600
+
+GRIDS_ROOT = Path(os.getenv('GRIDS_DIR', DEFAULT_GRIDS_ROOT))
+TILES_ROOT = Path(os.getenv('TILES_DIR', DEFAULT_TILES_ROOT))
+
+# Segments de chemin acceptés pour scénario / date / champ
+SAFE_NAME = re.compile(r'^[\w.-]+$')
+
+Format = Optional[Literal['json', 'arrow']]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    database = Database(load_config(), max_size=int(os.getenv('API_POOL_SIZE', '10')))
+    try:
+        await database.connect()
+    except Exception as e:
+        # Les grilles de bruit restent disponibles sans base de données ; le pool est recréé à la demande
+        logger.error(f"❌ Connexion PostgreSQL impossible, nouvelle tentative à la prochaine requête: {e}")
+    app.state.db = database
+    app.state.cache = ResultCache(ttl=AGGREGATE_TTL)
+    yield
+    await database.close()
+
+
+app = FastAPI(
+    title="Airport Air Quality API",
+    description="Agrégats d'émissions et grilles de bruit en lecture seule",
+    version="1.0.0",
+    lifespan=lifespan,
+)
+
+# Tuiles raster générées par scripts/build_tiles.py
+app.mount("/tiles", StaticFiles(directory=TILES_ROOT, check_dir=False), name="tiles")
+
+# Métriques Prometheus (registre propre à chaque worker uvicorn)
+if metrics.PROMETHEUS_AVAILABLE:
+    from prometheus_client import make_asgi_app
+    app.mount("/metrics", make_asgi_app(), name="metrics")
+
+
+async def aggregate(request: Request, name: str, sql: str, start: Optional[datetime],
+                    end: Optional[datetime], fmt: Format):
+    """Exécuter (ou relire en cache) une requête d'agrégation et encoder la réponse"""
+    arrow = wants_arrow(request, fmt)
+    database: Database = request.app.state.db
+
+    async def compute():
+        try:
+            with metrics.timed_query(name, 'api'):
+                rows = await database.fetch(sql, start, end)
+        except Exception as e:
+            logger.error(f"❌ Requête {name} en échec: {e}")
+            raise HTTPException(status_code=503, detail="Base de données indisponible")
+        metrics.observe_pool(database.pool, 'api')
+        return records_payload(rows, 'arrow' if arrow else 'json')
+
+    key = (name, start, end, arrow)
+    payload = await request.app.state.cache.get_or_compute(key, compute)
+    return build_response(request, payload, AGGREGATE_TTL)
+
+
+@app.get("/health")
+async def health(request: Request):
+    database: Database = request.app.state.db
+    cache: ResultCache = request.app.state.cache
+    return {
+        'status': 'ok',
+        'database': database.pool is not None,
+        'cache': {'hits': cache.hits, 'misses': cache.misses},
+    }
+
+
+@app.get("/kpis")
+async def kpis(request: Request, start: Optional[datetime] = None, end: Optional[datetime] = None,
+               format: Format = None):
+    return await aggregate(request, 'kpis', queries.KPIS, start, end, format)
+
+
+@app.get("/emissions/temporal")
+async def emissions_temporal(request: Request, start: Optional[datetime] = None,
+                             end: Optional[datetime] = None,
+                             bucket: Literal['hour', 'day', 'week', 'month'] = 'day',
+                             format: Format = None):
+    return await aggregate(request, f'temporal:{bucket}', queries.temporal_query(bucket), start, end, format)
+
+
+@app.get("/emissions/aircraft")
+async def emissions_aircraft(request: Request, start: Optional[datetime] = None,
+                             end: Optional[datetime] = None, format: Format = None):
+    return await aggregate(request, 'aircraft', queries.AIRCRAFT, start, end, format)
+
+
+@app.get("/emissions/phases")
+async def emissions_phases(request: Request, start: Optional[datetime] = None,
+                           end: Optional[datetime] = None, format: Format = None):
+    return await aggregate(request, 'phases', queries.PHASES, start, end, format)
+
+
+@app.get("/emissions/pollutants")
+async def emissions_pollutants(request: Request, start: Optional[datetime] = None,
+                               end: Optional[datetime] = None, format: Format = None):
+    return await aggregate(request, 'pollutants', queries.POLLUTANTS, start, end, format)
+
+
+@app.get("/noise/grids")
+async def noise_grids(request: Request):
+    """Inventaire des grilles calculées (scénario, date, champs disponibles)"""
+    async def compute():
+        grids = []
+        for path in sorted(GRIDS_ROOT.glob('*/*.npz')):
+            with np.load(path, allow_pickle=False) as data:
+                fields = [name for name in data.files if name != '_grid_spec']
+            grids.append({'scenario': path.parent.name, 'date': path.stem, 'fields': fields})
+        return json_payload(grids)
+
+    payload = await request.app.state.cache.get_or_compute(('grids',), compute)
+    return build_response(request, payload, AGGREGATE_TTL)
+
+
+@app.get("/noise/grids/{scenario}/{date}/{field}")
+async def noise_grid(request: Request, scenario: str, date: str, field: str,
+                     stride: int = Query(1, ge=1, le=64), format: Format = None):
+    """Champ sur grille (stride > 1 : sous-échantillonnage pour les aperçus)"""
+    if not all(SAFE_NAME.match(part) for part in (scenario, date, field)):
+        raise HTTPException(status_code=400, detail="Identifiant invalide")
+    path = GRIDS_ROOT / scenario / f"{date}.npz"
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Grille introuvable")
+
+    arrow = wants_arrow(request, format)
+
+    def encode_grid():
+        spec, arrays = load_grid(path)
+        if field not in arrays:
+            raise HTTPException(status_code=404, detail=f"Champ {field} absent")
+        values = arrays[field][::stride, ::stride].astype(np.float32)
+        grid = dict(spec.to_dict(), step=spec.step * stride, nx=values.shape[1], ny=values.shape[0])
+
+        if arrow:
+            xs = spec.x0 + spec.step * stride * np.arange(values.shape[1])
+            ys = spec.y0 + spec.step * stride * np.arange(values.shape[0])
+            X, Y = np.meshgrid(xs, ys)
+            return arrow_payload(
+                {'x': X.ravel(), 'y': Y.ravel(), 'value': values.ravel()},
+                metadata={'grid': json_payload(grid).body.decode('utf-8'), 'field': field},
+            )
+        rounded = np.round(values.astype(np.float64), 1)
+        return json_payload({
+            'scenario': scenario,
+            'date': date,
+            'field': field,
+            'grid': grid,
+            'values': np.where(np.isnan(rounded), None, rounded).tolist(),
+        })
+
+    async def compute():
+        # Lecture et sérialisation hors de la boucle d'événements
+        return await run_in_threadpool(encode_grid)
+
+    key = ('grid', scenario, date, field, stride, arrow, path.stat().st_mtime_ns)
+    payload = await request.app.state.cache.get_or_compute(key, compute)
+    return build_response(request, payload, GRID_MAX_AGE)
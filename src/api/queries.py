@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Requêtes d'agrégation exposées par l'API
+Mêmes indicateurs que les dashboards Streamlit, paramétrés ($1, $2...)
+Projet: Airport Air Quality Modeling
+"""
+
+# Pas d'agrégation autorisés (interpolés dans DATE_TRUNC, donc en liste blanche)
+BUCKETS = ('hour', 'day', 'week', 'month')
+
+KPIS = """
+SELECT
+    COUNT(DISTINCT f.flight_id) AS total_flights,
+    COUNT(DISTINCT f.aircraft_type) AS aircraft_types,
+    ROUND(SUM(CASE WHEN e.pollutant_type = 'CO2' THEN e.emission_quantity_kg ELSE 0 END)::numeric, 2)::float8 AS total_co2_kg,
+    ROUND(AVG(CASE WHEN e.pollutant_type = 'CO2' THEN e.emission_quantity_kg ELSE NULL END)::numeric, 2)::float8 AS avg_co2_per_flight
+FROM etl.flights_staging f
+JOIN etl.emissions_staging e ON f.flight_id = e.flight_id
+WHERE ($1::timestamp IS NULL OR f.departure_time >= $1)
+  AND ($2::timestamp IS NULL OR f.departure_time < $2)
+"""
+
+TEMPORAL = """
+SELECT
+    DATE_TRUNC('{bucket}', f.departure_time) AS period,
+    COUNT(DISTINCT f.flight_id) AS flights,
+    ROUND(SUM(CASE WHEN e.pollutant_type = 'CO2' THEN e.emission_quantity_kg ELSE 0 END)::numeric, 2)::float8 AS co2_kg,
+    ROUND(SUM(CASE WHEN e.pollutant_type = 'NOx' THEN e.emission_quantity_kg ELSE 0 END)::numeric, 4)::float8 AS nox_kg
+FROM etl.flights_staging f
+JOIN etl.emissions_staging e ON f.flight_id = e.flight_id
+WHERE ($1::timestamp IS NULL OR f.departure_time >= $1)
+  AND ($2::timestamp IS NULL OR f.departure_time < $2)
+GROUP BY DATE_TRUNC('{bucket}', f.departure_time)
+ORDER BY period
+"""
+
+AIRCRAFT = """
+SELECT
+    f.aircraft_type,
+    COUNT(DISTINCT f.flight_id) AS flights_count,
+    ROUND(SUM(CASE WHEN e.pollutant_type = 'CO2' THEN e.emission_quantity_kg ELSE 0 END)::numeric, 2)::float8 AS total_co2_kg,
+    ROUND(AVG(CASE WHEN e.pollutant_type = 'CO2' THEN e.emission_quantity_kg ELSE NULL END)::numeric, 2)::float8 AS avg_co2_per_flight
+FROM etl.flights_staging f
+JOIN etl.emissions_staging e ON f.flight_id = e.flight_id
+WHERE ($1::timestamp IS NULL OR f.departure_time >= $1)
+  AND ($2::timestamp IS NULL OR f.departure_time < $2)
+GROUP BY f.aircraft_type
+ORDER BY total_co2_kg DESC
+"""
+
+PHASES = """
+SELECT
+    e.flight_phase,
+    COUNT(*) AS phase_calculations,
+    ROUND(AVG(e.fuel_consumed_kg)::numeric, 2)::float8 AS avg_fuel_kg,
+    ROUND(SUM(CASE WHEN e.pollutant_type = 'CO2' THEN e.emission_quantity_kg ELSE 0 END)::numeric, 2)::float8 AS phase_co2_kg,
+    ROUND(AVG(CASE WHEN e.pollutant_type = 'CO2' THEN e.emission_quantity_kg ELSE NULL END)::numeric, 2)::float8 AS avg_co2_kg
+FROM etl.flights_staging f
+JOIN etl.emissions_staging e ON f.flight_id = e.flight_id
+WHERE ($1::timestamp IS NULL OR f.departure_time >= $1)
+  AND ($2::timestamp IS NULL OR f.departure_time < $2)
+GROUP BY e.flight_phase
+ORDER BY phase_co2_kg DESC
+"""
+
+POLLUTANTS = """
+SELECT
+    e.pollutant_type,
+    ROUND(SUM(e.emission_quantity_kg)::numeric, 2)::float8 AS total_emission_kg,
+    COUNT(*) AS calculations_count
+FROM etl.flights_staging f
+JOIN etl.emissions_staging e ON f.flight_id = e.flight_id
+WHERE ($1::timestamp IS NULL OR f.departure_time >= $1)
+  AND ($2::timestamp IS NULL OR f.departure_time < $2)
+GROUP BY e.pollutant_type
+ORDER BY total_emission_kg DESC
+"""
+
+
+def temporal_query(bucket: str) -> str:
+    if bucket not in BUCKETS:
+        raise ValueError(f"Pas d'agrégation inconnu: {bucket}")
+    return TEMPORAL.format(bucket=bucket)
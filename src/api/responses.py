@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Encodage des réponses de l'API : JSON ou Arrow IPC, ETag, compression gzip/brotli
+Les corps compressés sont conservés avec le résultat en cache : une même
+réponse n'est sérialisée et compressée qu'une fois par variante
+Projet: Airport Air Quality Modeling
+"""
+
+import gzip
+import hashlib
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from fastapi import HTTPException, Request, Response
+
+try:
+    import brotli
+except ImportError:  # brotli optionnel : repli sur gzip
+    brotli = None
+
+JSON_MEDIA_TYPE = "application/json"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# En dessous de cette taille, la compression coûte plus qu'elle ne rapporte
+MIN_COMPRESS_SIZE = 1024
+
+
+def _json_default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Type non sérialisable: {type(value).__name__}")
+
+
+class Payload:
+    """Corps de réponse sérialisé, son ETag et ses variantes compressées"""
+
+    def __init__(self, body: bytes, media_type: str):
+        self.body = body
+        self.media_type = media_type
+        self.etag = hashlib.sha1(body).hexdigest()[:20]
+        self._variants: Dict[str, bytes] = {}
+
+    def encoded(self, encoding: Optional[str]) -> bytes:
+        if encoding is None:
+            return self.body
+        if encoding not in self._variants:
+            if encoding == 'br':
+                self._variants[encoding] = brotli.compress(self.body, quality=5)
+            else:
+                self._variants[encoding] = gzip.compress(self.body, compresslevel=6)
+        return self._variants[encoding]
+
+
+def json_payload(data: Any) -> Payload:
+    body = json.dumps(data, default=_json_default, separators=(',', ':'), ensure_ascii=False)
+    return Payload(body.encode('utf-8'), JSON_MEDIA_TYPE)
+
+
+def arrow_payload(columns: Dict[str, Any], metadata: Optional[Dict[str, str]] = None) -> Payload:
+    """Flux Arrow IPC à partir de colonnes (pyarrow optionnel)"""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise HTTPException(status_code=406, detail="Format Arrow indisponible (pyarrow non installé)")
+
+    table = pa.table(columns)
+    if metadata:
+        table = table.replace_schema_metadata(metadata)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return Payload(sink.getvalue().to_pybytes(), ARROW_MEDIA_TYPE)
+
+
+def records_payload(rows: List[Dict[str, Any]], fmt: str) -> Payload:
+    """Lignes SQL en JSON (liste d'objets) ou Arrow (colonnes)"""
+    if fmt == 'arrow':
+        names = list(rows[0].keys()) if rows else []
+        return arrow_payload({name: [row[name] for row in rows] for name in names})
+    return json_payload(rows)
+
+
+def wants_arrow(request: Request, fmt: Optional[str]) -> bool:
+    if fmt:
+        return fmt == 'arrow'
+    return ARROW_MEDIA_TYPE in request.headers.get('accept', '')
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Meilleur encodage accepté par le client (brotli > gzip > aucun)"""
+    accepted = {}
+    for item in accept_encoding.split(','):
+        parts = item.strip().split(';')
+        if not parts[0]:
+            continue
+        quality = 1.0
+        for param in parts[1:]:
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[parts[0].strip().lower()] = quality
+
+    if brotli is not None and accepted.get('br', 0) > 0:
+        return 'br'
+    if accepted.get('gzip', 0) > 0:
+        return 'gzip'
+    return None
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Comparaison faible : préfixe W/ et suffixe d'encodage ignorés"""
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        candidate = candidate.removeprefix('W/').strip('"')
+        if candidate.split('-')[0] == etag:
+            return True
+    return False
+
+
+def build_response(request: Request, payload: Payload, max_age: int) -> Response:
+    """Réponse 200 compressée ou 304 si le client possède déjà cette version"""
+    headers = {
+        'Cache-Control': f'public, max-age={max_age}',
+        'Vary': 'Accept, Accept-Encoding',
+    }
+
+    if _etag_matches(request.headers.get('if-none-match', ''), payload.etag):
+        headers['ETag'] = f'"{payload.etag}"'
+        return Response(status_code=304, headers=headers)
+
+    encoding = None
+    if len(payload.body) >= MIN_COMPRESS_SIZE:
+        encoding = negotiate_encoding(request.headers.get('accept-encoding', ''))
+
+    if encoding:
+        headers['Content-Encoding'] = encoding
+        headers['ETag'] = f'"{payload.etag}-{encoding}"'
+    else:
+        headers['ETag'] = f'"{payload.etag}"'
+
+    return Response(content=payload.encoded(encoding), media_type=payload.media_type, headers=headers)
@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Statistiques de conformité incrémentales (valeurs limites de la directive 2008/50/CE)
+Projet: Airport Air Quality Modeling
+
+Les valeurs horaires d'une série (station ou cellule de grille) arrivent
+heure par heure ; on ne garde que des états de taille fixe, fusionnables
+entre périodes (mois calculés séparément) :
+
+- compteurs de dépassements horaires et journaliers par seuil ;
+- les k plus grandes valeurs horaires et moyennes journalières, exactes :
+  la conformité du NO2 horaire se lit sur la 19e plus forte heure
+  (≈ percentile 99,8), celle des PM10 sur le 36e plus fort jour
+  (≈ percentile 90,4) ;
+- un histogramme logarithmique par série (type DDSketch, erreur relative
+  bornée) pour les autres quantiles horaires ;
+- sommes pour les moyennes annuelles.
+
+L'état d'une grille 500 × 500 tient en quelques centaines de Mo et se
+sauvegarde (.npz) comme point de reprise : les indicateurs annuels se
+relisent sans reparcourir l'année de mesures ou de grilles horaires.
+"""
+
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.grids.spec import GridSpec
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class LimitValue:
+    """Valeur limite : seuil (µg/m³) sur une période de moyenne, dépassements tolérés par an"""
+    pollutant: str
+    averaging: str  # 'hour', 'day' ou 'year'
+    threshold: float
+    allowed: int = 0
+
+    @property
+    def rank(self) -> int:
+        """Rang de la valeur qui décide de la conformité (dépassements tolérés + 1)"""
+        return self.allowed + 1
+
+
+# Directive 2008/50/CE, annexe XI (protection de la santé humaine)
+LIMIT_VALUES = (
+    LimitValue('NO2', 'hour', 200.0, 18),
+    LimitValue('NO2', 'year', 40.0),
+    LimitValue('PM10', 'day', 50.0, 35),
+    LimitValue('PM10', 'year', 40.0),
+    LimitValue('PM2.5', 'year', 25.0),
+    LimitValue('SO2', 'hour', 350.0, 24),
+    LimitValue('SO2', 'day', 125.0, 3),
+)
+
+# Polluants modélisés (src/dispersion) : NOx exprimé en NO2, donc majorant du NO2
+POLLUTANT_ALIASES = {'NOx': 'NO2', 'PM25': 'PM2.5'}
+
+# Moyenne journalière valide à partir de 18 heures mesurées (75 %)
+MIN_HOURS_PER_DAY = 18
+
+# Plus grandes valeurs gardées par série, au moins le rang des valeurs limites
+HOURLY_TOP_K = 25
+DAILY_TOP_K = 40
+
+# Histogramme logarithmique : erreur relative et plage utile (µg/m³)
+SKETCH_ACCURACY = 0.02
+SKETCH_MIN_VALUE = 0.1
+SKETCH_MAX_VALUE = 1000.0
+
+# Séries traitées par bloc pour les quantiles de l'histogramme (cumuls uint32)
+QUANTILE_BLOCK_ROWS = 16384
+
+
+def limits_for(pollutant: str, limits: Sequence[LimitValue] = LIMIT_VALUES) -> List[LimitValue]:
+    """Valeurs limites d'un polluant (alias des polluants modélisés compris)"""
+    name = POLLUTANT_ALIASES.get(pollutant, pollutant)
+    return [limit for limit in limits if limit.pollutant == name]
+
+
+def epoch_hours(hours) -> np.ndarray:
+    """Heures depuis 1970 (entiers) d'un index horaire"""
+    return pd.DatetimeIndex(hours).floor('h').as_unit('s').asi8 // 3600
+
+
+class LogHistogram:
+    """Histogrammes logarithmiques fusionnables, un par série (type DDSketch)
+
+    Le compartiment i couvre ]γ^(i-1), γ^i] avec γ = (1 + a) / (1 - a) : le
+    quantile restitué est à moins de a (erreur relative) de la valeur
+    exacte entre min_value et max_value. Le compartiment 0 reçoit les
+    valeurs ≤ min_value (restituées 0), le dernier celles > max_value
+    (restituées max_value). Comptes en uint16, promus en uint32 au besoin.
+    """
+
+    def __init__(self, n: int, relative_accuracy: float = SKETCH_ACCURACY,
+                 min_value: float = SKETCH_MIN_VALUE, max_value: float = SKETCH_MAX_VALUE):
+        if not 0 < relative_accuracy < 1 or not 0 < min_value < max_value:
+            raise ValueError("Paramètres d'histogramme invalides")
+        self.relative_accuracy = float(relative_accuracy)
+        self.min_value = float(min_value)
+        self.max_value = float(max_value)
+        self.log_gamma = np.log1p(2 * relative_accuracy / (1 - relative_accuracy))
+        self.offset = int(np.floor(np.log(min_value) / self.log_gamma))
+        self.n_bins = int(np.ceil(np.log(max_value) / self.log_gamma)) - self.offset + 2
+        self.counts = np.zeros((n, self.n_bins), dtype=np.uint16)
+        # Borne du nombre de valeurs par série (promotion des comptes)
+        self.max_count = 0
+
+    def params(self) -> Dict:
+        return {'relative_accuracy': self.relative_accuracy, 'min_value': self.min_value,
+                'max_value': self.max_value}
+
+    def bins(self, values: np.ndarray) -> np.ndarray:
+        """Compartiment de chaque valeur, -1 pour NaN"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            index = np.ceil(np.log(values) / self.log_gamma) - self.offset
+        index = np.clip(np.nan_to_num(index, nan=-1.0, neginf=0.0), -1, self.n_bins - 1).astype(np.int32)
+        index[(values <= self.min_value)] = 0
+        index[values > self.max_value] = self.n_bins - 1
+        return index
+
+    def _reserve(self, extra: int):
+        self.max_count += int(extra)
+        if self.counts.dtype == np.uint16 and self.max_count > np.iinfo(np.uint16).max:
+            self.counts = self.counts.astype(np.uint32)
+
+    def add(self, values: np.ndarray):
+        """Ajouter des valeurs (heures, séries), NaN ignorés"""
+        values = np.atleast_2d(values)
+        self._reserve(len(values))
+        # indices à plat : une valeur par série et par heure, pas de doublon dans l'indexation
+        flat = self.counts.reshape(-1)
+        base = np.arange(self.counts.shape[0], dtype=np.int64) * self.n_bins
+        for row in values:
+            index = self.bins(row)
+            valid = index >= 0
+            flat[(base + index)[valid]] += 1
+
+    def merge(self, other: "LogHistogram"):
+        if other.params() != self.params() or other.counts.shape != self.counts.shape:
+            raise ValueError("Histogrammes incompatibles : fusion impossible")
+        self._reserve(other.max_count)
+        self.counts += other.counts.astype(self.counts.dtype)
+
+    def value(self, index: np.ndarray) -> np.ndarray:
+        """Valeur représentative d'un compartiment"""
+        gamma = np.exp(self.log_gamma)
+        value = 2 * np.exp((index + self.offset) * self.log_gamma) / (gamma + 1)
+        value = np.where(index == 0, 0.0, value)
+        return np.where(index == self.n_bins - 1, self.max_value, value)
+
+    def quantile(self, q: float, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Quantile q de chaque série (NaN sans valeur)"""
+        rows = np.arange(len(self.counts)) if rows is None else np.asarray(rows)
+        result = np.full(len(rows), np.nan)
+        for start in range(0, len(rows), QUANTILE_BLOCK_ROWS):
+            block = rows[start:start + QUANTILE_BLOCK_ROWS]
+            cumulative = np.cumsum(self.counts[block], axis=1, dtype=np.uint32)
+            total = cumulative[:, -1]
+            target = np.maximum(np.ceil(q * total), 1)
+            index = (cumulative < target[:, None]).sum(axis=1)
+            result[start:start + len(block)] = np.where(total > 0, self.value(index), np.nan)
+        return result
+
+
+class TopValues:
+    """k plus grandes valeurs exactes par série"""
+
+    def __init__(self, n: int, k: int):
+        self.k = int(k)
+        self.values = np.full((n, self.k), -np.inf, dtype=np.float32)
+
+    def add(self, values: np.ndarray):
+        """Ajouter des valeurs (heures, séries), NaN ignorés"""
+        self._keep(np.nan_to_num(np.atleast_2d(values).astype(np.float32), nan=-np.inf).T)
+
+    def merge(self, other: "TopValues"):
+        if other.values.shape != self.values.shape:
+            raise ValueError("Rangs incompatibles : fusion impossible")
+        self._keep(other.values)
+
+    def _keep(self, candidates: np.ndarray):
+        # Seules les séries dont un candidat dépasse la plus petite valeur gardée changent
+        rows = np.flatnonzero(candidates.max(axis=1) > self.values.min(axis=1))
+        if len(rows):
+            merged = np.concatenate([self.values[rows], candidates[rows]], axis=1)
+            self.values[rows] = -np.partition(-merged, self.k - 1, axis=1)[:, :self.k]
+
+    def nth_largest(self, rank: Union[int, np.ndarray]) -> np.ndarray:
+        """rank-ième plus grande valeur (1 = maximum) de chaque série, NaN au-delà des valeurs vues"""
+        rank = np.broadcast_to(np.asarray(rank), (len(self.values),))
+        if (rank > self.k).any():
+            raise ValueError(f"Rang au-delà des {self.k} valeurs gardées")
+        ordered = -np.sort(-self.values, axis=1)
+        value = ordered[np.arange(len(ordered)), np.maximum(rank, 1) - 1].astype(np.float64)
+        return np.where(np.isfinite(value) & (rank >= 1), value, np.nan)
+
+
+class ComplianceStats:
+    """État de conformité d'un polluant sur n séries (stations ou cellules)
+
+    Les heures arrivent dans l'ordre chronologique, par blocs (heures, n) ;
+    une heure déjà vue est ignorée (reprise après interruption). Une
+    journée est close à son heure 23 ou à l'arrivée de la suivante.
+    """
+
+    def __init__(self, n: int, pollutant: str, limits: Optional[Sequence[LimitValue]] = None,
+                 sketch: Optional[Mapping] = None, min_hours_per_day: int = MIN_HOURS_PER_DAY):
+        self.n = int(n)
+        self.pollutant = pollutant
+        self.limits = list(limits_for(pollutant) if limits is None else limits)
+        self.min_hours_per_day = int(min_hours_per_day)
+        self.hour_thresholds = sorted({l.threshold for l in self.limits if l.averaging == 'hour'})
+        self.day_thresholds = sorted({l.threshold for l in self.limits if l.averaging == 'day'})
+        hourly_k = max([HOURLY_TOP_K] + [l.rank for l in self.limits if l.averaging == 'hour'])
+        daily_k = max([DAILY_TOP_K] + [l.rank for l in self.limits if l.averaging == 'day'])
+
+        self.hours = np.zeros(n, dtype=np.int32)
+        self.total = np.zeros(n, dtype=np.float64)
+        self.hourly_top = TopValues(n, hourly_k)
+        self.hourly_exceedances = np.zeros((len(self.hour_thresholds), n), dtype=np.int32)
+        self.sketch = LogHistogram(n, **dict(sketch or {}))
+
+        self.days = np.zeros(n, dtype=np.int32)
+        self.daily_top = TopValues(n, daily_k)
+        self.daily_exceedances = np.zeros((len(self.day_thresholds), n), dtype=np.int32)
+        self.day_sum = np.zeros(n, dtype=np.float64)
+        self.day_hours = np.zeros(n, dtype=np.int16)
+        self.current_day: Optional[int] = None
+
+        self.first_hour: Optional[int] = None
+        self.last_hour: Optional[int] = None
+
+    def add(self, hours, values: np.ndarray):
+        """Ajouter des valeurs horaires (heures, n) en µg/m³, NaN = heure manquante"""
+        epoch = epoch_hours(hours)
+        values = np.asarray(values, dtype=np.float64).reshape(len(epoch), self.n)
+        if len(epoch) > 1 and (np.diff(epoch) <= 0).any():
+            raise ValueError("Heures non strictement croissantes")
+        if self.last_hour is not None and len(epoch) and epoch[0] <= self.last_hour:
+            fresh = epoch > self.last_hour
+            logger.warning(f"⚠️ {self.pollutant} : {int((~fresh).sum())} heures déjà cumulées ignorées")
+            epoch, values = epoch[fresh], values[fresh]
+        if not len(epoch):
+            return
+
+        day = epoch // 24
+        splits = np.flatnonzero(np.diff(day)) + 1
+        for block_hours, block in zip(np.split(epoch, splits), np.split(values, splits)):
+            if block_hours[0] // 24 != self.current_day:
+                self.close_day()
+                self.current_day = int(block_hours[0] // 24)
+            self._add_hours(block)
+            if block_hours[-1] % 24 == 23:
+                self.close_day()
+
+        if self.first_hour is None:
+            self.first_hour = int(epoch[0])
+        self.last_hour = int(epoch[-1])
+
+    def _add_hours(self, block: np.ndarray):
+        valid = ~np.isnan(block)
+        hours = valid.sum(axis=0)
+        sums = np.where(valid, block, 0.0).sum(axis=0)
+        self.hours += hours.astype(np.int32)
+        self.total += sums
+        for i, threshold in enumerate(self.hour_thresholds):
+            self.hourly_exceedances[i] += (block > threshold).sum(axis=0, dtype=np.int32)
+        self.hourly_top.add(block)
+        self.sketch.add(block)
+        self.day_sum += sums
+        self.day_hours += hours.astype(np.int16)
+
+    def close_day(self):
+        """Clore la journée en cours : moyenne journalière si assez d'heures valides"""
+        if self.current_day is None:
+            return
+        valid = self.day_hours >= self.min_hours_per_day
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(valid, self.day_sum / self.day_hours, np.nan)
+        self.days += valid.astype(np.int32)
+        self.daily_top.add(mean[np.newaxis])
+        for i, threshold in enumerate(self.day_thresholds):
+            self.daily_exceedances[i] += (mean > threshold).astype(np.int32)
+        self.day_sum[:] = 0.0
+        self.day_hours[:] = 0
+        self.current_day = None
+
+    def merge(self, other: "ComplianceStats"):
+        """Fusionner l'état d'une autre période, sans heure commune (ex: calcul par mois)"""
+        if (other.n, other.pollutant, other.limits) != (self.n, self.pollutant, self.limits):
+            raise ValueError("Statistiques incompatibles : fusion impossible")
+        if self.current_day is not None or other.current_day is not None:
+            raise ValueError("Journée en cours : clore les journées (close_day) avant la fusion")
+        if other.first_hour is None:
+            return
+        if self.first_hour is not None and not (other.last_hour < self.first_hour
+                                                or other.first_hour > self.last_hour):
+            raise ValueError("Périodes qui se recouvrent : heures cumulées deux fois")
+        self.hours += other.hours
+        self.total += other.total
+        self.hourly_exceedances += other.hourly_exceedances
+        self.hourly_top.merge(other.hourly_top)
+        self.sketch.merge(other.sketch)
+        self.days += other.days
+        self.daily_exceedances += other.daily_exceedances
+        self.daily_top.merge(other.daily_top)
+        self.first_hour = other.first_hour if self.first_hour is None else min(self.first_hour, other.first_hour)
+        self.last_hour = other.last_hour if self.last_hour is None else max(self.last_hour, other.last_hour)
+
+    def mean(self) -> np.ndarray:
+        """Moyenne des valeurs horaires de la période (NaN sans valeur)"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.hours > 0, self.total / self.hours, np.nan)
+
+    def quantile(self, q: float) -> np.ndarray:
+        """Quantile horaire q (plus petite valeur de fonction de répartition ≥ q)
+
+        Exact quand le rang depuis le haut tient dans les valeurs gardées
+        (percentile 99,8 d'une année : 18e plus forte heure), sinon lu dans
+        l'histogramme.
+        """
+        rank = self.hours - np.ceil(q * self.hours).astype(np.int64) + 1
+        exact = (self.hours > 0) & (rank <= self.hourly_top.k)
+        result = np.full(self.n, np.nan)
+        if exact.any():
+            result[exact] = self.hourly_top.nth_largest(np.where(exact, rank, 1))[exact]
+        approximate = (self.hours > 0) & ~exact
+        if approximate.any():
+            rows = np.flatnonzero(approximate)
+            result[rows] = self.sketch.quantile(q, rows)
+        return result
+
+    def indicators(self) -> Dict[str, np.ndarray]:
+        """Indicateurs de la période par série : moyennes, dépassements, valeurs de rang, conformité
+
+        Séries sans valeur valide : moyenne et rangs NaN, non conformes.
+        """
+        result = {'heures': self.hours.copy(), 'jours': self.days.copy(), 'moyenne': self.mean()}
+        for limit in self.limits:
+            label = f"{limit.threshold:g}"
+            if limit.averaging == 'hour':
+                count = self.hourly_exceedances[self.hour_thresholds.index(limit.threshold)]
+                result[f"depassements_h_{label}"] = count.copy()
+                result[f"rang_h_{limit.rank}"] = self.hourly_top.nth_largest(limit.rank)
+                result[f"conforme_h_{label}"] = (count <= limit.allowed) & (self.hours > 0)
+            elif limit.averaging == 'day':
+                count = self.daily_exceedances[self.day_thresholds.index(limit.threshold)]
+                result[f"depassements_j_{label}"] = count.copy()
+                result[f"rang_j_{limit.rank}"] = self.daily_top.nth_largest(limit.rank)
+                result[f"conforme_j_{label}"] = (count <= limit.allowed) & (self.days > 0)
+            else:
+                result[f"conforme_an_{label}"] = result['moyenne'] <= limit.threshold
+        return result
+
+    def state(self) -> Tuple[Dict, Dict[str, np.ndarray]]:
+        """Paramètres (JSON) et tableaux de l'état, pour le point de reprise"""
+        meta = {
+            'pollutant': self.pollutant, 'limits': [asdict(l) for l in self.limits],
+            'sketch': self.sketch.params(), 'min_hours_per_day': self.min_hours_per_day,
+            'current_day': self.current_day, 'first_hour': self.first_hour, 'last_hour': self.last_hour,
+        }
+        arrays = {
+            'hours': self.hours, 'total': self.total, 'hourly_top': self.hourly_top.values,
+            'hourly_exceedances': self.hourly_exceedances, 'sketch': self.sketch.counts, 'days': self.days,
+            'daily_top': self.daily_top.values, 'daily_exceedances': self.daily_exceedances,
+            'day_sum': self.day_sum, 'day_hours': self.day_hours,
+        }
+        return meta, arrays
+
+    @classmethod
+    def from_state(cls, n: int, meta: Mapping, arrays: Mapping[str, np.ndarray]) -> "ComplianceStats":
+        stats = cls(n, meta['pollutant'], [LimitValue(**l) for l in meta['limits']], meta['sketch'],
+                    meta['min_hours_per_day'])
+        stats.hours, stats.total, stats.days = arrays['hours'], arrays['total'], arrays['days']
+        stats.hourly_top.values, stats.daily_top.values = arrays['hourly_top'], arrays['daily_top']
+        stats.hourly_exceedances = arrays['hourly_exceedances']
+        stats.daily_exceedances = arrays['daily_exceedances']
+        stats.sketch.counts = arrays['sketch']
+        stats.sketch.max_count = int(stats.sketch.counts.sum(axis=1, dtype=np.uint32).max(initial=0))
+        stats.day_sum, stats.day_hours = arrays['day_sum'], arrays['day_hours']
+        stats.current_day, stats.first_hour, stats.last_hour = (
+            meta['current_day'], meta['first_hour'], meta['last_hour'])
+        return stats
+
+
+class ComplianceAccumulator:
+    """Statistiques de conformité par polluant sur des stations ou les cellules d'une grille"""
+
+    def __init__(self, keys: Union[GridSpec, Sequence[str]], pollutants: Sequence[str],
+                 sketch: Optional[Mapping] = None, min_hours_per_day: int = MIN_HOURS_PER_DAY):
+        self.spec = keys if isinstance(keys, GridSpec) else None
+        self.ids = None if self.spec is not None else [str(key) for key in keys]
+        self.n = self.spec.size if self.spec is not None else len(self.ids)
+        self.stats: Dict[str, ComplianceStats] = {
+            p: ComplianceStats(self.n, p, sketch=sketch, min_hours_per_day=min_hours_per_day) for p in pollutants
+        }
+
+    @property
+    def last_hour(self) -> Optional[pd.Timestamp]:
+        """Dernière heure cumulée, tous polluants confondus"""
+        hours = [s.last_hour for s in self.stats.values() if s.last_hour is not None]
+        return pd.Timestamp(max(hours) * 3600, unit='s') if hours else None
+
+    def add(self, pollutant: str, hours, values: np.ndarray):
+        """Valeurs horaires (heures, n) ou, sur une grille, (heures, ny, nx)"""
+        self.stats[pollutant].add(hours, np.asarray(values).reshape(len(hours), self.n))
+
+    def add_frame(self, frame: pd.DataFrame, value_column: str = 'valeur'):
+        """Format long (heure, id_station, polluant, valeur) : une matrice heures × stations par polluant"""
+        for pollutant, rows in frame[frame['polluant'].isin(list(self.stats))].groupby('polluant'):
+            matrix = rows.pivot_table(index='heure', columns='id_station', values=value_column, aggfunc='mean')
+            matrix = matrix.sort_index().reindex(columns=self.ids)
+            self.add(pollutant, matrix.index, matrix.to_numpy(dtype=np.float64))
+
+    def close_day(self):
+        for stats in self.stats.values():
+            stats.close_day()
+
+    def merge(self, other: "ComplianceAccumulator"):
+        """Fusionner le cumul d'une autre période sur les mêmes séries"""
+        if other.spec != self.spec or other.ids != self.ids or set(other.stats) != set(self.stats):
+            raise ValueError("Séries ou polluants différents : fusion impossible")
+        for pollutant, stats in self.stats.items():
+            stats.merge(other.stats[pollutant])
+
+    def indicators(self, pollutant: str) -> Dict[str, np.ndarray]:
+        """Indicateurs d'un polluant, en grilles (ny, nx) sur une grille"""
+        values = self.stats[pollutant].indicators()
+        if self.spec is not None:
+            values = {name: array.reshape(self.spec.shape) for name, array in values.items()}
+        return values
+
+    def to_frame(self) -> pd.DataFrame:
+        """Indicateurs par station et polluant (format long)"""
+        frames = []
+        for pollutant in self.stats:
+            frame = pd.DataFrame(self.stats[pollutant].indicators())
+            frame.insert(0, 'polluant', pollutant)
+            frame.insert(0, 'id_station', self.ids if self.ids is not None else np.arange(self.n))
+            frames.append(frame)
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def save(self, path):
+        """Point de reprise (.npz non compressé, écriture atomique)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {'grid': self.spec.to_dict() if self.spec is not None else None, 'ids': self.ids, 'stats': {}}
+        arrays = {}
+        for pollutant, stats in self.stats.items():
+            meta['stats'][pollutant], state = stats.state()
+            arrays.update({f"{pollutant}__{name}": array for name, array in state.items()})
+        tmp = path.with_name(path.stem + '.tmp.npz')
+        np.savez(tmp, _compliance=json.dumps(meta), **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path) -> "ComplianceAccumulator":
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['_compliance']))
+            arrays = {name: data[name] for name in data.files if name != '_compliance'}
+        keys = GridSpec.from_dict(meta['grid']) if meta['grid'] is not None else meta['ids']
+        accumulator = cls(keys, [])
+        for pollutant, state in meta['stats'].items():
+            prefix = f"{pollutant}__"
+            accumulator.stats[pollutant] = ComplianceStats.from_state(accumulator.n, state, {
+                name[len(prefix):]: array for name, array in arrays.items() if name.startswith(prefix)})
+        return accumulator
+
+    @classmethod
+    def resume(cls, path, keys: Union[GridSpec, Sequence[str]], pollutants: Sequence[str],
+               **kwargs) -> "ComplianceAccumulator":
+        """Reprendre un cumul existant (mêmes séries et polluants) ou en démarrer un nouveau"""
+        path = Path(path)
+        if not path.exists():
+            return cls(keys, pollutants, **kwargs)
+        accumulator = cls.load(path)
+        same_keys = accumulator.spec == keys if isinstance(keys, GridSpec) else accumulator.ids == list(map(str, keys))
+        if not same_keys or set(accumulator.stats) != set(pollutants):
+            raise ValueError(f"Le point de reprise {path} porte sur d'autres séries ou polluants")
+        logger.info(f"🔁 Reprise des statistiques de conformité jusqu'à {accumulator.last_hour}")
+        return accumulator
+
+    def summary(self) -> Dict:
+        return {p: {'heures': int(s.hours.max(initial=0)), 'jours': int(s.days.max(initial=0))}
+                for p, s in self.stats.items()}
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Débits horaires d'émission pour la dispersion (etl.emissions_staging)
+Projet: Airport Air Quality Modeling
+
+Émissions des phases du cycle LTO (roulage, décollage, montée, approche)
+rattachées à l'heure de départ ou d'arrivée du vol à l'aéroport, converties
+en débits (g/s) et réparties également entre les sources d'une piste.
+emissions_staging ne localise pas les émissions : la géométrie de piste par
+défaut (centrée sur le point de référence) en tient lieu.
+"""
+
+import logging
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.dispersion.plume import line_sources
+
+logger = logging.getLogger(__name__)
+
+# Phases proches du sol (cycle LTO) et mouvement de rattachement
+DEPARTURE_PHASES = ('taxi_out', 'takeoff', 'climb')
+ARRIVAL_PHASES = ('approach', 'taxi_in')
+
+DEFAULT_POLLUTANTS = ('NOx', 'PM10', 'PM25')
+
+# Piste par défaut : longueur (m), orientation (degrés, sens des QFU), sources
+DEFAULT_RUNWAY_LENGTH_M = 3000.0
+DEFAULT_RUNWAY_HEADING_DEG = 90.0
+DEFAULT_RUNWAY_SOURCES = 20
+
+# Hauteur d'émission et dispersion initiale des jets moteurs (m)
+ENGINE_HEIGHT_M = 10.0
+ENGINE_SIGMA_Y0_M = 20.0
+ENGINE_SIGMA_Z0_M = 5.0
+
+HOURLY_EMISSIONS_QUERY = """
+    SELECT date_trunc('hour', CASE WHEN e.flight_phase IN %(arrival)s
+                                   THEN f.arrival_time ELSE f.departure_time END) AS heure,
+           e.pollutant_type AS polluant, SUM(e.emission_quantity_kg)::float8 AS emission_kg
+    FROM etl.emissions_staging e
+    JOIN etl.flights_staging f ON f.flight_id = e.flight_id
+    WHERE e.pollutant_type = ANY(%(pollutants)s)
+      AND ((e.flight_phase IN %(departure)s AND f.departure_airport = %(airport)s
+            AND f.departure_time >= %(start)s AND f.departure_time < %(end)s)
+        OR (e.flight_phase IN %(arrival)s AND f.arrival_airport = %(airport)s
+            AND f.arrival_time >= %(start)s AND f.arrival_time < %(end)s))
+    GROUP BY 1, 2
+"""
+
+
+def load_hourly_emissions(conn, start, end, airport: str = 'CDG',
+                          pollutants: Sequence[str] = DEFAULT_POLLUTANTS) -> pd.DataFrame:
+    """Émissions LTO (kg) par heure et polluant, heures en index"""
+    frame = pd.read_sql_query(HOURLY_EMISSIONS_QUERY, conn, params={
+        'airport': airport, 'start': start, 'end': end, 'pollutants': list(pollutants),
+        'departure': DEPARTURE_PHASES, 'arrival': ARRIVAL_PHASES,
+    }, parse_dates=['heure'])
+    return frame.pivot_table(index='heure', columns='polluant', values='emission_kg', aggfunc='sum') \
+        .reindex(columns=list(pollutants)).fillna(0.0)
+
+
+def runway_sources(x: float, y: float, length_m: float = DEFAULT_RUNWAY_LENGTH_M,
+                   heading_deg: float = DEFAULT_RUNWAY_HEADING_DEG,
+                   n: int = DEFAULT_RUNWAY_SOURCES) -> pd.DataFrame:
+    """Sources réparties le long d'une piste centrée sur (x, y)"""
+    half = length_m / 2
+    dx, dy = half * np.sin(np.radians(heading_deg)), half * np.cos(np.radians(heading_deg))
+    return line_sources(x - dx, y - dy, x + dx, y + dy, n, ENGINE_HEIGHT_M, ENGINE_SIGMA_Y0_M, ENGINE_SIGMA_Z0_M)
+
+
+def spread_rates(hourly_kg: pd.DataFrame, hours: pd.DatetimeIndex, n_sources: int) -> dict:
+    """{polluant: débits (heures, sources) en g/s}, émission horaire répartie entre les sources"""
+    aligned = hourly_kg.reindex(hours).fillna(0.0)
+    return {pollutant: np.repeat((aligned[pollutant].to_numpy() * 1000.0 / 3600.0 / n_sources)[:, None],
+                                 n_sources, axis=1)
+            for pollutant in aligned.columns}
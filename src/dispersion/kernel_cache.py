@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache de noyaux de dispersion unitaires par classe météo et moyennes de longue durée
+Projet: Airport Air Quality Modeling
+
+La concentration est linéaire en débit : un groupe de sources (piste, aire
+de stationnement) émettant 1 g/s donne, pour une classe météo (secteur de
+vent, classe de vitesse, stabilité), un noyau unitaire sur la grille en
+µg/m³ par g/s. Les heures d'une année ne tombent que dans quelques
+centaines de classes : la moyenne de longue durée est la somme des noyaux
+pondérée par l'histogramme des classes (débits horaires du groupe compris).
+
+Chaque noyau est calculé une fois par le modèle (src/dispersion/plume.py)
+pour la direction centrale du secteur et la vitesse représentative de la
+classe, puis stocké en .npz compressé sous une clé de hachage de la grille,
+de la géométrie du groupe, du découpage météo et de la hauteur des
+récepteurs. Une heure est répartie entre les deux secteurs qui encadrent sa
+direction ; le panache étant en 1/u, son poids est corrigé du rapport
+vitesse représentative / vitesse observée.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.dispersion.meteo import MIN_WIND_MS, STABILITY_CLASSES
+from src.dispersion.plume import BLOCK_ELEMENTS, RECEPTOR_HEIGHT_M, PlumeSources, iter_kernels
+from src.grids.spec import GridSpec, load_grid, save_grid
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_ROOT = Path(__file__).resolve().parents[2] / "data" / "dispersion" / "kernels"
+
+# À incrémenter quand les formules du modèle changent (invalide tout le cache)
+CACHE_VERSION = 1
+
+# Noyaux calculés par appel au modèle (limite la mémoire des tableaux float64)
+KERNELS_PER_BATCH = 64
+
+# Noyaux gardés en mémoire (octets), les plus anciens relus ensuite du disque
+MEMORY_BYTES = 512 * 2**20
+
+
+@dataclass(frozen=True)
+class MetBinning:
+    """Découpage des heures en classes : secteur de vent × classe de vitesse × stabilité
+
+    speed_values_ms : vitesse représentative (à 10 m) de chaque classe
+    délimitée par speed_edges_ms (une valeur de plus que de bornes). Les
+    écarts types ne dépendant que de la distance et de la stabilité, la
+    correction en 1/u est exacte au-dessus du vent minimal : par défaut,
+    seuls les calmes forment une classe de vitesse à part et le nombre de
+    classes sert à la finesse des secteurs (l'erreur de la moyenne vient des
+    panaches stables étroits ramenés aux directions des secteurs).
+    """
+
+    direction_step_deg: float = 2.0
+    speed_edges_ms: Tuple[float, ...] = (MIN_WIND_MS,)
+    speed_values_ms: Tuple[float, ...] = (MIN_WIND_MS, 5.0)
+
+    def __post_init__(self):
+        if len(self.speed_values_ms) != len(self.speed_edges_ms) + 1:
+            raise ValueError("speed_values_ms doit compter une valeur de plus que speed_edges_ms")
+        if abs(360.0 / self.direction_step_deg - self.n_directions) > 1e-9:
+            raise ValueError(f"Secteur de {self.direction_step_deg}° ne divisant pas 360°")
+
+    @property
+    def n_directions(self) -> int:
+        return int(round(360.0 / self.direction_step_deg))
+
+    @property
+    def n_classes(self) -> int:
+        return self.n_directions * len(self.speed_values_ms) * len(STABILITY_CLASSES)
+
+    def classify(self, meteo: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """Codes de classe (2, heures) et parts (2, heures) par heure
+
+        Direction répartie linéairement entre les deux secteurs qui
+        l'encadrent (colonnes wind_direction_deg, wind_speed_ms, stability).
+        """
+        position = (meteo['wind_direction_deg'].to_numpy(dtype=np.float64) % 360.0) / self.direction_step_deg
+        lower = np.floor(position)
+        upper_share = position - lower
+        sectors = np.stack([lower.astype(np.int64) % self.n_directions,
+                            (lower.astype(np.int64) + 1) % self.n_directions])
+        speed = np.digitize(meteo['wind_speed_ms'].to_numpy(dtype=np.float64), self.speed_edges_ms)
+        stability = meteo['stability'].to_numpy().astype(np.int64)
+        codes = (sectors * len(self.speed_values_ms) + speed) * len(STABILITY_CLASSES) + stability
+        return codes, np.stack([1.0 - upper_share, upper_share])
+
+    def describe(self, codes) -> pd.DataFrame:
+        """Météo représentative des classes (mêmes colonnes que la météo horaire)"""
+        codes = np.asarray(codes, dtype=np.int64)
+        stability = codes % len(STABILITY_CLASSES)
+        speed = (codes // len(STABILITY_CLASSES)) % len(self.speed_values_ms)
+        sector = codes // (len(STABILITY_CLASSES) * len(self.speed_values_ms))
+        return pd.DataFrame({
+            'wind_direction_deg': sector * self.direction_step_deg,
+            'wind_speed_ms': np.asarray(self.speed_values_ms)[speed],
+            'stability': stability,
+        }, index=pd.Index(codes, name='classe'))
+
+    def speed_factor(self, meteo: pd.DataFrame, codes: np.ndarray) -> np.ndarray:
+        """Rapport vitesse représentative / vitesse observée (panache en 1/u)"""
+        speed = (codes // len(STABILITY_CLASSES)) % len(self.speed_values_ms)
+        representative = np.asarray(self.speed_values_ms)[speed]
+        observed = meteo['wind_speed_ms'].to_numpy(dtype=np.float64)
+        return np.maximum(representative, MIN_WIND_MS) / np.maximum(observed, MIN_WIND_MS)
+
+    def to_dict(self) -> Dict:
+        return {'direction_step_deg': self.direction_step_deg, 'speed_edges_ms': list(self.speed_edges_ms),
+                'speed_values_ms': list(self.speed_values_ms)}
+
+
+@dataclass(frozen=True)
+class SourceGroup:
+    """Groupe de sources émettant ensemble (débit total réparti selon weights)"""
+
+    name: str
+    sources: PlumeSources
+    weights: Optional[np.ndarray] = None
+
+    def __post_init__(self):
+        weights = np.ones(len(self.sources)) if self.weights is None else np.asarray(self.weights, dtype=np.float64)
+        if weights.shape != (len(self.sources),) or weights.sum() <= 0:
+            raise ValueError(f"Poids invalides pour le groupe {self.name}")
+        object.__setattr__(self, 'weights', weights / weights.sum())
+
+    @classmethod
+    def from_frame(cls, name: str, frame: pd.DataFrame, weight_column: Optional[str] = None) -> "SourceGroup":
+        """Sources au format de PlumeSources.from_frame, poids facultatifs"""
+        weights = frame[weight_column].to_numpy(dtype=np.float64) if weight_column else None
+        return cls(name, PlumeSources.from_frame(frame), weights)
+
+    def geometry(self) -> Dict:
+        return {
+            'x': self.sources.x.tolist(), 'y': self.sources.y.tolist(), 'height': self.sources.height.tolist(),
+            'sigma_y0': self.sources.sigma_y0.tolist(), 'sigma_z0': self.sources.sigma_z0.tolist(),
+            'weights': self.weights.tolist(),
+        }
+
+
+class KernelCache:
+    """Noyaux unitaires (groupe × classe météo) en mémoire et sur disque (.npz)"""
+
+    def __init__(self, spec: GridSpec, binning: Optional[MetBinning] = None, root=DEFAULT_CACHE_ROOT,
+                 receptor_height: float = RECEPTOR_HEIGHT_M, block_elements: int = BLOCK_ELEMENTS,
+                 memory_bytes: int = MEMORY_BYTES):
+        self.spec = spec
+        self.binning = binning or MetBinning()
+        self.root = Path(root) / spec.key()
+        self.receptor_height = float(receptor_height)
+        self.block_elements = block_elements
+        self.memory_bytes = memory_bytes
+        self._memory: Dict[Tuple[str, int], np.ndarray] = {}
+        self._memory_used = 0
+        self.hits = self.loads = self.computed = 0
+
+    def digest(self, group: SourceGroup) -> str:
+        """Hachage de toutes les entrées du calcul (répertoire des noyaux du groupe)"""
+        payload = json.dumps({
+            'version': CACHE_VERSION,
+            'grid': self.spec.to_dict(),
+            'sources': group.geometry(),
+            'binning': self.binning.to_dict(),
+            'receptor_height': self.receptor_height,
+        }, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()[:24]
+
+    def path(self, digest: str, code: int) -> Path:
+        return self.root / digest / f"{int(code)}.npz"
+
+    def kernels(self, group: SourceGroup, codes: Sequence[int]) -> np.ndarray:
+        """Noyaux (len(codes), N) en µg/m³ par g/s : mémoire, puis disque, puis modèle"""
+        digest = self.digest(group)
+        result = np.empty((len(codes), self.spec.size), dtype=np.float32)
+        missing = []
+        for i, code in enumerate(int(c) for c in codes):
+            kernel = self._memory.get((digest, code))
+            if kernel is not None:
+                self.hits += 1
+            elif self.path(digest, code).exists():
+                self.loads += 1
+                kernel = self._remember(digest, code, self._load(digest, code))
+            else:
+                missing.append(i)
+                continue
+            result[i] = kernel
+        for start in range(0, len(missing), KERNELS_PER_BATCH):
+            batch = missing[start:start + KERNELS_PER_BATCH]
+            result[batch] = self._compute(group, digest, [int(codes[i]) for i in batch])
+        return result
+
+    def _remember(self, digest: str, code: int, kernel: np.ndarray) -> np.ndarray:
+        self._memory[(digest, code)] = kernel
+        self._memory_used += kernel.nbytes
+        while self._memory_used > self.memory_bytes and self._memory:
+            self._memory_used -= self._memory.pop(next(iter(self._memory))).nbytes
+        return kernel
+
+    def _load(self, digest: str, code: int) -> np.ndarray:
+        spec, arrays = load_grid(self.path(digest, code))
+        if spec != self.spec:
+            raise ValueError(f"Noyau {digest}/{code} calculé sur une autre grille")
+        return arrays['kernel'].ravel()
+
+    def _compute(self, group: SourceGroup, digest: str, codes: Sequence[int]) -> np.ndarray:
+        meteo = self.binning.describe(codes)
+        kernels = np.empty((len(codes), self.spec.size), dtype=np.float32)
+        for block, kernel in iter_kernels(group.sources, self.spec.points(), meteo, self.receptor_height,
+                                          self.block_elements):
+            kernels[block] = np.einsum('hsr,s->hr', kernel, group.weights)
+        (self.root / digest).mkdir(parents=True, exist_ok=True)
+        for code, kernel in zip(codes, kernels):
+            path = self.path(digest, code)
+            tmp = path.with_name(f"{code}.tmp.npz")
+            save_grid(tmp, self.spec, kernel=kernel.reshape(self.spec.shape), _groupe=group.name)
+            os.replace(tmp, path)
+            self._remember(digest, code, kernel)
+        self.computed += len(codes)
+        logger.info(f"🧮 {len(codes)} noyaux unitaires calculés pour {group.name} ({self.root / digest})")
+        return kernels
+
+    @property
+    def hit_rate(self) -> float:
+        """Part des noyaux demandés servis sans calcul (mémoire ou disque)"""
+        requested = self.hits + self.loads + self.computed
+        return (self.hits + self.loads) / requested if requested else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {'memory_hits': self.hits, 'disk_loads': self.loads, 'computed': self.computed,
+                'hit_rate': round(self.hit_rate, 4)}
+
+
+def class_histogram(binning: MetBinning, meteo: pd.DataFrame) -> pd.Series:
+    """Heures (fractionnées entre secteurs voisins) par classe météo, plus fréquentes d'abord"""
+    codes, shares = binning.classify(meteo)
+    return pd.Series(shares.ravel()).groupby(codes.ravel()).sum().sort_values(ascending=False) \
+        .rename_axis('classe').rename('heures')
+
+
+def long_term_means(cache: KernelCache, groups: Sequence[SourceGroup], rates: Mapping[str, np.ndarray],
+                    meteo: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Concentrations moyennes (ny, nx) en µg/m³ sur les heures de meteo, par polluant
+
+    rates : {polluant: débits (heures, groupes) en g/s}. Pour chaque groupe,
+    poids de chaque classe = somme des débits horaires × part du secteur ×
+    correction de vitesse, puis un produit matriciel poids × noyaux.
+    """
+    codes, shares = cache.binning.classify(meteo)
+    shares = shares * cache.binning.speed_factor(meteo, codes[0])
+    classes, inverse = np.unique(codes.ravel(), return_inverse=True)
+    pollutants = list(rates)
+    stacked = np.stack([np.asarray(rates[p], dtype=np.float64) for p in pollutants])
+    if stacked.shape[1:] != (len(meteo), len(groups)):
+        raise ValueError(f"Débits {stacked.shape[1:]} incompatibles avec {len(meteo)} heures × "
+                         f"{len(groups)} groupes")
+
+    totals = np.zeros((len(pollutants), cache.spec.size))
+    for g, group in enumerate(groups):
+        weights = np.stack([np.bincount(inverse, (shares * stacked[p, :, g]).ravel(), minlength=len(classes))
+                            for p in range(len(pollutants))])
+        used = np.flatnonzero(weights.any(axis=0))
+        for start in range(0, len(used), KERNELS_PER_BATCH):
+            batch = used[start:start + KERNELS_PER_BATCH]
+            totals += weights[:, batch] @ cache.kernels(group, classes[batch])
+    logger.info(f"🌫️ {len(meteo)} h → {len(classes)} classes météo, {len(groups)} groupes | "
+                f"cache {cache.stats()}")
+    return {p: (totals[i] / max(len(meteo), 1)).reshape(cache.spec.shape) for i, p in enumerate(pollutants)}
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Météorologie horaire pour la dispersion (etl.weather_staging)
+Projet: Airport Air Quality Modeling
+
+Observations ramenées au pas horaire (vent moyenné vectoriellement, trous
+courts interpolés), hauteur du soleil et classe de stabilité de
+Pasquill-Gifford selon la table de Turner :
+
+    vent (m/s)   fort   modéré  faible   nuit ≥ 4/8   nuit ≤ 3/8
+    < 2          A      B       B        E            F
+    2 - 3        B      B       C        E            F
+    3 - 5        B      C       C        D            E
+    5 - 6        C      D       D        D            D
+    ≥ 6          C      D       D        D            D
+
+Ensoleillement d'après la hauteur du soleil (> 60° fort, 35-60° modéré,
+sinon faible). weather_staging ne fournit pas la nébulosité : une humidité
+relative ≥ OVERCAST_HUMIDITY_PERCENT tient lieu de ciel couvert (classe D de
+jour, nuit ≥ 4/8). Les classes intermédiaires de Turner (A-B, B-C, C-D) sont
+ramenées à la plus stable des deux.
+"""
+
+import logging
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Point de référence pour la hauteur du soleil (aéroport Paris-Val d'Europe)
+AIRPORT_LAT = 48.8738
+AIRPORT_LON = 2.6794
+
+# Fuseau des horodatages de weather_staging (heure locale)
+LOCAL_TIMEZONE = 'Europe/Paris'
+
+STABILITY_CLASSES = 'ABCDEF'
+
+# Hauteur de mesure du vent (m) et vent minimal du modèle gaussien (calmes)
+WIND_HEIGHT_M = 10.0
+MIN_WIND_MS = 1.0
+
+# Exposant du profil de vent en loi puissance par classe (rural, ISC3)
+WIND_PROFILE_EXPONENT = np.array([0.07, 0.07, 0.10, 0.15, 0.35, 0.55])
+
+# Humidité relative tenant lieu de ciel couvert (%)
+OVERCAST_HUMIDITY_PERCENT = 85.0
+
+# Trou d'observations comblé par interpolation (heures)
+MAX_INTERPOLATED_HOURS = 3
+
+# Table de Turner : bornes de vent et classe (indice dans STABILITY_CLASSES)
+# par ensoleillement (fort, modéré, faible, nuit couverte, nuit claire)
+WIND_BINS_MS = [2.0, 3.0, 5.0, 6.0]
+TURNER_TABLE = np.array([
+    [0, 1, 1, 4, 5],
+    [1, 1, 2, 4, 5],
+    [1, 2, 2, 3, 4],
+    [2, 3, 3, 3, 3],
+    [2, 3, 3, 3, 3],
+])
+
+WEATHER_QUERY = """
+    SELECT observation_time, temperature_c::float8 AS temperature_c,
+           humidity_percent::float8 AS humidity_percent, wind_speed_ms::float8 AS wind_speed_ms,
+           wind_direction_deg::float8 AS wind_direction_deg, pressure_hpa::float8 AS pressure_hpa
+    FROM etl.weather_staging
+    WHERE airport_code = %(airport)s
+      AND observation_time >= %(start)s AND observation_time < %(end)s
+    ORDER BY observation_time
+"""
+
+
+def load_weather(conn, start, end, airport: str = 'CDG') -> pd.DataFrame:
+    """Observations brutes de weather_staging sur [start, end["""
+    return pd.read_sql_query(WEATHER_QUERY, conn, params={'airport': airport, 'start': start, 'end': end},
+                             parse_dates=['observation_time'])
+
+
+def hourly_weather(observations: pd.DataFrame, start=None, end=None) -> pd.DataFrame:
+    """Météo au pas horaire, index horaire ; heures sans données exclues
+
+    Vent moyenné par composantes, trous d'au plus MAX_INTERPOLATED_HOURS
+    interpolés, classes de stabilité ajoutées (cf. stability_class).
+    """
+    frame = observations.set_index('observation_time').sort_index()
+    rad = np.radians(frame['wind_direction_deg'])
+    frame = frame.assign(u=frame['wind_speed_ms'] * np.sin(rad), v=frame['wind_speed_ms'] * np.cos(rad))
+    hourly = frame[['temperature_c', 'humidity_percent', 'wind_speed_ms', 'pressure_hpa', 'u', 'v']] \
+        .resample('h').mean()
+    if start is not None or end is not None:
+        index = pd.date_range(pd.Timestamp(start or hourly.index[0]).floor('h'),
+                              pd.Timestamp(end or hourly.index[-1] + pd.Timedelta(hours=1)).ceil('h'),
+                              freq='h', inclusive='left')
+        hourly = hourly.reindex(index)
+    hourly = hourly.interpolate(method='time', limit=MAX_INTERPOLATED_HOURS, limit_area='inside')
+    missing = hourly.isna().any(axis=1)
+    if missing.any():
+        logger.warning(f"⚠️ {int(missing.sum())} heures sans météo exclues")
+    hourly = hourly[~missing]
+    hourly['wind_direction_deg'] = np.degrees(np.arctan2(hourly['u'], hourly['v'])) % 360.0
+    hourly = hourly.drop(columns=['u', 'v'])
+    hourly['solar_elevation_deg'] = solar_elevation(hourly.index)
+    hourly['stability'] = stability_class(hourly['wind_speed_ms'].to_numpy(),
+                                          hourly['solar_elevation_deg'].to_numpy(),
+                                          hourly['humidity_percent'].to_numpy())
+    hourly.index.name = 'heure'
+    return hourly
+
+
+def solar_elevation(times, lat: float = AIRPORT_LAT, lon: float = AIRPORT_LON) -> np.ndarray:
+    """Hauteur du soleil (degrés) au milieu de chaque heure locale
+
+    Déclinaison et équation du temps approchées (NOAA), précision ~0,5°,
+    suffisante pour les seuils d'ensoleillement de Turner.
+    """
+    local = pd.DatetimeIndex(times) + pd.Timedelta(minutes=30)
+    utc = local.tz_localize(LOCAL_TIMEZONE, ambiguous=False, nonexistent='shift_forward').tz_convert('UTC')
+    gamma = 2 * np.pi / 365 * (utc.dayofyear.to_numpy() - 1 + (utc.hour.to_numpy() - 12) / 24)
+    declination = (0.006918 - 0.399912 * np.cos(gamma) + 0.070257 * np.sin(gamma)
+                   - 0.006758 * np.cos(2 * gamma) + 0.000907 * np.sin(2 * gamma)
+                   - 0.002697 * np.cos(3 * gamma) + 0.00148 * np.sin(3 * gamma))
+    equation_of_time = 229.18 * (0.000075 + 0.001868 * np.cos(gamma) - 0.032077 * np.sin(gamma)
+                                 - 0.014615 * np.cos(2 * gamma) - 0.040849 * np.sin(2 * gamma))
+    minutes = utc.hour.to_numpy() * 60 + utc.minute.to_numpy()
+    hour_angle = np.radians((minutes + equation_of_time + 4 * lon) / 4 - 180)
+    lat_rad = np.radians(lat)
+    sin_elevation = (np.sin(lat_rad) * np.sin(declination)
+                     + np.cos(lat_rad) * np.cos(declination) * np.cos(hour_angle))
+    return np.degrees(np.arcsin(np.clip(sin_elevation, -1, 1)))
+
+
+def stability_class(wind_speed: np.ndarray, solar_elevation_deg: np.ndarray,
+                    humidity: Optional[np.ndarray] = None) -> np.ndarray:
+    """Classe de Pasquill-Gifford (indice 0-5 dans STABILITY_CLASSES) par heure"""
+    wind_speed = np.asarray(wind_speed, dtype=np.float64)
+    elevation = np.asarray(solar_elevation_deg, dtype=np.float64)
+    overcast = (np.zeros(len(wind_speed), dtype=bool) if humidity is None
+                else np.asarray(humidity, dtype=np.float64) >= OVERCAST_HUMIDITY_PERCENT)
+    insolation = np.select([elevation > 60, elevation > 35, elevation > 0, overcast], [0, 1, 2, 3], default=4)
+    stability = TURNER_TABLE[np.digitize(wind_speed, WIND_BINS_MS), insolation]
+    return np.where(overcast & (elevation > 0), STABILITY_CLASSES.index('D'), stability)
+
+
+def wind_at_height(wind_speed: np.ndarray, stability: np.ndarray, height_m) -> np.ndarray:
+    """Vent à la hauteur des sources (loi puissance), borné à MIN_WIND_MS"""
+    ratio = np.maximum(np.asarray(height_m, dtype=np.float64), WIND_HEIGHT_M) / WIND_HEIGHT_M
+    return np.maximum(wind_speed * ratio ** WIND_PROFILE_EXPONENT[stability], MIN_WIND_MS)
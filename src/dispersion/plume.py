@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modèle de panache gaussien vectorisé (sources × récepteurs × heures)
+Projet: Airport Air Quality Modeling
+
+Concentration au récepteur (x aval, y transverse, z hauteur) d'une source
+ponctuelle de débit Q (g/s) à la hauteur H, vent u à la hauteur de la source :
+
+    C = Q / (2π u σy σz) · exp(-y² / 2σy²) · [exp(-(z-H)² / 2σz²) + exp(-(z+H)² / 2σz²)]
+
+avec réflexion totale au sol, sans dépôt ni couche de mélange. Écarts types
+de Briggs (1973), terrain dégagé, σ = a·x·(1 + b·x)^p selon la classe de
+Pasquill-Gifford (src/dispersion/meteo.py) ; dispersion initiale σy0/σz0
+des sources étendues (moteurs, aires de trafic) par source virtuelle.
+
+Les heures sont regroupées par classe de stabilité (exposants constants) et
+traitées par blocs (heures × sources × récepteurs) de taille bornée ; les
+polluants partagent les noyaux de dispersion (contraction par les débits).
+Concentrations en µg/m³.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterator, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.dispersion.meteo import STABILITY_CLASSES, WIND_HEIGHT_M, wind_at_height
+from src.grids.memmap_store import GridStore
+from src.grids.spec import GridSpec
+
+logger = logging.getLogger(__name__)
+
+# Écarts types de Briggs, terrain dégagé : (a, b, p) pour σ = a·x·(1 + b·x)^p, classes A à F
+SIGMA_Y = np.array([
+    [0.22, 0.0001, -0.5],
+    [0.16, 0.0001, -0.5],
+    [0.11, 0.0001, -0.5],
+    [0.08, 0.0001, -0.5],
+    [0.06, 0.0001, -0.5],
+    [0.04, 0.0001, -0.5],
+])
+SIGMA_Z = np.array([
+    [0.20, 0.0, 0.0],
+    [0.12, 0.0, 0.0],
+    [0.08, 0.0002, -0.5],
+    [0.06, 0.0015, -0.5],
+    [0.03, 0.0003, -1.0],
+    [0.016, 0.0003, -1.0],
+])
+
+# Distance aval minimale (m) : en deçà, récepteur confondu avec la source
+MIN_DOWNWIND_M = 1.0
+
+# Hauteur des récepteurs (m, hauteur de prélèvement des stations)
+RECEPTOR_HEIGHT_M = 1.5
+
+# Éléments heures × sources × récepteurs par bloc (~8 tableaux float64)
+BLOCK_ELEMENTS = 4_000_000
+
+# Masses molaires (g/mol) pour la conversion en ppb (NOx exprimés en NO2)
+MOLAR_MASS = {'NOx': 46.0055, 'NO2': 46.0055, 'SO2': 64.066, 'SOx': 64.066, 'CO': 28.010}
+
+GAS_CONSTANT = 8.314462
+
+
+@dataclass(frozen=True)
+class PlumeSources:
+    """Sources ponctuelles (coordonnées du CRS de la grille, m)"""
+
+    x: np.ndarray
+    y: np.ndarray
+    height: np.ndarray
+    sigma_y0: np.ndarray
+    sigma_z0: np.ndarray
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "PlumeSources":
+        """Colonnes x, y, hauteur_m et facultativement sigma_y0_m, sigma_z0_m"""
+        n = len(frame)
+
+        def column(name):
+            values = frame[name].to_numpy(dtype=np.float64) if name in frame else np.zeros(n)
+            return np.ascontiguousarray(values)
+
+        return cls(column('x'), column('y'), column('hauteur_m'), column('sigma_y0_m'), column('sigma_z0_m'))
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+
+def _sigma(coefficients: np.ndarray, distance: np.ndarray) -> np.ndarray:
+    a, b, p = coefficients
+    if p == 0.0:
+        return a * distance
+    if p == -0.5:
+        return a * distance / np.sqrt(1.0 + b * distance)
+    return a * distance / (1.0 + b * distance)
+
+
+def _plume_block(dx: np.ndarray, dy: np.ndarray, sources: PlumeSources, receptor_z: np.ndarray,
+                 direction_deg: np.ndarray, wind_ms: np.ndarray, stability: int) -> np.ndarray:
+    """Noyaux (heures, sources, récepteurs) en µg/m³ par g/s, classe unique"""
+    theta = np.radians(direction_deg)[:, None, None]
+    # Vent venant de θ : transport vers θ + 180°
+    along_x, along_y = -np.sin(theta), -np.cos(theta)
+    downwind = along_x * dx + along_y * dy
+    crosswind = along_y * dx - along_x * dy
+    upwind = downwind < MIN_DOWNWIND_M
+    downwind = np.maximum(downwind, MIN_DOWNWIND_M)
+
+    sigma_y = _sigma(SIGMA_Y[stability], downwind)
+    sigma_z = _sigma(SIGMA_Z[stability], downwind)
+    if sources.sigma_y0.any():
+        sigma_y = np.sqrt(sigma_y ** 2 + sources.sigma_y0[:, None] ** 2)
+    if sources.sigma_z0.any():
+        sigma_z = np.sqrt(sigma_z ** 2 + sources.sigma_z0[:, None] ** 2)
+
+    height = sources.height[:, None]
+    u = wind_ms[:, :, None]
+    inv_2sz2 = -0.5 / (sigma_z * sigma_z)
+    kernel = np.exp(crosswind * crosswind * (-0.5 / (sigma_y * sigma_y)))
+    kernel *= (np.exp((receptor_z - height) ** 2 * inv_2sz2) + np.exp((receptor_z + height) ** 2 * inv_2sz2))
+    kernel *= 1e6 / (2 * np.pi) / (u * sigma_y * sigma_z)
+    kernel[upwind] = 0.0
+    return kernel
+
+
+def iter_kernels(sources: PlumeSources, receptors: np.ndarray, meteo: pd.DataFrame,
+                 receptor_height: float = RECEPTOR_HEIGHT_M,
+                 block_elements: int = BLOCK_ELEMENTS) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Blocs (indices d'heures, noyaux (heures, sources, récepteurs) en µg/m³ par g/s)
+
+    meteo : colonnes wind_speed_ms, wind_direction_deg, stability (indice de classe).
+    """
+    receptors = np.asarray(receptors, dtype=np.float64)
+    dx = receptors[None, :, 0] - sources.x[:, None]
+    dy = receptors[None, :, 1] - sources.y[:, None]
+    receptor_z = np.full(len(receptors), receptor_height) if np.ndim(receptor_height) == 0 \
+        else np.asarray(receptor_height, dtype=np.float64)
+    stability = meteo['stability'].to_numpy()
+    speed = meteo['wind_speed_ms'].to_numpy(dtype=np.float64)
+    direction = meteo['wind_direction_deg'].to_numpy(dtype=np.float64)
+    hours_per_block = max(1, block_elements // max(dx.size, 1))
+    for cls in np.unique(stability):
+        hours = np.flatnonzero(stability == cls)
+        for start in range(0, len(hours), hours_per_block):
+            block = hours[start:start + hours_per_block]
+            wind = wind_at_height(speed[block, None], stability[block, None], sources.height[None, :])
+            yield block, _plume_block(dx, dy, sources, receptor_z, direction[block], wind, int(cls))
+
+
+def concentrations(sources: PlumeSources, rates: np.ndarray, receptors: np.ndarray, meteo: pd.DataFrame,
+                   receptor_height: float = RECEPTOR_HEIGHT_M,
+                   block_elements: int = BLOCK_ELEMENTS) -> np.ndarray:
+    """Concentrations horaires (µg/m³)
+
+    rates : débits (g/s) de forme (heures, sources) ou (polluants, heures, sources).
+    Retourne (heures, récepteurs) ou (polluants, heures, récepteurs).
+    """
+    rates = np.asarray(rates, dtype=np.float64)
+    squeeze = rates.ndim == 2
+    rates = rates[None] if squeeze else rates
+    if rates.shape[1:] != (len(meteo), len(sources)):
+        raise ValueError(f"Débits {rates.shape[1:]} incompatibles avec {len(meteo)} heures × {len(sources)} sources")
+    result = np.zeros((rates.shape[0], len(meteo), len(receptors)))
+    for block, kernel in iter_kernels(sources, receptors, meteo, receptor_height, block_elements):
+        result[:, block] = np.einsum('phs,hsr->phr', rates[:, block], kernel, optimize=True)
+    return result[0] if squeeze else result
+
+
+def to_ppb(concentration: np.ndarray, pollutant: str, temperature_c, pressure_hpa) -> np.ndarray:
+    """µg/m³ → ppb aux conditions de l'heure (température, pression)"""
+    temperature_k = np.asarray(temperature_c, dtype=np.float64) + 273.15
+    pressure_pa = np.asarray(pressure_hpa, dtype=np.float64) * 100.0
+    return concentration * 1e3 * GAS_CONSTANT * temperature_k / (MOLAR_MASS[pollutant] * pressure_pa)
+
+
+def hourly_runs(sources: PlumeSources, rates: Mapping[str, np.ndarray], meteo: pd.DataFrame,
+                spec: GridSpec, stations: Optional[pd.DataFrame] = None, store_path=None,
+                hours_per_chunk: int = 24, overwrite: bool = False,
+                receptor_height: float = RECEPTOR_HEIGHT_M) -> Tuple[Optional[GridStore], pd.DataFrame]:
+    """Grilles horaires par polluant (magasin mappé) et séries aux stations
+
+    rates : {polluant: débits (heures, sources) en g/s}. Calcul par tranches
+    chronologiques de hours_per_chunk heures : grille et stations dans le même
+    passage, un pas de temps du magasin par heure. stations : colonnes
+    id_station, x, y. Séries au format long (heure, id_station, polluant,
+    concentration_ugm3, ppb pour les gaz).
+    """
+    pollutants = list(rates)
+    stacked = np.stack([np.asarray(rates[p], dtype=np.float64) for p in pollutants])
+    grid_points = spec.points()
+    station_points = (stations[['x', 'y']].to_numpy(dtype=np.float64) if stations is not None and len(stations)
+                      else np.empty((0, 2)))
+    receptors = np.vstack([grid_points, station_points])
+
+    store = None
+    if store_path is not None:
+        store = GridStore.create(store_path, spec, pollutants, attrs={
+            'unite': 'µg/m³', 'modele': 'panache gaussien (Briggs, terrain dégagé)',
+            'sources': len(sources), 'hauteur_recepteurs_m': receptor_height,
+            'hauteur_vent_m': WIND_HEIGHT_M,
+        }, overwrite=overwrite)
+
+    series = []
+    for start in range(0, len(meteo), hours_per_chunk):
+        chunk = slice(start, start + hours_per_chunk)
+        values = concentrations(sources, stacked[:, chunk], receptors, meteo.iloc[chunk], receptor_height)
+        hours = meteo.index[chunk]
+        if store is not None:
+            for h, hour in enumerate(hours):
+                store.append(hour.isoformat(), **{
+                    p: values[i, h, :spec.size].reshape(spec.shape).astype(np.float32)
+                    for i, p in enumerate(pollutants)})
+        if len(station_points):
+            for i, pollutant in enumerate(pollutants):
+                frame = pd.DataFrame(values[i, :, spec.size:], index=pd.Index(hours, name='heure'),
+                                     columns=pd.Index(stations['id_station'], name='id_station'))
+                frame = frame.stack().rename('concentration_ugm3').reset_index()
+                frame['polluant'] = pollutant
+                if pollutant in MOLAR_MASS:
+                    weather = meteo.reindex(frame['heure'])
+                    frame['ppb'] = to_ppb(frame['concentration_ugm3'].to_numpy(), pollutant,
+                                          weather['temperature_c'].to_numpy(), weather['pressure_hpa'].to_numpy())
+                series.append(frame)
+        logger.info(f"🌫️ {hours[0]:%Y-%m-%d %H:%M} → {hours[-1]:%Y-%m-%d %H:%M} : "
+                    f"{len(hours)} h × {len(receptors):,} récepteurs × {len(sources)} sources")
+
+    columns = ['heure', 'id_station', 'polluant', 'concentration_ugm3', 'ppb']
+    station_series = pd.concat(series, ignore_index=True).reindex(columns=columns) if series \
+        else pd.DataFrame(columns=columns)
+    return store, station_series
+
+
+def class_summary(meteo: pd.DataFrame) -> Dict[str, int]:
+    """Nombre d'heures par classe de stabilité"""
+    counts = np.bincount(meteo['stability'].to_numpy(), minlength=len(STABILITY_CLASSES))
+    return dict(zip(STABILITY_CLASSES, counts.tolist()))
+
+
+def line_sources(x0: float, y0: float, x1: float, y1: float, n: int, height_m: float = 0.0,
+                 sigma_y0_m: float = 0.0, sigma_z0_m: float = 0.0) -> pd.DataFrame:
+    """n sources régulièrement réparties sur un segment (piste, voie de circulation)"""
+    fraction = (np.arange(n) + 0.5) / n
+    return pd.DataFrame({
+        'x': x0 + (x1 - x0) * fraction,
+        'y': y0 + (y1 - y0) * fraction,
+        'hauteur_m': height_m,
+        'sigma_y0_m': sigma_y0_m,
+        'sigma_z0_m': sigma_z0_m,
+    })
+
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Stockage sur disque des grilles (bruit, concentrations) en mémoire mappée
+Projet: Airport Air Quality Modeling
+
+Un magasin est un répertoire :
+    meta.json       géoréférencement (GridSpec), champs et types, pas de temps
+    <champ>.dat     tableau brut (n_temps, ny, nx) en ordre C, petit-boutiste
+
+Les champs sont ouverts par np.memmap : lecture d'une emprise, calcul tuile
+par tuile et ajout d'un pas de temps ne chargent que les lignes concernées,
+quelle que soit la taille de la grille. meta.json est réécrit atomiquement
+après les données : un ajout interrompu n'est jamais visible.
+"""
+
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.grids.spec import GridSpec, load_grid
+
+logger = logging.getLogger(__name__)
+
+STORE_FORMAT = "airport-grid-store"
+STORE_VERSION = 1
+META_FILE = "meta.json"
+
+# Tuiles de calcul et d'écriture (nœuds par côté)
+DEFAULT_TILE_SIZE = 512
+
+# Lignes écrites par bloc lors d'un ajout (borne la mémoire des copies)
+WRITE_BLOCK_ROWS = 256
+
+# Fonction valeurs(points (N, 2)) -> (N,), cf. src/noise/adaptive.Evaluator
+Evaluator = Callable[[np.ndarray], np.ndarray]
+
+
+class GridStore:
+    """Champs sur grille (n_temps, ny, nx) mappés en mémoire depuis un répertoire"""
+
+    def __init__(self, path, meta: Dict):
+        self.path = Path(path)
+        if meta.get('format') != STORE_FORMAT:
+            raise ValueError(f"{self.path} n'est pas un magasin de grilles")
+        self.spec = GridSpec.from_dict(meta['grid'])
+        self.fields: Dict[str, np.dtype] = {name: np.dtype(dtype) for name, dtype in meta['fields'].items()}
+        self.times: List[str] = list(meta['times'])
+        self.attrs: Dict = dict(meta.get('attrs', {}))
+
+    @classmethod
+    def create(cls, path, spec: GridSpec, fields: Union[Sequence[str], Mapping[str, str]],
+               dtype: str = 'float32', attrs: Optional[Mapping] = None, overwrite: bool = False) -> "GridStore":
+        """Nouveau magasin vide (aucun pas de temps)"""
+        path = Path(path)
+        if path.exists():
+            if not overwrite:
+                raise FileExistsError(f"Magasin existant: {path}")
+            shutil.rmtree(path)
+        path.mkdir(parents=True)
+        if not isinstance(fields, Mapping):
+            fields = {name: dtype for name in fields}
+        store = cls(path, {
+            'format': STORE_FORMAT, 'grid': spec.to_dict(), 'times': [], 'attrs': dict(attrs or {}),
+            'fields': {name: np.dtype(value).newbyteorder('<').str for name, value in fields.items()},
+        })
+        for name in store.fields:
+            store._data_path(name).touch()
+        store._write_meta()
+        return store
+
+    @classmethod
+    def open(cls, path) -> "GridStore":
+        path = Path(path)
+        with open(path / META_FILE, encoding='utf-8') as f:
+            return cls(path, json.load(f))
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def __repr__(self) -> str:
+        return (f"GridStore({self.path}, {self.spec.nx}×{self.spec.ny}, champs={list(self.fields)}, "
+                f"{len(self.times)} pas de temps)")
+
+    # ---- métadonnées et fichiers -------------------------------------------------
+
+    def _data_path(self, field: str) -> Path:
+        return self.path / f"{field}.dat"
+
+    def _frame_bytes(self, field: str) -> int:
+        return self.spec.size * self.fields[field].itemsize
+
+    def _write_meta(self):
+        meta = {'format': STORE_FORMAT, 'version': STORE_VERSION, 'grid': self.spec.to_dict(),
+                'fields': {name: dtype.str for name, dtype in self.fields.items()},
+                'times': self.times, 'attrs': self.attrs}
+        tmp = self.path / f"{META_FILE}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp, self.path / META_FILE)
+
+    @staticmethod
+    def _fill_value(dtype: np.dtype):
+        return np.nan if dtype.kind == 'f' else 0
+
+    def time_index(self, time: Union[int, str]) -> int:
+        if isinstance(time, str):
+            try:
+                return self.times.index(time)
+            except ValueError:
+                raise KeyError(f"Pas de temps inconnu: {time}") from None
+        index = int(time)
+        if not -len(self.times) <= index < len(self.times):
+            raise IndexError(f"Pas de temps {index} hors du magasin ({len(self.times)})")
+        return index % len(self.times)
+
+    # ---- accès mappé ---------------------------------------------------------------
+
+    def array(self, field: str, mode: str = 'r') -> np.memmap:
+        """Champ complet (n_temps, ny, nx) mappé en mémoire ('r' ou 'r+')"""
+        if field not in self.fields:
+            raise KeyError(f"Champ inconnu: {field} ({', '.join(self.fields)})")
+        if not self.times:
+            raise ValueError(f"Magasin {self.path} vide : ajouter un pas de temps")
+        return np.memmap(self._data_path(field), dtype=self.fields[field], mode=mode,
+                         shape=(len(self.times),) + self.spec.shape)
+
+    def read_window(self, field: str, rows: slice, cols: slice, time: Union[int, str] = -1) -> np.ndarray:
+        """Copie en mémoire des nœuds [rows, cols] d'un pas de temps"""
+        return np.array(self.array(field)[self.time_index(time), rows, cols])
+
+    def read_bbox(self, field: str, xmin: float, ymin: float, xmax: float, ymax: float,
+                  time: Union[int, str] = -1) -> Tuple[GridSpec, np.ndarray]:
+        """Sous-grille et valeurs des nœuds contenus dans une emprise (CRS de la grille)"""
+        rows, cols = self.spec.window(xmin, ymin, xmax, ymax)
+        return self.spec.subgrid(rows, cols), self.read_window(field, rows, cols, time)
+
+    def series(self, field: str, x: float, y: float) -> np.ndarray:
+        """Valeurs de tous les pas de temps au nœud le plus proche d'un point"""
+        iy, ix = self.spec.index_of(x, y)
+        if iy < 0:
+            raise ValueError(f"Point ({x}, {y}) hors de la grille")
+        return np.array(self.array(field)[:, int(iy), int(ix)])
+
+    def iter_tiles(self, tile_size: int = DEFAULT_TILE_SIZE) -> Iterator[Tuple[slice, slice, GridSpec]]:
+        """Tuiles (lignes, colonnes, sous-grille) couvrant la grille, ligne par ligne"""
+        for iy in range(0, self.spec.ny, tile_size):
+            for ix in range(0, self.spec.nx, tile_size):
+                rows = slice(iy, min(iy + tile_size, self.spec.ny))
+                cols = slice(ix, min(ix + tile_size, self.spec.nx))
+                yield rows, cols, self.spec.subgrid(rows, cols)
+
+    # ---- écriture --------------------------------------------------------------------
+
+    def append(self, time: str, **arrays: np.ndarray) -> int:
+        """Ajouter un pas de temps ; champs absents remplis (NaN / 0), à calculer ensuite
+
+        Les tableaux fournis peuvent être des memmap ou tout tableau (ny, nx) :
+        ils sont recopiés par blocs de lignes.
+        """
+        time = str(time)
+        if time in self.times:
+            raise ValueError(f"Pas de temps déjà présent: {time}")
+        unknown = set(arrays) - set(self.fields)
+        if unknown:
+            raise KeyError(f"Champs inconnus: {sorted(unknown)}")
+        index = len(self.times)
+        for field, dtype in self.fields.items():
+            values = arrays.get(field)
+            if values is not None and np.shape(values) != self.spec.shape:
+                raise ValueError(f"{field} {np.shape(values)} incompatible avec la grille {self.spec.shape}")
+            frame_bytes = self._frame_bytes(field)
+            with open(self._data_path(field), 'r+b') as f:
+                f.truncate(index * frame_bytes)  # reste d'un ajout interrompu
+                f.truncate((index + 1) * frame_bytes)
+            frame = np.memmap(self._data_path(field), dtype=dtype, mode='r+',
+                              offset=index * frame_bytes, shape=self.spec.shape)
+            for row in range(0, self.spec.ny, WRITE_BLOCK_ROWS):
+                block = slice(row, row + WRITE_BLOCK_ROWS)
+                frame[block] = self._fill_value(dtype) if values is None else values[block]
+            frame.flush()
+            del frame
+        self.times.append(time)
+        self._write_meta()
+        return index
+
+    def update_attrs(self, **attrs):
+        """Modifier les attributs libres (réécriture atomique de meta.json)"""
+        self.attrs.update(attrs)
+        self._write_meta()
+
+    def write_window(self, field: str, rows: slice, cols: slice, values: np.ndarray,
+                     time: Union[int, str] = -1):
+        data = self.array(field, mode='r+')
+        data[self.time_index(time), rows, cols] = values
+        data.flush()
+
+    def fill(self, field: str, evaluate: Evaluator, time: Union[int, str] = -1,
+             tile_size: int = DEFAULT_TILE_SIZE, progress: Optional[Callable[[int, int], None]] = None):
+        """Calculer un champ tuile par tuile (evaluate(points) -> valeurs) et l'écrire en place
+
+        Mémoire bornée par la tuile : convient au moteur de bruit
+        (src/noise/adaptive.level_evaluator) comme aux concentrations.
+        """
+        index = self.time_index(time)
+        data = self.array(field, mode='r+')
+        tiles = list(self.iter_tiles(tile_size))
+        for done, (rows, cols, sub) in enumerate(tiles, 1):
+            data[index, rows, cols] = np.asarray(evaluate(sub.points())).reshape(sub.shape)
+            if progress:
+                progress(done, len(tiles))
+        data.flush()
+        logger.info(f"🧱 {field}[{self.times[index]}] calculé en {len(tiles)} tuiles de {tile_size} nœuds")
+
+    def import_grid(self, path, time: Optional[str] = None) -> int:
+        """Ajouter les champs d'un fichier save_grid (.npz) comme nouveau pas de temps"""
+        spec, arrays = load_grid(path)
+        if spec != self.spec:
+            raise ValueError(f"{path} porte sur une autre grille")
+        return self.append(time or Path(path).stem, **{k: v for k, v in arrays.items() if k in self.fields})
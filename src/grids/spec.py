@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Géoréférencement des grilles régulières (bruit, concentrations)
+Projet: Airport Air Quality Modeling
+
+Convention : values[iy, ix], iy croissant vers le nord depuis y0, ix croissant
+vers l'est depuis x0 ; (x0, y0) est le centre du premier nœud, en mètres dans
+un CRS projeté (Lambert-93 par défaut).
+"""
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+
+DEFAULT_CRS = "EPSG:2154"  # Lambert-93, CRS métrique de référence en France
+
+# Champs calculés rangés par scénario et date : <racine>/<scénario>/<date>.npz
+DEFAULT_GRIDS_ROOT = Path(__file__).resolve().parents[2] / "data" / "grids"
+
+
+@dataclass(frozen=True)
+class GridSpec:
+    """Grille régulière de récepteurs dans un CRS projeté"""
+
+    x0: float
+    y0: float
+    step: float
+    nx: int
+    ny: int
+    crs: str = DEFAULT_CRS
+
+    @classmethod
+    def from_bbox(cls, xmin: float, ymin: float, xmax: float, ymax: float,
+                  step: float, crs: str = DEFAULT_CRS) -> "GridSpec":
+        """Grille couvrant une emprise (bornes incluses) avec un pas donné"""
+        nx = int(np.floor((xmax - xmin) / step + 1e-9)) + 1
+        ny = int(np.floor((ymax - ymin) / step + 1e-9)) + 1
+        return cls(float(xmin), float(ymin), float(step), nx, ny, crs)
+
+    @classmethod
+    def centered(cls, x: float, y: float, half_width: float, step: float,
+                 crs: str = DEFAULT_CRS) -> "GridSpec":
+        """Grille carrée centrée sur un point (ex: point de référence aéroport)"""
+        return cls.from_bbox(x - half_width, y - half_width, x + half_width, y + half_width, step, crs)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return (self.ny, self.nx)
+
+    @property
+    def size(self) -> int:
+        return self.nx * self.ny
+
+    @property
+    def xs(self) -> np.ndarray:
+        return self.x0 + self.step * np.arange(self.nx)
+
+    @property
+    def ys(self) -> np.ndarray:
+        return self.y0 + self.step * np.arange(self.ny)
+
+    @property
+    def bounds(self) -> Tuple[float, float, float, float]:
+        """Emprise des cellules (xmin, ymin, xmax, ymax), demi-pas inclus"""
+        half = self.step / 2
+        return (self.x0 - half, self.y0 - half,
+                self.x0 + (self.nx - 1) * self.step + half,
+                self.y0 + (self.ny - 1) * self.step + half)
+
+    def meshgrid(self) -> Tuple[np.ndarray, np.ndarray]:
+        return np.meshgrid(self.xs, self.ys)
+
+    def points(self) -> np.ndarray:
+        """Coordonnées (N, 2) des nœuds, ordre ligne par ligne (iy puis ix)"""
+        X, Y = self.meshgrid()
+        return np.column_stack([X.ravel(), Y.ravel()])
+
+    def window(self, xmin: float, ymin: float, xmax: float, ymax: float) -> Tuple[slice, slice]:
+        """Lignes et colonnes des nœuds contenus dans une emprise (bornes incluses)"""
+        ix0 = max(0, int(np.ceil((xmin - self.x0) / self.step - 1e-9)))
+        ix1 = min(self.nx, int(np.floor((xmax - self.x0) / self.step + 1e-9)) + 1)
+        iy0 = max(0, int(np.ceil((ymin - self.y0) / self.step - 1e-9)))
+        iy1 = min(self.ny, int(np.floor((ymax - self.y0) / self.step + 1e-9)) + 1)
+        return slice(iy0, max(iy0, iy1)), slice(ix0, max(ix0, ix1))
+
+    def subgrid(self, rows: slice, cols: slice) -> "GridSpec":
+        """Grille des nœuds [rows, cols] (pas unitaire)"""
+        iy0, iy1, _ = rows.indices(self.ny)
+        ix0, ix1, _ = cols.indices(self.nx)
+        return GridSpec(self.x0 + ix0 * self.step, self.y0 + iy0 * self.step, self.step,
+                        max(0, ix1 - ix0), max(0, iy1 - iy0), self.crs)
+
+    def index_of(self, x, y) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices (iy, ix) du nœud le plus proche, -1 hors grille"""
+        ix = np.rint((np.asarray(x, dtype=float) - self.x0) / self.step).astype(np.int64)
+        iy = np.rint((np.asarray(y, dtype=float) - self.y0) / self.step).astype(np.int64)
+        outside = (ix < 0) | (ix >= self.nx) | (iy < 0) | (iy >= self.ny)
+        return np.where(outside, -1, iy), np.where(outside, -1, ix)
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "GridSpec":
+        return cls(**data)
+
+    def key(self) -> str:
+        """Empreinte stable de la grille (clés de cache)"""
+        payload = json.dumps(self.to_dict(), sort_keys=True).encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()[:16]
+
+
+def grid_path(scenario: str, date: str, root=DEFAULT_GRIDS_ROOT) -> Path:
+    """Emplacement conventionnel des champs d'un scénario pour une date"""
+    return Path(root) / scenario / f"{date}.npz"
+
+
+def save_grid(path, spec: GridSpec, **arrays: np.ndarray):
+    """Sauvegarder des champs sur grille (.npz compressé + géoréférencement)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(path, _grid_spec=json.dumps(spec.to_dict()), **arrays)
+
+
+def load_grid(path) -> Tuple[GridSpec, Dict[str, np.ndarray]]:
+    """Relire un fichier écrit par save_grid"""
+    with np.load(path, allow_pickle=False) as data:
+        spec = GridSpec.from_dict(json.loads(str(data["_grid_spec"])))
+        arrays = {name: data[name] for name in data.files if name != "_grid_spec"}
+    return spec, arrays
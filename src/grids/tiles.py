@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pyramide de tuiles raster z/x/y (PNG) pour les champs sur grille
+Lden, Lnight, concentrations NOx... rendus une fois sur disque puis servis
+à la carte folium comme une couche de tuiles standard
+Projet: Airport Air Quality Modeling
+
+Arborescence du cache : <racine>/<scénario>/<date>/<champ>/{z}/{x}/{y}.png
+avec un metadata.json portant l'empreinte des données d'entrée.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import shutil
+import struct
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.grids.spec import GridSpec
+
+logger = logging.getLogger(__name__)
+
+TILE_SIZE = 256
+WEB_MERCATOR_HALF = 20037508.342789244  # demi-étendue EPSG:3857 (m)
+
+DEFAULT_TILES_ROOT = Path(__file__).resolve().parents[2] / "data" / "tiles"
+
+# Classes de couleur (seuil bas inclus, couleur) - sous le premier seuil : transparent
+NOISE_COLORMAP = [
+    (50, '#ffffb2'), (55, '#fecc5c'), (60, '#fd8d3c'), (65, '#f03b20'), (70, '#bd0026'),
+]
+NOX_COLORMAP = [
+    (10, '#edf8fb'), (20, '#b3cde3'), (40, '#8c96c6'), (100, '#8856a7'), (200, '#810f7c'),
+]
+FIELD_COLORMAPS = {
+    'lden': NOISE_COLORMAP,
+    'lnight': NOISE_COLORMAP,
+    'nox': NOX_COLORMAP,
+}
+DECIBEL_FIELDS = {'lden', 'lnight'}
+
+
+def encode_png(rgba: np.ndarray) -> bytes:
+    """Encoder une image RGBA uint8 (hauteur, largeur, 4) en PNG"""
+    height, width, _ = rgba.shape
+    raw = np.zeros((height, width * 4 + 1), dtype=np.uint8)  # octet de filtre 0 par ligne
+    raw[:, 1:] = rgba.reshape(height, width * 4)
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return (struct.pack('>I', len(data)) + tag + data
+                + struct.pack('>I', zlib.crc32(tag + data) & 0xFFFFFFFF))
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header)
+            + chunk(b'IDAT', zlib.compress(raw.tobytes(), 6)) + chunk(b'IEND', b''))
+
+
+def colormap_lut(colormap: Sequence[Tuple[float, str]], alpha: int = 180) -> Tuple[np.ndarray, np.ndarray]:
+    """Seuils et table RGBA (classe 0 = transparent)"""
+    thresholds = np.array([level for level, _ in colormap], dtype=float)
+    lut = np.zeros((len(colormap) + 1, 4), dtype=np.uint8)
+    for i, (_, color) in enumerate(colormap, start=1):
+        color = color.lstrip('#')
+        lut[i, :3] = [int(color[k:k + 2], 16) for k in (0, 2, 4)]
+        lut[i, 3] = alpha
+    return thresholds, lut
+
+
+def build_overviews(values: np.ndarray, levels: int, decibel: bool) -> List[np.ndarray]:
+    """Aperçus 2×2 successifs (moyenne énergétique pour les champs en dB)"""
+    current = np.asarray(values, dtype=np.float64)
+    if decibel:
+        current = np.power(10.0, current / 10.0)
+    overviews = [current]
+    for _ in range(levels):
+        ny, nx = current.shape
+        if ny < 2 or nx < 2:
+            break
+        trimmed = current[:ny - ny % 2, :nx - nx % 2]
+        current = np.nanmean(trimmed.reshape(ny // 2, 2, nx // 2, 2), axis=(1, 3))
+        overviews.append(current)
+    if decibel:
+        overviews = [10.0 * np.log10(np.maximum(ov, 1e-30)) for ov in overviews]
+    return overviews
+
+
+def lonlat_to_tile(lon: float, lat: float, zoom: int) -> Tuple[int, int]:
+    """Tuile XYZ contenant un point WGS84"""
+    n = 2 ** zoom
+    lat = max(min(lat, 85.0511), -85.0511)
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def grid_lonlat_bounds(spec: GridSpec) -> Tuple[float, float, float, float]:
+    """Emprise WGS84 (ouest, sud, est, nord) de la grille"""
+    from pyproj import Transformer
+
+    xmin, ymin, xmax, ymax = spec.bounds
+    edge = np.linspace(0.0, 1.0, 21)
+    xs = np.concatenate([xmin + edge * (xmax - xmin), np.full(21, xmax),
+                         xmax - edge * (xmax - xmin), np.full(21, xmin)])
+    ys = np.concatenate([np.full(21, ymin), ymin + edge * (ymax - ymin),
+                         np.full(21, ymax), ymax - edge * (ymax - ymin)])
+    to_wgs84 = Transformer.from_crs(spec.crs, "EPSG:4326", always_xy=True)
+    lons, lats = to_wgs84.transform(xs, ys)
+    return float(np.min(lons)), float(np.min(lats)), float(np.max(lons)), float(np.max(lats))
+
+
+def _interpolation_matrix(n_control: int = 9) -> np.ndarray:
+    """Poids (TILE_SIZE, n_control) d'interpolation linéaire des centres de pixels"""
+    control = np.linspace(0.0, TILE_SIZE, n_control)
+    pixels = np.arange(TILE_SIZE) + 0.5
+    weights = np.zeros((TILE_SIZE, n_control))
+    for j in range(n_control):
+        basis = np.zeros(n_control)
+        basis[j] = 1.0
+        weights[:, j] = np.interp(pixels, control, basis)
+    return weights
+
+
+def tile_grid_coordinates(to_grid, tx: int, ty: int, resolution: float,
+                          weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Coordonnées dans le CRS de la grille des centres de pixels d'une tuile
+
+    La reprojection n'est calculée que sur un treillis de points de contrôle,
+    puis interpolée bilinéairement (écart sub-pixel à l'échelle d'une tuile).
+    """
+    control = np.linspace(0.0, TILE_SIZE, weights.shape[1])
+    mx = -WEB_MERCATOR_HALF + (tx * TILE_SIZE + control) * resolution
+    my = WEB_MERCATOR_HALF - (ty * TILE_SIZE + control) * resolution
+    MX, MY = np.meshgrid(mx, my)
+    cx, cy = to_grid.transform(MX, MY)
+    return weights @ cx @ weights.T, weights @ cy @ weights.T
+
+
+def data_fingerprint(values: np.ndarray, spec: GridSpec, colormap, zooms, alpha: int) -> str:
+    """Empreinte des entrées du rendu (clé de validité du cache)"""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(values, dtype=np.float32).tobytes())
+    digest.update(json.dumps([spec.to_dict(), colormap, list(zooms), alpha], sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def tile_cache_dir(root, scenario: str, date: str, field: str) -> Path:
+    return Path(root) / scenario / date / field
+
+
+def build_tile_pyramid(values: np.ndarray, spec: GridSpec, scenario: str, date: str, field: str,
+                       root=DEFAULT_TILES_ROOT, zooms: Tuple[int, int] = (10, 15),
+                       colormap: Optional[Sequence[Tuple[float, str]]] = None,
+                       decibel: Optional[bool] = None, alpha: int = 180,
+                       force: bool = False) -> Dict:
+    """Rendre un champ sur grille en pyramide de tuiles PNG (avec cache)
+
+    Retourne le dictionnaire de métadonnées ; si une pyramide existe déjà pour
+    les mêmes données (scénario, date, champ, empreinte), rien n'est recalculé.
+    """
+    from pyproj import Transformer
+
+    values = np.asarray(values, dtype=np.float64)
+    if values.shape != spec.shape:
+        raise ValueError(f"Dimensions {values.shape} incompatibles avec la grille {spec.shape}")
+
+    colormap = list(colormap or FIELD_COLORMAPS.get(field, NOISE_COLORMAP))
+    decibel = field in DECIBEL_FIELDS if decibel is None else decibel
+    zoom_min, zoom_max = zooms
+
+    output_dir = tile_cache_dir(root, scenario, date, field)
+    metadata_file = output_dir / "metadata.json"
+    fingerprint = data_fingerprint(values, spec, colormap, zooms, alpha)
+
+    if metadata_file.exists() and not force:
+        metadata = json.loads(metadata_file.read_text(encoding='utf-8'))
+        if metadata.get('fingerprint') == fingerprint:
+            logger.info(f"✅ Tuiles à jour (cache): {output_dir}")
+            return metadata
+
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    output_dir.mkdir(parents=True)
+
+    start = time.time()
+    thresholds, lut = colormap_lut(colormap, alpha)
+    west, south, east, north = grid_lonlat_bounds(spec)
+    mid_lat = math.radians((south + north) / 2)
+
+    # Résolution au sol du zoom le plus faible → nombre d'aperçus utiles
+    coarsest = 2 * WEB_MERCATOR_HALF / (TILE_SIZE * 2 ** zoom_min) * math.cos(mid_lat)
+    n_levels = max(int(math.floor(math.log2(max(coarsest / spec.step, 1.0)))), 0)
+    overviews = build_overviews(values, n_levels, decibel)
+
+    to_grid = Transformer.from_crs("EPSG:3857", spec.crs, always_xy=True)
+    weights = _interpolation_matrix()
+    n_tiles = 0
+
+    for zoom in range(zoom_min, zoom_max + 1):
+        resolution = 2 * WEB_MERCATOR_HALF / (TILE_SIZE * 2 ** zoom)
+        ground_resolution = resolution * math.cos(mid_lat)
+        level = min(int(math.floor(math.log2(max(ground_resolution / spec.step, 1.0)))), len(overviews) - 1)
+        overview = overviews[level]
+        factor = 2 ** level
+        ov_step = spec.step * factor
+        ov_x0 = spec.x0 + (factor - 1) * spec.step / 2
+        ov_y0 = spec.y0 + (factor - 1) * spec.step / 2
+        ov_ny, ov_nx = overview.shape
+
+        x_min_tile, y_min_tile = lonlat_to_tile(west, north, zoom)
+        x_max_tile, y_max_tile = lonlat_to_tile(east, south, zoom)
+
+        for tx in range(x_min_tile, x_max_tile + 1):
+            for ty in range(y_min_tile, y_max_tile + 1):
+                gx, gy = tile_grid_coordinates(to_grid, tx, ty, resolution, weights)
+
+                ix = np.rint((gx - ov_x0) / ov_step).astype(np.int64)
+                iy = np.rint((gy - ov_y0) / ov_step).astype(np.int64)
+                inside = (ix >= 0) & (ix < ov_nx) & (iy >= 0) & (iy < ov_ny)
+                if not inside.any():
+                    continue
+
+                sampled = np.full(gx.shape, np.nan)
+                sampled[inside] = overview[iy[inside], ix[inside]]
+                classes = np.searchsorted(thresholds, sampled, side='right')
+                classes[np.isnan(sampled)] = 0
+                if not classes.any():
+                    continue
+
+                tile_file = output_dir / str(zoom) / str(tx) / f"{ty}.png"
+                tile_file.parent.mkdir(parents=True, exist_ok=True)
+                tile_file.write_bytes(encode_png(lut[classes]))
+                n_tiles += 1
+
+    metadata = {
+        'scenario': scenario,
+        'date': date,
+        'field': field,
+        'fingerprint': fingerprint,
+        'grid': spec.to_dict(),
+        'bounds_wgs84': [west, south, east, north],
+        'min_zoom': zoom_min,
+        'max_zoom': zoom_max,
+        'colormap': colormap,
+        'decibel': decibel,
+        'n_tiles': n_tiles,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+    }
+    metadata_file.write_text(json.dumps(metadata, indent=2), encoding='utf-8')
+
+    logger.info(f"✅ {n_tiles} tuiles {field} rendues en {time.time() - start:.1f}s: {output_dir}")
+    return metadata
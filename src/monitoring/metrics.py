@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Métriques Prometheus des dashboards, du pipeline ETL, des migrations et de l'API
+Projet: Airport Air Quality Modeling
+
+Exposition locale sur /metrics via start_metrics_server(port), ou envoi vers
+une Pushgateway (PROMETHEUS_PUSHGATEWAY) pour les traitements batch.
+Sans prometheus_client installé, toutes les fonctions sont sans effet.
+"""
+
+import functools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+# Bornes des histogrammes de latence (secondes) : du cache chaud à la requête lourde
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _NoopMetric:
+    """Remplaçant silencieux quand prometheus_client est absent"""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def set(self, value):
+        pass
+
+    def observe(self, value):
+        pass
+
+
+if PROMETHEUS_AVAILABLE:
+    QUERY_DURATION = Histogram(
+        'airport_query_duration_seconds', "Durée des requêtes SQL",
+        ['component', 'query'], buckets=LATENCY_BUCKETS,
+    )
+    QUERY_ERRORS = Counter(
+        'airport_query_errors_total', "Requêtes SQL en échec", ['component', 'query'],
+    )
+    CACHE_REQUESTS = Counter(
+        'airport_cache_requests_total', "Accès aux caches de résultats", ['component', 'cache'],
+    )
+    CACHE_MISSES = Counter(
+        'airport_cache_misses_total', "Accès non servis par le cache (recalcul)", ['component', 'cache'],
+    )
+    POOL_CONNECTIONS = Gauge(
+        'airport_db_pool_connections', "Connexions du pool par état", ['component', 'state'],
+    )
+    ETL_ROWS = Counter(
+        'airport_etl_rows_total', "Lignes produites par étape ETL", ['stage'],
+    )
+    ETL_ROWS_PER_SECOND = Gauge(
+        'airport_etl_rows_per_second', "Débit de la dernière exécution par étape ETL", ['stage'],
+    )
+    ETL_STAGE_DURATION = Histogram(
+        'airport_etl_stage_duration_seconds', "Durée des étapes ETL", ['stage', 'status'],
+        buckets=LATENCY_BUCKETS,
+    )
+    MIGRATION_DURATION = Histogram(
+        'airport_migration_duration_seconds', "Durée d'application des migrations",
+        ['version', 'status'], buckets=LATENCY_BUCKETS,
+    )
+else:
+    QUERY_DURATION = QUERY_ERRORS = CACHE_REQUESTS = CACHE_MISSES = _NoopMetric()
+    POOL_CONNECTIONS = ETL_ROWS = ETL_ROWS_PER_SECOND = _NoopMetric()
+    ETL_STAGE_DURATION = MIGRATION_DURATION = _NoopMetric()
+
+_server_lock = threading.Lock()
+_server_started = False
+
+
+def start_metrics_server(port: Optional[int] = None, default_port: int = 9100) -> bool:
+    """Démarrer l'endpoint HTTP /metrics (une seule fois par processus)
+
+    Le port vient de l'argument, sinon de METRICS_PORT, sinon de default_port.
+    """
+    global _server_started
+    if not PROMETHEUS_AVAILABLE:
+        return False
+    with _server_lock:
+        if _server_started:
+            return True
+        port = int(port or os.getenv('METRICS_PORT', default_port))
+        try:
+            from prometheus_client import start_http_server
+            start_http_server(port)
+            _server_started = True
+            logger.info(f"📈 Métriques Prometheus exposées sur http://localhost:{port}/metrics")
+        except OSError as e:
+            # Port déjà pris (autre processus du même composant) : on continue sans exposition
+            logger.warning(f"⚠️ Endpoint métriques non démarré sur le port {port}: {e}")
+        return _server_started
+
+
+def push_metrics(job: str) -> bool:
+    """Envoyer les métriques à la Pushgateway si PROMETHEUS_PUSHGATEWAY est défini"""
+    gateway = os.getenv('PROMETHEUS_PUSHGATEWAY')
+    if not PROMETHEUS_AVAILABLE or not gateway:
+        return False
+    try:
+        from prometheus_client import push_to_gateway
+        push_to_gateway(gateway, job=job, registry=REGISTRY)
+        return True
+    except Exception as e:
+        logger.warning(f"⚠️ Envoi des métriques vers {gateway} impossible: {e}")
+        return False
+
+
+@contextmanager
+def timed_query(name: str, component: str):
+    """Mesurer la durée d'une requête (les échecs sont comptés à part)"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        QUERY_ERRORS.labels(component, name).inc()
+        raise
+    finally:
+        QUERY_DURATION.labels(component, name).observe(time.perf_counter() - start)
+
+
+def record_cache_access(cache: str, component: str, hit: bool):
+    CACHE_REQUESTS.labels(component, cache).inc()
+    if not hit:
+        CACHE_MISSES.labels(component, cache).inc()
+
+
+def instrument_cache(cache: str, component: str, cache_decorator: Callable):
+    """Envelopper une fonction mise en cache pour compter accès et recalculs
+
+    Le corps de la fonction n'est exécuté qu'en cas d'absence dans le cache :
+    l'accès est compté à l'appel, le recalcul à l'intérieur.
+        @instrument_cache('load_data', 'executive', st.cache_data(ttl=300))
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def compute(*args, **kwargs):
+            CACHE_MISSES.labels(component, cache).inc()
+            return func(*args, **kwargs)
+
+        cached = cache_decorator(compute)
+
+        @functools.wraps(func)
+        def call(*args, **kwargs):
+            CACHE_REQUESTS.labels(component, cache).inc()
+            return cached(*args, **kwargs)
+
+        call.clear = getattr(cached, 'clear', None)
+        return call
+    return decorator
+
+
+def observe_pool(pool, component: str):
+    """Relever l'occupation d'un pool SQLAlchemy (QueuePool) ou asyncpg"""
+    try:
+        if hasattr(pool, 'get_idle_size'):  # asyncpg
+            size = pool.get_size()
+            idle = pool.get_idle_size()
+            states = {'in_use': size - idle, 'idle': idle, 'max': pool.get_max_size()}
+        elif hasattr(pool, 'checkedout'):  # SQLAlchemy QueuePool
+            states = {
+                'in_use': pool.checkedout(),
+                'idle': pool.checkedin(),
+                'overflow': max(pool.overflow(), 0),
+                'max': pool.size() + max(getattr(pool, '_max_overflow', 0), 0),
+            }
+        else:
+            return
+    except Exception as e:
+        logger.debug(f"Pool non observable: {e}")
+        return
+    for state, value in states.items():
+        POOL_CONNECTIONS.labels(component, state).set(value)
+
+
+class _StageRecorder:
+    def __init__(self):
+        self.rows = 0
+
+
+@contextmanager
+def etl_stage(stage: str):
+    """Mesurer une étape ETL ; fixer recorder.rows pour le débit
+        with etl_stage('flights') as recorder:
+            recorder.rows = len(df)
+    """
+    recorder = _StageRecorder()
+    start = time.perf_counter()
+    status = 'success'
+    try:
+        yield recorder
+    except Exception:
+        status = 'error'
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        ETL_STAGE_DURATION.labels(stage, status).observe(duration)
+        if recorder.rows:
+            ETL_ROWS.labels(stage).inc(recorder.rows)
+            ETL_ROWS_PER_SECOND.labels(stage).set(recorder.rows / max(duration, 1e-9))
+
+
+def record_migration(version: str, duration_s: float, success: bool):
+    MIGRATION_DURATION.labels(version, 'success' if success else 'error').observe(duration_s)
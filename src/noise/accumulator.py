@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cumul énergétique des mouvements pour les indicateurs Lden / Lnight
+Projet: Airport Air Quality Modeling
+
+Les SEL de chaque vol sont convertis en énergie (10^(SEL/10), en s) et
+additionnés par période réglementaire dans des grilles float64 :
+jour 06h-18h, soirée 18h-22h (+5 dB), nuit 22h-06h (+10 dB).
+La mémoire ne dépend que de la taille de la grille ; l'état se sauvegarde
+(.npz) pour cumuler une année de trafic jour après jour.
+"""
+
+import json
+import logging
+import os
+from datetime import date, datetime, time
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from src.grids.spec import GridSpec, load_grid, save_grid
+from src.noise.engine import AcousticProfile, FlightTrack, compute_flight_noise
+
+logger = logging.getLogger(__name__)
+
+PERIODS = ('day', 'evening', 'night')
+
+# Durée (h) et pondération (dB) des périodes de l'indicateur Lden (directive 2002/49/CE)
+PERIOD_HOURS = {'day': 12, 'evening': 4, 'night': 8}
+PERIOD_PENALTY_DB = {'day': 0.0, 'evening': 5.0, 'night': 10.0}
+
+DAY_START, EVENING_START, NIGHT_START = 6, 18, 22
+
+# Vols traités par appel au moteur (mémoire ~ 2 × n × taille de grille en float32)
+DEFAULT_CHUNK_FLIGHTS = 50
+
+
+def period_of(moment: Union[datetime, time, int]) -> str:
+    """Période réglementaire d'un horaire (datetime, time ou heure entière)"""
+    hour = moment if isinstance(moment, (int, np.integer)) else moment.hour
+    if DAY_START <= hour < EVENING_START:
+        return 'day'
+    if EVENING_START <= hour < NIGHT_START:
+        return 'evening'
+    return 'night'
+
+
+def flight_times(frame) -> Dict[str, time]:
+    """Horaire de référence par vol (début de la première phase) depuis PHASES_QUERY"""
+    first = frame.groupby('id_vol', sort=False)['heure_debut'].first()
+    return {str(flight_id): moment for flight_id, moment in first.items()}
+
+
+class LdenAccumulator:
+    """Énergies cumulées par période sur une grille de récepteurs"""
+
+    def __init__(self, spec: GridSpec):
+        self.spec = spec
+        self.energy = {period: np.zeros(spec.shape, dtype=np.float64) for period in PERIODS}
+        self.movements = {period: 0 for period in PERIODS}
+        self.days = set()
+
+    def add_sel(self, sel: np.ndarray, periods: Sequence[str]):
+        """Ajouter des SEL (n, ny, nx) en dBA, une période par mouvement"""
+        sel = np.asarray(sel)
+        if sel.ndim == 2:
+            sel = sel[np.newaxis]
+        if sel.shape[1:] != self.spec.shape or len(periods) != len(sel):
+            raise ValueError(f"SEL {sel.shape} incompatibles avec la grille {self.spec.shape} "
+                             f"et {len(periods)} périodes")
+        periods = np.asarray(periods)
+        for period in PERIODS:
+            selected = periods == period
+            if not selected.any():
+                continue
+            # NaN (aucun segment) -> énergie nulle
+            energy = np.power(10.0, sel[selected].astype(np.float64) / 10)
+            self.energy[period] += np.nansum(energy, axis=0)
+            self.movements[period] += int(selected.sum())
+
+    def add_energy(self, energy: np.ndarray, period: str, movements: int = 1):
+        """Ajouter une énergie déjà sommée (ny, nx), en s, de `movements` mouvements d'une période"""
+        if period not in self.energy:
+            raise ValueError(f"Période inconnue: {period}")
+        energy = np.asarray(energy, dtype=np.float64).reshape(self.spec.shape)
+        self.energy[period] += energy
+        self.movements[period] += int(movements)
+
+    def add_flights(self, tracks: Sequence[FlightTrack], times: Mapping[str, Union[datetime, time]],
+                    profiles: Mapping[str, AcousticProfile], day: Optional[Union[date, str]] = None,
+                    weather: Optional[Mapping[str, float]] = None,
+                    chunk_flights: int = DEFAULT_CHUNK_FLIGHTS, cutoff_m: Optional[float] = None):
+        """Calculer et cumuler les mouvements par paquets de chunk_flights vols
+
+        times : horaire de référence (décollage / atterrissage) par flight_id.
+        day : journée couverte, comptée une seule fois dans la durée moyenne.
+        cutoff_m : distance de coupure des segments (index spatial), None = tous.
+        """
+        if day is not None:
+            day = str(day)
+            if day in self.days:
+                logger.warning(f"⚠️ Journée {day} déjà cumulée, mouvements ajoutés quand même")
+            self.days.add(day)
+
+        for i in range(0, len(tracks), chunk_flights):
+            chunk = tracks[i:i + chunk_flights]
+            noise = compute_flight_noise(chunk, profiles, self.spec, weather=weather, cutoff_m=cutoff_m)
+            periods = [period_of(times[flight_id]) for flight_id in noise.flight_ids]
+            self.add_sel(noise.sel, periods)
+
+    @property
+    def n_days(self) -> int:
+        return len(self.days)
+
+    def _average(self, energy: np.ndarray, hours: float, n_days: Optional[int]) -> np.ndarray:
+        n_days = n_days or self.n_days
+        if not n_days:
+            raise ValueError("Nombre de jours inconnu : renseigner day= ou n_days=")
+        with np.errstate(divide='ignore'):
+            return 10 * np.log10(energy / (n_days * hours * 3600))
+
+    def level(self, period: str, n_days: Optional[int] = None) -> np.ndarray:
+        """Niveau équivalent de la période (Lday, Levening, Lnight) en dBA"""
+        return self._average(self.energy[period], PERIOD_HOURS[period], n_days)
+
+    def lden(self, n_days: Optional[int] = None) -> np.ndarray:
+        weighted = sum(self.energy[p] * 10 ** (PERIOD_PENALTY_DB[p] / 10) for p in PERIODS)
+        return self._average(weighted, 24, n_days)
+
+    def lnight(self, n_days: Optional[int] = None) -> np.ndarray:
+        return self.level('night', n_days)
+
+    def merge(self, other: "LdenAccumulator"):
+        """Fusionner un autre cumul sur la même grille (ex: calcul par mois)"""
+        if other.spec != self.spec:
+            raise ValueError("Grilles différentes : fusion impossible")
+        overlap = self.days & other.days
+        if overlap:
+            raise ValueError(f"Journées cumulées deux fois: {sorted(overlap)[:5]}")
+        for period in PERIODS:
+            self.energy[period] += other.energy[period]
+            self.movements[period] += other.movements[period]
+        self.days |= other.days
+
+    def save(self, path):
+        """Point de reprise : énergies + journées et mouvements déjà cumulés"""
+        path = Path(path)
+        state = {'days': sorted(self.days), 'movements': self.movements}
+        tmp = path.with_name(path.stem + '.tmp.npz')
+        save_grid(tmp, self.spec, _accumulator=json.dumps(state),
+                  **{f"energy_{period}": self.energy[period] for period in PERIODS})
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path) -> "LdenAccumulator":
+        spec, arrays = load_grid(path)
+        accumulator = cls(spec)
+        state = json.loads(str(arrays['_accumulator']))
+        for period in PERIODS:
+            accumulator.energy[period] = arrays[f"energy_{period}"].astype(np.float64)
+        accumulator.movements.update(state['movements'])
+        accumulator.days = set(state['days'])
+        return accumulator
+
+    @classmethod
+    def resume(cls, path, spec: GridSpec) -> "LdenAccumulator":
+        """Reprendre un cumul existant (même grille) ou en démarrer un nouveau"""
+        path = Path(path)
+        if not path.exists():
+            return cls(spec)
+        accumulator = cls.load(path)
+        if accumulator.spec != spec:
+            raise ValueError(f"Le point de reprise {path} porte sur une autre grille")
+        logger.info(f"🔁 Reprise du cumul : {accumulator.n_days} jours, "
+                    f"{sum(accumulator.movements.values()):,} mouvements")
+        return accumulator
+
+    def summary(self) -> Dict:
+        return {'days': self.n_days, 'movements': dict(self.movements)}
+
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Grille de récepteurs adaptative (raffinement quadtree) pour le calcul de bruit
+Projet: Airport Air Quality Modeling
+
+Calcul sur une grille grossière puis subdivision récursive des seules mailles
+qui encadrent un seuil d'isophone ou dont l'écart entre échantillons (coins,
+centre et milieux des arêtes) dépasse une tolérance (dB) : un pic situé à
+l'intérieur d'une maille est détecté avant qu'elle soit acceptée. Les
+mailles proches d'un segment de trajectoire, où le niveau varie trop vite
+pour être échantillonné, sont raffinées d'office. Les mailles non raffinées
+sont interpolées bilinéairement sur leurs quatre quarts, à moins de la
+tolérance de l'échantillonnage exact :
+le résultat est une grille au pas fin, exacte autour des isophones, obtenue
+pour une fraction des évaluations d'une grille uniforme.
+"""
+
+import logging
+import warnings
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from src.grids.spec import GridSpec
+from src.noise.accumulator import PERIOD_HOURS, PERIOD_PENALTY_DB, period_of
+from src.noise.contours import DEFAULT_THRESHOLDS
+from src.noise.engine import DEFAULT_RECEPTOR_HEIGHT_M, AcousticProfile, FlightTrack, compute_receptor_noise
+
+logger = logging.getLogger(__name__)
+
+# Écart maximal (dB) toléré entre les échantillons d'une maille non raffinée
+DEFAULT_GRADIENT_TOLERANCE = 3.0
+
+# Mailles dont le centre est à moins de SOURCE_DISTANCE_FACTOR demi-diagonales d'un segment
+# de trajectoire (distance oblique) : champ trop courbé près de la source pour l'interpolation
+SOURCE_DISTANCE_FACTOR = 2.0
+
+# Couples maille × segment par bloc du calcul de distance
+SOURCE_CHUNK_ELEMENTS = 2_000_000
+
+# Fonction niveau(points (N, 2)) -> (N,) en dB
+Evaluator = Callable[[np.ndarray], np.ndarray]
+
+
+@dataclass
+class RefinementStats:
+    """Statistiques de raffinement par niveau (du plus grossier au plus fin)"""
+
+    fine_nodes: int
+    levels: List[Dict] = field(default_factory=list)
+
+    @property
+    def evaluations(self) -> int:
+        return sum(level['evaluated'] for level in self.levels)
+
+    @property
+    def ratio(self) -> float:
+        """Part des évaluations d'une grille uniforme au pas fin"""
+        return self.evaluations / self.fine_nodes
+
+    def report(self) -> str:
+        lines = [f"{'pas (m)':>9} {'mailles':>9} {'raffinées':>10} {'évaluations':>12}"]
+        for level in self.levels:
+            lines.append(f"{level['step']:>9.1f} {level['cells']:>9,} {level['refined']:>10,} "
+                         f"{level['evaluated']:>12,}")
+        lines.append(f"Total {self.evaluations:,} évaluations pour {self.fine_nodes:,} nœuds "
+                     f"({self.ratio:.1%} de la grille uniforme)")
+        return "\n".join(lines)
+
+
+def adaptive_spec(spec: GridSpec, levels: int) -> GridSpec:
+    """Agrandir une grille fine pour que (n - 1) soit multiple de 2^levels"""
+    block = 2 ** levels
+    nx = int(np.ceil((spec.nx - 1) / block)) * block + 1
+    ny = int(np.ceil((spec.ny - 1) / block)) * block + 1
+    return GridSpec(spec.x0, spec.y0, spec.step, nx, ny, spec.crs)
+
+
+def _needs_refinement(samples: np.ndarray, thresholds: np.ndarray, tolerance: float) -> np.ndarray:
+    """Mailles (n, échantillons) qui encadrent un seuil ou varient de plus de tolerance dB"""
+    low = np.nanmin(samples, axis=1)
+    high = np.nanmax(samples, axis=1)
+    straddle = ((low[:, None] < thresholds) & (high[:, None] >= thresholds)).any(axis=1)
+    # Maille partiellement hors du domaine de calcul (NaN) : raffiner aussi
+    partial = np.isnan(samples).any(axis=1) & ~np.isnan(samples).all(axis=1)
+    return straddle | (high - low > tolerance) | partial
+
+
+def track_segments(tracks: Sequence[FlightTrack]) -> np.ndarray:
+    """Segments (S, 2, 3) début / fin de toutes les trajectoires"""
+    if not tracks:
+        return np.zeros((0, 2, 3))
+    return np.concatenate([np.stack([track.start, track.end], axis=1) for track in tracks])
+
+
+def _near_sources(points: np.ndarray, segments: np.ndarray, radius: float) -> np.ndarray:
+    """Points (N, 2) à moins de radius (distance oblique, hauteur de récepteur) d'un segment"""
+    near = np.zeros(len(points), dtype=bool)
+    if len(segments) == 0:
+        return near
+    origin = segments[:, 0]
+    direction = segments[:, 1] - origin
+    length2 = np.maximum((direction ** 2).sum(axis=1), 1e-12)
+    receptors = np.column_stack([points, np.full(len(points), DEFAULT_RECEPTOR_HEIGHT_M)])
+    chunk = max(1, SOURCE_CHUNK_ELEMENTS // len(segments))
+    for lo in range(0, len(points), chunk):
+        offset = receptors[lo:lo + chunk, None, :] - origin
+        t = np.clip((offset * direction).sum(axis=2) / length2, 0.0, 1.0)
+        distance2 = ((offset - t[..., None] * direction) ** 2).sum(axis=2)
+        near[lo:lo + chunk] = distance2.min(axis=1) < radius ** 2
+    return near
+
+
+def _fill_bilinear(values: np.ndarray, evaluated: np.ndarray, iy: np.ndarray, ix: np.ndarray, size: int):
+    """Interpoler l'intérieur des mailles (coin bas-gauche iy, ix) non évalué"""
+    if len(iy) == 0:
+        return
+    t = np.arange(size + 1) / size
+    dy, dx = np.meshgrid(np.arange(size + 1), np.arange(size + 1), indexing='ij')
+    ty, tx = t[dy], t[dx]
+    v00 = values[iy, ix][:, None, None]
+    v01 = values[iy, ix + size][:, None, None]
+    v10 = values[iy + size, ix][:, None, None]
+    v11 = values[iy + size, ix + size][:, None, None]
+    interpolated = (v00 * (1 - ty) * (1 - tx) + v01 * (1 - ty) * tx
+                    + v10 * ty * (1 - tx) + v11 * ty * tx)
+    rows = iy[:, None, None] + dy
+    cols = ix[:, None, None] + dx
+    keep = ~evaluated[rows, cols]
+    values[rows[keep], cols[keep]] = interpolated[keep]
+
+
+def refine_grid(evaluate: Evaluator, spec: GridSpec, levels: int = 3,
+                thresholds: Sequence[float] = DEFAULT_THRESHOLDS,
+                gradient_tolerance: float = DEFAULT_GRADIENT_TOLERANCE,
+                sources: Optional[np.ndarray] = None):
+    """Niveaux au pas fin de spec par raffinement depuis un pas spec.step·2^levels
+
+    sources : segments (S, 2, 3) des trajectoires (cf. track_segments) ; les
+    mailles proches d'une source sont raffinées quels que soient leurs échantillons.
+    Retourne (spec ajustée, valeurs (ny, nx), statistiques).
+    """
+    spec = adaptive_spec(spec, levels)
+    thresholds = np.asarray(sorted(thresholds), dtype=float)
+    values = np.full(spec.shape, np.nan)
+    evaluated = np.zeros(spec.shape, dtype=bool)
+    stats = RefinementStats(fine_nodes=spec.size)
+
+    def evaluate_nodes(iy: np.ndarray, ix: np.ndarray) -> int:
+        flat = np.unique(iy * spec.nx + ix)
+        flat = flat[~evaluated.ravel()[flat]]
+        if len(flat) == 0:
+            return 0
+        rows, cols = np.divmod(flat, spec.nx)
+        points = np.column_stack([spec.x0 + cols * spec.step, spec.y0 + rows * spec.step])
+        values[rows, cols] = evaluate(points)
+        evaluated[rows, cols] = True
+        return len(flat)
+
+    # Grille grossière initiale
+    size = 2 ** levels
+    coarse_y = np.arange(0, spec.ny, size)
+    coarse_x = np.arange(0, spec.nx, size)
+    gy, gx = np.meshgrid(coarse_y, coarse_x, indexing='ij')
+    count = evaluate_nodes(gy.ravel(), gx.ravel())
+    cy, cx = np.meshgrid(coarse_y[:-1], coarse_x[:-1], indexing='ij')
+    cells_y, cells_x = cy.ravel(), cx.ravel()
+
+    # Coins, milieux des arêtes et centre d'une maille ; quarts (mailles filles)
+    children = np.array([(0, 0), (0, 1), (1, 0), (1, 1)])
+    samples = np.array([(0, 0), (0, 2), (2, 0), (2, 2), (0, 1), (1, 0), (1, 1), (1, 2), (2, 1)])
+
+    while True:
+        if size > 1:
+            # Échantillons intérieurs évalués avant d'accepter la maille
+            half = size // 2
+            sy = cells_y[:, None] + samples[:, 0] * half
+            sx = cells_x[:, None] + samples[:, 1] * half
+            count += evaluate_nodes(sy[:, 4:].ravel(), sx[:, 4:].ravel())
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)  # mailles entièrement NaN
+                refine = _needs_refinement(values[sy, sx], thresholds, gradient_tolerance)
+            if sources is not None:
+                centres = np.column_stack([spec.x0 + (cells_x + half) * spec.step,
+                                           spec.y0 + (cells_y + half) * spec.step])
+                radius = SOURCE_DISTANCE_FACTOR * half * spec.step * np.sqrt(2.0)
+                refine |= _near_sources(centres, sources, radius)
+        else:
+            refine = np.zeros(len(cells_y), dtype=bool)
+        stats.levels.append({'step': spec.step * size, 'cells': len(cells_y),
+                             'refined': int(refine.sum()), 'evaluated': count})
+        if not refine.all() and size > 1:
+            ky, kx = cells_y[~refine], cells_x[~refine]
+            _fill_bilinear(values, evaluated, (ky[:, None] + children[:, 0] * half).ravel(),
+                           (kx[:, None] + children[:, 1] * half).ravel(), half)
+        if not refine.any():
+            break
+
+        # Subdivision en 4 mailles filles, dont les coins sont déjà évalués
+        ry, rx = cells_y[refine], cells_x[refine]
+        cells_y = (ry[:, None] + children[:, 0] * half).ravel()
+        cells_x = (rx[:, None] + children[:, 1] * half).ravel()
+        size = half
+        count = 0
+
+    logger.info(f"🔍 Grille adaptative : {stats.evaluations:,} évaluations / {spec.size:,} nœuds "
+                f"({stats.ratio:.1%})")
+    return spec, values, stats
+
+
+def level_evaluator(tracks: Sequence[FlightTrack], times: Mapping[str, object],
+                    profiles: Mapping[str, AcousticProfile], indicator: str = 'lden',
+                    n_days: int = 1, weather: Optional[Mapping[str, float]] = None,
+                    cutoff_m: Optional[float] = None) -> Evaluator:
+    """Lden ou Lnight en des points quelconques (mêmes pondérations que LdenAccumulator)"""
+    if indicator not in ('lden', 'lnight'):
+        raise ValueError(f"Indicateur inconnu: {indicator}")
+
+    def evaluate(points: np.ndarray) -> np.ndarray:
+        flight_ids, _, sel = compute_receptor_noise(tracks, profiles, points, weather, cutoff_m=cutoff_m)
+        periods = [period_of(times[flight_id]) for flight_id in flight_ids]
+        if indicator == 'lden':
+            weights = np.array([10 ** (PERIOD_PENALTY_DB[p] / 10) for p in periods])
+            seconds = n_days * 24 * 3600
+        else:
+            weights = np.array([1.0 if p == 'night' else 0.0 for p in periods])
+            seconds = n_days * PERIOD_HOURS['night'] * 3600
+        energy = np.nansum(weights[:, None] * np.power(10.0, sel.astype(np.float64) / 10), axis=0)
+        with np.errstate(divide='ignore'):
+            return 10 * np.log10(energy / seconds)
+
+    return evaluate
+
+
+def refine_noise_grid(tracks: Sequence[FlightTrack], times: Mapping[str, object],
+                      profiles: Mapping[str, AcousticProfile], spec: GridSpec, levels: int = 3,
+                      indicator: str = 'lden', thresholds: Sequence[float] = DEFAULT_THRESHOLDS,
+                      gradient_tolerance: float = DEFAULT_GRADIENT_TOLERANCE,
+                      n_days: int = 1, weather: Optional[Mapping[str, Union[float, int]]] = None):
+    """Lden / Lnight adaptatif d'un ensemble de mouvements (cf. refine_grid)"""
+    evaluate = level_evaluator(tracks, times, profiles, indicator, n_days, weather)
+    return refine_grid(evaluate, spec, levels, thresholds, gradient_tolerance, track_segments(tracks))
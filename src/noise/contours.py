@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Courbes isophones : polygones par seuil à partir des grilles Lden / Lnight
+Projet: Airport Air Quality Modeling
+
+Contours remplis par marching squares (contourpy), assemblés en polygones
+troués (shapely, tableaux « ragged » sans boucle Python), validés puis
+simplifiés dans le CRS métrique de la grille. Chargement en masse (COPY)
+dans acoustique.zone_exposition_bruit et export GeoJSON / GeoParquet.
+"""
+
+import csv
+import io
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import shapely
+from contourpy import FillType, contour_generator
+
+from src.grids.spec import GridSpec
+
+logger = logging.getLogger(__name__)
+
+# Seuils réglementaires usuels (dB) : PEB, carte de bruit stratégique
+DEFAULT_THRESHOLDS = (50, 55, 60, 65, 70)
+INDICATORS = ('Lden', 'Lnight')
+
+WGS84 = "EPSG:4326"
+
+
+@dataclass
+class NoiseContour:
+    """Zone exposée au-delà d'un seuil (ou entre deux seuils en mode bandes)"""
+
+    indicator: str
+    threshold: float
+    upper: Optional[float]
+    geometry: "shapely.MultiPolygon"  # CRS de la grille
+
+    @property
+    def area_ha(self) -> float:
+        return self.geometry.area / 10_000
+
+
+def _filled_polygons(generator, lower: float, upper: float):
+    """Polygones (avec trous) d'un contour rempli, tous blocs confondus"""
+    polygons = []
+    points_chunks, offsets_chunks, outer_chunks = generator.filled(lower, upper)
+    for points, offsets, outer in zip(points_chunks, offsets_chunks, outer_chunks):
+        if points is None or len(outer) < 2:
+            continue
+        polygons.append(shapely.from_ragged_array(
+            shapely.GeometryType.POLYGON, points, (offsets.astype(np.int64), outer.astype(np.int64)),
+        ))
+    return np.concatenate(polygons) if polygons else np.empty(0, dtype=object)
+
+
+def extract_contours(values: np.ndarray, spec: GridSpec, thresholds: Sequence[float] = DEFAULT_THRESHOLDS,
+                     indicator: str = 'Lden', bands: bool = False,
+                     simplify_tolerance: Optional[float] = None, chunk_size: int = 0) -> List[NoiseContour]:
+    """Polygones par seuil (zones >= seuil, ou bandes [seuil, seuil suivant[)
+
+    simplify_tolerance en mètres (défaut : un demi-pas de grille) ; les NaN
+    sont exclus des zones. chunk_size > 0 découpe le marching squares en blocs.
+    """
+    if indicator not in INDICATORS:
+        raise ValueError(f"Indicateur inconnu: {indicator}")
+    values = np.asarray(values, dtype=np.float64)
+    if values.shape != spec.shape:
+        raise ValueError(f"Grille {values.shape} incompatible avec {spec.shape}")
+
+    tolerance = spec.step / 2 if simplify_tolerance is None else simplify_tolerance
+    generator = contour_generator(
+        x=spec.xs, y=spec.ys, z=np.ma.masked_invalid(values),
+        fill_type=FillType.ChunkCombinedOffsetOffset, chunk_size=chunk_size,
+    )
+
+    thresholds = sorted(float(t) for t in thresholds)
+    top = np.nanmax(values) if np.isfinite(values).any() else -np.inf
+    contours = []
+    for i, threshold in enumerate(thresholds):
+        upper = thresholds[i + 1] if bands and i + 1 < len(thresholds) else None
+        if threshold > top:
+            continue
+        polygons = _filled_polygons(generator, threshold, upper if upper is not None else np.inf)
+        if len(polygons) == 0:
+            continue
+        # Les blocs de contourpy se touchent : union avant validation et simplification
+        geometry = shapely.union_all(shapely.make_valid(polygons)) if chunk_size else \
+            shapely.make_valid(shapely.multipolygons(polygons))
+        if tolerance > 0:
+            geometry = shapely.make_valid(shapely.simplify(geometry, tolerance, preserve_topology=True))
+        geometry = _as_multipolygon(geometry)
+        if geometry.is_empty:
+            continue
+        contours.append(NoiseContour(indicator, threshold, upper, geometry))
+    return contours
+
+
+def _as_multipolygon(geometry):
+    """Ne garder que les parties surfaciques (make_valid peut produire des lignes)"""
+    parts = shapely.get_parts(geometry)
+    polygons = []
+    for part in parts:
+        if isinstance(part, shapely.Polygon):
+            polygons.append(part)
+        elif isinstance(part, (shapely.MultiPolygon, shapely.GeometryCollection)):
+            polygons.extend(p for p in shapely.get_parts(part) if isinstance(p, shapely.Polygon))
+    return shapely.MultiPolygon(polygons)
+
+
+def to_wgs84(geometry, crs: str):
+    """Reprojection vectorisée d'une géométrie vers EPSG:4326"""
+    from pyproj import Transformer
+
+    transformer = Transformer.from_crs(crs, WGS84, always_xy=True)
+    return shapely.transform(geometry, lambda coords: np.column_stack(
+        transformer.transform(coords[:, 0], coords[:, 1])))
+
+
+def contours_frame(contours: Sequence[NoiseContour], spec: GridSpec, crs: str = WGS84):
+    """GeoDataFrame (indicateur, seuil, surface) pour l'export"""
+    import geopandas as gpd
+
+    frame = gpd.GeoDataFrame({
+        'indicateur': [c.indicator for c in contours],
+        'seuil_db': [c.threshold for c in contours],
+        'seuil_max_db': [c.upper for c in contours],
+        'surface_hectares': [round(c.area_ha, 2) for c in contours],
+    }, geometry=[c.geometry for c in contours], crs=spec.crs)
+    return frame.to_crs(crs) if crs != spec.crs else frame
+
+
+def export_geojson(contours: Sequence[NoiseContour], spec: GridSpec, path) -> Path:
+    """GeoJSON en WGS84 (cartes folium, SIG)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    features = []
+    for contour in contours:
+        features.append({
+            'type': 'Feature',
+            'properties': {
+                'indicateur': contour.indicator,
+                'seuil_db': contour.threshold,
+                'seuil_max_db': contour.upper,
+                'surface_hectares': round(contour.area_ha, 2),
+            },
+            'geometry': json.loads(shapely.to_geojson(to_wgs84(contour.geometry, spec.crs))),
+        })
+    path.write_text(json.dumps({'type': 'FeatureCollection', 'features': features}), encoding='utf-8')
+    return path
+
+
+def export_geoparquet(contours: Sequence[NoiseContour], spec: GridSpec, path) -> Optional[Path]:
+    """GeoParquet dans le CRS de la grille (pyarrow optionnel)"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        logger.warning("⚠️ pyarrow non installé : export GeoParquet ignoré")
+        return None
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    contours_frame(contours, spec, crs=spec.crs).to_parquet(path)
+    return path
+
+
+def load_zones(conn, contours: Sequence[NoiseContour], spec: GridSpec, id_aeroport: str,
+               scenario: str, indicators: Sequence[str], date_calcul=None) -> int:
+    """Remplacer les zones calculées d'un scénario par COPY (une transaction)
+
+    Les zones des indicateurs donnés sont toujours supprimées, même sans
+    nouvel isophone (niveaux sous tous les seuils). Les zones PEB arrêtées
+    (source_zone = 'arrete') ne sont jamais modifiées.
+    """
+    indicators = sorted(set(indicators))
+    unexpected = sorted({c.indicator for c in contours} - set(indicators))
+    if unexpected:
+        raise ValueError(f"Isophones {', '.join(unexpected)} hors des indicateurs remplacés")
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for contour in contours:
+        geometry = shapely.set_srid(to_wgs84(contour.geometry, spec.crs), 4326)
+        lden = contour.threshold if contour.indicator == 'Lden' else None
+        lnight = contour.threshold if contour.indicator == 'Lnight' else None
+        writer.writerow([
+            id_aeroport, 'calcul', scenario, date_calcul or '', contour.indicator,
+            contour.threshold, '' if contour.upper is None else contour.upper,
+            '' if lden is None else lden, '' if lnight is None else lnight,
+            shapely.to_wkb(geometry, hex=True, include_srid=True), round(contour.area_ha, 2),
+        ])
+    buffer.seek(0)
+
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                DELETE FROM acoustique.zone_exposition_bruit
+                WHERE id_aeroport = %s AND source_zone = 'calcul' AND scenario = %s
+                  AND date_calcul IS NOT DISTINCT FROM %s AND indicateur = ANY(%s)
+                """,
+                (id_aeroport, scenario, date_calcul, indicators),
+            )
+            cur.copy_expert(
+                """
+                COPY acoustique.zone_exposition_bruit (
+                    id_aeroport, source_zone, scenario, date_calcul, indicateur, seuil_db, seuil_max_db,
+                    niveau_exposition_lden_db, niveau_exposition_ln_db, geometrie_zone, surface_hectares
+                ) FROM STDIN WITH (FORMAT csv)
+                """,
+                buffer,
+            )
+    except Exception:
+        conn.rollback()
+        raise
+    conn.commit()
+    logger.info(f"✅ {len(contours)} zones {'/'.join(indicators)} chargées (scénario {scenario})")
+    return len(contours)
+
+
+def summarize(contours: Sequence[NoiseContour]) -> Dict[str, Dict[float, float]]:
+    """Surfaces (ha) par indicateur et seuil"""
+    summary: Dict[str, Dict[float, float]] = {}
+    for contour in contours:
+        summary.setdefault(contour.indicator, {})[contour.threshold] = round(contour.area_ha, 2)
+    return summary
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Corrélation des événements sonores mesurés avec les vols (acoustique.mesure_bruit)
+Projet: Airport Air Quality Modeling
+
+1. Passages : pour chaque station et chaque vol audible, point de plus proche
+   approche de la trajectoire (index spatial des segments, cf. track_index) ;
+   heure de passage interpolée sur le segment, distance oblique et azimut.
+2. Jointure par intervalle : événements et passages triés par (station, heure),
+   bornes de la fenêtre de tolérance par recherche dichotomique. Équivalent
+   multi-candidats d'un merge_asof par station : coût O((E + P) log P) au lieu
+   d'un parcours événements × vols.
+3. Score dans [0, 1] : poids (proximité temporelle × proximité de la
+   trajectoire) rapporté à celui des autres vols candidats de l'événement,
+   multiplié par la proximité temporelle ; un événement reçoit au plus un vol,
+   un vol au plus un événement par station.
+4. Mise à jour en masse de id_vol_correlé, correlation_certitude,
+   distance_estimee_m et azimut_source_deg (COPY + UPDATE ... FROM).
+"""
+
+import io
+import logging
+from typing import List, Mapping, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.noise.engine import FlightTrack, tracks_from_phases
+from src.noise.track_index import TrackIndex
+
+logger = logging.getLogger(__name__)
+
+# Fenêtre de tolérance entre l'heure de l'événement et l'heure de passage (s)
+DEFAULT_TOLERANCE_S = 120.0
+
+# Écart type attendu entre heure de l'événement et heure de passage estimée (s)
+TIME_SCALE_S = 30.0
+
+# Au-delà, un vol n'est pas candidat pour une station (m, distance oblique)
+DEFAULT_CUTOFF_M = 5000.0
+
+# Distance à la trajectoire divisant le poids d'un candidat par deux (m)
+DISTANCE_SCALE_M = 1500.0
+
+# Certitude minimale pour renseigner la corrélation
+MIN_CERTITUDE = 0.3
+
+EVENTS_QUERY = """
+    SELECT mb.id_mesure_bruit::text AS id_mesure_bruit, mb.id_station_bruit::text AS id_station_bruit,
+           mb.timestamp_mesure, COALESCE(mb.duree_evenement_s, 0)::float8 AS duree_s,
+           mb.lamax_dba::float8 AS lamax_dba
+    FROM acoustique.mesure_bruit mb
+    WHERE mb.timestamp_mesure >= %(start)s AND mb.timestamp_mesure < %(end)s
+"""
+
+STATIONS_QUERY = """
+    SELECT id_station_bruit::text AS id_station_bruit, code_station,
+           ST_X(ST_Transform(coordonnees_gps, 2154)) AS x,
+           ST_Y(ST_Transform(coordonnees_gps, 2154)) AS y,
+           COALESCE(hauteur_microphone_m, 4.0)::float8 AS hauteur_m
+    FROM acoustique.station_mesure_bruit
+    WHERE statut_operationnel
+"""
+
+# Phases horodatées des vols couvrant la période (veille incluse pour les vols de nuit)
+FLIGHT_PHASES_QUERY = """
+    SELECT v.id_vol::text AS id_vol, at.designation_icao, pv.type_phase,
+           v.date_vol + pv.heure_debut AS debut,
+           COALESCE(pv.duree_minutes, 0) * 60 AS duree_s, COALESCE(pv.altitude_m, 0) AS altitude_m,
+           ST_X(ST_Transform(COALESCE(pv.position_gps, a.coordonnees_gps), 2154)) AS x,
+           ST_Y(ST_Transform(COALESCE(pv.position_gps, a.coordonnees_gps), 2154)) AS y
+    FROM airport.vol v
+    JOIN airport.aeronef_type at ON v.id_type_aeronef = at.id_type_aeronef
+    JOIN airport.phase_vol pv ON pv.id_vol = v.id_vol
+    LEFT JOIN airport.aeroport a ON a.id_aeroport = COALESCE(v.id_aeroport_origine, v.id_aeroport_destination)
+    WHERE v.date_vol BETWEEN %(start)s::date - 1 AND %(end)s::date
+    ORDER BY v.id_vol, pv.heure_debut
+"""
+
+
+def _seconds(values) -> np.ndarray:
+    """Horodatages -> secondes depuis l'époque (float64)"""
+    return pd.to_datetime(pd.Series(values)).to_numpy(dtype='datetime64[ns]').astype(np.int64) / 1e9
+
+
+def tracks_from_flight_phases(frame: pd.DataFrame) -> Tuple[List[FlightTrack], np.ndarray]:
+    """Trajectoires (une source fixe par phase) et heure de début de chaque segment
+
+    frame : résultat de FLIGHT_PHASES_QUERY. Les segments sont rangés comme
+    dans TrackIndex.from_tracks (vol par vol, ordre des phases).
+    """
+    tracks = tracks_from_phases(frame)
+    starts = [_seconds(rows['debut']) for _, rows in frame.groupby('id_vol', sort=False)]
+    return tracks, np.concatenate(starts) if starts else np.empty(0)
+
+
+def segment_start_times(tracks: Sequence[FlightTrack], departures: Mapping[str, object]) -> np.ndarray:
+    """Heure de début de chaque segment depuis l'heure du premier point de chaque vol"""
+    tracks = [track for track in tracks if track.n_segments]
+    if not tracks:
+        return np.empty(0)
+    first = _seconds([departures[track.flight_id] for track in tracks])
+    elapsed = [np.concatenate([[0.0], np.cumsum(track.duration)[:-1]]) for track in tracks]
+    return np.repeat(first, [track.n_segments for track in tracks]) + np.concatenate(elapsed)
+
+
+def overflights(tracks: Sequence[FlightTrack], segment_start: np.ndarray, stations: pd.DataFrame,
+                cutoff_m: float = DEFAULT_CUTOFF_M) -> pd.DataFrame:
+    """Passage de chaque vol au plus près de chaque station (à moins de cutoff_m)
+
+    stations : id_station_bruit, x, y, hauteur_m (CRS des trajectoires).
+    Retourne id_station_bruit, id_vol, passage (s depuis l'époque), distance_m, azimut_deg.
+    """
+    index = TrackIndex.from_tracks(tracks)
+    if len(segment_start) != len(index):
+        raise ValueError(f"{len(segment_start)} heures de segment pour {len(index)} segments")
+    receptors = stations[['x', 'y', 'hauteur_m']].to_numpy(dtype=float)
+    station_idx, owner, segment, distance = index.nearest(receptors, cutoff_m, per_owner=True)
+
+    # Point de plus proche approche sur le segment et heure correspondante
+    start, end = index.start[segment], index.end[segment]
+    u, w = end - start, receptors[station_idx] - start
+    length2 = np.einsum('ij,ij->i', u, u)
+    moving = length2 > 1e-6
+    fraction = np.clip(np.einsum('ij,ij->i', w, u) / np.where(moving, length2, 1.0), 0.0, 1.0)
+    duration = np.concatenate([track.duration for track in tracks if track.n_segments])[segment]
+    passage = segment_start[segment] + np.where(moving, fraction, 0.5) * duration
+    closest = start + np.where(moving, fraction, 0.0)[:, None] * u
+    dx, dy = (closest - receptors[station_idx])[:, 0], (closest - receptors[station_idx])[:, 1]
+
+    return pd.DataFrame({
+        'id_station_bruit': stations['id_station_bruit'].to_numpy()[station_idx],
+        'id_vol': np.asarray(index.owner_ids, dtype=object)[owner],
+        'passage': passage,
+        'distance_m': distance,
+        'azimut_deg': np.degrees(np.arctan2(dx, dy)) % 360,
+    })
+
+
+def interval_join(left_key: np.ndarray, left_time: np.ndarray, right_key: np.ndarray, right_time: np.ndarray,
+                  tolerance: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Couples (i, j) de même clé entière avec |left_time[i] - right_time[j]| <= tolerance
+
+    Tri lexicographique (clé, heure) puis bornes par searchsorted : pas de
+    produit cartésien, sortie proportionnelle au nombre de couples.
+    """
+    if not len(left_key) or not len(right_key):
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    left_key, right_key = np.asarray(left_key, dtype=np.float64), np.asarray(right_key, dtype=np.float64)
+    origin = min(left_time.min(), right_time.min())
+    span = max(left_time.max(), right_time.max()) - origin + 2 * tolerance + 1
+    order = np.argsort(right_key * span + (right_time - origin), kind='stable')
+    sorted_key = right_key[order] * span + (right_time[order] - origin)
+    left = left_key * span + (left_time - origin)
+    lo = np.searchsorted(sorted_key, left - tolerance, side='left')
+    hi = np.searchsorted(sorted_key, left + tolerance, side='right')
+    counts = hi - lo
+    left_idx = np.repeat(np.arange(len(left_key)), counts)
+    first = np.repeat(lo - np.cumsum(counts) + counts, counts)
+    right_idx = order[first + np.arange(counts.sum())]
+    return left_idx, right_idx
+
+
+def correlate(events: pd.DataFrame, passages: pd.DataFrame, tolerance_s: float = DEFAULT_TOLERANCE_S,
+              min_certitude: float = MIN_CERTITUDE) -> pd.DataFrame:
+    """Meilleur vol par événement : id_mesure_bruit, id_vol, certitude, distance_m, azimut_deg
+
+    events : id_mesure_bruit, id_station_bruit, timestamp_mesure, duree_s
+    (heure de l'événement = début + demi-durée). passages : cf. overflights.
+    """
+    if events.empty or passages.empty:
+        return pd.DataFrame(columns=['id_mesure_bruit', 'id_vol', 'certitude', 'distance_m', 'azimut_deg'])
+    stations = pd.Index(pd.unique(np.concatenate([events['id_station_bruit'].to_numpy(),
+                                                  passages['id_station_bruit'].to_numpy()])))
+    event_time = _seconds(events['timestamp_mesure']) + events['duree_s'].fillna(0).to_numpy(dtype=float) / 2
+    event_idx, passage_idx = interval_join(
+        stations.get_indexer(events['id_station_bruit']), event_time,
+        stations.get_indexer(passages['id_station_bruit']),
+        passages['passage'].to_numpy(dtype=float), tolerance_s,
+    )
+
+    lag = event_time[event_idx] - passages['passage'].to_numpy()[passage_idx]
+    distance = passages['distance_m'].to_numpy()[passage_idx]
+    timing = np.exp(-0.5 * (lag / TIME_SCALE_S) ** 2)
+    weight = timing / (1 + (distance / DISTANCE_SCALE_M) ** 2)
+    # Part du candidat parmi ceux de l'événement (ambiguïté) × plausibilité temporelle
+    share = weight / np.bincount(event_idx, weight, minlength=len(events))[event_idx]
+    score = share * timing
+
+    kept = score >= min_certitude
+    event_idx, passage_idx, score = event_idx[kept], passage_idx[kept], score[kept]
+    flights, n_flights = pd.factorize(passages['id_vol'])[0], passages['id_vol'].nunique()
+    passage_key = stations.get_indexer(passages['id_station_bruit']).astype(np.int64) * n_flights + flights
+    selected = assign(score, event_idx, passage_key[passage_idx])
+    event_idx, passage_idx = event_idx[selected], passage_idx[selected]
+    logger.info(f"🔗 {len(selected):,} événements corrélés sur {len(events):,} "
+                f"({int(kept.sum()):,} couples candidats, {len(passages):,} passages)")
+    return pd.DataFrame({
+        'id_mesure_bruit': events['id_mesure_bruit'].to_numpy()[event_idx],
+        'id_vol': passages['id_vol'].to_numpy()[passage_idx],
+        'certitude': score[selected],
+        'distance_m': passages['distance_m'].to_numpy()[passage_idx],
+        'azimut_deg': passages['azimut_deg'].to_numpy()[passage_idx],
+    })
+
+
+def assign(score: np.ndarray, event: np.ndarray, passage_key: np.ndarray) -> np.ndarray:
+    """Affectation gloutonne par score décroissant, par tours vectorisés
+
+    Un vol par événement, un passage (station, vol) par événement. Un
+    événement dont le meilleur passage est pris par un meilleur événement
+    retente sa chance au tour suivant avec ses autres candidats.
+    Retourne les indices des couples retenus.
+    """
+    remaining = np.argsort(-score, kind='stable')
+    rounds = []
+    while len(remaining):
+        # Premier couple (meilleur score) de chaque événement, puis de chaque passage
+        _, first = np.unique(event[remaining], return_index=True)
+        candidates = remaining[np.sort(first)]
+        _, first = np.unique(passage_key[candidates], return_index=True)
+        selected = candidates[np.sort(first)]
+        rounds.append(selected)
+        remaining = remaining[~np.isin(event[remaining], event[selected])
+                              & ~np.isin(passage_key[remaining], passage_key[selected])]
+    return np.concatenate(rounds) if rounds else np.empty(0, dtype=np.int64)
+
+
+def update_correlations(conn, events: pd.DataFrame, matches: pd.DataFrame) -> int:
+    """Écrire les corrélations de tous les événements traités (NULL si aucun vol)
+
+    COPY dans une table temporaire puis un seul UPDATE ... FROM ; relancer sur
+    la même période remplace les corrélations précédentes.
+    """
+    rows = events[['id_mesure_bruit']].merge(matches, on='id_mesure_bruit', how='left')
+    rows['certitude'] = rows['certitude'].round(2)
+    for column in ('distance_m', 'azimut_deg'):
+        rows[column] = rows[column].round().astype('Int64')
+    buffer = io.StringIO()
+    rows[['id_mesure_bruit', 'id_vol', 'certitude', 'distance_m', 'azimut_deg']].to_csv(
+        buffer, index=False, header=False, na_rep='')
+    buffer.seek(0)
+
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE TEMP TABLE correlation_evenement (
+                id_mesure_bruit UUID PRIMARY KEY, id_vol UUID, certitude NUMERIC(3,2),
+                distance_m INTEGER, azimut_deg INTEGER
+            ) ON COMMIT DROP
+        """)
+        cur.copy_expert("COPY correlation_evenement FROM STDIN WITH (FORMAT csv)", buffer)
+        cur.execute("""
+            UPDATE acoustique.mesure_bruit mb
+            SET id_vol_correlé = c.id_vol,
+                correlation_certitude = c.certitude,
+                distance_estimee_m = c.distance_m,
+                azimut_source_deg = c.azimut_deg
+            FROM correlation_evenement c
+            WHERE mb.id_mesure_bruit = c.id_mesure_bruit
+        """)
+        updated = cur.rowcount
+    conn.commit()
+    logger.info(f"✅ {updated:,} mesures mises à jour ({matches['id_mesure_bruit'].nunique():,} corrélées)")
+    return updated
+
+
+def correlate_period(conn, start, end, tolerance_s: float = DEFAULT_TOLERANCE_S,
+                     cutoff_m: float = DEFAULT_CUTOFF_M, min_certitude: float = MIN_CERTITUDE,
+                     write: bool = True) -> pd.DataFrame:
+    """Corréler les événements [start, end[ avec les vols de la période"""
+    events = pd.read_sql_query(EVENTS_QUERY, conn, params={'start': start, 'end': end})
+    stations = pd.read_sql_query(STATIONS_QUERY, conn)
+    phases = pd.read_sql_query(FLIGHT_PHASES_QUERY, conn, params={'start': start, 'end': end})
+    tracks, segment_start = tracks_from_flight_phases(phases)
+    passages = overflights(tracks, segment_start, stations, cutoff_m)
+    matches = correlate(events, passages, tolerance_s, min_certitude)
+    if write:
+        update_correlations(conn, events, matches)
+    return matches
+
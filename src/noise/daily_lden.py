@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mise à jour journalière du Lden annuel sans recalcul de l'année
+Projet: Airport Air Quality Modeling
+
+Un répertoire par scénario :
+    days/        magasin mappé (src/grids/memmap_store.py) des énergies de
+                 chaque journée, une trame par date, champs energy_<période>
+    annual.npz   cumul des journées retenues + état (journées, empreintes
+                 des isophones, journée en cours d'écriture)
+
+Les énergies sont quantifiées en entiers int64 (pas ENERGY_QUANTUM) : le cumul
+annuel est une somme exacte, indépendante de l'ordre. Remplacer une journée
+corrigée (retrait de l'ancienne trame, ajout de la nouvelle) donne au bit près
+le cumul qu'un recalcul complet produirait. Les isophones ne sont rechargés
+dans zone_exposition_bruit que si la grille des classes de seuils change.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence, Union
+
+import numpy as np
+
+from src.grids.memmap_store import GridStore
+from src.grids.spec import GridSpec, load_grid, save_grid
+from src.noise.accumulator import PERIODS, LdenAccumulator
+from src.noise.contours import DEFAULT_THRESHOLDS, extract_contours, load_zones
+
+logger = logging.getLogger(__name__)
+
+DAYS_DIR = "days"
+ANNUAL_FILE = "annual.npz"
+
+# Pas de quantification des énergies (s) : SEL de 20 dB. Erreur < 1e-5 dB pour
+# un Lden journalier de 20 dB ; marge int64 pour ~1e17 s par nœud et par an
+ENERGY_QUANTUM = 100.0
+ENERGY_LIMIT = np.iinfo(np.int64).max
+
+# Fenêtre glissante réglementaire (jours)
+ANNUAL_DAYS = 365
+
+
+def energy_field(period: str) -> str:
+    return f"energy_{period}"
+
+
+def quantize(energy: np.ndarray) -> np.ndarray:
+    """Énergie float (s) -> entiers int64 au pas ENERGY_QUANTUM (NaN -> 0)"""
+    scaled = np.rint(np.nan_to_num(np.asarray(energy, dtype=np.float64), nan=0.0) / ENERGY_QUANTUM)
+    if scaled.size and (scaled.min() < 0 or scaled.max() >= ENERGY_LIMIT):
+        raise OverflowError("Énergie hors de la plage représentable en int64")
+    return scaled.astype(np.int64)
+
+
+def class_digest(values: np.ndarray, spec: GridSpec, thresholds: Sequence[float]) -> str:
+    """Empreinte de la grille des classes de seuils (isophones inchangés si identique)"""
+    classes = np.digitize(np.nan_to_num(values, nan=-np.inf), sorted(thresholds)).astype(np.int8)
+    digest = hashlib.sha256()
+    digest.update(json.dumps({'grid': spec.to_dict(), 'thresholds': sorted(thresholds)}).encode("utf-8"))
+    digest.update(classes.tobytes())
+    return digest.hexdigest()
+
+
+class DailyLden:
+    """Énergies journalières persistées et cumul annuel glissant exact"""
+
+    def __init__(self, root, store: GridStore):
+        self.root = Path(root)
+        self.store = store
+        self.spec = store.spec
+        self.annual = {period: np.zeros(self.spec.shape, dtype=np.int64) for period in PERIODS}
+        self.days = set()
+        self.contours: Dict[str, str] = {}
+        self.pending: Optional[str] = None
+
+    @classmethod
+    def open(cls, root, spec: GridSpec) -> "DailyLden":
+        """Ouvrir le cumul d'un scénario (même grille) ou en créer un vide"""
+        root = Path(root)
+        days_path = root / DAYS_DIR
+        if (days_path / "meta.json").exists():
+            store = GridStore.open(days_path)
+            if store.spec != spec:
+                raise ValueError(f"Le cumul {root} porte sur une autre grille")
+        else:
+            store = GridStore.create(days_path, spec, {energy_field(p): 'int64' for p in PERIODS},
+                                     attrs={'quantum': ENERGY_QUANTUM, 'movements': {}}, overwrite=True)
+        daily = cls(root, store)
+        if (root / ANNUAL_FILE).exists():
+            daily._load()
+        if daily.pending:
+            logger.warning(f"⚠️ Journée {daily.pending} interrompue : retirée du cumul, à recalculer")
+            daily.days.discard(daily.pending)
+            daily.pending = None
+            daily.rebuild()
+        return daily
+
+    def _load(self):
+        spec, arrays = load_grid(self.root / ANNUAL_FILE)
+        if spec != self.spec:
+            raise ValueError(f"{self.root / ANNUAL_FILE} porte sur une autre grille")
+        state = json.loads(str(arrays['_annual']))
+        if state['quantum'] != ENERGY_QUANTUM:
+            raise ValueError(f"Pas de quantification {state['quantum']} incompatible ({ENERGY_QUANTUM})")
+        for period in PERIODS:
+            self.annual[period] = arrays[energy_field(period)].astype(np.int64)
+        self.days = set(state['days'])
+        self.contours = dict(state['contours'])
+        self.pending = state.get('pending')
+
+    def save(self):
+        """Écriture atomique du cumul annuel et de son état"""
+        state = {'quantum': ENERGY_QUANTUM, 'days': sorted(self.days), 'contours': self.contours,
+                 'pending': self.pending}
+        path = self.root / ANNUAL_FILE
+        tmp = path.with_name(path.stem + '.tmp.npz')
+        save_grid(tmp, self.spec, _annual=json.dumps(state),
+                  **{energy_field(period): self.annual[period] for period in PERIODS})
+        os.replace(tmp, path)
+
+    # ---- journées ------------------------------------------------------------------
+
+    @property
+    def stored_days(self):
+        return list(self.store.times)
+
+    def day_energy(self, day: Union[date, str]) -> Dict[str, np.ndarray]:
+        """Énergies quantifiées (int64) persistées pour une journée"""
+        index = self.store.time_index(str(day))
+        return {period: np.array(self.store.array(energy_field(period))[index]) for period in PERIODS}
+
+    def day_movements(self, day: Union[date, str]) -> Dict[str, int]:
+        return dict(self.store.attrs['movements'].get(str(day), {p: 0 for p in PERIODS}))
+
+    def update_day(self, day: Union[date, str], accumulator: LdenAccumulator) -> bool:
+        """Persister les énergies d'une journée et mettre le cumul à jour
+
+        accumulator : cumul de cette seule journée (LdenAccumulator.add_flights).
+        Une journée déjà présente est remplacée (retrait exact de l'ancienne
+        contribution). Retourne True si une journée existante a été remplacée.
+        """
+        day = str(day)
+        if accumulator.spec != self.spec:
+            raise ValueError("Cumul journalier sur une autre grille")
+        if accumulator.days and accumulator.days != {day}:
+            raise ValueError(f"Le cumul fourni couvre {sorted(accumulator.days)}, pas {day}")
+        new = {period: quantize(accumulator.energy[period]) for period in PERIODS}
+        replaced = day in self.store.times
+        old = self.day_energy(day) if replaced else None
+        if any(np.any(self.annual[p] > ENERGY_LIMIT - new[p]) for p in PERIODS):
+            raise OverflowError(f"Cumul annuel hors de la plage int64 en ajoutant {day}")
+
+        # Journée marquée en cours : une trame à moitié écrite n'entre jamais dans le cumul
+        self.pending = day
+        self.save()
+        if replaced:
+            for period in PERIODS:
+                self.store.write_window(energy_field(period), slice(None), slice(None), new[period], time=day)
+        else:
+            self.store.append(day, **{energy_field(period): new[period] for period in PERIODS})
+        self.store.update_attrs(movements={**self.store.attrs['movements'], day: dict(accumulator.movements)})
+
+        for period in PERIODS:
+            if replaced and day in self.days:
+                self.annual[period] -= old[period]
+            self.annual[period] += new[period]
+        self.days.add(day)
+        self.pending = None
+        self.save()
+        logger.info(f"📅 {day} {'remplacée' if replaced else 'ajoutée'} : "
+                    f"{sum(accumulator.movements.values())} mouvements, {self.n_days} jours cumulés")
+        return replaced
+
+    def remove_day(self, day: Union[date, str]):
+        """Retirer une journée du cumul (sa trame reste sur disque)"""
+        day = str(day)
+        if day not in self.days:
+            return
+        energy = self.day_energy(day)
+        for period in PERIODS:
+            self.annual[period] -= energy[period]
+        self.days.discard(day)
+        self.save()
+
+    def include_day(self, day: Union[date, str]):
+        """Remettre dans le cumul une journée persistée"""
+        day = str(day)
+        if day in self.days:
+            return
+        energy = self.day_energy(day)
+        for period in PERIODS:
+            self.annual[period] += energy[period]
+        self.days.add(day)
+        self.save()
+
+    def roll(self, last_day: Union[date, str, None] = None, n_days: int = ANNUAL_DAYS) -> Sequence[str]:
+        """Fenêtre glissante ]last_day - n_days, last_day] : retrait des journées plus anciennes"""
+        if not self.days:
+            return []
+        last = date.fromisoformat(str(last_day or max(self.days)))
+        first = str(last - timedelta(days=n_days - 1))
+        expired = sorted(day for day in self.days if day < first or day > str(last))
+        for day in expired:
+            self.remove_day(day)
+        if expired:
+            logger.info(f"🗓️ {len(expired)} journées hors fenêtre retirées ({first} → {last})")
+        return expired
+
+    def rebuild(self, days: Optional[Iterable[str]] = None):
+        """Recalculer le cumul depuis les trames persistées (reprise après incident)"""
+        days = set(self.days if days is None else map(str, days))
+        missing = days - set(self.store.times)
+        if missing:
+            raise KeyError(f"Journées non persistées: {sorted(missing)[:5]}")
+        self.annual = {period: np.zeros(self.spec.shape, dtype=np.int64) for period in PERIODS}
+        for day in sorted(days):
+            for period, energy in self.day_energy(day).items():
+                self.annual[period] += energy
+        self.days = days
+        self.save()
+
+    def verify(self) -> bool:
+        """Cumul identique à la somme des trames des journées retenues"""
+        expected = {period: np.zeros(self.spec.shape, dtype=np.int64) for period in PERIODS}
+        for day in self.days:
+            for period, energy in self.day_energy(day).items():
+                expected[period] += energy
+        return all(np.array_equal(expected[p], self.annual[p]) for p in PERIODS)
+
+    # ---- indicateurs -----------------------------------------------------------------
+
+    @property
+    def n_days(self) -> int:
+        return len(self.days)
+
+    def accumulator(self) -> LdenAccumulator:
+        """Cumul annuel sous forme de LdenAccumulator (énergies float64)"""
+        accumulator = LdenAccumulator(self.spec)
+        for period in PERIODS:
+            accumulator.energy[period] = self.annual[period].astype(np.float64) * ENERGY_QUANTUM
+        for day in self.days:
+            for period, count in self.day_movements(day).items():
+                accumulator.movements[period] += count
+        accumulator.days = set(self.days)
+        return accumulator
+
+    def levels(self) -> Dict[str, np.ndarray]:
+        accumulator = self.accumulator()
+        return {'Lden': accumulator.lden(), 'Lnight': accumulator.lnight()}
+
+    def contours_changed(self, indicator: str, values: np.ndarray,
+                         thresholds: Sequence[float] = DEFAULT_THRESHOLDS) -> bool:
+        return self.contours.get(indicator) != class_digest(values, self.spec, thresholds)
+
+    def refresh_contours(self, conn, id_aeroport: str, scenario: str,
+                         thresholds: Sequence[float] = DEFAULT_THRESHOLDS, bands: bool = False,
+                         force: bool = False) -> Dict[str, Optional[int]]:
+        """Recharger les isophones Lden / Lnight dont la grille des classes a changé
+
+        Retourne le nombre de zones chargées par indicateur (None si inchangé).
+        Un déplacement des courbes inférieur au pas de grille ne déclenche pas
+        de rechargement.
+        """
+        loaded: Dict[str, Optional[int]] = {}
+        for indicator, values in self.levels().items():
+            digest = class_digest(values, self.spec, thresholds)
+            if not force and self.contours.get(indicator) == digest:
+                logger.info(f"⏭️ Isophones {indicator} inchangés ({scenario})")
+                loaded[indicator] = None
+                continue
+            contours = extract_contours(values, self.spec, thresholds, indicator=indicator, bands=bands)
+            if not contours:
+                logger.warning(f"⚠️ Aucun isophone {indicator} au-dessus des seuils ({scenario}), "
+                               "anciennes zones supprimées")
+            loaded[indicator] = load_zones(conn, contours, self.spec, id_aeroport, scenario, [indicator])
+            # Empreinte enregistrée une fois le remplacement validé : un échec relance le calcul
+            self.contours[indicator] = digest
+            self.save()
+        return loaded
+
+    def summary(self) -> Dict:
+        days = sorted(self.days)
+        return {'days': len(days), 'first': days[0] if days else None, 'last': days[-1] if days else None,
+                'stored': len(self.store.times), 'movements': self.accumulator().movements}
+
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Moteur vectorisé de calcul de bruit (approche segmentée type ECAC Doc 29)
+Projet: Airport Air Quality Modeling
+
+Calcule LAmax et SEL de chaque vol sur toute une grille de récepteurs en un
+passage NumPy (récepteurs × segments), au lieu d'un appel de
+acoustique.calculer_empreinte_vol par couple (vol, point).
+
+Formules identiques à la migration V003 :
+- atténuation géométrique : L - 20·log10(d / dref), dref = 1000 m
+  (acoustique.calculer_attenuation_distance)
+- absorption atmosphérique : coef(f)·(1 + (T-15)·0,01)·(1 + |HR-70|·0,002)·d/1000
+  (acoustique.calculer_absorption_atmospherique)
+
+Niveau au récepteur : Lsource - 20·log10(d/dref) - absorption(d). La fonction
+SQL soustrait en plus le niveau atténué du niveau source ; le moteur applique
+la formule corrigée.
+
+Coordonnées en mètres dans le CRS de la grille (Lambert-93 par défaut).
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from src.grids.spec import GridSpec
+from src.noise.track_index import TrackIndex
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_DISTANCE_M = 1000.0
+
+# Distance minimale source-récepteur (la fonction SQL renvoie NULL pour d <= 0)
+MIN_DISTANCE_M = 10.0
+
+# Hauteur des récepteurs pour les indicateurs réglementaires (directive 2002/49/CE)
+DEFAULT_RECEPTOR_HEIGHT_M = 4.0
+
+# Conditions météo par défaut de calculer_empreinte_vol
+DEFAULT_WEATHER = {'temperature': 15.0, 'humidite': 70.0}
+
+# Taille des blocs récepteurs × segments traités en une fois (~10 tableaux float64)
+DEFAULT_CHUNK_ELEMENTS = 2_000_000
+
+# Coefficient d'absorption (dB/km) par bande de fréquence : (fréquence max, coefficient)
+ABSORPTION_BANDS = [(250, 0.1), (500, 0.2), (1000, 0.5), (2000, 1.0), (4000, 2.0)]
+ABSORPTION_ABOVE = 4.0
+
+# Colonne de profil_acoustique_aeronef par phase (libellés SQL anglais et V001 français)
+PHASE_SOURCE_COLUMN = {
+    'Taxi-out': 'bruit_taxi_dba',
+    'Taxi-in': 'bruit_taxi_dba',
+    'Take-off': 'bruit_decollage_dba',
+    'Décollage': 'bruit_decollage_dba',
+    'Climb-out': 'bruit_montee_dba',
+    'Montée': 'bruit_montee_dba',
+    'Approach': 'bruit_approche_dba',
+    'Approche': 'bruit_approche_dba',
+    'Landing': 'bruit_atterrissage_dba',
+    'Atterrissage': 'bruit_atterrissage_dba',
+}
+DEFAULT_SOURCE_COLUMN = 'bruit_taxi_dba'
+
+# Profils actifs et phases géolocalisées, pour alimenter le moteur depuis la base
+PROFILES_QUERY = """
+    SELECT at.designation_icao, p.bruit_taxi_dba, p.bruit_decollage_dba, p.bruit_montee_dba,
+           p.bruit_approche_dba, p.bruit_atterrissage_dba, p.frequence_dominante_hz
+    FROM acoustique.profil_acoustique_aeronef p
+    JOIN airport.aeronef_type at ON p.id_type_aeronef = at.id_type_aeronef
+    WHERE p.statut_actif = TRUE
+"""
+
+PHASES_QUERY = """
+    SELECT v.id_vol::text AS id_vol, at.designation_icao, pv.type_phase, pv.heure_debut,
+           COALESCE(pv.duree_minutes, 0) * 60 AS duree_s, COALESCE(pv.altitude_m, 0) AS altitude_m,
+           ST_X(ST_Transform(COALESCE(pv.position_gps, a.coordonnees_gps), 2154)) AS x,
+           ST_Y(ST_Transform(COALESCE(pv.position_gps, a.coordonnees_gps), 2154)) AS y
+    FROM airport.vol v
+    JOIN airport.aeronef_type at ON v.id_type_aeronef = at.id_type_aeronef
+    JOIN airport.phase_vol pv ON pv.id_vol = v.id_vol
+    LEFT JOIN airport.aeroport a ON a.id_aeroport = COALESCE(v.id_aeroport_origine, v.id_aeroport_destination)
+    WHERE v.date_vol = %(date)s
+    ORDER BY v.id_vol, pv.heure_debut
+"""
+
+
+@dataclass(frozen=True)
+class AcousticProfile:
+    """Niveaux source (dBA à dref) d'un type d'aéronef, cf. profil_acoustique_aeronef"""
+
+    bruit_taxi_dba: float = 65.0
+    bruit_decollage_dba: float = 90.0
+    bruit_montee_dba: float = 85.0
+    bruit_approche_dba: float = 80.0
+    bruit_atterrissage_dba: float = 75.0
+    frequence_dominante_hz: float = 1000.0
+
+    def source_level(self, phase: str) -> float:
+        return float(getattr(self, PHASE_SOURCE_COLUMN.get(phase, DEFAULT_SOURCE_COLUMN)))
+
+
+@dataclass
+class FlightTrack:
+    """Trajectoire d'un vol découpée en segments (début, fin, durée, phase)
+
+    Un segment de longueur nulle représente une source fixe pendant sa durée
+    (cas des phases de airport.phase_vol, une position par phase).
+    """
+
+    flight_id: str
+    aircraft: str
+    start: np.ndarray  # (S, 3) x, y, z en mètres
+    end: np.ndarray  # (S, 3)
+    duration: np.ndarray  # (S,) secondes
+    phases: Sequence[str]
+
+    @classmethod
+    def from_points(cls, flight_id: str, aircraft: str, x, y, z, t, phases: Sequence[str]) -> "FlightTrack":
+        """Trajectoire échantillonnée : n points horodatés, n-1 phases de segment"""
+        points = np.column_stack([x, y, z]).astype(float)
+        t = np.asarray(t, dtype=float)
+        if len(phases) != len(points) - 1:
+            raise ValueError("Une phase par segment attendue (n points -> n-1 segments)")
+        return cls(flight_id, aircraft, points[:-1], points[1:], np.diff(t), list(phases))
+
+    @property
+    def n_segments(self) -> int:
+        return len(self.duration)
+
+
+@dataclass
+class FlightNoise:
+    """LAmax et SEL par vol sur la grille : tableaux (n_vols, ny, nx)"""
+
+    spec: GridSpec
+    flight_ids: List[str]
+    lamax: np.ndarray
+    sel: np.ndarray
+
+    def for_flight(self, flight_id: str):
+        index = self.flight_ids.index(flight_id)
+        return self.lamax[index], self.sel[index]
+
+
+def absorption_coefficient(frequency_hz, temperature: float = 15.0, humidity: float = 70.0) -> np.ndarray:
+    """Coefficient d'absorption corrigé (dB/km), cf. calculer_absorption_atmospherique"""
+    frequency_hz = np.asarray(frequency_hz, dtype=float)
+    coefficient = np.full(frequency_hz.shape, ABSORPTION_ABOVE)
+    for upper, value in reversed(ABSORPTION_BANDS):
+        coefficient = np.where(frequency_hz <= upper, value, coefficient)
+    return coefficient * (1 + (temperature - 15) * 0.01) * (1 + abs(humidity - 70) * 0.002)
+
+
+def atmospheric_absorption(distance_m, frequency_hz=1000, temperature: float = 15.0,
+                           humidity: float = 70.0) -> np.ndarray:
+    """Absorption atmosphérique (dB) sur une distance en mètres"""
+    return absorption_coefficient(frequency_hz, temperature, humidity) * np.asarray(distance_m) / 1000
+
+
+def distance_attenuation(level, distance_m, reference_m: float = REFERENCE_DISTANCE_M) -> np.ndarray:
+    """Niveau après divergence géométrique, cf. calculer_attenuation_distance"""
+    return np.asarray(level) - 20 * np.log10(np.asarray(distance_m) / reference_m)
+
+
+def received_level(source_level, distance_m, frequency_hz=1000, temperature: float = 15.0,
+                   humidity: float = 70.0) -> np.ndarray:
+    """Niveau au récepteur (équivalent corrigé du niveau_final de calculer_empreinte_vol)"""
+    distance_m = np.maximum(distance_m, MIN_DISTANCE_M)
+    return (distance_attenuation(source_level, distance_m)
+            - atmospheric_absorption(distance_m, frequency_hz, temperature, humidity))
+
+
+def audibility_cutoff(source_level: float, floor_db: float = 40.0, frequency_hz: float = 1000,
+                      temperature: float = 15.0, humidity: float = 70.0) -> float:
+    """Distance (m) au-delà de laquelle le niveau reçu passe sous floor_db
+
+    Borne de coupure cohérente avec les formules du moteur pour cutoff_m :
+    utiliser le niveau source le plus élevé de la flotte.
+    """
+    low, high = np.log(MIN_DISTANCE_M), np.log(1e6)
+    for _ in range(60):  # bissection (niveau décroissant avec la distance)
+        middle = (low + high) / 2
+        if received_level(source_level, np.exp(middle), frequency_hz, temperature, humidity) > floor_db:
+            low = middle
+        else:
+            high = middle
+    return float(np.exp(high))
+
+
+def profiles_from_frame(frame) -> Dict[str, AcousticProfile]:
+    """Profils par désignation OACI depuis le résultat de PROFILES_QUERY"""
+    fields = AcousticProfile.__dataclass_fields__
+    profiles = {}
+    for record in frame.to_dict('records'):
+        values = {k: float(v) for k, v in record.items() if k in fields and v is not None}
+        profiles[record['designation_icao']] = AcousticProfile(**values)
+    return profiles
+
+
+def tracks_from_phases(frame) -> List[FlightTrack]:
+    """Une source fixe par phase (position, altitude, durée) depuis PHASES_QUERY"""
+    tracks = []
+    for flight_id, rows in frame.groupby('id_vol', sort=False):
+        points = rows[['x', 'y', 'altitude_m']].to_numpy(dtype=float)
+        tracks.append(FlightTrack(
+            flight_id=str(flight_id),
+            aircraft=rows['designation_icao'].iloc[0],
+            start=points,
+            end=points.copy(),
+            duration=rows['duree_s'].to_numpy(dtype=float),
+            phases=list(rows['type_phase']),
+        ))
+    return tracks
+
+
+def _stack_segments(tracks: Iterable[FlightTrack], profiles: Mapping[str, AcousticProfile],
+                    temperature: float, humidity: float):
+    """Concaténer les segments de tous les vols (triés par vol) avec leurs attributs"""
+    flight_ids, offsets, starts, ends, durations, levels, frequencies = [], [], [], [], [], [], []
+    total = 0
+    for track in tracks:
+        if track.n_segments == 0:
+            logger.warning(f"⚠️ Vol {track.flight_id} sans segment ignoré")
+            continue
+        profile = profiles.get(track.aircraft)
+        if profile is None:
+            logger.warning(f"⚠️ Profil acoustique absent pour {track.aircraft}, valeurs par défaut")
+            profile = AcousticProfile()
+        flight_ids.append(track.flight_id)
+        offsets.append(total)
+        total += track.n_segments
+        starts.append(np.asarray(track.start, dtype=float))
+        ends.append(np.asarray(track.end, dtype=float))
+        durations.append(np.asarray(track.duration, dtype=float))
+        levels.append([profile.source_level(phase) for phase in track.phases])
+        frequencies.append(np.full(track.n_segments, profile.frequence_dominante_hz))
+
+    if not flight_ids:
+        return flight_ids, None
+
+    frequencies = np.concatenate(frequencies)
+    segments = {
+        'start': np.concatenate(starts),
+        'end': np.concatenate(ends),
+        'duration': np.maximum(np.concatenate(durations), 0.0),
+        'level': np.concatenate([np.asarray(lv, dtype=float) for lv in levels]),
+        'absorption': absorption_coefficient(frequencies, temperature, humidity) / 1000,  # dB/m
+        'offsets': np.asarray(offsets),
+        'flight': np.repeat(np.arange(len(flight_ids)), np.diff(np.append(offsets, total))),
+    }
+    return flight_ids, segments
+
+
+def _pair_levels(wx, wy, wz, ux, uy, uz, level, absorption, duration):
+    """LAmax et énergie d'exposition (Pa²·s relatif) de couples récepteur × segment
+
+    w : vecteur début de segment -> récepteur, u : vecteur du segment ; tous
+    les arguments sont diffusables entre eux (bloc dense ou couples indexés).
+    Pour un segment parcouru à vitesse constante, l'intégrale de (dref/d)² le
+    long du segment vaut dref²·(durée/longueur)·[atan(s2/dp) - atan(s1/dp)] / dp
+    (dp : distance à la droite porteuse, s1, s2 : abscisses des extrémités).
+    L'absorption est prise au point le plus proche du segment.
+    """
+    length2 = ux * ux + uy * uy + uz * uz
+    moving = length2 > 1e-6
+    safe_length2 = np.where(moving, length2, 1.0)
+    length = np.sqrt(safe_length2)
+
+    dot = wx * ux + wy * uy + wz * uz
+    w2 = wx * wx + wy * wy + wz * wz
+
+    # Point le plus proche sur le segment (fraction bornée à [0, 1])
+    fraction = np.where(moving, np.clip(dot / safe_length2, 0.0, 1.0), 0.0)
+    closest2 = w2 - 2 * fraction * dot + fraction * fraction * length2
+    closest = np.maximum(np.sqrt(np.maximum(closest2, 0.0)), MIN_DISTANCE_M)
+    del fraction, closest2
+
+    # Niveau à dref corrigé de l'absorption au point le plus proche
+    level_ref = level - absorption * closest
+    lamax = level_ref - 20 * np.log10(closest / REFERENCE_DISTANCE_M)
+
+    # Géométrie de la droite porteuse pour l'intégrale d'exposition
+    s1 = -dot / length
+    perpendicular = np.maximum(np.sqrt(np.maximum(w2 - s1 * s1, 0.0)), MIN_DISTANCE_M)
+    angle = np.arctan((s1 + length) / perpendicular) - np.arctan(s1 / perpendicular)
+    del s1, dot, w2
+
+    reference2 = REFERENCE_DISTANCE_M ** 2
+    exposure_moving = reference2 * (duration / length) * angle / perpendicular
+    exposure_fixed = reference2 * duration / (closest * closest)
+    energy = 10 ** (level_ref / 10) * np.where(moving, exposure_moving, exposure_fixed)
+    return lamax, energy, closest
+
+
+def _chunk_levels(receptors: np.ndarray, seg: Dict[str, np.ndarray]):
+    """Bloc dense : tous les segments pour un bloc de récepteurs, réduit par vol"""
+    start = seg['start']
+    ux, uy, uz = (seg['end'] - start).T
+    lamax, energy, _ = _pair_levels(
+        receptors[:, 0:1] - start[:, 0], receptors[:, 1:2] - start[:, 1], receptors[:, 2:3] - start[:, 2],
+        ux, uy, uz, seg['level'], seg['absorption'], seg['duration'],
+    )
+    offsets = seg['offsets']
+    return np.maximum.reduceat(lamax, offsets, axis=1), np.add.reduceat(energy, offsets, axis=1)
+
+
+def _sparse_levels(receptors: np.ndarray, seg: Dict[str, np.ndarray], index, cutoff_m: float,
+                   n_flights: int):
+    """Couples à moins de cutoff_m seulement (index spatial), réduit par vol
+
+    Récepteurs sans segment audible d'un vol : LAmax -inf, énergie nulle.
+    """
+    receptor_idx, segment_idx = index.candidates(receptors, cutoff_m)
+    start = seg['start'][segment_idx]
+    u = seg['end'][segment_idx] - start
+    w = receptors[receptor_idx] - start
+    lamax, energy, closest = _pair_levels(
+        w[:, 0], w[:, 1], w[:, 2], u[:, 0], u[:, 1], u[:, 2],
+        seg['level'][segment_idx], seg['absorption'][segment_idx], seg['duration'][segment_idx],
+    )
+    # Filtre exact sur la distance oblique (les candidats viennent des emprises)
+    keep = closest <= cutoff_m
+    n_receptors = len(receptors)
+    key = receptor_idx[keep] * n_flights + seg['flight'][segment_idx[keep]]
+    chunk_lamax = np.full(n_receptors * n_flights, -np.inf)
+    np.maximum.at(chunk_lamax, key, lamax[keep])
+    chunk_energy = np.bincount(key, weights=energy[keep], minlength=n_receptors * n_flights)
+    return chunk_lamax.reshape(n_receptors, n_flights), chunk_energy.reshape(n_receptors, n_flights)
+
+
+def compute_receptor_noise(tracks: Iterable[FlightTrack], profiles: Mapping[str, AcousticProfile],
+                           points: np.ndarray, weather: Optional[Mapping[str, float]] = None,
+                           receptor_height: float = DEFAULT_RECEPTOR_HEIGHT_M,
+                           chunk_elements: int = DEFAULT_CHUNK_ELEMENTS,
+                           cutoff_m: Optional[float] = None):
+    """LAmax et SEL (dBA) de chaque vol en des récepteurs quelconques (N, 2)
+
+    Les segments de tous les vols sont traités ensemble ; seuls les récepteurs
+    sont découpés en blocs pour borner la mémoire (chunk_elements couples).
+    Avec cutoff_m, seuls les segments à moins de cutoff_m (distance oblique)
+    sont évalués via l'index spatial ; un vol sans segment audible donne NaN.
+    Retourne (flight_ids, lamax (n_vols, N), sel (n_vols, N)).
+    """
+    weather = {**DEFAULT_WEATHER, **(weather or {})}
+    flight_ids, seg = _stack_segments(tracks, profiles, float(weather['temperature']),
+                                      float(weather['humidite']))
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    n_points = len(points)
+    n_flights = len(flight_ids)
+    lamax = np.full((n_flights, n_points), np.nan, dtype=np.float32)
+    sel = np.full((n_flights, n_points), np.nan, dtype=np.float32)
+    if seg is None:
+        return flight_ids, lamax, sel
+
+    receptors = np.column_stack([points, np.full(n_points, receptor_height)])
+    n_segments = len(seg['duration'])
+    chunk = max(1, chunk_elements // n_segments)
+
+    index = TrackIndex(seg['start'], seg['end'], seg['flight'], flight_ids) if cutoff_m is not None else None
+
+    # Bloc borné au pire cas (tous les segments proches) dans les deux modes
+    for i in range(0, n_points, chunk):
+        block = receptors[i:i + chunk]
+        if index is None:
+            chunk_lamax, chunk_energy = _chunk_levels(block, seg)
+        else:
+            chunk_lamax, chunk_energy = _sparse_levels(block, seg, index, cutoff_m, n_flights)
+        with np.errstate(divide='ignore'):
+            lamax[:, i:i + chunk] = np.where(np.isinf(chunk_lamax), np.nan, chunk_lamax).T
+            sel[:, i:i + chunk] = np.where(chunk_energy > 0, 10 * np.log10(chunk_energy), np.nan).T
+    return flight_ids, lamax, sel
+
+
+def compute_flight_noise(tracks: Iterable[FlightTrack], profiles: Mapping[str, AcousticProfile],
+                         spec: GridSpec, weather: Optional[Mapping[str, float]] = None,
+                         receptor_height: float = DEFAULT_RECEPTOR_HEIGHT_M,
+                         chunk_elements: int = DEFAULT_CHUNK_ELEMENTS,
+                         cutoff_m: Optional[float] = None) -> FlightNoise:
+    """LAmax et SEL (dBA) de chaque vol sur tous les nœuds de la grille"""
+    tracks = list(tracks)
+    flight_ids, lamax, sel = compute_receptor_noise(tracks, profiles, spec.points(), weather,
+                                                    receptor_height, chunk_elements, cutoff_m)
+    n_segments = sum(track.n_segments for track in tracks)
+    logger.info(f"🔊 Bruit calculé : {len(flight_ids)} vols, {n_segments} segments, {spec.size:,} récepteurs")
+    shape = (len(flight_ids),) + spec.shape
+    return FlightNoise(spec, flight_ids, lamax.reshape(shape), sel.reshape(shape))
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache d'empreintes unitaires (type d'aéronef × procédure × piste) et scénarios par superposition
+Projet: Airport Air Quality Modeling
+
+Une empreinte unitaire est le LAmax / SEL d'un seul mouvement sur la grille,
+calculée une fois par le moteur (src/noise/engine.py) puis stockée en .npz
+compressé sous une clé de hachage de toutes ses entrées (grille, profil
+acoustique, procédure, piste, météo, hauteur des récepteurs, coupure).
+Changer l'une de ces entrées change la clé : une empreinte périmée n'est
+jamais relue.
+
+Les énergies s'additionnant, le Lden d'un scénario (répartition par piste,
+flotte, horaires) est une somme pondérée des empreintes par le nombre de
+mouvements de chaque période : relancer un scénario modifié ne coûte qu'un
+produit matriciel. Les empreintes alimentent aussi, à la demande,
+acoustique.empreinte_acoustique_calculee pour les vols réels.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import shapely
+
+from src.grids.spec import GridSpec, load_grid, save_grid
+from src.noise.accumulator import PERIODS, LdenAccumulator, period_of
+from src.noise.engine import (
+    DEFAULT_RECEPTOR_HEIGHT_M, DEFAULT_WEATHER, AcousticProfile, FlightTrack, absorption_coefficient,
+    compute_flight_noise,
+)
+from src.noise.track_index import TrackIndex
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_ROOT = Path(__file__).resolve().parents[2] / "data" / "noise" / "footprints"
+
+# À incrémenter quand les formules du moteur changent (invalide tout le cache)
+CACHE_VERSION = 1
+
+# Procédure par défaut selon le sens du mouvement (cf. FLIGHT_FOOTPRINTS_QUERY)
+OPERATION_PROCEDURES = {'depart': 'DEP_STD', 'arrivee': 'ARR_STD'}
+
+# Méthode enregistrée dans empreinte_acoustique_calculee (lignes remplacées en bloc)
+FOOTPRINT_METHOD = 'EMPREINTE_UNITAIRE'
+
+# Plage de niveau_bruit_dba acceptée par chk_niveau_realiste
+MIN_STORED_LEVEL_DB = 40.0
+MAX_STORED_LEVEL_DB = 140.0
+
+# Pistes en service de l'aéroport, extrémités en Lambert-93
+RUNWAYS_QUERY = """
+    SELECT p.designation,
+           ST_X(ST_Transform(p.coordonnees_debut, 2154)) AS x_debut,
+           ST_Y(ST_Transform(p.coordonnees_debut, 2154)) AS y_debut,
+           ST_X(ST_Transform(p.coordonnees_fin, 2154)) AS x_fin,
+           ST_Y(ST_Transform(p.coordonnees_fin, 2154)) AS y_fin
+    FROM airport.piste p
+    JOIN airport.aeroport a ON a.id_aeroport = p.id_aeroport
+    WHERE a.code_iata = %(airport)s AND p.statut_operationnel
+      AND p.coordonnees_debut IS NOT NULL AND p.coordonnees_fin IS NOT NULL
+"""
+
+# Mouvements d'une journée : type, piste, sens et horaire de référence
+FLIGHT_FOOTPRINTS_QUERY = """
+    SELECT v.id_vol::text AS id_vol, at.designation_icao, p.designation AS piste,
+           CASE WHEN v.id_aeroport_origine = p.id_aeroport THEN 'depart' ELSE 'arrivee' END AS operation,
+           CASE WHEN v.id_aeroport_origine = p.id_aeroport
+                THEN COALESCE(v.heure_decollage_reelle, v.heure_decollage_prevue)
+                ELSE COALESCE(v.heure_atterrissage_reelle, v.heure_atterrissage_prevue) END AS heure
+    FROM airport.vol v
+    JOIN airport.aeronef_type at ON v.id_type_aeronef = at.id_type_aeronef
+    JOIN airport.piste p ON p.id_piste = v.id_piste_utilisee
+    WHERE v.date_vol = %(date)s AND v.statut_vol <> 'Annulé'
+"""
+
+
+@dataclass(frozen=True)
+class Runway:
+    """Seuil de piste (Lambert-93) et cap de décollage / atterrissage (degrés, 0 = nord)"""
+
+    designation: str
+    x: float
+    y: float
+    heading_deg: float
+
+    def to_grid(self, along, lateral) -> Tuple[np.ndarray, np.ndarray]:
+        """Coordonnées depuis l'axe (distance après le seuil, décalage à droite)"""
+        heading = np.radians(self.heading_deg)
+        along, lateral = np.asarray(along, dtype=float), np.asarray(lateral, dtype=float)
+        x = self.x + along * np.sin(heading) + lateral * np.cos(heading)
+        y = self.y + along * np.cos(heading) - lateral * np.sin(heading)
+        return x, y
+
+
+@dataclass(frozen=True)
+class Procedure:
+    """Trajectoire type relative au seuil : n points horodatés, une phase par segment"""
+
+    name: str
+    along_m: Tuple[float, ...]
+    lateral_m: Tuple[float, ...]
+    altitude_m: Tuple[float, ...]
+    time_s: Tuple[float, ...]
+    phases: Tuple[str, ...]
+
+    @classmethod
+    def from_profile(cls, name: str, along, altitude, speed, phases: Sequence[str], lateral=None) -> "Procedure":
+        """Procédure à partir des distances, altitudes et vitesses (m/s) par segment"""
+        along = np.asarray(along, dtype=float)
+        lateral = np.zeros_like(along) if lateral is None else np.asarray(lateral, dtype=float)
+        time_s = np.concatenate([[0.0], np.cumsum(np.hypot(np.diff(along), np.diff(lateral)) / speed)])
+        return cls(name, tuple(along.tolist()), tuple(lateral.tolist()),
+                   tuple(np.asarray(altitude, dtype=float).tolist()), tuple(time_s.tolist()), tuple(phases))
+
+    def track(self, runway: Runway, aircraft: str, flight_id: Optional[str] = None) -> FlightTrack:
+        x, y = runway.to_grid(self.along_m, self.lateral_m)
+        return FlightTrack.from_points(flight_id or f"{aircraft}/{self.name}/{runway.designation}", aircraft,
+                                       x, y, self.altitude_m, self.time_s, self.phases)
+
+
+def departure_procedure(name: str = 'DEP_STD', roll_m: float = 1800.0, climb_gradient: float = 0.08,
+                        length_m: float = 15000.0, climb_speed: float = 80.0) -> Procedure:
+    """Départ dans l'axe : roulement au décollage puis montée à pente constante"""
+    roll = np.linspace(0, roll_m, 5)
+    climb = np.linspace(roll_m, length_m, 17)[1:]
+    along = np.concatenate([roll, climb])
+    altitude = np.maximum(0.0, along - roll_m) * climb_gradient
+    speed = np.concatenate([np.full(4, climb_speed / 2), np.full(16, climb_speed)])
+    return Procedure.from_profile(name, along, altitude, speed, ['Take-off'] * 4 + ['Climb-out'] * 16)
+
+
+def arrival_procedure(name: str = 'ARR_STD', glide_deg: float = 3.0, crossing_height_m: float = 15.0,
+                      length_m: float = 15000.0, roll_m: float = 1500.0, approach_speed: float = 70.0) -> Procedure:
+    """Arrivée dans l'axe : approche sur le plan de descente puis roulement à l'atterrissage"""
+    approach = np.linspace(-length_m, 0, 17)
+    roll = np.linspace(0, roll_m, 5)[1:]
+    along = np.concatenate([approach, roll])
+    altitude = np.concatenate([crossing_height_m - approach * np.tan(np.radians(glide_deg)), np.zeros(4)])
+    speed = np.concatenate([np.full(16, approach_speed), np.full(4, approach_speed / 3)])
+    return Procedure.from_profile(name, along, altitude, speed, ['Approach'] * 16 + ['Landing'] * 4)
+
+
+DEFAULT_PROCEDURES = {procedure.name: procedure for procedure in (departure_procedure(), arrival_procedure())}
+
+
+def runways_from_frame(frame) -> Dict[str, Runway]:
+    """Deux sens par piste (ex: 07L/25R) depuis le résultat de RUNWAYS_QUERY"""
+    runways = {}
+    for record in frame.to_dict('records'):
+        ends = str(record['designation']).split('/')
+        dx, dy = record['x_fin'] - record['x_debut'], record['y_fin'] - record['y_debut']
+        heading = float(np.degrees(np.arctan2(dx, dy)) % 360)
+        runways[ends[0]] = Runway(ends[0], float(record['x_debut']), float(record['y_debut']), heading)
+        if len(ends) > 1:
+            runways[ends[1]] = Runway(ends[1], float(record['x_fin']), float(record['y_fin']),
+                                      (heading + 180) % 360)
+    return runways
+
+
+@dataclass(frozen=True)
+class FootprintKey:
+    """Empreinte unitaire : un mouvement d'un type d'aéronef sur une procédure et une piste"""
+
+    aircraft: str
+    procedure: str
+    runway: str
+
+
+@dataclass(frozen=True)
+class Movement:
+    """Mouvements d'un scénario : count passages de key pendant une période (day, evening, night)"""
+
+    key: FootprintKey
+    period: str
+    count: float
+
+
+@dataclass
+class Footprint:
+    """Empreinte unitaire sur la grille, tableaux (N,) dans l'ordre de GridSpec.points()"""
+
+    key: FootprintKey
+    digest: str
+    lamax: np.ndarray
+    sel: np.ndarray
+    distance: np.ndarray
+
+    @property
+    def energy(self) -> np.ndarray:
+        """Énergie d'exposition (s) d'un mouvement, nulle hors empreinte"""
+        return np.nan_to_num(np.power(10.0, self.sel.astype(np.float64) / 10), nan=0.0)
+
+
+class FootprintCache:
+    """Empreintes unitaires calculées à la demande, en mémoire et sur disque (.npz)"""
+
+    def __init__(self, spec: GridSpec, profiles: Mapping[str, AcousticProfile],
+                 runways: Mapping[str, Runway], procedures: Optional[Mapping[str, Procedure]] = None,
+                 root=DEFAULT_CACHE_ROOT, weather: Optional[Mapping[str, float]] = None,
+                 receptor_height: float = DEFAULT_RECEPTOR_HEIGHT_M, cutoff_m: Optional[float] = None):
+        self.spec = spec
+        self.profiles = profiles
+        self.runways = runways
+        self.procedures = dict(DEFAULT_PROCEDURES if procedures is None else procedures)
+        self.root = Path(root) / spec.key()
+        self.weather = {k: float(v) for k, v in {**DEFAULT_WEATHER, **(weather or {})}.items()}
+        self.receptor_height = float(receptor_height)
+        self.cutoff_m = cutoff_m
+        self._memory: Dict[str, Footprint] = {}
+        self._energy: Dict[str, np.ndarray] = {}
+        self.hits = self.loads = self.computed = 0
+
+    def profile(self, aircraft: str) -> AcousticProfile:
+        profile = self.profiles.get(aircraft)
+        if profile is None:
+            logger.warning(f"⚠️ Profil acoustique absent pour {aircraft}, valeurs par défaut")
+            profile = AcousticProfile()
+        return profile
+
+    def track(self, key: FootprintKey, flight_id: Optional[str] = None) -> FlightTrack:
+        if key.procedure not in self.procedures:
+            raise KeyError(f"Procédure inconnue: {key.procedure}")
+        if key.runway not in self.runways:
+            raise KeyError(f"Piste inconnue: {key.runway}")
+        return self.procedures[key.procedure].track(self.runways[key.runway], key.aircraft, flight_id)
+
+    def digest(self, key: FootprintKey) -> str:
+        """Hachage de toutes les entrées du calcul (clé de fichier)"""
+        payload = json.dumps({
+            'version': CACHE_VERSION,
+            'grid': self.spec.to_dict(),
+            'aircraft': key.aircraft,
+            'profile': asdict(self.profile(key.aircraft)),
+            'procedure': asdict(self.procedures[key.procedure]),
+            'runway': asdict(self.runways[key.runway]),
+            'weather': self.weather,
+            'receptor_height': self.receptor_height,
+            'cutoff_m': self.cutoff_m,
+        }, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()[:24]
+
+    def path(self, digest: str) -> Path:
+        return self.root / f"{digest}.npz"
+
+    def get(self, key: FootprintKey) -> Footprint:
+        return self.get_many([key])[key]
+
+    def get_many(self, keys: Iterable[FootprintKey]) -> Dict[FootprintKey, Footprint]:
+        """Empreintes des clés demandées : mémoire, puis disque, puis un seul appel au moteur"""
+        result, missing = {}, {}
+        for key in dict.fromkeys(keys):
+            digest = self.digest(key)
+            if digest in self._memory:
+                self.hits += 1
+                result[key] = self._memory[digest]
+            elif self.path(digest).exists():
+                self.loads += 1
+                result[key] = self._remember(self._load(key, digest))
+            else:
+                missing[key] = digest
+        if missing:
+            for footprint in self._compute(missing):
+                result[footprint.key] = self._remember(footprint)
+        return result
+
+    def energy(self, keys: Sequence[FootprintKey]) -> np.ndarray:
+        """Énergies unitaires empilées (len(keys), N) en float64"""
+        footprints = self.get_many(keys)
+        rows = []
+        for key in keys:
+            digest = footprints[key].digest
+            if digest not in self._energy:
+                self._energy[digest] = footprints[key].energy
+            rows.append(self._energy[digest])
+        return np.stack(rows) if rows else np.empty((0, self.spec.size))
+
+    def _remember(self, footprint: Footprint) -> Footprint:
+        self._memory[footprint.digest] = footprint
+        return footprint
+
+    def _load(self, key: FootprintKey, digest: str) -> Footprint:
+        spec, arrays = load_grid(self.path(digest))
+        if spec != self.spec:
+            raise ValueError(f"Empreinte {digest} calculée sur une autre grille")
+        return Footprint(key, digest, arrays['lamax'].ravel(), arrays['sel'].ravel(), arrays['distance'].ravel())
+
+    def _compute(self, missing: Mapping[FootprintKey, str]) -> List[Footprint]:
+        tracks = [self.track(key, digest) for key, digest in missing.items()]
+        profiles = {key.aircraft: self.profile(key.aircraft) for key in missing}
+        noise = compute_flight_noise(tracks, profiles, self.spec, self.weather, self.receptor_height,
+                                     cutoff_m=self.cutoff_m)
+        points = self.spec.points()
+        self.root.mkdir(parents=True, exist_ok=True)
+        footprints = []
+        for (key, digest), track in zip(missing.items(), tracks):
+            lamax, sel = noise.for_flight(digest)
+            footprint = Footprint(key, digest, lamax.ravel(), sel.ravel(), self._distance(track, points))
+            tmp = self.path(digest).with_name(f"{digest}.tmp.npz")
+            save_grid(tmp, self.spec, lamax=lamax, sel=sel, distance=footprint.distance.reshape(self.spec.shape),
+                      _footprint=json.dumps(asdict(key)))
+            os.replace(tmp, self.path(digest))
+            footprints.append(footprint)
+        self.computed += len(footprints)
+        logger.info(f"🧮 {len(footprints)} empreintes unitaires calculées ({self.root})")
+        return footprints
+
+    def _distance(self, track: FlightTrack, points: np.ndarray) -> np.ndarray:
+        """Distance oblique minimale récepteur-trajectoire (m)"""
+        corners = np.vstack([track.start, track.end, np.column_stack([points, np.zeros(len(points))])])
+        reach = float(np.linalg.norm(np.ptp(corners, axis=0))) + self.receptor_height + 1.0
+        index = TrackIndex.from_tracks([track])
+        _, distance = index.nearest(points, self.cutoff_m or reach, self.receptor_height)
+        return distance.astype(np.float32)
+
+    def stats(self) -> Dict[str, int]:
+        return {'memory_hits': self.hits, 'disk_loads': self.loads, 'computed': self.computed}
+
+
+def scenario_accumulator(cache: FootprintCache, movements: Sequence[Movement]) -> LdenAccumulator:
+    """Énergies par période d'un scénario : somme des empreintes pondérée par les mouvements"""
+    unknown = {m.period for m in movements} - set(PERIODS)
+    if unknown:
+        raise ValueError(f"Périodes inconnues: {sorted(unknown)}")
+    accumulator = LdenAccumulator(cache.spec)
+    for period in PERIODS:
+        selected = [m for m in movements if m.period == period and m.count]
+        if not selected:
+            continue
+        counts = np.array([m.count for m in selected], dtype=np.float64)
+        energy = counts @ cache.energy([m.key for m in selected])
+        accumulator.add_energy(energy, period, int(round(counts.sum())))
+    return accumulator
+
+
+def scenario_levels(cache: FootprintCache, movements: Sequence[Movement], n_days: int = 1) -> Dict[str, np.ndarray]:
+    """Lden / Lnight (ny, nx) d'un scénario dont les mouvements couvrent n_days jours"""
+    accumulator = scenario_accumulator(cache, movements)
+    return {'lden': accumulator.lden(n_days), 'lnight': accumulator.lnight(n_days)}
+
+
+def flight_keys(frame) -> Dict[str, Tuple[FootprintKey, str]]:
+    """Clé d'empreinte et période par vol depuis FLIGHT_FOOTPRINTS_QUERY
+
+    Le sens d'utilisation de la piste n'est pas enregistré : premier QFU de la
+    désignation (07L pour 07L/25R).
+    """
+    flights = {}
+    for record in frame.to_dict('records'):
+        key = FootprintKey(record['designation_icao'], OPERATION_PROCEDURES[record['operation']],
+                           str(record['piste']).split('/')[0])
+        period = period_of(record['heure']) if record['heure'] is not None else 'day'
+        flights[record['id_vol']] = (key, period)
+    return flights
+
+
+def movements_from_flights(flights: Mapping[str, Tuple[FootprintKey, str]]) -> List[Movement]:
+    """Mouvements agrégés (clé, période) d'un ensemble de vols, base d'un scénario"""
+    counts: Dict[Tuple[FootprintKey, str], int] = {}
+    for key, period in flights.values():
+        counts[(key, period)] = counts.get((key, period), 0) + 1
+    return [Movement(key, period, count) for (key, period), count in counts.items()]
+
+
+def store_flight_footprints(conn, cache: FootprintCache, flights: Mapping[str, FootprintKey],
+                            min_level_db: float = MIN_STORED_LEVEL_DB, replace: bool = False) -> int:
+    """Alimenter empreinte_acoustique_calculee pour des vols depuis leurs empreintes unitaires
+
+    Seuls les vols sans lignes FOOTPRINT_METHOD sont écrits (replace=True :
+    tous), pour les nœuds où LAmax >= min_level_db. Chargement par COPY.
+    """
+    import pandas as pd
+    from pyproj import Transformer
+
+    flight_ids = list(flights)
+    with conn.cursor() as cur:
+        if replace:
+            cur.execute("DELETE FROM acoustique.empreinte_acoustique_calculee "
+                        "WHERE methode_calcul = %s AND id_vol = ANY(%s::uuid[])", (FOOTPRINT_METHOD, flight_ids))
+        else:
+            cur.execute("SELECT DISTINCT id_vol::text FROM acoustique.empreinte_acoustique_calculee "
+                        "WHERE methode_calcul = %s AND id_vol = ANY(%s::uuid[])", (FOOTPRINT_METHOD, flight_ids))
+            stored = {row[0] for row in cur.fetchall()}
+            flight_ids = [flight_id for flight_id in flight_ids if flight_id not in stored]
+    if not flight_ids:
+        conn.commit()
+        return 0
+
+    footprints = cache.get_many(flights[flight_id] for flight_id in flight_ids)
+    transformer = Transformer.from_crs(cache.spec.crs, "EPSG:4326", always_xy=True)
+    lon, lat = transformer.transform(*cache.spec.points().T)
+    geometry = shapely.to_wkb(shapely.set_srid(shapely.points(lon, lat), 4326), hex=True, include_srid=True)
+    temperature, humidity = cache.weather['temperature'], cache.weather['humidite']
+
+    buffer = io.StringIO()
+    rows = 0
+    for flight_id in flight_ids:
+        key = flights[flight_id]
+        footprint = footprints[key]
+        audible = np.nonzero(footprint.lamax >= min_level_db)[0]
+        distance = np.maximum(footprint.distance[audible].astype(np.float64), 0.01)
+        absorption = absorption_coefficient(cache.profile(key.aircraft).frequence_dominante_hz,
+                                            temperature, humidity) * distance / 1000
+        pd.DataFrame({
+            'id_vol': flight_id,
+            'point_calcul': geometry[audible],
+            'distance_source_m': distance.round(2),
+            'niveau_bruit_dba': np.minimum(footprint.lamax[audible], MAX_STORED_LEVEL_DB).round(2),
+            'sel_db': footprint.sel[audible].round(2),
+            'temperature_calcul_c': temperature,
+            'humidite_calcul_percent': int(round(humidity)),
+            'absorption_atmospherique_db': np.minimum(absorption, 99.99).round(2),
+            'methode_calcul': FOOTPRINT_METHOD,
+        }).to_csv(buffer, header=False, index=False)
+        rows += len(audible)
+    buffer.seek(0)
+
+    with conn.cursor() as cur:
+        cur.copy_expert(
+            """
+            COPY acoustique.empreinte_acoustique_calculee (
+                id_vol, point_calcul, distance_source_m, niveau_bruit_dba, sel_db, temperature_calcul_c,
+                humidite_calcul_percent, absorption_atmospherique_db, methode_calcul
+            ) FROM STDIN WITH (FORMAT csv)
+            """,
+            buffer,
+        )
+    conn.commit()
+    logger.info(f"✅ {rows:,} points d'empreinte chargés pour {len(flight_ids)} vols")
+    return rows
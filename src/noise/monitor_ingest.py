@@ -0,0 +1,503 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ingestion des données des stations de mesure du bruit (LAeq 1 s)
+Projet: Airport Air Quality Modeling
+
+Fichiers CSV ou NDJSON, une ligne par échantillon :
+    code_station, timestamp (ISO 8601 ou secondes epoch, heure locale), laeq_dba
+
+1. Lecture par blocs (CHUNK_ROWS lignes, pyarrow ou pandas), échantillons
+   ramenés à des tableaux (station, seconde, niveau) ; doublons : le dernier
+   reçu l'emporte.
+2. Détection vectorisée des événements : échantillons au-dessus du seuil de
+   déclenchement de la station, plages contiguës fusionnées si séparées d'au
+   plus MAX_GAP_S, durée minimale MIN_EVENT_DURATION_S ; LAmax, SEL et LAeq
+   par réduction segmentée (np.*.reduceat), sans boucle par événement.
+3. Série brute : une ligne par station et par heure, 3600 niveaux en
+   centièmes de dB (SMALLINT[], NULL si absent) dans
+   acoustique.serie_bruit_horaire (migration V008).
+4. Écriture par COPY : événements dans acoustique.mesure_bruit (remplacement
+   des événements de même source sur la plage traitée, relance sans doublon),
+   heures brutes fusionnées avec les heures partielles déjà stockées.
+
+Flux continu : seules les heures révolues sont finalisées à chaque bloc ; un
+événement encore en cours à la coupure est reporté au bloc suivant avec ses
+échantillons.
+"""
+
+import io
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Période d'intégration des stations (s) ; une série horaire = HOUR_S échantillons
+SAMPLE_PERIOD_S = 1
+HOUR_S = 3600
+
+# Seuil de déclenchement si la station n'en définit pas (dB(A))
+DEFAULT_THRESHOLD_DBA = 55.0
+
+# Durée minimale d'un événement et creux sous le seuil toléré à l'intérieur (s)
+MIN_EVENT_DURATION_S = 10
+MAX_GAP_S = 2
+
+# Au-delà, dépassement continu du seuil (bruit de fond élevé) plutôt qu'un événement (s)
+MAX_EVENT_DURATION_S = 600
+
+# Lignes lues par bloc (taille approximative d'une ligne CSV pour pyarrow, octets)
+CHUNK_ROWS = 1_000_000
+CSV_ROW_BYTES = 32
+
+# Fuseau des horodatages avec décalage (les colonnes TIMESTAMP sont en heure locale)
+LOCAL_TIMEZONE = 'Europe/Paris'
+
+# Valeur de source_donnees des événements détectés par l'ingestion
+SOURCE_DONNEES = 'MONITEUR_1S'
+
+COLUMNS = ['code_station', 'timestamp', 'laeq_dba']
+NDJSON_SUFFIXES = ('.ndjson', '.jsonl', '.json')
+
+STATIONS_QUERY = """
+    SELECT id_station_bruit::text AS id_station_bruit, code_station,
+           COALESCE(seuil_declenchement_dba, %(default)s)::float8 AS seuil_dba
+    FROM acoustique.station_mesure_bruit
+    WHERE statut_operationnel
+"""
+
+NO_TIME = np.iinfo(np.int64).min
+END_OF_TIME = np.iinfo(np.int64).max
+
+
+def _epoch_seconds(values: pd.Series) -> np.ndarray:
+    """Horodatages (ISO 8601 ou secondes epoch) en secondes epoch locales"""
+    if pd.api.types.is_numeric_dtype(values):
+        return np.floor(values.to_numpy(dtype=np.float64)).astype(np.int64)
+    stamps = pd.to_datetime(values, format='ISO8601')
+    if stamps.dt.tz is not None:
+        stamps = stamps.dt.tz_convert(LOCAL_TIMEZONE).dt.tz_localize(None)
+    return stamps.to_numpy().astype('datetime64[s]').view(np.int64)
+
+
+def _arrow_batches(path: Path, chunk_rows: int) -> Iterator:
+    """Blocs pyarrow (RecordBatch) d'un fichier CSV (en flux) ou NDJSON"""
+    import pyarrow as pa
+    from pyarrow import csv, json
+
+    types = {'code_station': pa.string(), 'laeq_dba': pa.float64()}
+    if path.suffix.lower() in NDJSON_SUFFIXES:
+        table = json.read_json(path, read_options=json.ReadOptions(use_threads=False),
+                               parse_options=json.ParseOptions(explicit_schema=pa.schema(types)))
+        yield from table.select(COLUMNS).to_batches(chunk_rows)
+        return
+    yield from csv.open_csv(
+        path,
+        read_options=csv.ReadOptions(block_size=chunk_rows * CSV_ROW_BYTES, use_threads=False),
+        convert_options=csv.ConvertOptions(include_columns=COLUMNS, column_types=types),
+    )
+
+
+def _frame_from_arrow(batch) -> pd.DataFrame:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    codes = pc.dictionary_encode(batch.column('code_station'))
+    stamps = batch.column('timestamp')
+    if pa.types.is_string(stamps.type):
+        try:
+            stamps = stamps.cast(pa.timestamp('s'))
+        except pa.ArrowInvalid:  # décalage horaire explicite
+            pass
+    if pa.types.is_timestamp(stamps.type) and stamps.type.tz is None:
+        t = stamps.cast(pa.timestamp('s')).cast(pa.int64()).to_numpy()
+    else:
+        t = _epoch_seconds(stamps.to_pandas())
+    return pd.DataFrame({
+        'code_station': pd.Categorical.from_codes(codes.indices.fill_null(-1).to_numpy(),
+                                                  codes.dictionary.to_pylist()),
+        't': t,
+        'laeq_dba': batch.column('laeq_dba').to_numpy(zero_copy_only=False),
+    })
+
+
+def read_monitor_file(path: Union[str, Path], chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Blocs (code_station, t en secondes epoch, laeq_dba) d'un fichier CSV ou NDJSON
+
+    Lecture par pyarrow s'il est installé (CSV en flux, débit environ
+    triple), sinon par pandas.
+    """
+    path = Path(path)
+    try:
+        batches = _arrow_batches(path, chunk_rows)
+        first = next(batches, None)
+    except ImportError:
+        logger.warning("⚠️ pyarrow non installé : lecture par pandas")
+    else:
+        if first is not None:
+            yield _frame_from_arrow(first)
+            for batch in batches:
+                yield _frame_from_arrow(batch)
+        return
+
+    if path.suffix.lower() in NDJSON_SUFFIXES:
+        reader = pd.read_json(path, lines=True, chunksize=chunk_rows, dtype={'code_station': str})
+    else:
+        reader = pd.read_csv(path, usecols=COLUMNS, chunksize=chunk_rows, engine='c',
+                             dtype={'code_station': 'category', 'laeq_dba': np.float64})
+    for chunk in reader:
+        yield pd.DataFrame({
+            'code_station': chunk['code_station'].astype('category'),
+            't': _epoch_seconds(chunk['timestamp']),
+            'laeq_dba': pd.to_numeric(chunk['laeq_dba'], errors='coerce').to_numpy(dtype=np.float64),
+        })
+
+
+def _segment_reduce(ufunc, values: np.ndarray, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """Réduction de values[start:end + 1] pour chaque segment (bornes incluses)"""
+    if len(start) == 0:
+        return np.empty(0, dtype=values.dtype)
+    bounds = np.empty(2 * len(start), dtype=np.int64)
+    bounds[0::2] = start
+    bounds[1::2] = end + 1
+    padded = np.append(values, values[:1])
+    return ufunc.reduceat(padded, bounds)[0::2]
+
+
+def detect_events(station: np.ndarray, t: np.ndarray, level: np.ndarray, threshold: np.ndarray,
+                  max_gap_s: int = MAX_GAP_S) -> Dict[str, np.ndarray]:
+    """Événements sonores d'échantillons triés par (station, t)
+
+    Retourne les indices de début et de fin (inclus) des plages au-dessus du
+    seuil après fusion, avec durée, LAmax, SEL et LAeq. Les creux fusionnés
+    comptent dans l'énergie de l'événement ; un échantillon manquant coupe
+    l'événement. Les durées limites ne sont pas appliquées (cf. MonitorIngester).
+    """
+    above = level >= threshold
+    contiguous = np.zeros(len(t), dtype=bool)
+    contiguous[1:] = (station[1:] == station[:-1]) & (np.diff(t) == SAMPLE_PERIOD_S)
+    previous_above = np.zeros(len(t), dtype=bool)
+    previous_above[1:] = above[:-1]
+    next_above = np.zeros(len(t), dtype=bool)
+    next_above[:-1] = above[1:] & contiguous[1:]
+
+    start = np.flatnonzero(above & ~(previous_above & contiguous))
+    end = np.flatnonzero(above & ~next_above)
+
+    # Fusion des plages séparées d'un creux court sans échantillon manquant
+    if len(start) > 1:
+        gap_index = start[1:] - end[:-1]
+        gap_time = t[start[1:]] - t[end[:-1]]
+        merge = ((station[start[1:]] == station[end[:-1]]) & (gap_time == gap_index * SAMPLE_PERIOD_S)
+                 & (gap_time - SAMPLE_PERIOD_S <= max_gap_s))
+        start = start[np.concatenate([[True], ~merge])]
+        end = end[np.concatenate([~merge, [True]])]
+
+    energy = np.power(10.0, level / 10.0) * SAMPLE_PERIOD_S
+    duration = (t[end] - t[start] + SAMPLE_PERIOD_S).astype(np.float64)
+    sel = 10.0 * np.log10(_segment_reduce(np.add, energy, start, end))
+    return {
+        'start': start,
+        'end': end,
+        'duree_s': duration,
+        'lamax_dba': _segment_reduce(np.maximum, level, start, end),
+        'sel_dba': sel,
+        'laeq_dba': sel - 10.0 * np.log10(duration),
+    }
+
+
+def hourly_series(station: np.ndarray, t: np.ndarray, level: np.ndarray):
+    """Heures (station, début d'heure) et matrice des niveaux en centièmes de dB
+
+    Échantillons triés par (station, t). Retourne (station, heure, niveaux
+    int16 (n, HOUR_S), masque des échantillons présents).
+    """
+    hour = t - np.mod(t, HOUR_S)
+    change = np.ones(len(t), dtype=bool)
+    change[1:] = (station[1:] != station[:-1]) | (hour[1:] != hour[:-1])
+    first = np.flatnonzero(change)
+    row = np.cumsum(change) - 1
+    column = (t - hour) // SAMPLE_PERIOD_S
+    levels = np.zeros((len(first), HOUR_S // SAMPLE_PERIOD_S), dtype=np.int16)
+    present = np.zeros(levels.shape, dtype=bool)
+    levels[row, column] = np.round(level * 100.0).astype(np.int16)
+    present[row, column] = True
+    return station[first], hour[first], levels, present
+
+
+# Texte de chaque valeur SMALLINT possible, 'NULL' en dernière position
+_SMALLINT_TEXT = np.array([str(value) for value in range(-2**15, 2**15)] + ['NULL'], dtype=object)
+
+
+def array_literals(levels: np.ndarray, present: np.ndarray) -> list:
+    """Littéraux SMALLINT[] ('{5512,NULL,...}') des lignes de la matrice"""
+    index = np.where(present, levels.astype(np.int32) + 2**15, 2**16)
+    return ['{' + ','.join(row) + '}' for row in _SMALLINT_TEXT[index].tolist()]
+
+
+@dataclass
+class IngestBatch:
+    """Résultat finalisé d'un bloc : événements, heures brutes et plages remplacées"""
+
+    events: pd.DataFrame
+    series: pd.DataFrame
+    spans: pd.DataFrame
+
+    @property
+    def empty(self) -> bool:
+        return self.events.empty and self.series.empty and self.spans.empty
+
+
+@dataclass
+class IngestStats:
+    """Compteurs d'une ingestion (échantillons, rejets, événements, heures)"""
+
+    samples: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    unknown: Dict[str, int] = field(default_factory=dict)
+    events: int = 0
+    background: int = 0
+    hours: int = 0
+
+
+class MonitorIngester:
+    """Détection d'événements et séries horaires sur un flux de blocs d'échantillons
+
+    L'état conservé entre deux blocs se limite, par station, aux échantillons
+    de l'heure en cours (et d'un éventuel événement non terminé) et aux bornes
+    déjà finalisées.
+    """
+
+    def __init__(self, stations: pd.DataFrame, min_duration_s: int = MIN_EVENT_DURATION_S,
+                 max_gap_s: int = MAX_GAP_S):
+        self.stations = stations.reset_index(drop=True)
+        self.codes = pd.Index(self.stations['code_station'].astype(str))
+        if not self.codes.is_unique:
+            raise ValueError("Codes de station en double : préciser l'aéroport")
+        self.threshold = self.stations['seuil_dba'].to_numpy(dtype=np.float64)
+        self.min_duration_s = min_duration_s
+        self.max_gap_s = max_gap_s
+        n = len(self.stations)
+        self.series_done = np.full(n, NO_TIME, dtype=np.int64)
+        self.events_done = np.full(n, NO_TIME, dtype=np.int64)
+        self.pending = (np.empty(0, np.int32), np.empty(0, np.int64), np.empty(0, np.float64))
+        self.stats = IngestStats()
+
+    def feed(self, frame: pd.DataFrame) -> IngestBatch:
+        """Ajouter un bloc ; retourne les heures révolues et événements terminés"""
+        # Quelques codes distincts par bloc : correspondance sur les catégories
+        codes = pd.Categorical(frame['code_station'])
+        station = np.append(self.codes.get_indexer(codes.categories.astype(str)), -1)[codes.codes]
+        level = frame['laeq_dba'].to_numpy(dtype=np.float64)
+        unknown = station < 0
+        if unknown.any():
+            for code, n in frame.loc[unknown, 'code_station'].astype(str).value_counts().items():
+                self.stats.unknown[code] = self.stats.unknown.get(code, 0) + int(n)
+        valid = ~unknown & np.isfinite(level)
+        self.stats.invalid += int((~unknown & ~valid).sum())
+        self.stats.samples += int(valid.sum())
+
+        pending_station, pending_t, pending_level = self.pending
+        self.pending = (np.concatenate([pending_station, station[valid].astype(np.int32)]),
+                        np.concatenate([pending_t, frame['t'].to_numpy(dtype=np.int64)[valid]]),
+                        np.concatenate([pending_level, level[valid]]))
+        return self._finalize(flush=False)
+
+    def flush(self) -> IngestBatch:
+        """Finaliser tout ce qui reste (fin de fichier)"""
+        return self._finalize(flush=True)
+
+    def _finalize(self, flush: bool) -> IngestBatch:
+        station, t, level = self.pending
+        order = np.lexsort((t, station))
+        station, t, level = station[order], t[order], level[order]
+        last = np.ones(len(t), dtype=bool)
+        last[:-1] = (station[1:] != station[:-1]) | (t[1:] != t[:-1])
+        self.stats.duplicates += int((~last).sum())
+        station, t, level = station[last], t[last], level[last]
+        if len(t) == 0:
+            return self._batch({}, np.empty(0, np.int64), station, t, station, t, level, None)
+
+        # Coupure par station : début de l'heure du dernier échantillon reçu
+        present = np.unique(station)
+        group_end = np.searchsorted(station, present, side='right') - 1
+        group_start = np.searchsorted(station, present, side='left')
+        if flush:
+            cut = t[group_end] + SAMPLE_PERIOD_S
+        else:
+            cut = t[group_end] - np.mod(t[group_end], HOUR_S)
+        cut_of = np.full(len(self.stations), END_OF_TIME, dtype=np.int64)
+        cut_of[present] = cut
+        first_seen = self.events_done[present] == NO_TIME
+        self.events_done[present[first_seen]] = t[group_start[first_seen]]
+
+        final = t < cut_of[station]
+        events = detect_events(station[final], t[final], level[final], self.threshold[station[final]],
+                               self.max_gap_s)
+        final_station, final_t = station[final], t[final]
+        event_station = final_station[events['start']]
+        event_start = final_t[events['start']]
+        event_end = final_t[events['end']]
+
+        # Événement pouvant se prolonger après la coupure : reporté au bloc suivant
+        open_ = event_end + SAMPLE_PERIOD_S + self.max_gap_s >= cut_of[event_station]
+        if flush:
+            open_[:] = False
+        span_start = self.events_done[present].copy()
+        done = cut.copy()
+        if open_.any():
+            first_open = pd.Series(event_start[open_]).groupby(event_station[open_]).min()
+            done_of = cut_of.copy()
+            done_of[first_open.index.to_numpy()] = first_open.to_numpy()
+            done = done_of[present]
+        emitted = ~open_ & (event_start >= self.events_done[event_station])
+        keep_event = emitted & (events['duree_s'] >= self.min_duration_s)
+        self.stats.background += int((keep_event & (events['duree_s'] > MAX_EVENT_DURATION_S)).sum())
+        keep_event &= events['duree_s'] <= MAX_EVENT_DURATION_S
+
+        series = final & (t >= self.series_done[station])
+        spans = (present, span_start, done)
+        batch = self._batch(events, np.flatnonzero(keep_event), final_station, final_t,
+                            station[series], t[series], level[series], spans)
+
+        # État conservé : échantillons postérieurs à la dernière borne finalisée
+        self.events_done[present] = done
+        self.series_done[present] = cut
+        keep_from = np.full(len(self.stations), END_OF_TIME, dtype=np.int64)
+        keep_from[present] = np.minimum(done, cut)
+        keep = t >= keep_from[station]
+        self.pending = (station[keep], t[keep], level[keep])
+        return batch
+
+    def _batch(self, events: dict, selected: np.ndarray, event_station: np.ndarray, event_t: np.ndarray,
+               series_station: np.ndarray, series_t: np.ndarray, series_level: np.ndarray,
+               spans: Optional[tuple]) -> IngestBatch:
+        """Tables des événements retenus, heures brutes et plages d'événements remplacées"""
+        ids = self.stations['id_station_bruit'].to_numpy()
+        start = events['start'][selected] if len(selected) else np.empty(0, np.int64)
+        frame = pd.DataFrame({
+            'id_station_bruit': ids[event_station[start]],
+            'timestamp_mesure': event_t[start].astype('datetime64[s]'),
+            **{name: events[name][selected] if len(selected) else np.empty(0)
+               for name in ('duree_s', 'lamax_dba', 'laeq_dba', 'sel_dba')},
+        })
+
+        hour_station, hour, levels, present = hourly_series(series_station, series_t, series_level)
+        series = pd.DataFrame({
+            'id_station_bruit': ids[hour_station],
+            'heure': hour.astype('datetime64[s]'),
+            'niveaux_cdb': array_literals(levels, present),
+        })
+
+        span_station, span_start, span_end = spans or (np.empty(0, np.int64),) * 3
+        span_frame = pd.DataFrame({
+            'id_station_bruit': ids[span_station],
+            'debut': np.asarray(span_start, dtype=np.int64).astype('datetime64[s]'),
+            'fin': np.asarray(span_end, dtype=np.int64).astype('datetime64[s]'),
+        })
+        span_frame = span_frame[span_frame['fin'] > span_frame['debut']].reset_index(drop=True)
+
+        self.stats.events += len(frame)
+        self.stats.hours += len(series)
+        return IngestBatch(frame, series, span_frame)
+
+
+def load_stations(conn, airport: Optional[str] = None) -> pd.DataFrame:
+    """Stations en service (identifiant, code, seuil de déclenchement)"""
+    query = STATIONS_QUERY
+    params = {'default': DEFAULT_THRESHOLD_DBA}
+    if airport:
+        query += " AND id_aeroport = (SELECT id_aeroport FROM airport.aeroport WHERE code_iata = %(airport)s)"
+        params['airport'] = airport
+    return pd.read_sql_query(query, conn, params=params)
+
+
+def _copy_csv(cur, frame: pd.DataFrame, target: str) -> None:
+    buffer = io.StringIO()
+    frame.to_csv(buffer, index=False, header=False, na_rep='', date_format='%Y-%m-%d %H:%M:%S')
+    buffer.seek(0)
+    cur.copy_expert(f"COPY {target} FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def write_batch(conn, batch: IngestBatch) -> None:
+    """Écrire un bloc finalisé en une transaction
+
+    Partitions mensuelles créées au besoin (migration V007), événements de même
+    source remplacés sur les plages traitées puis chargés par COPY (triggers
+    des indicateurs journaliers, V006), heures brutes fusionnées avec les
+    heures partielles existantes.
+    """
+    if batch.empty:
+        return
+    bounds = pd.concat([batch.spans['debut'], batch.spans['fin'], batch.series['heure']])
+    events = batch.events.copy()
+    for column in ('duree_s', 'lamax_dba', 'laeq_dba'):
+        events[column] = events[column].round(2)
+    events['type_evenement'] = 'Indéterminé'
+    events['source_donnees'] = SOURCE_DONNEES
+
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT public.creer_partitions_mensuelles(t::regclass, %s, %s)
+            FROM unnest(ARRAY['acoustique.mesure_bruit', 'acoustique.serie_bruit_horaire']) AS t
+        """, (bounds.min().date(), bounds.max().date()))
+
+        cur.execute("""
+            CREATE TEMP TABLE ingestion_plage (
+                id_station_bruit UUID, debut TIMESTAMP, fin TIMESTAMP
+            ) ON COMMIT DROP
+        """)
+        _copy_csv(cur, batch.spans, 'ingestion_plage')
+        cur.execute("""
+            DELETE FROM acoustique.mesure_bruit mb
+            USING ingestion_plage p
+            WHERE mb.id_station_bruit = p.id_station_bruit
+              AND mb.timestamp_mesure >= p.debut AND mb.timestamp_mesure < p.fin
+              AND mb.source_donnees = %s
+        """, (SOURCE_DONNEES,))
+        replaced = cur.rowcount
+        _copy_csv(cur, events[['id_station_bruit', 'timestamp_mesure', 'duree_s', 'lamax_dba', 'laeq_dba',
+                               'type_evenement', 'source_donnees']],
+                  'acoustique.mesure_bruit (id_station_bruit, timestamp_mesure, duree_evenement_s, lamax_dba, '
+                  'laeq_dba, type_evenement, source_donnees)')
+
+        cur.execute("""
+            CREATE TEMP TABLE ingestion_serie (
+                id_station_bruit UUID, heure TIMESTAMP, niveaux_cdb SMALLINT[]
+            ) ON COMMIT DROP
+        """)
+        _copy_csv(cur, batch.series, 'ingestion_serie')
+        cur.execute("""
+            INSERT INTO acoustique.serie_bruit_horaire AS s (id_station_bruit, heure, niveaux_cdb)
+            SELECT id_station_bruit, heure, niveaux_cdb FROM ingestion_serie
+            ON CONFLICT (id_station_bruit, heure) DO UPDATE
+            SET niveaux_cdb = acoustique.fusionner_niveaux(s.niveaux_cdb, EXCLUDED.niveaux_cdb),
+                date_maj = CURRENT_TIMESTAMP
+        """)
+    conn.commit()
+    logger.info(f"💾 {len(batch.events):,} événements ({replaced:,} remplacés), "
+                f"{len(batch.series):,} heures brutes")
+
+
+def ingest_file(conn, path: Union[str, Path], ingester: MonitorIngester, chunk_rows: int = CHUNK_ROWS,
+                write: bool = True, flush: bool = True) -> IngestStats:
+    """Ingérer un fichier de station(s) ; conn peut être None si write=False
+
+    flush=False garde l'heure en cours et un événement non terminé pour le
+    fichier suivant (fichiers successifs d'un même flux).
+    """
+    batches = (ingester.feed(chunk) for chunk in read_monitor_file(path, chunk_rows))
+    for batch in batches:
+        if write:
+            write_batch(conn, batch)
+    if flush:
+        batch = ingester.flush()
+        if write:
+            write_batch(conn, batch)
+    return ingester.stats
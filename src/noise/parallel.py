@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Calcul Lden parallèle : tuiles de grille réparties sur un pool de processus
+Projet: Airport Air Quality Modeling
+
+La grille est découpée en bandes de lignes ; chaque processus calcule tous les
+vols pour ses bandes et cumule les énergies par période directement dans un
+tampon multiprocessing.shared_memory (3, ny, nx) en float64. Les bandes sont
+disjointes : pas de verrou, et chaque nœud reçoit ses vols dans le même ordre
+et par les mêmes paquets que LdenAccumulator.add_flights. Le résultat est
+identique au bit près au calcul séquentiel, quel que soit le nombre de
+processus ou l'ordre de fin des tuiles.
+"""
+
+import logging
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime, time
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.grids.spec import GridSpec
+from src.noise.accumulator import DEFAULT_CHUNK_FLIGHTS, PERIODS, LdenAccumulator, period_of
+from src.noise.engine import AcousticProfile, FlightTrack, compute_receptor_noise
+
+logger = logging.getLogger(__name__)
+
+# Tuiles par processus (équilibrage : les tuiles proches des pistes coûtent plus cher)
+TILES_PER_WORKER = 4
+
+# progress(tuiles terminées, tuiles au total)
+ProgressCallback = Callable[[int, int], None]
+
+# État des processus du pool, transmis une fois par processus (initializer)
+_WORKER: Dict = {}
+
+
+def tile_bounds(spec: GridSpec, workers: int, tile_rows: Optional[int] = None):
+    """Bandes de lignes [début, fin) couvrant la grille"""
+    tile_rows = tile_rows or max(1, math.ceil(spec.ny / (workers * TILES_PER_WORKER)))
+    return [(start, min(start + tile_rows, spec.ny)) for start in range(0, spec.ny, tile_rows)]
+
+
+def _tile_energy(state: Mapping, rows: Tuple[int, int], energy: np.ndarray):
+    """Cumuler dans energy (3, lignes, nx) les vols sur une bande de lignes"""
+    spec: GridSpec = state['spec']
+    start, stop = rows
+    ys = spec.y0 + spec.step * np.arange(start, stop)
+    X, Y = np.meshgrid(spec.xs, ys)
+    points = np.column_stack([X.ravel(), Y.ravel()])
+    tracks, periods = state['tracks'], state['periods']
+    chunk_flights = state['chunk_flights']
+    for i in range(0, len(tracks), chunk_flights):
+        flight_ids, _, sel = compute_receptor_noise(tracks[i:i + chunk_flights], state['profiles'], points,
+                                                    state['weather'], cutoff_m=state['cutoff_m'])
+        chunk_periods = np.array([periods[flight_id] for flight_id in flight_ids])
+        for p, period in enumerate(PERIODS):
+            selected = chunk_periods == period
+            if not selected.any():
+                continue
+            # Même réduction que LdenAccumulator.add_sel (NaN -> énergie nulle)
+            contribution = np.nansum(np.power(10.0, sel[selected].astype(np.float64) / 10), axis=0)
+            energy[p] += contribution.reshape(stop - start, spec.nx)
+
+
+def _init_worker(shm_name: str, state: Dict):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    spec = state['spec']
+    _WORKER.update(state, shm=shm, energy=np.ndarray((len(PERIODS),) + spec.shape, dtype=np.float64,
+                                                         buffer=shm.buf))
+
+
+def _run_tile(rows: Tuple[int, int]) -> Tuple[int, int]:
+    start, stop = rows
+    _tile_energy(_WORKER, rows, _WORKER['energy'][:, start:stop])
+    return rows
+
+
+def parallel_add_flights(accumulator: LdenAccumulator, tracks: Sequence[FlightTrack],
+                         times: Mapping[str, Union[datetime, time]], profiles: Mapping[str, AcousticProfile],
+                         day: Optional[Union[date, str]] = None, weather: Optional[Mapping[str, float]] = None,
+                         workers: Optional[int] = None, tile_rows: Optional[int] = None,
+                         chunk_flights: int = DEFAULT_CHUNK_FLIGHTS, cutoff_m: Optional[float] = None,
+                         progress: Optional[ProgressCallback] = None) -> LdenAccumulator:
+    """Équivalent parallèle de LdenAccumulator.add_flights (résultat identique)
+
+    workers : processus du pool (défaut : nombre de cœurs) ; 1 = calcul dans
+    le processus courant, sans mémoire partagée.
+    """
+    spec = accumulator.spec
+    workers = workers or os.cpu_count() or 1
+    if day is not None:
+        day = str(day)
+        if day in accumulator.days:
+            logger.warning(f"⚠️ Journée {day} déjà cumulée, mouvements ajoutés quand même")
+        accumulator.days.add(day)
+
+    # Mêmes paquets de vols qu'en séquentiel (vols sans segment compris, ignorés par le moteur)
+    tracks = list(tracks)
+    periods = {track.flight_id: period_of(times[track.flight_id]) for track in tracks if track.n_segments}
+    tiles = tile_bounds(spec, workers, tile_rows)
+    state = {'spec': spec, 'tracks': tracks, 'periods': periods, 'profiles': dict(profiles),
+             'weather': weather, 'chunk_flights': chunk_flights, 'cutoff_m': cutoff_m}
+    # Les cumuls existants servent de point de départ : même ordre d'addition qu'en séquentiel
+    initial = np.stack([accumulator.energy[period] for period in PERIODS])
+
+    if workers == 1 or len(tiles) == 1:
+        energy = initial
+        for done, (start, stop) in enumerate(tiles, 1):
+            _tile_energy(state, (start, stop), energy[:, start:stop])
+            if progress:
+                progress(done, len(tiles))
+    else:
+        shm = shared_memory.SharedMemory(create=True, size=initial.nbytes)
+        try:
+            shared = np.ndarray(initial.shape, dtype=np.float64, buffer=shm.buf)
+            shared[:] = initial
+            with ProcessPoolExecutor(max_workers=min(workers, len(tiles)), initializer=_init_worker,
+                                     initargs=(shm.name, state)) as pool:
+                futures = [pool.submit(_run_tile, rows) for rows in tiles]
+                for done, future in enumerate(as_completed(futures), 1):
+                    future.result()
+                    if progress:
+                        progress(done, len(tiles))
+            energy = shared.copy()
+            del shared
+        finally:
+            shm.close()
+            shm.unlink()
+
+    for p, period in enumerate(PERIODS):
+        accumulator.energy[period] = energy[p]
+        accumulator.movements[period] += sum(1 for track in tracks
+                                             if periods.get(track.flight_id) == period)
+    logger.info(f"🧵 {len(tracks)} mouvements cumulés sur {len(tiles)} tuiles, {min(workers, len(tiles))} processus")
+    return accumulator
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Index spatial des segments de trajectoire (STRtree) pour les distances récepteur-trajectoire
+Projet: Airport Air Quality Modeling
+
+Les segments (x, y, z en mètres, CRS projeté) sont indexés par leur trace au
+sol ; une requête par emprise sélectionne les candidats, puis la distance
+oblique 3D (point le plus proche du segment) est calculée et filtrée.
+Les segments au-delà de la distance de coupure ne sont jamais évalués : le coût
+dépend du trafic proche des récepteurs, pas du trafic total.
+Utilisé par le moteur de bruit (cutoff_m, cf. engine.audibility_cutoff) et
+réutilisable pour la dispersion.
+"""
+
+import logging
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import shapely
+
+logger = logging.getLogger(__name__)
+
+
+def slant_distance(receptors: np.ndarray, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """Distance 3D de chaque récepteur au segment [start, end] correspondant (par ligne)"""
+    u = end - start
+    w = receptors - start
+    length2 = np.einsum('ij,ij->i', u, u)
+    fraction = np.where(length2 > 1e-6,
+                        np.clip(np.einsum('ij,ij->i', w, u) / np.where(length2 > 1e-6, length2, 1.0), 0.0, 1.0),
+                        0.0)
+    offset = w - fraction[:, None] * u
+    return np.sqrt(np.einsum('ij,ij->i', offset, offset))
+
+
+class TrackIndex:
+    """Segments de trajectoire indexés (STRtree sur leur trace au sol)"""
+
+    def __init__(self, start: np.ndarray, end: np.ndarray, owner: Optional[np.ndarray] = None,
+                 owner_ids: Optional[Sequence[str]] = None):
+        self.start = np.asarray(start, dtype=float).reshape(-1, 3)
+        self.end = np.asarray(end, dtype=float).reshape(-1, 3)
+        self.owner = np.zeros(len(self.start), dtype=np.int64) if owner is None else np.asarray(owner)
+        self.owner_ids: List[str] = list(owner_ids) if owner_ids is not None else []
+        self.tree = shapely.STRtree(shapely.linestrings(
+            np.stack([self.start[:, :2], self.end[:, :2]], axis=1)
+        ))
+
+    @classmethod
+    def from_tracks(cls, tracks) -> "TrackIndex":
+        """Index des segments d'une liste de FlightTrack (owner = rang du vol)"""
+        tracks = [track for track in tracks if track.n_segments]
+        if not tracks:
+            return cls(np.empty((0, 3)), np.empty((0, 3)), np.empty(0, dtype=np.int64), [])
+        owner = np.repeat(np.arange(len(tracks)), [track.n_segments for track in tracks])
+        return cls(np.concatenate([track.start for track in tracks]),
+                   np.concatenate([track.end for track in tracks]),
+                   owner, [track.flight_id for track in tracks])
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    @staticmethod
+    def _receptors(points: np.ndarray, receptor_height: float) -> np.ndarray:
+        points = np.asarray(points, dtype=float)
+        if points.shape[1] == 3:
+            return points
+        return np.column_stack([points, np.full(len(points), receptor_height)])
+
+    def candidates(self, points: np.ndarray, cutoff: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Couples (récepteur, segment) dont les emprises sont à moins de cutoff
+
+        Présélection sans perte (carré de demi-côté cutoff autour du récepteur) :
+        à filtrer ensuite sur la distance oblique, qui majore la distance horizontale.
+        """
+        points = np.asarray(points, dtype=float)
+        if len(self) == 0 or len(points) == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        x, y = points[:, 0], points[:, 1]
+        receptor_idx, segment_idx = self.tree.query(shapely.box(x - cutoff, y - cutoff, x + cutoff, y + cutoff))
+        return receptor_idx, segment_idx
+
+    def query_pairs(self, points: np.ndarray, cutoff: float,
+                    receptor_height: float = 0.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Couples (récepteur, segment, distance oblique) à moins de cutoff mètres
+
+        points : (N, 2) au sol (hauteur receptor_height) ou (N, 3).
+        """
+        receptors = self._receptors(points, receptor_height)
+        receptor_idx, segment_idx = self.candidates(receptors, cutoff)
+        distance = slant_distance(receptors[receptor_idx], self.start[segment_idx], self.end[segment_idx])
+        keep = distance <= cutoff
+        return receptor_idx[keep], segment_idx[keep], distance[keep]
+
+    def nearest(self, points: np.ndarray, cutoff: float, receptor_height: float = 0.0,
+                per_owner: bool = False):
+        """Segment le plus proche de chaque récepteur (ou de chaque vol si per_owner)
+
+        Sans per_owner : (segment (N,), distance (N,)), -1 / inf hors coupure.
+        Avec per_owner : tableaux (récepteur, vol, segment, distance), une ligne par
+        couple récepteur × vol audible (point de plus proche approche du vol).
+        """
+        receptor_idx, segment_idx, distance = self.query_pairs(points, cutoff, receptor_height)
+        group = receptor_idx if not per_owner else receptor_idx * (self.owner.max(initial=0) + 1) \
+            + self.owner[segment_idx]
+        order = np.lexsort((distance, group))
+        group, first = np.unique(group[order], return_index=True)
+        best = order[first]
+
+        if per_owner:
+            return receptor_idx[best], self.owner[segment_idx[best]], segment_idx[best], distance[best]
+
+        n_points = len(points)
+        nearest_segment = np.full(n_points, -1, dtype=np.int64)
+        nearest_distance = np.full(n_points, np.inf)
+        nearest_segment[receptor_idx[best]] = segment_idx[best]
+        nearest_distance[receptor_idx[best]] = distance[best]
+        return nearest_segment, nearest_distance
+